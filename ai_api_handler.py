@@ -5,11 +5,30 @@ import urllib.request
 import urllib.parse
 import urllib.error
 import ssl
+import time
 
 class AIAPIHandler:
-    def __init__(self):
+    # Engines that can be passed as ai_engine
+    SUPPORTED_ENGINES = ['openai', 'claude', 'gemini', 'mock']
+    # Model used by each API engine (the mock model comes from its config)
+    MODELS = {
+        'openai': 'gpt-3.5-turbo',
+        'claude': 'claude-3-haiku-20240307',
+        'gemini': 'gemini-pro'
+    }
+    
+    def __init__(self, mock_config=None, usage_tracker=None):
         # Load API keys from .env file
         self.load_env()
+        self.settings = self.load_settings()
+        
+        # Offline mock LLM engine (created on first use, needs no API key; configured by ai_models.mock)
+        self.mock_config = mock_config if mock_config is not None else self.settings.get('ai_models', {}).get('mock', {})
+        self.mock_engine = None
+        
+        # Token / cost accounting for every LLM call
+        from src.ai_processors.usage_tracker import UsageTracker
+        self.usage_tracker = usage_tracker or UsageTracker.from_config(self.settings)
         
         # API endpoints
         self.endpoints = {
@@ -53,6 +72,35 @@ class AIAPIHandler:
         if not available_keys:
             print("Warning: No API keys found. Will use fallback mode.")
     
+    def load_settings(self):
+        """Load config/settings.json (price table etc.), empty dict if unavailable"""
+        settings_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'settings.json')
+        try:
+            with open(settings_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"Warning: settings not loaded ({e}), using defaults")
+            return {}
+    
+    def record_usage(self, provider, model, start_time, prompt, content=None,
+                     prompt_tokens=None, completion_tokens=None, success=True):
+        """Record tokens, latency and cost of one LLM call
+        
+        Token counts reported by the provider are used when available; otherwise
+        they are estimated from the prompt and response text.
+        """
+        estimated = False
+        if success and (prompt_tokens is None or completion_tokens is None):
+            from src.ai_processors.usage_tracker import estimate_tokens
+            prompt_tokens = estimate_tokens(prompt) if prompt_tokens is None else prompt_tokens
+            completion_tokens = estimate_tokens(content) if completion_tokens is None else completion_tokens
+            estimated = True
+        
+        self.usage_tracker.record(
+            provider, model, prompt_tokens or 0, completion_tokens or 0,
+            time.perf_counter() - start_time, success=success, estimated=estimated
+        )
+    
     def generate_tags_prompt(self, video_data):
         """旧来のタグ生成プロンプト（二段階処理では使用しない）"""
         print("⚠️ 旧来のタグ生成プロンプトは使用しないでください。二段階処理を使用してください。")
@@ -129,7 +177,42 @@ class AIAPIHandler:
         
         print(f"  Tag filtering: {len(tags)} -> {len(filtered_tags)} tags")
         return filtered_tags
-
+    
+    def parse_tags_response(self, content):
+        """Parse a comma separated AI response into cleaned, filtered tags"""
+        # Parse tags from response
+        tags = [tag.strip() for tag in content.split(',') if tag.strip()]
+        
+        # Clean up tags (remove quotes, extra spaces, etc.)
+        cleaned_tags = []
+        for tag in tags:
+            clean_tag = tag.strip().strip('"').strip("'").strip()
+            if clean_tag and len(clean_tag) > 0:
+                cleaned_tags.append(clean_tag)
+        
+        # Apply generic tag filtering
+        return self.filter_generic_tags(cleaned_tags)
+    
+    def get_model_name(self, ai_engine='openai'):
+        """Return the model name used for the engine (empty for unsupported engines)"""
+        if ai_engine == 'mock':
+            return self.get_mock_engine().model
+        return self.MODELS.get(ai_engine, '')
+    
+    def call_ai(self, prompt, ai_engine='openai'):
+        """Call the selected AI engine with a prompt"""
+        if ai_engine == 'openai':
+            return self.call_openai(prompt)
+        elif ai_engine == 'claude':
+            return self.call_claude(prompt)
+        elif ai_engine == 'gemini':
+            return self.call_gemini(prompt)
+        elif ai_engine == 'mock':
+            return self.call_mock(prompt)
+        
+        print(f"Unsupported AI engine: {ai_engine}")
+        return None
+    
     def call_openai(self, prompt):
         """Call OpenAI API"""
         if 'OPENAI_API_KEY' not in self.api_keys or not self.api_keys['OPENAI_API_KEY']:
@@ -142,7 +225,7 @@ class AIAPIHandler:
         }
         
         data = {
-            'model': 'gpt-3.5-turbo',
+            'model': self.MODELS['openai'],
             'messages': [
                 {'role': 'system', 'content': 'あなたは教育コンテンツのタグ付け専門家です。文字起こし内容を詳細に分析し、その動画固有の具体的なキーワードのみをタグとして抽出してください。汎用的な表現（「要素」「手法」「ポイント」「基本」「応用」等）や数字を含む汎用表現（「6つの要素」等）は絶対に生成しないでください。文字起こしから実際に言及された企業名、ツール名、専門用語、具体的な指標名のみを抽出してください。'},
                 {'role': 'user', 'content': prompt}
@@ -151,6 +234,7 @@ class AIAPIHandler:
             'max_tokens': 300  # Increased for more comprehensive tags
         }
         
+        start_time = time.perf_counter()
         try:
             print(f"Calling OpenAI API for tag generation...")
             req = urllib.request.Request(
@@ -163,19 +247,12 @@ class AIAPIHandler:
                 if response.getcode() == 200:
                     result = json.loads(response.read().decode('utf-8'))
                     content = result['choices'][0]['message']['content'].strip()
+                    usage = result.get('usage', {})
+                    self.record_usage('openai', data['model'], start_time, prompt, content,
+                                      usage.get('prompt_tokens'), usage.get('completion_tokens'))
                     
-                    # Parse tags from response
-                    tags = [tag.strip() for tag in content.split(',') if tag.strip()]
-                    
-                    # Clean up tags (remove quotes, extra spaces, etc.)
-                    cleaned_tags = []
-                    for tag in tags:
-                        clean_tag = tag.strip().strip('"').strip("'").strip()
-                        if clean_tag and len(clean_tag) > 0:
-                            cleaned_tags.append(clean_tag)
-                    
-                    # Apply generic tag filtering
-                    filtered_tags = self.filter_generic_tags(cleaned_tags)
+                    # Parse, clean and filter tags from response
+                    filtered_tags = self.parse_tags_response(content)
                     
                     print(f"OpenAI generated {len(filtered_tags)} filtered tags")
                     return filtered_tags[:20]  # Limit to 20 tags
@@ -186,9 +263,11 @@ class AIAPIHandler:
         except urllib.error.HTTPError as e:
             error_body = e.read().decode('utf-8')
             print(f"OpenAI API HTTP error {e.code}: {error_body}")
+            self.record_usage('openai', data['model'], start_time, prompt, success=False)
             return None
         except Exception as e:
             print(f"OpenAI API error: {str(e)}")
+            self.record_usage('openai', data['model'], start_time, prompt, success=False)
             return None
     
     def call_claude(self, prompt):
@@ -204,7 +283,7 @@ class AIAPIHandler:
         }
         
         data = {
-            'model': 'claude-3-haiku-20240307',
+            'model': self.MODELS['claude'],
             'max_tokens': 300,  # Increased for more comprehensive tags
             'messages': [{
                 'role': 'user',
@@ -212,6 +291,7 @@ class AIAPIHandler:
             }]
         }
         
+        start_time = time.perf_counter()
         try:
             print(f"Calling Claude API for tag generation...")
             req = urllib.request.Request(
@@ -224,19 +304,12 @@ class AIAPIHandler:
                 if response.getcode() == 200:
                     result = json.loads(response.read().decode('utf-8'))
                     content = result['content'][0]['text'].strip()
+                    usage = result.get('usage', {})
+                    self.record_usage('claude', data['model'], start_time, prompt, content,
+                                      usage.get('input_tokens'), usage.get('output_tokens'))
                     
-                    # Parse tags from response
-                    tags = [tag.strip() for tag in content.split(',') if tag.strip()]
-                    
-                    # Clean up tags (remove quotes, extra spaces, etc.)
-                    cleaned_tags = []
-                    for tag in tags:
-                        clean_tag = tag.strip().strip('"').strip("'").strip()
-                        if clean_tag and len(clean_tag) > 0:
-                            cleaned_tags.append(clean_tag)
-                    
-                    # Apply generic tag filtering
-                    filtered_tags = self.filter_generic_tags(cleaned_tags)
+                    # Parse, clean and filter tags from response
+                    filtered_tags = self.parse_tags_response(content)
                     
                     print(f"Claude generated {len(filtered_tags)} filtered tags")
                     return filtered_tags[:20]  # Limit to 20 tags
@@ -247,9 +320,11 @@ class AIAPIHandler:
         except urllib.error.HTTPError as e:
             error_body = e.read().decode('utf-8')
             print(f"Claude API HTTP error {e.code}: {error_body}")
+            self.record_usage('claude', data['model'], start_time, prompt, success=False)
             return None
         except Exception as e:
             print(f"Claude API error: {str(e)}")
+            self.record_usage('claude', data['model'], start_time, prompt, success=False)
             return None
     
     def call_gemini(self, prompt):
@@ -276,6 +351,7 @@ class AIAPIHandler:
             }
         }
         
+        start_time = time.perf_counter()
         try:
             print(f"Calling Gemini API for tag generation...")
             req = urllib.request.Request(
@@ -293,19 +369,12 @@ class AIAPIHandler:
                         candidate = result['candidates'][0]
                         if 'content' in candidate and 'parts' in candidate['content']:
                             content = candidate['content']['parts'][0]['text'].strip()
+                            usage = result.get('usageMetadata', {})
+                            self.record_usage('gemini', self.MODELS['gemini'], start_time, prompt, content,
+                                              usage.get('promptTokenCount'), usage.get('candidatesTokenCount'))
                             
-                            # Parse tags from response
-                            tags = [tag.strip() for tag in content.split(',') if tag.strip()]
-                            
-                            # Clean up tags (remove quotes, extra spaces, etc.)
-                            cleaned_tags = []
-                            for tag in tags:
-                                clean_tag = tag.strip().strip('"').strip("'").strip()
-                                if clean_tag and len(clean_tag) > 0:
-                                    cleaned_tags.append(clean_tag)
-                            
-                            # Apply generic tag filtering
-                            filtered_tags = self.filter_generic_tags(cleaned_tags)
+                            # Parse, clean and filter tags from response
+                            filtered_tags = self.parse_tags_response(content)
                             
                             print(f"Gemini generated {len(filtered_tags)} filtered tags")
                             return filtered_tags[:20]  # Limit to 20 tags
@@ -319,9 +388,46 @@ class AIAPIHandler:
         except urllib.error.HTTPError as e:
             error_body = e.read().decode('utf-8')
             print(f"Gemini API HTTP error {e.code}: {error_body}")
+            self.record_usage('gemini', self.MODELS['gemini'], start_time, prompt, success=False)
             return None
         except Exception as e:
             print(f"Gemini API error: {str(e)}")
+            self.record_usage('gemini', self.MODELS['gemini'], start_time, prompt, success=False)
+            return None
+    
+    def get_mock_engine(self):
+        """Return the offline mock LLM engine, creating it on first use"""
+        if self.mock_engine is None:
+            from src.ai_processors.mock_engine import MockLLMEngine
+            self.mock_engine = MockLLMEngine(self.mock_config)
+        return self.mock_engine
+    
+    def call_mock(self, prompt):
+        """Call the offline mock LLM engine (no API key or network access needed)"""
+        from src.ai_processors.mock_engine import MockLLMError
+        
+        engine = self.get_mock_engine()
+        start_time = time.perf_counter()
+        try:
+            print(f"Calling Mock LLM engine for tag generation...")
+            result = engine.complete(prompt)
+            content = result['text'].strip()
+            self.record_usage('mock', result['model'], start_time, prompt, content,
+                              result['usage']['prompt_tokens'], result['usage']['completion_tokens'])
+            
+            # Parse, clean and filter tags from response
+            filtered_tags = self.parse_tags_response(content)
+            
+            print(f"Mock generated {len(filtered_tags)} filtered tags")
+            return filtered_tags[:20]  # Limit to 20 tags
+            
+        except MockLLMError as e:
+            print(f"Mock API HTTP error {e.status_code}: {e.message}")
+            self.record_usage('mock', engine.model, start_time, prompt, success=False)
+            return None
+        except Exception as e:
+            print(f"Mock API error: {str(e)}")
+            self.record_usage('mock', engine.model, start_time, prompt, success=False)
             return None
     
     def generate_tags(self, video_data, ai_engine='openai'):
@@ -374,12 +480,8 @@ class AIAPIHandler:
 出力: 選択したタグのみをカンマ区切りで出力してください。
 """
         
-        if ai_engine == 'openai':
-            return self.call_openai(prompt)
-        elif ai_engine == 'claude':
-            return self.call_claude(prompt)
-        elif ai_engine == 'gemini':
-            return self.call_gemini(prompt)
+        if ai_engine in self.SUPPORTED_ENGINES:
+            return self.call_ai(prompt, ai_engine)
         else:
             return self.generate_fallback_tags(video_data)
     
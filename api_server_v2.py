@@ -9,8 +9,23 @@ import os
 import sys
 import csv
 import io
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# タグ最適化の動画×タグ接続行列（.npz）の保存先
+INCIDENCE_DIR = os.environ.get('INCIDENCE_DIR', os.path.join('checkpoints', 'incidence'))
+
+# 読み込んだスプレッドシートのスナップショットの保存先
+SHEET_SNAPSHOT_DIR = os.environ.get('SHEET_SNAPSHOT_DIR', os.path.join('checkpoints', 'sheet_snapshots'))
+
+# 複数タブのCSVを並行してダウンロードする同時接続数と、1回に読み込むタブ数の上限
+MAX_TAB_WORKERS = int(os.environ.get('MAX_TAB_WORKERS', 4))
+MAX_SHEET_TABS = 50
+
+# NDJSON ストリーミング集計で1行として読み込む最大バイト数
+MAX_NDJSON_LINE_BYTES = 1024 * 1024
+
 # Import AI handler
 try:
     from ai_api_handler import AIAPIHandler
@@ -86,19 +101,53 @@ class TagGeneratorAPIHandler(http.server.SimpleHTTPRequestHandler):
                 'status': 'running',
                 'timestamp': datetime.now().isoformat(),
                 'version': '2.0.0',
-                'features': ['sheets_api', 'ai_processing', 'tag_optimization'],
+                'features': ['sheets_api', 'ai_processing', 'tag_optimization', 'usage_metrics'],
                 'ai_enabled': AI_ENABLED,
                 'production_mode': production_mode,
                 'available_engines': available_engines,
                 'default_engine': available_engines[0] if available_engines else 'simulation',
                 'force_production': True  # Force production mode when API keys are available
             })
+        elif urllib.parse.urlparse(self.path).path == '/api/metrics/usage':
+            self.handle_usage_metrics()
+        elif urllib.parse.urlparse(self.path).path == '/api/tags/analytics':
+            self.handle_tag_analytics()
         else:
             self.send_error(404)
     
+    def handle_usage_metrics(self):
+        """LLM呼び出しのトークン使用量・コスト集計（?job_id=&dataset_id=&stage= で絞り込み可）"""
+        if not AI_ENABLED:
+            self.send_json_response({'success': False, 'error': 'AI APIハンドラーが利用できません'}, 503)
+            return
+        
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        filters = {key: query[key][0] for key in ['job_id', 'dataset_id', 'stage', 'ai_engine'] if key in query}
+        tracker = ai_handler.usage_tracker
+        
+        self.send_json_response({
+            'success': True,
+            'filters': filters,
+            'summary': tracker.summarize(**filters),
+            'by_stage': tracker.summarize_by('stage', **filters),
+            'by_job': tracker.summarize_by('job_id', **filters),
+            'by_dataset': tracker.summarize_by('dataset_id', **filters),
+            'by_model': tracker.summarize_by('model', **filters),
+            # 第2段階のコストを承認候補リストのサイズ別に比較
+            'by_candidate_count': tracker.summarize_by('candidate_count', **dict(filters, stage='2'))
+        })
+    
     def handle_api_post(self):
         try:
             content_length = int(self.headers.get('Content-Length', 0))
+            
+            # NDJSON のタグ集計は本文を全て読み込まずに1行ずつ処理する
+            content_type = self.headers.get('Content-Type', '')
+            if (urllib.parse.urlparse(self.path).path == '/api/tags/optimize'
+                    and content_type.split(';')[0].strip() in ('application/x-ndjson', 'application/ndjson')):
+                self.handle_tag_optimize_stream(content_length)
+                return
+            
             if content_length:
                 post_data = self.rfile.read(content_length)
                 data = json.loads(post_data.decode('utf-8'))
@@ -143,9 +192,10 @@ class TagGeneratorAPIHandler(http.server.SimpleHTTPRequestHandler):
             return
         
         sheet_id = sheet_id_match.group(1)
+        gid = self._requested_tabs(sheet_id, url, {})[0]['gid']
         
         # Try to access public CSV export
-        csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid=0"
+        csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
         
         try:
             req = urllib.request.Request(csv_url)
@@ -188,6 +238,9 @@ class TagGeneratorAPIHandler(http.server.SimpleHTTPRequestHandler):
                         'success': True,
                         'message': 'Connection successful',
                         'sheet_id': sheet_id,
+                        'gid': gid,
+                        # 複数タブを読み込む場合は /api/sheets/data に all_tabs または gids を指定する
+                        'tabs': self._list_public_tabs(sheet_id) or [],
                         'rows': valid_data_count,  # A列にタイトルがある行数のみをカウント
                         'columns': headers,
                         'sample_data': lines[1] if len(lines) > 1 else None
@@ -256,104 +309,228 @@ class TagGeneratorAPIHandler(http.server.SimpleHTTPRequestHandler):
                 return
             
             sheet_id = sheet_id_match.group(1)
-            csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid=0"
-            
-            # データ取得
-            req = urllib.request.Request(csv_url)
-            req.add_header('User-Agent', 'TagGenerator/3.0')
+            tabs = self._requested_tabs(sheet_id, url, data)
+            if not tabs:
+                self.send_json_response({
+                    'success': False,
+                    'error': 'シート（タブ）一覧を取得できません。GOOGLE_API_KEY を設定するか gids を指定してください'
+                })
+                return
+            multi_tab = len(tabs) > 1
+            snapshot_key = ','.join(f"gid={tab['gid']}" for tab in tabs)
             
-            with urllib.request.urlopen(req, timeout=15) as response:
-                if response.getcode() == 200:
-                    # Shift-JISでデコード、エラー時はUTF-8でフォールバック
-                    raw_content = response.read()
-                    try:
-                        content = raw_content.decode('shift-jis')
-                        print(f"CSVをShift-JISでデコードしました")
-                    except UnicodeDecodeError:
-                        try:
-                            content = raw_content.decode('utf-8')
-                            print(f"CSVをUTF-8でデコードしました（Shift-JISで失敗）")
-                        except UnicodeDecodeError:
-                            content = raw_content.decode('utf-8', errors='ignore')
-                            print(f"CSVをUTF-8でデコードしました（エラー無視）")
-                    lines = content.strip().split('\n')
-                    
-                    if len(lines) < 2:
-                        self.send_json_response({
-                            'success': False,
-                            'error': 'スプレッドシートが空か、データが不十分です'
-                        })
-                        return
-                    
-                    # CSVパーシング
-                    csv_reader = csv.DictReader(io.StringIO(content))
-                    processed_data = []
-                    
-                    for row in csv_reader:
-                        # 列名を正規化（柔軟なマッピング）
-                        normalized_row = {}
-                        for key, value in row.items():
-                            key_lower = key.lower().strip()
-                            value_clean = str(value).strip() if value else ''
-                            
-                            # 列名のマッピング
-                            if 'title' in key_lower or 'タイトル' in key_lower:
-                                normalized_row['title'] = value_clean
-                            elif 'skill' in key_lower or 'スキル' in key_lower:
-                                normalized_row['skill'] = value_clean
-                            elif 'description' in key_lower or '説明' in key_lower:
-                                normalized_row['description'] = value_clean
-                            elif 'summary' in key_lower or '要約' in key_lower:
-                                normalized_row['summary'] = value_clean
-                            elif 'transcript' in key_lower or '文字起こし' in key_lower:
-                                normalized_row['transcript'] = value_clean
-                        
-                        # 必須フィールドの確認
-                        if normalized_row.get('title'):
-                            # デフォルト値を設定
-                            if not normalized_row.get('skill'):
-                                normalized_row['skill'] = 'ビジネススキル'
-                            if not normalized_row.get('description'):
-                                normalized_row['description'] = normalized_row['title']
-                            if not normalized_row.get('summary'):
-                                normalized_row['summary'] = normalized_row['title']
-                            if not normalized_row.get('transcript'):
-                                normalized_row['transcript'] = normalized_row.get('description', '')
-                            
-                            processed_data.append(normalized_row)
-                    
+            # Drive の更新日時が前回読み込み時と同じなら保存済みのスナップショットを返す
+            version = self._public_sheet_version(sheet_id)
+            snapshot_cache = None
+            if version:
+                from src.sheet_snapshot_cache import SheetSnapshotCache
+                snapshot_cache = SheetSnapshotCache(SHEET_SNAPSHOT_DIR)
+                cached = snapshot_cache.get(sheet_id, snapshot_key, version)
+                if cached is not None:
+                    processed_data = cached.fillna('').to_dict('records')
+                    print(f"スナップショットを使用: {sheet_id} ({version.get('modified_time')})")
                     self.send_json_response({
                         'success': True,
                         'data': processed_data,
                         'total_rows': len(processed_data),
                         'processed_rows': len(processed_data),
-                        'source': 'google_sheets',
-                        'sheet_id': sheet_id
-                    })
-                    
-                else:
-                    self.send_json_response({
-                        'success': False,
-                        'error': f'HTTP {response.getcode()}: スプレッドシートにアクセスできません'
+                        'source': 'snapshot',
+                        'sheet_id': sheet_id,
+                        'tabs': tabs,
+                        'modified_time': version.get('modified_time')
                     })
-                    
-        except urllib.error.HTTPError as e:
-            if e.code == 403:
-                self.send_json_response({
-                    'success': False,
-                    'error': 'アクセスが拒否されました。スプレッドシートを公開設定にしてください。'
-                })
-            else:
+                    return
+            
+            # タブごとのCSVを並行してダウンロード（全体の時間は最も大きいタブの時間に近づく）
+            results = self._fetch_tabs(sheet_id, tabs)
+            
+            processed_data = []
+            tab_errors = []
+            for tab, (content, error) in zip(tabs, results):
+                if error is not None:
+                    tab_errors.append({'gid': tab['gid'], 'title': tab['title'], 'error': error})
+                    continue
+                
+                rows = self._parse_catalog_csv(content)
+                tab['rows'] = len(rows)
+                if multi_tab:
+                    for row in rows:
+                        row['source_tab'] = tab['title']
+                processed_data.extend(rows)
+            
+            if len(tab_errors) == len(tabs):
                 self.send_json_response({
                     'success': False,
-                    'error': f'HTTPエラー {e.code}: {e.reason}'
+                    'error': tab_errors[0]['error'] if not multi_tab else 'すべてのタブの読み込みに失敗しました',
+                    'tab_errors': tab_errors
                 })
+                return
+            
+            if snapshot_cache is not None and processed_data and not tab_errors:
+                import pandas as pd
+                snapshot_cache.put(sheet_id, snapshot_key, version, pd.DataFrame(processed_data))
+            
+            response_data = {
+                'success': True,
+                'data': processed_data,
+                'total_rows': len(processed_data),
+                'processed_rows': len(processed_data),
+                'source': 'google_sheets',
+                'sheet_id': sheet_id,
+                'tabs': tabs
+            }
+            if tab_errors:
+                response_data['tab_errors'] = tab_errors
+            self.send_json_response(response_data)
+            
         except Exception as e:
             self.send_json_response({
                 'success': False,
                 'error': f'データ読み込みエラー: {str(e)}'
             })
     
+    def _requested_tabs(self, sheet_id, url, data):
+        """
+        読み込むタブ（{'gid', 'title'} のリスト）を決定
+        
+        all_tabs が真ならすべてのタブ、gids があればその gid、どちらも無ければURLの gid（無ければ 0）
+        """
+        if data.get('all_tabs'):
+            return self._list_public_tabs(sheet_id)
+        
+        gids = data.get('gids')
+        if gids:
+            titles = {tab['gid']: tab['title'] for tab in (self._list_public_tabs(sheet_id) or [])}
+            requested = []
+            for gid in gids:
+                gid = str(gid)
+                if not gid.isdigit():
+                    continue
+                requested.append({'gid': gid, 'title': titles.get(gid, f'gid={gid}')})
+            return list({tab['gid']: tab for tab in requested}.values())[:MAX_SHEET_TABS]
+        
+        gid_match = re.search(r'[#&?]gid=(\d+)', url)
+        gid = gid_match.group(1) if gid_match else '0'
+        return [{'gid': gid, 'title': f'gid={gid}'}]
+    
+    def _list_public_tabs(self, sheet_id):
+        """Sheets API（APIキー）で公開スプレッドシートのタブ一覧を取得。取得できない場合は None"""
+        api_key = os.environ.get('GOOGLE_API_KEY')
+        if not api_key:
+            return None
+        
+        query = urllib.parse.urlencode({'fields': 'sheets.properties(sheetId,title)', 'key': api_key})
+        metadata_url = f"https://sheets.googleapis.com/v4/spreadsheets/{sheet_id}?{query}"
+        try:
+            with urllib.request.urlopen(metadata_url, timeout=10) as response:
+                metadata = json.loads(response.read().decode('utf-8'))
+        except Exception as e:
+            print(f"タブ一覧を取得できません: {str(e)}")
+            return None
+        
+        return [
+            {'gid': str(sheet['properties'].get('sheetId', 0)), 'title': sheet['properties'].get('title', '')}
+            for sheet in metadata.get('sheets', [])
+        ][:MAX_SHEET_TABS]
+    
+    def _fetch_tabs(self, sheet_id, tabs):
+        """タブごとのCSVを上限付きのスレッドプールで並行してダウンロードし、(内容, エラー) を tabs の順で返す"""
+        if len(tabs) == 1:
+            return [self._fetch_tab_csv(sheet_id, tabs[0]['gid'])]
+        
+        with ThreadPoolExecutor(max_workers=min(MAX_TAB_WORKERS, len(tabs))) as executor:
+            return list(executor.map(lambda tab: self._fetch_tab_csv(sheet_id, tab['gid']), tabs))
+    
+    def _fetch_tab_csv(self, sheet_id, gid):
+        """1タブ分のCSVをダウンロードしてデコード。(内容, エラーメッセージ) を返す"""
+        csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
+        req = urllib.request.Request(csv_url)
+        req.add_header('User-Agent', 'TagGenerator/3.0')
+        
+        try:
+            with urllib.request.urlopen(req, timeout=15) as response:
+                if response.getcode() != 200:
+                    return None, f'HTTP {response.getcode()}: スプレッドシートにアクセスできません'
+                raw_content = response.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 403:
+                return None, 'アクセスが拒否されました。スプレッドシートを公開設定にしてください。'
+            return None, f'HTTPエラー {e.code}: {e.reason}'
+        except Exception as e:
+            return None, f'データ読み込みエラー: {str(e)}'
+        
+        # Shift-JISでデコード、エラー時はUTF-8でフォールバック
+        try:
+            content = raw_content.decode('shift-jis')
+            print(f"CSV (gid={gid}) をShift-JISでデコードしました")
+        except UnicodeDecodeError:
+            try:
+                content = raw_content.decode('utf-8')
+                print(f"CSV (gid={gid}) をUTF-8でデコードしました（Shift-JISで失敗）")
+            except UnicodeDecodeError:
+                content = raw_content.decode('utf-8', errors='ignore')
+                print(f"CSV (gid={gid}) をUTF-8でデコードしました（エラー無視）")
+        
+        if len(content.strip().split('\n')) < 2:
+            return None, 'スプレッドシートが空か、データが不十分です'
+        return content, None
+    
+    def _parse_catalog_csv(self, content):
+        """CSVを列名を正規化した動画データのリストに変換（タイトルの無い行は除く）"""
+        csv_reader = csv.DictReader(io.StringIO(content))
+        processed_data = []
+        
+        for row in csv_reader:
+            # 列名を正規化（柔軟なマッピング）
+            normalized_row = {}
+            for key, value in row.items():
+                key_lower = (key or '').lower().strip()
+                value_clean = str(value).strip() if value else ''
+                
+                # 列名のマッピング
+                if 'title' in key_lower or 'タイトル' in key_lower:
+                    normalized_row['title'] = value_clean
+                elif 'skill' in key_lower or 'スキル' in key_lower:
+                    normalized_row['skill'] = value_clean
+                elif 'description' in key_lower or '説明' in key_lower:
+                    normalized_row['description'] = value_clean
+                elif 'summary' in key_lower or '要約' in key_lower:
+                    normalized_row['summary'] = value_clean
+                elif 'transcript' in key_lower or '文字起こし' in key_lower:
+                    normalized_row['transcript'] = value_clean
+            
+            # 必須フィールドの確認
+            if normalized_row.get('title'):
+                # デフォルト値を設定
+                if not normalized_row.get('skill'):
+                    normalized_row['skill'] = 'ビジネススキル'
+                if not normalized_row.get('description'):
+                    normalized_row['description'] = normalized_row['title']
+                if not normalized_row.get('summary'):
+                    normalized_row['summary'] = normalized_row['title']
+                if not normalized_row.get('transcript'):
+                    normalized_row['transcript'] = normalized_row.get('description', '')
+                
+                processed_data.append(normalized_row)
+        
+        return processed_data
+    
+    def _public_sheet_version(self, sheet_id):
+        """Drive API（APIキー）で公開スプレッドシートの更新日時とバージョンを取得。取得できない場合は None"""
+        api_key = os.environ.get('GOOGLE_API_KEY')
+        if not api_key:
+            return None
+        
+        query = urllib.parse.urlencode({'fields': 'modifiedTime,version', 'key': api_key})
+        metadata_url = f"https://www.googleapis.com/drive/v3/files/{sheet_id}?{query}"
+        try:
+            with urllib.request.urlopen(metadata_url, timeout=5) as response:
+                metadata = json.loads(response.read().decode('utf-8'))
+            return {'modified_time': metadata.get('modifiedTime'), 'version': metadata.get('version')}
+        except Exception as e:
+            print(f"スプレッドシートの更新日時を取得できません: {str(e)}")
+            return None
+    
     def handle_ai_process(self, data):
         video_data = data.get('data', [])
         ai_engine = data.get('ai_engine', 'openai')
@@ -461,6 +638,8 @@ class TagGeneratorAPIHandler(http.server.SimpleHTTPRequestHandler):
         from staged_tag_processor import StagedTagProcessor
         
         video_data = data.get('data', [])
+        ai_engine = data.get('ai_engine', 'openai')
+        dataset_id = data.get('dataset_id')
         
         if not video_data:
             self.send_json_response({
@@ -474,7 +653,7 @@ class TagGeneratorAPIHandler(http.server.SimpleHTTPRequestHandler):
         processor = StagedTagProcessor(ai_handler if AI_ENABLED else None)
         
         try:
-            result = processor.execute_stage1_candidate_generation(video_data)
+            result = processor.execute_stage1_candidate_generation(video_data, ai_engine=ai_engine, dataset_id=dataset_id)
             self.send_json_response(result)
             
         except Exception as e:
@@ -495,6 +674,7 @@ class TagGeneratorAPIHandler(http.server.SimpleHTTPRequestHandler):
         video_data = data.get('data', [])
         approved_candidates = data.get('approved_candidates', [])
         ai_engine = data.get('ai_engine', 'openai')
+        dataset_id = data.get('dataset_id')
         
         if not video_data:
             self.send_json_response({
@@ -516,7 +696,12 @@ class TagGeneratorAPIHandler(http.server.SimpleHTTPRequestHandler):
         processor = StagedTagProcessor(ai_handler if AI_ENABLED else None)
         
         try:
-            result = processor.execute_stage2_individual_tagging(video_data, approved_candidates, ai_engine)
+            result = processor.execute_stage2_individual_tagging(
+                video_data, approved_candidates, ai_engine,
+                dataset_id=dataset_id, incremental=bool(data.get('incremental', False)),
+                dedup=bool(data.get('dedup', True)),
+                near_duplicate=bool(data.get('near_duplicate', False))
+            )
             self.send_json_response(result)
             
         except Exception as e:
@@ -692,6 +877,13 @@ class TagGeneratorAPIHandler(http.server.SimpleHTTPRequestHandler):
         return filtered_tags
     
     def handle_tag_optimize(self, data):
+        """
+        タグ一覧を出現回数順に最適化
+        
+        "save_incidence": true の場合は接続行列を保存して incidence_id を返す（/api/tags/analytics で使う）
+        """
+        from src.tag_incidence import TagIncidence
+        
         all_tags = data.get('tags', [])
         max_tags = data.get('max_tags', 200)
         
@@ -714,15 +906,161 @@ class TagGeneratorAPIHandler(http.server.SimpleHTTPRequestHandler):
             for tag, freq in optimized
         }
         
-        self.send_json_response({
+        # 接続行列は要求された場合だけ保存する（同じタグ一覧の接続行列は保存済みのものを再利用する）
+        incidence_id = None
+        if data.get('save_incidence'):
+            incidence_id = hashlib.sha1(
+                json.dumps(all_tags, ensure_ascii=False, sort_keys=True).encode('utf-8')
+            ).hexdigest()[:16]
+            incidence_path = os.path.join(INCIDENCE_DIR, f"{incidence_id}.npz")
+            if os.path.exists(incidence_path):
+                incidence = TagIncidence.load(incidence_path)
+            else:
+                incidence = TagIncidence.from_tags(all_tags)
+                incidence.save(incidence_path)
+        else:
+            incidence = TagIncidence.from_tags(all_tags)
+        
+        response = {
             'success': True,
-            'original_count': len(set(tag for tag_list in all_tags for tag in tag_list)),
+            'original_count': len(tag_frequency),
             'optimized_count': len(optimized),
             'optimized_tags': [tag for tag, freq in optimized],
             'tag_frequencies': dict(optimized[:20]),  # Top 20 with frequencies
-            'tag_scores': dict(list(tag_scores.items())[:10])  # Top 10 with scores
+            'tag_scores': dict(list(tag_scores.items())[:10]),  # Top 10 with scores
+            'coverage_percentage': incidence.coverage(tag for tag, freq in optimized)
+        }
+        if incidence_id:
+            response['incidence_id'] = incidence_id
+        self.send_json_response(response)
+    
+    def handle_tag_optimize_stream(self, content_length):
+        """
+        NDJSON（1行1動画のタグ配列、または {"tags": [...]}）のタグを一定のメモリで集計
+        
+        ?max_tags=&capacity= で上位件数と SpaceSaving の保持数を指定できる。
+        頻度は誤差の範囲（lower_bound〜upper_bound）付き、ユニーク数は HyperLogLog の推定値
+        """
+        from src.tag_sketches import TagStreamSummary, DEFAULT_CAPACITY
+        
+        if not content_length:
+            self.send_json_response({'success': False, 'error': 'Content-Length が必要です'}, 411)
+            return
+        
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        max_tags = self._query_int(query, 'max_tags', 200)
+        if max_tags is None:
+            return
+        capacity = self._query_int(query, 'capacity', DEFAULT_CAPACITY)
+        if capacity is None:
+            return
+        
+        capacity = max(capacity, max_tags)
+        summary = TagStreamSummary(capacity=capacity)
+        
+        invalid_lines = 0
+        remaining = content_length
+        while remaining > 0:
+            line = self.rfile.readline(min(remaining, MAX_NDJSON_LINE_BYTES))
+            if not line:
+                break
+            remaining -= len(line)
+            
+            if not line.endswith(b'\n') and remaining > 0 and len(line) == MAX_NDJSON_LINE_BYTES:
+                # 長すぎる行は改行まで読み捨てる
+                invalid_lines += 1
+                while remaining > 0:
+                    rest = self.rfile.readline(min(remaining, MAX_NDJSON_LINE_BYTES))
+                    if not rest:
+                        break
+                    remaining -= len(rest)
+                    if rest.endswith(b'\n'):
+                        break
+                continue
+            
+            if not line.strip():
+                continue
+            
+            try:
+                row = json.loads(line)
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                invalid_lines += 1
+                continue
+            
+            tags = row.get('tags') if isinstance(row, dict) else row
+            if not isinstance(tags, list):
+                invalid_lines += 1
+                continue
+            summary.add_tags(tags)
+        
+        result = summary.summary(max_tags)
+        top_tags = result.pop('top_tags')
+        max_count = top_tags[0]['count'] if top_tags else 1
+        
+        self.send_json_response({
+            'success': True,
+            'mode': 'streaming',
+            'original_count': result['distinct_tags'],
+            'optimized_count': len(top_tags),
+            'optimized_tags': [entry['tag'] for entry in top_tags],
+            'tag_frequencies': {entry['tag']: entry for entry in top_tags},
+            'tag_scores': {
+                entry['tag']: {'frequency': entry['count'], 'score': round((entry['count'] / max_count) * 10, 1)}
+                for entry in top_tags[:10]
+            },
+            'invalid_lines': invalid_lines,
+            **result
         })
     
+    def handle_tag_analytics(self):
+        """保存済みの接続行列からタグ分析（?incidence_id=&tags=カンマ区切り&max_tags=）"""
+        from src.tag_incidence import TagIncidence
+        
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        incidence_id = query.get('incidence_id', [''])[0]
+        if not re.fullmatch(r'[0-9a-f]{16}', incidence_id):
+            self.send_json_response({'success': False, 'error': 'incidence_id が不正です'}, 400)
+            return
+        
+        max_tags = self._query_int(query, 'max_tags', 200)
+        if max_tags is None:
+            return
+        
+        incidence_path = os.path.join(INCIDENCE_DIR, f"{incidence_id}.npz")
+        if not os.path.exists(incidence_path):
+            self.send_json_response({'success': False, 'error': '接続行列が見つかりません'}, 404)
+            return
+        
+        incidence = TagIncidence.load(incidence_path)
+        if 'tags' in query:
+            final_tags = [tag.strip() for tag in query['tags'][0].split(',') if tag.strip()]
+        else:
+            # 省略時は付与動画数の上位のタグ
+            import numpy as np
+            frequencies = incidence.tag_frequencies()
+            final_tags = [incidence.tags[column] for column in np.argsort(-frequencies, kind='stable')[:max_tags]]
+        
+        analytics = incidence.analytics(final_tags)
+        analytics['final_tags'] = final_tags
+        self.send_json_response({'success': True, 'incidence_id': incidence_id, 'analytics': analytics})
+    
+    def _query_int(self, query, name, default):
+        """
+        クエリパラメータを1以上の整数として取得
+        
+        不正な値の場合は 400 を返して None を返す（呼び出し側はそのまま終了する）
+        """
+        value = query.get(name, [str(default)])[0]
+        try:
+            number = int(value)
+        except ValueError:
+            number = 0
+        
+        if number < 1:
+            self.send_json_response({'success': False, 'error': f'{name} は1以上の整数で指定してください'}, 400)
+            return None
+        return number
+    
     def send_json_response(self, data, status=200):
         self.send_response(status)
         self.send_header('Content-type', 'application/json; charset=utf-8')
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+パイプライン性能計測スクリプト
+モックLLMエンジンを使用して、合成カタログに対し第1段階・第2段階の処理を実行し、
+スループット・レイテンシ（p50/p95/p99）・動画あたりCPU時間を計測します。
+実APIは呼び出さないため、APIキーやクォータは不要です。
+"""
+
+import os
+import sys
+import io
+import json
+import math
+import time
+import random
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_api_handler import AIAPIHandler
+from staged_tag_processor import StagedTagProcessor
+from src.catalog_snapshot import read_catalog_snapshot, write_catalog_snapshot
+
+
+# 合成カタログ生成用の語彙
+SKILLS = ['マーケティング', '営業', 'データ分析', 'プロジェクト管理', '財務会計', '人事労務']
+TOOLS = [
+    'Google Analytics 4', 'Salesforce CRM', 'Power BI', 'Tableau', 'HubSpot',
+    'Excel関数', 'SQL クエリ', 'Slack', 'Notion', 'Looker Studio', 'Jira', 'Kintone'
+]
+CONCEPTS = [
+    'コンバージョン率', 'LTV分析', 'ROI計算', 'A/Bテスト', 'KPI設計', 'OKR設定',
+    'SWOT分析', 'PDCA サイクル', 'カスタマージャーニー', 'ペルソナ設計',
+    'リードナーチャリング', 'キャッシュフロー', 'ガントチャート', 'リスクマネジメント',
+    'ファネル分析', 'コホート分析', 'インサイドセールス', 'アカウントプランニング'
+]
+
+
+def build_synthetic_catalog(video_count, transcript_chars=2000, seed=0):
+    """
+    合成動画カタログを生成
+    
+    Args:
+        video_count: 動画数
+        transcript_chars: 文字起こしのおおよその文字数
+        seed: 乱数シード
+    
+    Returns:
+        動画データのリスト
+    """
+    rng = random.Random(seed)
+    catalog = []
+    
+    for i in range(video_count):
+        skill = rng.choice(SKILLS)
+        tools = rng.sample(TOOLS, 2)
+        concepts = rng.sample(CONCEPTS, 4)
+        
+        sentences = []
+        while sum(len(s) for s in sentences) < transcript_chars:
+            term = rng.choice(tools + concepts)
+            sentences.append(f"今回は{term}について具体的な事例を交えて説明します。")
+        
+        catalog.append({
+            'title': f"{tools[0]}で実践する{concepts[0]}と{concepts[1]} 第{i + 1}回",
+            'skill': skill,
+            'description': f"{skill}担当者向けに{tools[0]}と{tools[1]}を使った{concepts[2]}の進め方を解説します。",
+            'summary': f"{concepts[0]}、{concepts[1]}、{concepts[3]}の要点を整理します。",
+            'transcript': ''.join(sentences)
+        })
+    
+    return catalog
+
+
+def percentile(values, pct):
+    """
+    最近傍ランク法でパーセンタイルを算出
+    
+    Args:
+        values: 数値のリスト
+        pct: パーセンタイル（0-100）
+    
+    Returns:
+        パーセンタイル値（値がない場合は0.0）
+    """
+    if not values:
+        return 0.0
+    
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class CallRecorder:
+    """AIAPIHandler.call_ai の呼び出しごとのレイテンシと失敗を記録"""
+    
+    def __init__(self, handler):
+        self.handler = handler
+        self.original_call_ai = handler.call_ai
+        self.latencies = {1: [], 2: []}
+        self.errors = {1: 0, 2: 0}
+        self.stage = 1
+        handler.call_ai = self.call_ai
+    
+    def call_ai(self, prompt, ai_engine='openai'):
+        start = time.perf_counter()
+        result = self.original_call_ai(prompt, ai_engine)
+        self.latencies[self.stage].append(time.perf_counter() - start)
+        if result is None:
+            self.errors[self.stage] += 1
+        return result
+
+
+def latency_summary(latencies):
+    """レイテンシリストの要約統計（ミリ秒）"""
+    return {
+        'calls': len(latencies),
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'max_ms': max(latencies) * 1000 if latencies else 0.0
+    }
+
+
+def run_benchmark(args):
+    """
+    第1段階・第2段階を実行して計測結果を返す
+    
+    Args:
+        args: コマンドライン引数
+    
+    Returns:
+        計測結果の辞書
+    """
+    mock_config = {
+        'latency_distribution': args.latency_distribution,
+        'latency_mean': args.latency_mean,
+        'latency_stddev': args.latency_stddev,
+        'latency_min': args.latency_min,
+        'latency_max': args.latency_max,
+        'error_rate': args.error_rate,
+        'rate_limit_rate': args.rate_limit_rate,
+        'seed': args.seed
+    }
+    
+    if args.catalog:
+        # 保存済みのカタログスナップショットを使う（件数はスナップショットの行数）
+        load_start = time.perf_counter()
+        catalog = read_catalog_snapshot(args.catalog, as_category=False).to_dict('records')
+        print(f"カタログを読み込みました: {args.catalog} ({len(catalog)}件, {time.perf_counter() - load_start:.2f}秒)")
+        args.videos = len(catalog)
+    else:
+        catalog = build_synthetic_catalog(args.videos, args.transcript_chars, args.seed)
+    
+    if args.save_catalog:
+        write_catalog_snapshot(catalog, args.save_catalog)
+        print(f"カタログを保存しました: {args.save_catalog}")
+    
+    # ログ出力を抑制（--verbose 指定時のみ表示）
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    
+    with output:
+        handler = AIAPIHandler(mock_config=mock_config)
+        recorder = CallRecorder(handler)
+        processor = StagedTagProcessor(handler)
+        
+        # 第1段階: タグ候補生成
+        recorder.stage = 1
+        stage1_wall = time.perf_counter()
+        stage1_cpu = time.process_time()
+        stage1_result = processor.execute_stage1_candidate_generation(
+            catalog, max_batch_size=len(catalog), ai_engine='mock'
+        )
+        stage1_wall = time.perf_counter() - stage1_wall
+        stage1_cpu = time.process_time() - stage1_cpu
+        
+        # 第2段階: 生成された候補をすべて承認して個別タグ付け
+        recorder.stage = 2
+        stage2_wall = time.perf_counter()
+        stage2_cpu = time.process_time()
+        stage2_result = processor.execute_stage2_individual_tagging(
+            catalog, stage1_result['tag_candidates'], ai_engine='mock'
+        )
+        stage2_wall = time.perf_counter() - stage2_wall
+        stage2_cpu = time.process_time() - stage2_cpu
+    
+    total_wall = stage1_wall + stage2_wall
+    total_cpu = stage1_cpu + stage2_cpu
+    tagged_videos = len([r for r in stage2_result.get('results', []) if r['selected_tags']])
+    
+    return {
+        'config': {
+            'videos': args.videos,
+            'transcript_chars': args.transcript_chars,
+            'mock': mock_config
+        },
+        'stage1': {
+            'wall_seconds': stage1_wall,
+            'cpu_seconds': stage1_cpu,
+            'candidate_count': stage1_result['candidate_count'],
+            'usage': stage1_result['usage'],
+            'failed_calls': recorder.errors[1],
+            'latency': latency_summary(recorder.latencies[1])
+        },
+        'stage2': {
+            'wall_seconds': stage2_wall,
+            'cpu_seconds': stage2_cpu,
+            'tagged_videos': tagged_videos,
+            'failed_calls': recorder.errors[2],
+            'videos_per_second': args.videos / stage2_wall if stage2_wall > 0 else 0.0,
+            'usage': stage2_result['usage'],
+            'latency': latency_summary(recorder.latencies[2])
+        },
+        'total': {
+            'wall_seconds': total_wall,
+            'videos_per_second': args.videos / total_wall if total_wall > 0 else 0.0,
+            'cpu_ms_per_video': total_cpu / args.videos * 1000 if args.videos else 0.0
+        }
+    }
+
+
+def print_report(report):
+    """計測結果を表示"""
+    print(f"\n{'='*60}")
+    print(f"パイプライン性能計測結果: {report['config']['videos']}件の合成動画")
+    print(f"{'='*60}")
+    
+    for stage_key, label in [('stage1', '第1段階（タグ候補生成）'), ('stage2', '第2段階（個別タグ付け）')]:
+        stage = report[stage_key]
+        latency = stage['latency']
+        print(f"\n{label}")
+        print(f"  経過時間: {stage['wall_seconds']:.2f}秒 / CPU時間: {stage['cpu_seconds']:.2f}秒")
+        print(f"  API呼び出し: {latency['calls']}回 (失敗 {stage['failed_calls']}回)")
+        print(f"  レイテンシ: p50 {latency['p50_ms']:.1f}ms / p95 {latency['p95_ms']:.1f}ms / p99 {latency['p99_ms']:.1f}ms")
+        print(f"  トークン: 入力 {stage['usage']['prompt_tokens']:,} / 出力 {stage['usage']['completion_tokens']:,}")
+    
+    print(f"\n候補数: {report['stage1']['candidate_count']}個 / タグ付け成功: {report['stage2']['tagged_videos']}件")
+    print(f"スループット: {report['total']['videos_per_second']:.2f}動画/秒")
+    print(f"動画あたりCPU時間: {report['total']['cpu_ms_per_video']:.2f}ms")
+
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description='モックLLMを使用したパイプライン性能計測')
+    parser.add_argument('--videos', type=int, default=100, help='合成カタログの動画数')
+    parser.add_argument('--transcript-chars', type=int, default=2000, help='文字起こしのおおよその文字数')
+    parser.add_argument('--latency-distribution', default='lognormal',
+                        choices=['none', 'fixed', 'uniform', 'lognormal'], help='レイテンシ分布')
+    parser.add_argument('--latency-mean', type=float, default=0.05, help='平均レイテンシ（秒）')
+    parser.add_argument('--latency-stddev', type=float, default=0.02, help='レイテンシの標準偏差（秒）')
+    parser.add_argument('--latency-min', type=float, default=0.01, help='最小レイテンシ（秒、uniform用）')
+    parser.add_argument('--latency-max', type=float, default=0.1, help='最大レイテンシ（秒、uniform用）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='500エラーの注入率')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='429エラーの注入率')
+    parser.add_argument('--seed', type=int, default=0, help='乱数シード')
+    parser.add_argument('--catalog', help='合成カタログの代わりに使う Parquet スナップショットのパス')
+    parser.add_argument('--save-catalog', help='使用したカタログを Parquet スナップショットとして保存するパス')
+    parser.add_argument('--json', dest='json_path', help='計測結果をJSONで保存するパス')
+    parser.add_argument('--verbose', action='store_true', help='処理ログを表示')
+    args = parser.parse_args()
+    
+    report = run_benchmark(args)
+    print_report(report)
+    
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n計測結果を保存しました: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+A1表記ユーティリティモジュール
+列番号と列名（A, B, ..., Z, AA, ...）の変換と、シート名を含む範囲文字列の作成を提供する
+"""
+
+import re
+from typing import Optional
+
+
+_COLUMN_PATTERN = re.compile(r'^[A-Za-z]+$')
+
+
+def column_letter(index: int) -> str:
+    """
+    0始まりの列番号を列名に変換
+    
+    Args:
+        index: 列番号（0 → 'A', 25 → 'Z', 26 → 'AA'）
+    
+    Returns:
+        列名
+    """
+    if index < 0:
+        raise ValueError(f"列番号は0以上である必要があります: {index}")
+    
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def column_index(letter: str) -> int:
+    """
+    列名を0始まりの列番号に変換
+    
+    Args:
+        letter: 列名（大文字・小文字を区別しない）
+    
+    Returns:
+        列番号
+    """
+    if not _COLUMN_PATTERN.match(letter or ''):
+        raise ValueError(f"不正な列名です: {letter}")
+    
+    index = 0
+    for char in letter.upper():
+        index = index * 26 + (ord(char) - 64)
+    return index - 1
+
+
+def quote_sheet_name(sheet_name: str) -> str:
+    """
+    範囲指定用にシート名を引用符で囲む（シート名中の ' は '' にエスケープ）
+    
+    Args:
+        sheet_name: シート名
+    
+    Returns:
+        引用符付きのシート名
+    """
+    return "'" + sheet_name.replace("'", "''") + "'"
+
+
+def a1_range(
+    sheet_name: str,
+    start_column: int,
+    start_row: int,
+    end_column: Optional[int] = None,
+    end_row: Optional[int] = None
+) -> str:
+    """
+    シート名付きのA1表記の範囲を作成
+    
+    Args:
+        sheet_name: シート名
+        start_column: 開始列番号（0始まり）
+        start_row: 開始行（1始まり）
+        end_column: 終了列番号（省略時は開始列と同じ）
+        end_row: 終了行（省略時は開始行と同じ）
+    
+    Returns:
+        範囲文字列（例: 'Sheet1'!C2:C1001）
+    """
+    end_column = start_column if end_column is None else end_column
+    end_row = start_row if end_row is None else end_row
+    
+    start = f"{column_letter(start_column)}{start_row}"
+    end = f"{column_letter(end_column)}{end_row}"
+    cells = start if start == end else f"{start}:{end}"
+    return f"{quote_sheet_name(sheet_name)}!{cells}"
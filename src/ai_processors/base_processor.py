@@ -4,6 +4,8 @@ AI処理の基底クラス
 
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any
+import asyncio
+import threading
 import time
 import logging
 
@@ -23,17 +25,90 @@ class BaseAIProcessor(ABC):
         self.logger = logging.getLogger(self.__class__.__name__)
         self.last_request_time = 0
         self.rate_limit_per_minute = self.config.get('rate_limit_per_minute', 60)
+        self._rate_limit_lock = threading.Lock()
+        self._loop_bound_objects = {}
+        
+        # トークン使用量・コストの記録先（BatchProcessor が UsageTracker を設定）
+        self.usage_tracker = None
         
     def _enforce_rate_limit(self):
         """レート制限を適用"""
-        min_interval = 60.0 / self.rate_limit_per_minute
-        elapsed = time.time() - self.last_request_time
+        with self._rate_limit_lock:
+            min_interval = 60.0 / self.rate_limit_per_minute
+            elapsed = time.time() - self.last_request_time
+            
+            if elapsed < min_interval:
+                sleep_time = min_interval - elapsed
+                time.sleep(sleep_time)
+            
+            self.last_request_time = time.time()
+    
+    async def _enforce_rate_limit_async(self):
+        """
+        レート制限を適用（非同期版）
         
-        if elapsed < min_interval:
-            sleep_time = min_interval - elapsed
-            time.sleep(sleep_time)
+        リクエストの送信間隔のみを制御し、送信済みリクエストの応答待ちは
+        ブロックしないため、複数のリクエストを同時に実行中にできる
+        """
+        async with self._get_loop_bound('rate_limit_lock', asyncio.Lock):
+            min_interval = 60.0 / self.rate_limit_per_minute
+            elapsed = time.time() - self.last_request_time
+            
+            if elapsed < min_interval:
+                await asyncio.sleep(min_interval - elapsed)
+            
+            self.last_request_time = time.time()
+    
+    def _record_usage(
+        self,
+        provider: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        start_time: float,
+        success: bool = True
+    ):
+        """
+        API呼び出しのトークン数・レイテンシを使用量トラッカーに記録
+        
+        Args:
+            provider: プロバイダー名
+            model: モデル名
+            prompt_tokens: 入力トークン数
+            completion_tokens: 出力トークン数
+            start_time: 呼び出し開始時刻（time.time()）
+            success: 呼び出し成功可否
+        """
+        if self.usage_tracker is None:
+            return
         
-        self.last_request_time = time.time()
+        self.usage_tracker.record(
+            provider, model, prompt_tokens, completion_tokens,
+            time.time() - start_time, success=success
+        )
+    
+    def _get_loop_bound(self, name: str, factory):
+        """
+        実行中のイベントループに紐づくオブジェクトを取得
+        
+        asyncio.Lock や非同期クライアントの接続プールは生成時のイベントループでしか
+        使えないため、asyncio.run が呼ばれるたびにループごとに生成し直す
+        
+        Args:
+            name: オブジェクト名
+            factory: オブジェクトを生成する関数
+            
+        Returns:
+            現在のイベントループ用のオブジェクト
+        """
+        loop = asyncio.get_running_loop()
+        cached = self._loop_bound_objects.get(name)
+        
+        if cached is None or cached[0] is not loop:
+            cached = (loop, factory())
+            self._loop_bound_objects[name] = cached
+        
+        return cached[1]
     
     @abstractmethod
     def generate_tags(self, video_data: Dict[str, str]) -> List[str]:
@@ -53,6 +128,21 @@ class BaseAIProcessor(ABC):
         """
         pass
     
+    async def generate_tags_async(self, video_data: Dict[str, str]) -> List[str]:
+        """
+        動画データからタグを生成（非同期版）
+        
+        非同期クライアントを持たないプロセッサー向けのデフォルト実装として、
+        同期版の generate_tags をワーカースレッドで実行する
+        
+        Args:
+            video_data: 動画データ辞書
+            
+        Returns:
+            生成されたタグのリスト
+        """
+        return await asyncio.to_thread(self.generate_tags, video_data)
+    
     def create_prompt(self, video_data: Dict[str, str]) -> str:
         """
         プロンプトを作成
@@ -3,6 +3,7 @@ Claude API処理モジュール
 """
 
 import os
+import time
 from typing import List, Dict, Any
 import anthropic
 from dotenv import load_dotenv
@@ -45,28 +46,59 @@ class ClaudeProcessor(BaseAIProcessor):
         Returns:
             生成されたタグのリスト
         """
+        start_time = time.time()
         try:
             # レート制限を適用
             self._enforce_rate_limit()
-            
-            # プロンプトを作成
-            prompt = self.create_prompt(video_data)
+            start_time = time.time()  # レート制限の待ち時間を除いて計測
             
             # Claudeにリクエスト
             response = self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                system="あなたはマーケティング教育動画の内容を分析して、検索に最適なタグを生成する専門家です。",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
+                **self._build_request(video_data)
+            )
+            
+            # レスポンスからタグを抽出
+            tags_text = response.content[0].text.strip()
+            self._record_usage('claude', self.model, response.usage.input_tokens, response.usage.output_tokens, start_time)
+            tags = self.clean_tags(tags_text)
+            
+            self.logger.info(f"Claude: 動画「{video_data.get('title', 'Unknown')}」に対して{len(tags)}個のタグを生成")
+            
+            return tags
+            
+        except anthropic.APIError as e:
+            self.logger.error(f"Claude APIエラー: {str(e)}")
+            self._record_usage('claude', self.model, 0, 0, start_time, success=False)
+            return []
+        except Exception as e:
+            self.logger.error(f"Claude処理エラー: {str(e)}")
+            self._record_usage('claude', self.model, 0, 0, start_time, success=False)
+            return []
+    
+    async def generate_tags_async(self, video_data: Dict[str, str]) -> List[str]:
+        """
+        Claude APIを使用してタグを生成（非同期クライアント版）
+        
+        Args:
+            video_data: 動画データ辞書
+            
+        Returns:
+            生成されたタグのリスト
+        """
+        start_time = time.time()
+        try:
+            # レート制限を適用
+            await self._enforce_rate_limit_async()
+            start_time = time.time()  # レート制限の待ち時間を除いて計測
+            
+            # Claudeにリクエスト
+            response = await self._get_async_client().messages.create(
+                **self._build_request(video_data)
             )
             
             # レスポンスからタグを抽出
             tags_text = response.content[0].text.strip()
+            self._record_usage('claude', self.model, response.usage.input_tokens, response.usage.output_tokens, start_time)
             tags = self.clean_tags(tags_text)
             
             self.logger.info(f"Claude: 動画「{video_data.get('title', 'Unknown')}」に対して{len(tags)}個のタグを生成")
@@ -75,11 +107,44 @@ class ClaudeProcessor(BaseAIProcessor):
             
         except anthropic.APIError as e:
             self.logger.error(f"Claude APIエラー: {str(e)}")
+            self._record_usage('claude', self.model, 0, 0, start_time, success=False)
             return []
         except Exception as e:
             self.logger.error(f"Claude処理エラー: {str(e)}")
+            self._record_usage('claude', self.model, 0, 0, start_time, success=False)
             return []
     
+    def _get_async_client(self) -> anthropic.AsyncAnthropic:
+        """実行中のイベントループ用の非同期クライアントを取得"""
+        return self._get_loop_bound(
+            'async_client', lambda: anthropic.AsyncAnthropic(api_key=self.api_key)
+        )
+    
+    def _build_request(self, video_data: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Messages API リクエストのパラメータを作成
+        
+        Args:
+            video_data: 動画データ辞書
+            
+        Returns:
+            リクエストパラメータ
+        """
+        # プロンプトを作成
+        prompt = self.create_prompt(video_data)
+        
+        return {
+            'model': self.model,
+            'max_tokens': self.max_tokens,
+            'system': "あなたはマーケティング教育動画の内容を分析して、検索に最適なタグを生成する専門家です。",
+            'messages': [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+        }
+    
     def test_connection(self) -> bool:
         """
         API接続テスト
@@ -3,6 +3,7 @@ Google Gemini処理モジュール
 """
 
 import os
+import time
 from typing import List, Dict, Any
 import google.generativeai as genai
 from dotenv import load_dotenv
@@ -49,29 +50,57 @@ class GeminiProcessor(BaseAIProcessor):
         Returns:
             生成されたタグのリスト
         """
+        start_time = time.time()
         try:
             # レート制限を適用
             self._enforce_rate_limit()
+            start_time = time.time()  # レート制限の待ち時間を除いて計測
             
-            # プロンプトを作成
-            system_prompt = "あなたはマーケティング教育動画の内容を分析して、検索に最適なタグを生成する専門家です。"
-            user_prompt = self.create_prompt(video_data)
+            # Geminiにリクエスト
+            response = self.model.generate_content(
+                self._build_prompt(video_data),
+                generation_config=self._build_generation_config()
+            )
+            
+            # レスポンスからタグを抽出
+            tags_text = response.text.strip()
+            self._record_usage('gemini', self.model_name, *self._usage_tokens(response), start_time)
+            tags = self.clean_tags(tags_text)
+            
+            self.logger.info(f"Gemini: 動画「{video_data.get('title', 'Unknown')}」に対して{len(tags)}個のタグを生成")
+            
+            return tags
             
-            full_prompt = f"{system_prompt}\n\n{user_prompt}"
+        except Exception as e:
+            self.logger.error(f"Gemini処理エラー: {str(e)}")
+            self._record_usage('gemini', self.model_name, 0, 0, start_time, success=False)
+            return []
+    
+    async def generate_tags_async(self, video_data: Dict[str, str]) -> List[str]:
+        """
+        Google Geminiを使用してタグを生成（非同期API版）
+        
+        Args:
+            video_data: 動画データ辞書
+            
+        Returns:
+            生成されたタグのリスト
+        """
+        start_time = time.time()
+        try:
+            # レート制限を適用
+            await self._enforce_rate_limit_async()
+            start_time = time.time()  # レート制限の待ち時間を除いて計測
             
             # Geminiにリクエスト
-            response = self.model.generate_content(
-                full_prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=self.temperature,
-                    max_output_tokens=self.max_tokens,
-                    top_p=1,
-                    top_k=40
-                )
+            response = await self.model.generate_content_async(
+                self._build_prompt(video_data),
+                generation_config=self._build_generation_config()
             )
             
             # レスポンスからタグを抽出
             tags_text = response.text.strip()
+            self._record_usage('gemini', self.model_name, *self._usage_tokens(response), start_time)
             tags = self.clean_tags(tags_text)
             
             self.logger.info(f"Gemini: 動画「{video_data.get('title', 'Unknown')}」に対して{len(tags)}個のタグを生成")
@@ -80,8 +109,49 @@ class GeminiProcessor(BaseAIProcessor):
             
         except Exception as e:
             self.logger.error(f"Gemini処理エラー: {str(e)}")
+            self._record_usage('gemini', self.model_name, 0, 0, start_time, success=False)
             return []
     
+    def _usage_tokens(self, response):
+        """
+        レスポンスのトークン使用量を取得
+        
+        Args:
+            response: generate_content のレスポンス
+            
+        Returns:
+            (入力トークン数, 出力トークン数)（usage_metadata が無い場合は0）
+        """
+        usage = getattr(response, 'usage_metadata', None)
+        return (
+            getattr(usage, 'prompt_token_count', 0) or 0,
+            getattr(usage, 'candidates_token_count', 0) or 0
+        )
+    
+    def _build_prompt(self, video_data: Dict[str, str]) -> str:
+        """
+        システムプロンプトを含むプロンプト全体を作成
+        
+        Args:
+            video_data: 動画データ辞書
+            
+        Returns:
+            プロンプト文字列
+        """
+        system_prompt = "あなたはマーケティング教育動画の内容を分析して、検索に最適なタグを生成する専門家です。"
+        user_prompt = self.create_prompt(video_data)
+        
+        return f"{system_prompt}\n\n{user_prompt}"
+    
+    def _build_generation_config(self):
+        """生成設定を作成"""
+        return genai.types.GenerationConfig(
+            temperature=self.temperature,
+            max_output_tokens=self.max_tokens,
+            top_p=1,
+            top_k=40
+        )
+    
     def test_connection(self) -> bool:
         """
         API接続テスト
@@ -0,0 +1,280 @@
+"""
+オフライン検証用モックLLMエンジン
+実APIを呼び出さずに、タグ候補に基づく決定的な応答と
+設定可能なレイテンシ分布・エラー率・429レート制限を再現する
+"""
+
+import asyncio
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from typing import List, Dict, Any
+from .usage_tracker import estimate_tokens
+
+
+# プロンプト内でタグ候補一覧の直前に置かれる見出し
+CANDIDATE_MARKERS = ['【承認済みタグ候補】', '利用可能なタグ候補']
+
+# 指示文として扱い、キーワード抽出の対象外とするセクション見出しの語
+INSTRUCTION_SECTION_WORDS = ['基準', 'ルール', '避ける', '厳守', '出力', '例']
+
+# データ行の先頭のラベル（「タイトル: 」「- スキル名：」など）
+LABEL_PATTERN = re.compile(r'^[-・*\s]*[^\s:：]{1,12}[:：]\s*')
+
+
+class MockLLMError(Exception):
+    """モックLLMが注入したAPIエラー"""
+    
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"HTTP {status_code}: {message}")
+        self.status_code = status_code
+        self.message = message
+
+
+class MockLLMEngine:
+    """決定的な応答を返すモックLLMエンジン"""
+    
+    def __init__(self, config: Dict[str, Any] = None):
+        """
+        初期化
+        
+        Args:
+            config: モック設定
+                - model: 応答に含めるモデル名
+                - latency_distribution: 'none' / 'fixed' / 'uniform' / 'lognormal'
+                - latency_mean: 平均レイテンシ（秒）
+                - latency_stddev: レイテンシの標準偏差（秒、lognormal用）
+                - latency_min / latency_max: レイテンシの範囲（秒、uniform用）
+                - error_rate: 500エラーを返す確率
+                - rate_limit_rate: 429エラーを返す確率
+                - min_tags / max_tags: 候補から選択するタグ数の範囲
+                - max_free_tags: 候補がない場合に返すキーワード数の上限
+                - seed: 乱数シード
+        """
+        self.config = config or {}
+        self.model = self.config.get('model', 'mock-llm')
+        self.latency_distribution = self.config.get('latency_distribution', 'lognormal')
+        self.latency_mean = self.config.get('latency_mean', 0.8)
+        self.latency_stddev = self.config.get('latency_stddev', 0.3)
+        self.latency_min = self.config.get('latency_min', 0.2)
+        self.latency_max = self.config.get('latency_max', 1.5)
+        self.error_rate = self.config.get('error_rate', 0.0)
+        self.rate_limit_rate = self.config.get('rate_limit_rate', 0.0)
+        self.min_tags = self.config.get('min_tags', 10)
+        self.max_tags = self.config.get('max_tags', 15)
+        self.max_free_tags = self.config.get('max_free_tags', 30)
+        
+        # レイテンシとエラー注入はシード固定の乱数列で再現可能にする
+        self._random = random.Random(self.config.get('seed', 0))
+        self._lock = threading.Lock()
+    
+    def complete(self, prompt: str) -> Dict[str, Any]:
+        """
+        プロンプトに応答（同期版）
+        
+        Args:
+            prompt: プロンプト文字列
+        
+        Returns:
+            応答テキストとトークン使用量
+        
+        Raises:
+            MockLLMError: エラー注入時
+        """
+        latency, status_code = self._sample_call()
+        if latency > 0:
+            time.sleep(latency)
+        
+        self._raise_injected_error(status_code)
+        return self.respond(prompt)
+    
+    async def complete_async(self, prompt: str) -> Dict[str, Any]:
+        """
+        プロンプトに応答（非同期版）
+        
+        Args:
+            prompt: プロンプト文字列
+        
+        Returns:
+            応答テキストとトークン使用量
+        
+        Raises:
+            MockLLMError: エラー注入時
+        """
+        latency, status_code = self._sample_call()
+        if latency > 0:
+            await asyncio.sleep(latency)
+        
+        self._raise_injected_error(status_code)
+        return self.respond(prompt)
+    
+    def respond(self, prompt: str) -> Dict[str, Any]:
+        """
+        プロンプトから決定的な応答を生成
+        
+        タグ候補を含むプロンプト（第2段階）では、本文で言及されている候補を優先して
+        10-15個を選択する。候補を含まないプロンプト（第1段階など）では、動画情報の
+        セクションから具体的なキーワードを抽出する。
+        
+        Args:
+            prompt: プロンプト文字列
+        
+        Returns:
+            応答テキストとトークン使用量
+        """
+        digest = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16], 16)
+        rng = random.Random(digest)
+        
+        candidates, body = self._split_candidates(prompt)
+        
+        if candidates:
+            body_lower = self._data_text(body).lower()
+            mentioned = [c for c in candidates if c.lower() in body_lower]
+            remaining = [c for c in candidates if c.lower() not in body_lower]
+            rng.shuffle(remaining)
+            
+            tag_count = rng.randint(self.min_tags, self.max_tags)
+            tags = (mentioned + remaining)[:tag_count]
+        else:
+            tags = self._extract_keywords(prompt)[:self.max_free_tags]
+        
+        text = ', '.join(tags)
+        
+        return {
+            'model': self.model,
+            'text': text,
+            'usage': {
+                'prompt_tokens': estimate_tokens(prompt),
+                'completion_tokens': estimate_tokens(text)
+            }
+        }
+    
+    def sample_latency(self) -> float:
+        """
+        設定された分布からレイテンシをサンプリング
+        
+        Returns:
+            レイテンシ（秒）
+        """
+        with self._lock:
+            return self._sample_latency_locked()
+    
+    def _sample_call(self):
+        """1回の呼び出しのレイテンシとエラー種別を決定"""
+        with self._lock:
+            latency = self._sample_latency_locked()
+            roll = self._random.random()
+        
+        if roll < self.rate_limit_rate:
+            return latency, 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return latency, 500
+        return latency, 200
+    
+    def _sample_latency_locked(self) -> float:
+        """ロック取得済みの状態でレイテンシをサンプリング"""
+        if self.latency_distribution == 'none':
+            return 0.0
+        
+        if self.latency_distribution == 'fixed':
+            return max(0.0, self.latency_mean)
+        
+        if self.latency_distribution == 'uniform':
+            return self._random.uniform(self.latency_min, self.latency_max)
+        
+        if self.latency_distribution == 'lognormal':
+            if self.latency_mean <= 0:
+                return 0.0
+            # 平均・標準偏差から対数正規分布のパラメータを算出
+            sigma_sq = math.log(1 + (self.latency_stddev ** 2) / (self.latency_mean ** 2))
+            mu = math.log(self.latency_mean) - sigma_sq / 2
+            return self._random.lognormvariate(mu, math.sqrt(sigma_sq))
+        
+        raise ValueError(f"サポートされていないレイテンシ分布: {self.latency_distribution}")
+    
+    def _raise_injected_error(self, status_code: int):
+        """注入されたエラーを送出"""
+        if status_code == 429:
+            raise MockLLMError(429, 'Rate limit exceeded (injected by mock engine)')
+        if status_code >= 500:
+            raise MockLLMError(status_code, 'Internal server error (injected by mock engine)')
+    
+    def _split_candidates(self, prompt: str):
+        """
+        プロンプトをタグ候補一覧とそれ以外の本文に分割
+        
+        Returns:
+            (タグ候補のリスト, 候補一覧を除いた本文)
+        """
+        for marker in CANDIDATE_MARKERS:
+            marker_pos = prompt.find(marker)
+            if marker_pos == -1:
+                continue
+            
+            list_start = prompt.find('\n', marker_pos)
+            if list_start == -1:
+                continue
+            list_end = prompt.find('\n\n', list_start + 1)
+            if list_end == -1:
+                list_end = len(prompt)
+            
+            candidates = [
+                c.strip() for c in prompt[list_start:list_end].replace('\n', ',').split(',')
+                if c.strip()
+            ]
+            body = prompt[:marker_pos] + prompt[list_end:]
+            return candidates, body
+        
+        return [], prompt
+    
+    def _extract_keywords(self, prompt: str) -> List[str]:
+        """
+        指示文以外のセクションから具体的なキーワードを抽出
+        
+        Returns:
+            出現頻度順（同頻度は出現順）のキーワードリスト
+        """
+        text = self._data_text(prompt, include_preamble='【' not in prompt)
+        words = re.findall(
+            r'[A-Za-z][A-Za-z0-9/\-]+(?: [A-Z0-9][A-Za-z0-9]*)?|[ァ-ヶー]{3,}|[一-龯]{2,}',
+            text
+        )
+        
+        counts = Counter(words)
+        first_seen = {}
+        for i, word in enumerate(words):
+            first_seen.setdefault(word, i)
+        
+        return sorted(counts, key=lambda w: (-counts[w], first_seen[w]))
+    
+    def _data_text(self, prompt: str, include_preamble: bool = True) -> str:
+        """
+        プロンプトから指示文のセクションを除いたデータ部分を取得
+        
+        【】の見出しと各行のラベル（「タイトル: 」など）は除き、値だけを返す
+        
+        Args:
+            prompt: プロンプト文字列
+            include_preamble: 最初の【】見出しより前の行を含めるか
+            
+        Returns:
+            データ部分のテキスト
+        """
+        data_lines = []
+        skip_section = not include_preamble
+        
+        for line in prompt.splitlines():
+            stripped = line.strip()
+            if stripped.startswith('【'):
+                header, _, stripped = stripped.partition('】')
+                skip_section = any(word in header for word in INSTRUCTION_SECTION_WORDS)
+                stripped = stripped.lstrip(':： ')
+            if not skip_section and stripped:
+                data_lines.append(LABEL_PATTERN.sub('', stripped))
+        
+        return '\n'.join(data_lines)
+
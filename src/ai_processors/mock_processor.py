@@ -0,0 +1,102 @@
+"""
+モックLLM処理モジュール
+APIキーやネットワークなしでパイプラインを検証・ベンチマークするためのプロセッサー
+"""
+
+import time
+from typing import List, Dict, Any
+from .base_processor import BaseAIProcessor
+from .mock_engine import MockLLMEngine, MockLLMError
+
+
+class MockProcessor(BaseAIProcessor):
+    """モックLLM処理クラス"""
+    
+    def __init__(self, config: Dict[str, Any] = None):
+        """
+        初期化
+        
+        Args:
+            config: モック設定（MockLLMEngine の設定項目と rate_limit_per_minute）
+        """
+        config = dict(config or {})
+        config.setdefault('rate_limit_per_minute', 6000)
+        super().__init__('mock', config)
+        
+        self.engine = MockLLMEngine(self.config)
+        self.model = self.engine.model
+    
+    def generate_tags(self, video_data: Dict[str, str]) -> List[str]:
+        """
+        モックLLMを使用してタグを生成
+        
+        Args:
+            video_data: 動画データ辞書
+        
+        Returns:
+            生成されたタグのリスト
+        """
+        start_time = time.time()
+        try:
+            # レート制限を適用
+            self._enforce_rate_limit()
+            start_time = time.time()  # レート制限の待ち時間を除いて計測
+            
+            response = self.engine.complete(self.create_prompt(video_data))
+            tags = self.clean_tags(response['text'])
+            self._record_usage('mock', self.model, response['usage']['prompt_tokens'], response['usage']['completion_tokens'], start_time)
+            
+            self.logger.info(f"Mock: 動画「{video_data.get('title', 'Unknown')}」に対して{len(tags)}個のタグを生成")
+            
+            return tags
+        
+        except MockLLMError as e:
+            self.logger.error(f"Mock APIエラー: {str(e)}")
+            self._record_usage('mock', self.model, 0, 0, start_time, success=False)
+            return []
+        except Exception as e:
+            self.logger.error(f"Mock処理エラー: {str(e)}")
+            self._record_usage('mock', self.model, 0, 0, start_time, success=False)
+            return []
+    
+    async def generate_tags_async(self, video_data: Dict[str, str]) -> List[str]:
+        """
+        モックLLMを使用してタグを生成（非同期版）
+        
+        Args:
+            video_data: 動画データ辞書
+        
+        Returns:
+            生成されたタグのリスト
+        """
+        start_time = time.time()
+        try:
+            # レート制限を適用
+            await self._enforce_rate_limit_async()
+            start_time = time.time()  # レート制限の待ち時間を除いて計測
+            
+            response = await self.engine.complete_async(self.create_prompt(video_data))
+            tags = self.clean_tags(response['text'])
+            self._record_usage('mock', self.model, response['usage']['prompt_tokens'], response['usage']['completion_tokens'], start_time)
+            
+            self.logger.info(f"Mock: 動画「{video_data.get('title', 'Unknown')}」に対して{len(tags)}個のタグを生成")
+            
+            return tags
+        
+        except MockLLMError as e:
+            self.logger.error(f"Mock APIエラー: {str(e)}")
+            self._record_usage('mock', self.model, 0, 0, start_time, success=False)
+            return []
+        except Exception as e:
+            self.logger.error(f"Mock処理エラー: {str(e)}")
+            self._record_usage('mock', self.model, 0, 0, start_time, success=False)
+            return []
+    
+    def test_connection(self) -> bool:
+        """
+        API接続テスト（モックは常に利用可能）
+        
+        Returns:
+            接続成功可否
+        """
+        return True
@@ -3,6 +3,7 @@ OpenAI GPT処理モジュール
 """
 
 import os
+import time
 from typing import List, Dict, Any
 import openai
 from dotenv import load_dotenv
@@ -46,35 +47,20 @@ class OpenAIProcessor(BaseAIProcessor):
         Returns:
             生成されたタグのリスト
         """
+        start_time = time.time()
         try:
             # レート制限を適用
             self._enforce_rate_limit()
-            
-            # プロンプトを作成
-            prompt = self.create_prompt(video_data)
+            start_time = time.time()  # レート制限の待ち時間を除いて計測
             
             # GPTにリクエスト
             response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "あなたはマーケティング教育動画の内容を分析して、検索に最適なタグを生成する専門家です。"
-                    },
-                    {
-                        "role": "user", 
-                        "content": prompt
-                    }
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                top_p=1,
-                frequency_penalty=0,
-                presence_penalty=0
+                **self._build_request(video_data)
             )
             
             # レスポンスからタグを抽出
             tags_text = response.choices[0].message.content.strip()
+            self._record_usage('openai', self.model, response.usage.prompt_tokens, response.usage.completion_tokens, start_time)
             tags = self.clean_tags(tags_text)
             
             self.logger.info(f"OpenAI: 動画「{video_data.get('title', 'Unknown')}」に対して{len(tags)}個のタグを生成")
@@ -83,11 +69,90 @@ class OpenAIProcessor(BaseAIProcessor):
             
         except openai.APIError as e:
             self.logger.error(f"OpenAI APIエラー: {str(e)}")
+            self._record_usage('openai', self.model, 0, 0, start_time, success=False)
             return []
         except Exception as e:
             self.logger.error(f"OpenAI処理エラー: {str(e)}")
+            self._record_usage('openai', self.model, 0, 0, start_time, success=False)
             return []
     
+    async def generate_tags_async(self, video_data: Dict[str, str]) -> List[str]:
+        """
+        OpenAI GPTを使用してタグを生成（非同期クライアント版）
+        
+        Args:
+            video_data: 動画データ辞書
+            
+        Returns:
+            生成されたタグのリスト
+        """
+        start_time = time.time()
+        try:
+            # レート制限を適用
+            await self._enforce_rate_limit_async()
+            start_time = time.time()  # レート制限の待ち時間を除いて計測
+            
+            # GPTにリクエスト
+            response = await self._get_async_client().chat.completions.create(
+                **self._build_request(video_data)
+            )
+            
+            # レスポンスからタグを抽出
+            tags_text = response.choices[0].message.content.strip()
+            self._record_usage('openai', self.model, response.usage.prompt_tokens, response.usage.completion_tokens, start_time)
+            tags = self.clean_tags(tags_text)
+            
+            self.logger.info(f"OpenAI: 動画「{video_data.get('title', 'Unknown')}」に対して{len(tags)}個のタグを生成")
+            
+            return tags
+            
+        except openai.APIError as e:
+            self.logger.error(f"OpenAI APIエラー: {str(e)}")
+            self._record_usage('openai', self.model, 0, 0, start_time, success=False)
+            return []
+        except Exception as e:
+            self.logger.error(f"OpenAI処理エラー: {str(e)}")
+            self._record_usage('openai', self.model, 0, 0, start_time, success=False)
+            return []
+    
+    def _get_async_client(self) -> openai.AsyncOpenAI:
+        """実行中のイベントループ用の非同期クライアントを取得"""
+        return self._get_loop_bound(
+            'async_client', lambda: openai.AsyncOpenAI(api_key=self.api_key)
+        )
+    
+    def _build_request(self, video_data: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Chat Completions リクエストのパラメータを作成
+        
+        Args:
+            video_data: 動画データ辞書
+            
+        Returns:
+            リクエストパラメータ
+        """
+        # プロンプトを作成
+        prompt = self.create_prompt(video_data)
+        
+        return {
+            'model': self.model,
+            'messages': [
+                {
+                    "role": "system", 
+                    "content": "あなたはマーケティング教育動画の内容を分析して、検索に最適なタグを生成する専門家です。"
+                },
+                {
+                    "role": "user", 
+                    "content": prompt
+                }
+            ],
+            'temperature': self.temperature,
+            'max_tokens': self.max_tokens,
+            'top_p': 1,
+            'frequency_penalty': 0,
+            'presence_penalty': 0
+        }
+    
     def test_connection(self) -> bool:
         """
         API接続テスト
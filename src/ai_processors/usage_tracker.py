@@ -0,0 +1,270 @@
+"""
+トークン使用量・コスト集計モジュール
+LLM呼び出しごとのトークン数・レイテンシ・コストを記録し、
+ステージ・ジョブ・データセット単位で集計する
+"""
+
+import contextlib
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+from typing import List, Dict, Any, Callable
+
+
+# 呼び出し元で設定されたラベル（stage / job_id / dataset_id など）
+# contextvars を使うため、asyncio タスクや asyncio.to_thread にも引き継がれる
+_current_labels = contextvars.ContextVar('usage_labels', default={})
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    テキストのトークン数を概算
+    
+    日本語などの非ASCII文字は1文字1トークン、ASCII文字は4文字1トークンとして数える
+    
+    Args:
+        text: テキスト
+    
+    Returns:
+        推定トークン数
+    """
+    if not text:
+        return 0
+    
+    non_ascii = sum(1 for char in text if ord(char) > 127)
+    ascii_chars = len(text) - non_ascii
+    return non_ascii + math.ceil(ascii_chars / 4)
+
+
+class UsageTracker:
+    """LLM呼び出しの使用量・コスト集計クラス"""
+    
+    def __init__(self, price_table: Dict[str, Dict[str, float]] = None, max_records: int = 100000):
+        """
+        初期化
+        
+        Args:
+            price_table: モデル名ごとの100万トークンあたり価格
+                例: {'gpt-3.5-turbo': {'input': 0.5, 'output': 1.5}}
+            max_records: 保持する呼び出し記録の最大数（古いものから破棄）
+        """
+        self.price_table = price_table or {}
+        self._records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+        self._listeners = []
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'UsageTracker':
+        """
+        設定辞書（config/settings.json）から生成
+        
+        Args:
+            config: 設定辞書
+        
+        Returns:
+            UsageTracker インスタンス
+        """
+        pricing = config.get('pricing', {})
+        return cls(pricing.get('per_million_tokens', {}))
+    
+    @contextlib.contextmanager
+    def labels(self, **labels):
+        """
+        このブロック内の呼び出し記録にラベルを付与
+        
+        Args:
+            **labels: stage, job_id, dataset_id などのラベル（入れ子の場合は上書きで結合）
+        """
+        merged = dict(_current_labels.get())
+        merged.update({key: value for key, value in labels.items() if value is not None})
+        token = _current_labels.set(merged)
+        try:
+            yield merged
+        finally:
+            _current_labels.reset(token)
+    
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """
+        呼び出し記録ごとに呼ばれるリスナーを登録
+        
+        Args:
+            listener: 記録を受け取る関数（ワーカースレッドから呼ばれることがある）
+        """
+        self._listeners.append(listener)
+    
+    def compute_cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """
+        価格表からコストを算出
+        
+        Args:
+            model: モデル名
+            prompt_tokens: 入力トークン数
+            completion_tokens: 出力トークン数
+        
+        Returns:
+            コスト（価格表に無いモデルは0.0）
+        """
+        prices = self.price_table.get(model, {})
+        return (
+            prompt_tokens * prices.get('input', 0.0) +
+            completion_tokens * prices.get('output', 0.0)
+        ) / 1_000_000
+    
+    def record(
+        self,
+        provider: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        latency: float,
+        success: bool = True,
+        estimated: bool = False,
+        **labels
+    ) -> Dict[str, Any]:
+        """
+        1回のLLM呼び出しを記録
+        
+        Args:
+            provider: プロバイダー名 ('openai', 'claude', 'gemini', 'mock')
+            model: モデル名
+            prompt_tokens: 入力トークン数
+            completion_tokens: 出力トークン数
+            latency: レイテンシ（秒）
+            success: 呼び出し成功可否
+            estimated: トークン数がAPI応答ではなく概算か
+            **labels: 追加ラベル（labels() で設定したラベルより優先）
+        
+        Returns:
+            記録されたレコード
+        """
+        record_labels = dict(_current_labels.get())
+        record_labels.update(labels)
+        
+        record = {
+            'timestamp': time.time(),
+            'provider': provider,
+            'model': model,
+            'prompt_tokens': int(prompt_tokens or 0),
+            'completion_tokens': int(completion_tokens or 0),
+            'latency': latency,
+            'success': success,
+            'estimated': estimated,
+            'cost': self.compute_cost(model, prompt_tokens or 0, completion_tokens or 0),
+            'labels': record_labels
+        }
+        
+        with self._lock:
+            self._records.append(record)
+        
+        for listener in self._listeners:
+            listener(record)
+        
+        return record
+    
+    def get_records(self, **filters) -> List[Dict[str, Any]]:
+        """
+        ラベルまたはプロバイダー・モデルで絞り込んだ記録を取得
+        
+        Args:
+            **filters: 絞り込み条件（例: job_id='stage2-...', provider='openai'）
+        
+        Returns:
+            記録のリスト
+        """
+        with self._lock:
+            records = list(self._records)
+        
+        return [record for record in records if self._matches(record, filters)]
+    
+    def summarize(self, **filters) -> Dict[str, Any]:
+        """
+        記録を集計
+        
+        Args:
+            **filters: 絞り込み条件
+        
+        Returns:
+            呼び出し数・トークン数・コスト・レイテンシの集計
+        """
+        return self._summarize_records(self.get_records(**filters))
+    
+    def summarize_by(self, key: str, **filters) -> Dict[str, Dict[str, Any]]:
+        """
+        ラベルまたはプロバイダー・モデルごとに集計
+        
+        Args:
+            key: 集計キー（'stage', 'job_id', 'dataset_id', 'provider', 'model' など）
+            **filters: 絞り込み条件
+        
+        Returns:
+            キーの値ごとの集計
+        """
+        groups = {}
+        for record in self.get_records(**filters):
+            value = self._get_field(record, key)
+            groups.setdefault(str(value), []).append(record)
+        
+        return {value: self._summarize_records(records) for value, records in groups.items()}
+    
+    def estimate_cost(
+        self,
+        model: str,
+        video_count: int,
+        prompt_tokens_per_video: float,
+        completion_tokens_per_video: float
+    ) -> float:
+        """
+        動画数とトークン数の見込みからコストを推定
+        
+        Args:
+            model: モデル名
+            video_count: 動画数
+            prompt_tokens_per_video: 動画あたりの入力トークン数
+            completion_tokens_per_video: 動画あたりの出力トークン数
+        
+        Returns:
+            推定コスト
+        """
+        return video_count * self.compute_cost(model, prompt_tokens_per_video, completion_tokens_per_video)
+    
+    def reset(self):
+        """記録をすべて破棄"""
+        with self._lock:
+            self._records.clear()
+    
+    def _summarize_records(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """記録リストの集計"""
+        latencies = sorted(record['latency'] for record in records)
+        prompt_tokens = sum(record['prompt_tokens'] for record in records)
+        completion_tokens = sum(record['completion_tokens'] for record in records)
+        successful_calls = len([record for record in records if record['success']])
+        
+        return {
+            'calls': len(records),
+            'failed_calls': len(records) - successful_calls,
+            'estimated_calls': len([record for record in records if record['estimated']]),
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+            'avg_prompt_tokens': prompt_tokens / len(records) if records else 0.0,
+            'cost': sum(record['cost'] for record in records),
+            'avg_latency': sum(latencies) / len(latencies) if latencies else 0.0,
+            'p95_latency': latencies[max(0, math.ceil(0.95 * len(latencies)) - 1)] if latencies else 0.0
+        }
+    
+    def _matches(self, record: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+        """記録が絞り込み条件に一致するか"""
+        for key, value in filters.items():
+            if value is None:
+                continue
+            if str(self._get_field(record, key)) != str(value):
+                return False
+        return True
+    
+    def _get_field(self, record: Dict[str, Any], key: str):
+        """記録のフィールドまたはラベルを取得"""
+        if key in ('provider', 'model', 'success', 'estimated'):
+            return record[key]
+        return record['labels'].get(key)
@@ -3,15 +3,55 @@
 メモリ効率的な分割処理を提供
 """
 
+import asyncio
+import contextvars
+import hashlib
+from collections import Counter
+import itertools
 import json
 import logging
+import os
+import sys
 import time
-from typing import List, Dict, Any, Optional, Callable
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Optional, Callable, Iterable, Iterator, Tuple
 import pandas as pd
 import streamlit as st
 from .ai_processors.openai_processor import OpenAIProcessor
 from .ai_processors.claude_processor import ClaudeProcessor  
 from .ai_processors.gemini_processor import GeminiProcessor
+from .ai_processors.mock_processor import MockProcessor
+from .ai_processors.usage_tracker import UsageTracker
+from .latency_stats import LatencyStats
+from .row_identity import ROW_FIELDS, row_digest, row_keys, stable_row_keys, row_fingerprint
+from .dedup import DEDUP_FIELDS, DEDUP_REQUIRED_FIELDS, find_representatives
+from .near_duplicate import NearDuplicateIndex, grounded_tags, adjust_tags
+from .run_journal import RunJournal
+from .result_store import ResultStore
+
+
+def _current_rss_bytes() -> Optional[int]:
+    """
+    プロセスの常駐メモリ（RSS）のバイト数
+    
+    Linux は /proc/self/statm の現在値、それ以外は resource のピーク値を使う
+    
+    Returns:
+        バイト数。取得できない環境（Windows など）では None
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS はバイト、それ以外はキロバイト単位
+    return peak if sys.platform == 'darwin' else peak * 1024
 
 
 class BatchProcessor:
@@ -31,6 +71,40 @@ class BatchProcessor:
         # 処理設定
         self.batch_size = self.config.get('processing', {}).get('batch_size', 10)
         self.max_memory_mb = self.config.get('processing', {}).get('max_memory_mb', 512)
+        self.max_concurrency = self.config.get('processing', {}).get('max_concurrency', 20)
+        self.concurrent = self.config.get('processing', {}).get('concurrent', False)
+        self.stream_buffer_rows = self.config.get('processing', {}).get('stream_buffer_rows', 500)
+        
+        # 内容が同一の動画は代表の1件だけAIで処理し、結果を全件に適用する
+        dedup_config = self.config.get('processing', {}).get('dedup', {})
+        self.dedup = dedup_config.get('enabled', True)
+        self.dedup_fields = dedup_config.get('fields', DEDUP_FIELDS)
+        self.dedup_required_fields = dedup_config.get('required_fields', DEDUP_REQUIRED_FIELDS)
+        
+        # 内容がほぼ同じ動画（再編集版・翻訳版）はタグ付け済みの類似動画のタグを再利用する
+        self.near_duplicate_config = self.config.get('processing', {}).get('near_duplicate', {})
+        self.near_duplicate_index = None
+        
+        # チェックポイント設定
+        checkpoint_config = self.config.get('processing', {}).get('checkpoint', {})
+        self.checkpoint_dir = checkpoint_config.get('directory', 'checkpoints')
+        self.checkpoint_fsync_interval = checkpoint_config.get('fsync_interval_seconds', 5.0)
+        self.checkpoint_fsync_every = checkpoint_config.get('fsync_every_rows', 50)
+        
+        # 増分処理用の結果ストア（初回使用時に開く）
+        self.result_store_path = self.config.get('processing', {}).get('result_store_path', 'checkpoints/results.sqlite3')
+        self.result_store = None
+        self.last_run_stats = {}
+        
+        # トークン使用量・コスト集計（全プロセッサーで共有）
+        self.usage_tracker = UsageTracker.from_config(self.config)
+        
+        # 実測レイテンシ・メモリ統計（処理時間・メモリ見積もり用、実行をまたいで保存）
+        self.latency_stats = LatencyStats(
+            self.config.get('processing', {}).get('latency_stats_path', 'checkpoints/latency_stats.json')
+        )
+        self.usage_tracker.add_listener(self.latency_stats.observe)
+        self._live_run = None
         
         # AI processors
         self.processors = {}
@@ -48,22 +122,24 @@ class BatchProcessor:
     def _initialize_processors(self):
         """AI processors を初期化"""
         ai_configs = self.config.get('ai_models', {})
+        providers = [
+            ('openai', OpenAIProcessor),
+            ('claude', ClaudeProcessor),
+            ('gemini', GeminiProcessor)
+        ]
+        # Mock（オフライン検証・ベンチマーク用、設定で有効化した場合のみ）
+        if ai_configs.get('mock', {}).get('enabled', False):
+            providers.append(('mock', MockProcessor))
         
-        try:
-            # OpenAI
-            openai_config = ai_configs.get('openai', {})
-            self.processors['openai'] = OpenAIProcessor(openai_config)
-            
-            # Claude
-            claude_config = ai_configs.get('claude', {})
-            self.processors['claude'] = ClaudeProcessor(claude_config)
-            
-            # Gemini
-            gemini_config = ai_configs.get('gemini', {})
-            self.processors['gemini'] = GeminiProcessor(gemini_config)
-            
-        except Exception as e:
-            self.logger.error(f"AI processor初期化エラー: {str(e)}")
+        # APIキーが無いプロバイダーがあっても他のプロバイダーは使えるよう個別に初期化する
+        for name, processor_class in providers:
+            try:
+                self.processors[name] = processor_class(ai_configs.get(name, {}))
+            except Exception as e:
+                self.logger.error(f"AI processor初期化エラー ({name}): {str(e)}")
+        
+        for processor in self.processors.values():
+            processor.usage_tracker = self.usage_tracker
     
     def test_ai_connections(self) -> Dict[str, bool]:
         """
@@ -88,7 +164,12 @@ class BatchProcessor:
         video_data: pd.DataFrame,
         ai_provider: str,
         column_mapping: Dict[str, str],
-        progress_callback: Optional[Callable] = None
+        progress_callback: Optional[Callable] = None,
+        concurrent: Optional[bool] = None,
+        max_concurrency: Optional[int] = None,
+        run_id: Optional[str] = None,
+        resume: bool = False,
+        incremental_namespace: Optional[str] = None
     ) -> List[List[str]]:
         """
         動画データをバッチ処理してタグを生成
@@ -98,14 +179,299 @@ class BatchProcessor:
             ai_provider: 使用するAIプロバイダー ('openai', 'claude', 'gemini')
             column_mapping: 列マッピング辞書
             progress_callback: 進捗コールバック関数
+            concurrent: 並行モードで処理するか（省略時は設定値 processing.concurrent）
+            max_concurrency: 並行モードの同時実行リクエスト数の上限（省略時は設定値）
+            run_id: 実行ID。指定すると完了行をジャーナルに記録する
+            resume: True の場合、同じ実行IDのジャーナルに記録済みの行を再処理せずに復元する
+                （全行完了として記録された実行は復元せず、最初から処理する）
+            incremental_namespace: 指定すると増分モードで処理する。この名前空間（データセット）の
+                結果ストアに内容・エンジン・モデルが一致する結果がある行はLLMに送らず再利用する
             
         Returns:
-            各動画のタグリスト
+            各動画のタグリスト（入力と同じ順序）
         """
         if ai_provider not in self.processors:
             raise ValueError(f"サポートされていないAIプロバイダー: {ai_provider}")
         
+        use_concurrent = self.concurrent if concurrent is None else concurrent
+        window = max(1, max_concurrency or self.max_concurrency)
+        
+        self._start_live_run(ai_provider, use_concurrent, window, len(video_data))
+        tracked_callback = self._track_live_progress(progress_callback) if progress_callback else None
+        
+        try:
+            if run_id is None and incremental_namespace is None:
+                self.last_run_stats = {'total_videos': len(video_data), 'processed': len(video_data), 'calls_saved': 0}
+                all_tags = self._run_videos(
+                    video_data, ai_provider, column_mapping, tracked_callback, use_concurrent, window
+                )
+            else:
+                all_tags = self._process_videos_tracked(
+                    video_data, ai_provider, column_mapping, tracked_callback,
+                    use_concurrent, window, run_id, resume, incremental_namespace
+                )
+            self._record_memory_usage(video_data, all_tags)
+            return all_tags
+        finally:
+            self.latency_stats.save()
+    
+    def _run_videos(
+        self,
+        video_data: pd.DataFrame,
+        ai_provider: str,
+        column_mapping: Dict[str, str],
+        progress_callback: Optional[Callable],
+        use_concurrent: bool,
+        window: int,
+        on_result: Optional[Callable] = None
+    ) -> List[List[str]]:
+        """
+        逐次（バッチ単位）または並行モードで動画を処理
+        
+        Args:
+            video_data: 動画データのDataFrame
+            ai_provider: AIプロバイダー名
+            column_mapping: 列マッピング
+            progress_callback: 進捗コールバック関数
+            use_concurrent: 並行モードで処理するか
+            window: 並行モードの同時実行リクエスト数
+            on_result: 1動画完了ごとに (行番号, タグリスト) で呼ばれる関数
+            
+        Returns:
+            各動画のタグリスト（入力と同じ順序）
+        """
+        use_near_duplicate = self.near_duplicate_config.get('enabled', False)
+        
+        if (self.dedup or use_near_duplicate) and len(video_data) > 0:
+            video_infos = [video_info for _, video_info in self._iter_video_infos(video_data, column_mapping)]
+            if self.dedup:
+                representative_of = find_representatives(video_infos, self.dedup_fields, self.dedup_required_fields)
+            else:
+                representative_of = list(range(len(video_infos)))
+            
+            if use_near_duplicate:
+                near = self._match_near_duplicates(video_infos, representative_of, ai_provider)
+                return self._run_deduplicated(
+                    video_data, ai_provider, column_mapping, progress_callback,
+                    use_concurrent, window, on_result, representative_of, video_infos, near
+                )
+            
+            del video_infos
+            if any(representative != index for index, representative in enumerate(representative_of)):
+                return self._run_deduplicated(
+                    video_data, ai_provider, column_mapping, progress_callback,
+                    use_concurrent, window, on_result, representative_of
+                )
+        
+        return self._run_unique_videos(
+            video_data, ai_provider, column_mapping, progress_callback, use_concurrent, window, on_result
+        )
+    
+    def _run_deduplicated(
+        self,
+        video_data: pd.DataFrame,
+        ai_provider: str,
+        column_mapping: Dict[str, str],
+        progress_callback: Optional[Callable],
+        use_concurrent: bool,
+        window: int,
+        on_result: Optional[Callable],
+        representative_of: List[int],
+        video_infos: Optional[List[Dict[str, str]]] = None,
+        near: Optional[Dict[str, Any]] = None
+    ) -> List[List[str]]:
+        """
+        重複をまとめた代表行だけを処理し、結果を同じ内容の全行に適用
+        
+        類似動画の検出結果（near）がある場合、インデックスの類似動画で解決済みの行は処理せず、
+        類似グループのメンバーには代表のタグを調整して適用し、処理した代表はインデックスに追加する
+        
+        Args:
+            video_data: 動画データのDataFrame
+            ai_provider: AIプロバイダー名
+            column_mapping: 列マッピング
+            progress_callback: 進捗コールバック関数（進捗は全行数で報告）
+            use_concurrent: 並行モードで処理するか
+            window: 並行モードの同時実行リクエスト数
+            on_result: 1動画完了ごとに (行番号, タグリスト) で呼ばれる関数（重複行の分も呼ばれる）
+            representative_of: 各行の代表行の番号
+            video_infos: 各行の動画データ辞書（類似動画の検出を使う場合のみ）
+            near: _match_near_duplicates の結果
+            
+        Returns:
+            各動画のタグリスト（入力と同じ順序）
+        """
+        total_videos = len(video_data)
+        resolved = near['resolved'] if near else {}
+        near_members = near['near_members'] if near else set()
+        representatives = [
+            index for index, representative in enumerate(representative_of)
+            if representative == index and index not in resolved
+        ]
+        members = {index: [] for index in representatives}
+        for index, representative in enumerate(representative_of):
+            if index not in resolved:
+                members[representative].append(index)
+        
+        calls_saved = total_videos - len(representatives)
+        self.last_run_stats['calls_saved'] = self.last_run_stats.get('calls_saved', 0) + calls_saved
+        if near:
+            self.last_run_stats['near_duplicates'] = (
+                self.last_run_stats.get('near_duplicates', 0) + len(resolved) + len(near_members)
+            )
+        if calls_saved:
+            self.logger.info(
+                f"重複・類似動画をまとめて処理: {total_videos}動画 → {len(representatives)}件 "
+                f"({calls_saved}回のAI呼び出しを削減)"
+            )
+        
+        all_tags: List[List[str]] = [[] for _ in range(total_videos)]
+        finished = 0
+        
+        # インデックスの類似動画で解決済みの行
+        for index, tags in resolved.items():
+            all_tags[index] = tags
+            if on_result:
+                on_result(index, tags)
+            finished += 1
+        
+        def fan_out(position: int, tags: List[str]):
+            nonlocal finished
+            representative = representatives[position]
+            grounded = []
+            if near and tags:
+                grounded = grounded_tags(tags, video_infos[representative], near['index'].fields)
+                if representative in near['signatures']:
+                    near['index'].add(
+                        near['namespace'], row_digest(video_infos[representative]),
+                        near['signatures'][representative], tags, grounded
+                    )
+            
+            for index in members[representative]:
+                if index in near_members:
+                    all_tags[index] = adjust_tags(tags, grounded, video_infos[index], near['index'].fields)
+                else:
+                    all_tags[index] = list(tags)
+                if on_result:
+                    on_result(index, all_tags[index])
+            finished += len(members[representative])
+        
+        def report_progress(progress: float, current: int, total: int):
+            progress_callback((finished / total_videos) * 100, finished, total_videos)
+        
+        if representatives:
+            self._run_unique_videos(
+                video_data.iloc[representatives], ai_provider, column_mapping,
+                report_progress if progress_callback else None,
+                use_concurrent, window, fan_out
+            )
+        elif progress_callback:
+            progress_callback(100.0, total_videos, total_videos)
+        
+        return all_tags
+    
+    def _match_near_duplicates(
+        self,
+        video_infos: List[Dict[str, str]],
+        representative_of: List[int],
+        ai_provider: str
+    ) -> Dict[str, Any]:
+        """
+        類似動画インデックスと同じ実行内の動画から、AI処理を省略できる類似動画を検出
+        
+        インデックスに類似動画がある代表行（とその重複行）は解決済みとし、残りの代表行は
+        同じ実行内で類似グループにまとめる。representative_of は類似グループの代表を指すよう更新する
+        
+        Args:
+            video_infos: 各行の動画データ辞書
+            representative_of: 各行の代表行の番号（完全重複の検出結果）
+            ai_provider: AIプロバイダー名
+            
+        Returns:
+            index, namespace, signatures（代表行のシグネチャ）、resolved（行番号 → タグ）、
+            near_members（類似グループの代表のタグを調整して適用する行）の辞書
+        """
+        index = self._get_near_duplicate_index()
+        namespace = f"{ai_provider}:{self._processor_model(ai_provider)}"
+        
+        signatures = {}
+        for row in range(len(video_infos)):
+            if representative_of[row] == row:
+                signature = index.signature(video_infos[row])
+                if signature is not None:
+                    signatures[row] = signature
+        
+        matches = {}
+        for row, signature in signatures.items():
+            match = index.query(namespace, signature)
+            if match is not None:
+                matches[row] = match
+        
+        grouped = index.group({row: signature for row, signature in signatures.items() if row not in matches})
+        
+        resolved = {}
+        near_members = set()
+        for row, representative in enumerate(representative_of):
+            if representative in matches:
+                match = matches[representative]
+                resolved[row] = adjust_tags(match['tags'], match['grounded'], video_infos[row], index.fields)
+            elif representative in grouped:
+                representative_of[row] = grouped[representative]
+                near_members.add(row)
+        
+        return {
+            'index': index,
+            'namespace': namespace,
+            'signatures': signatures,
+            'resolved': resolved,
+            'near_members': near_members
+        }
+    
+    def _get_near_duplicate_index(self) -> NearDuplicateIndex:
+        """類似動画インデックスを取得（初回使用時に開く）"""
+        if self.near_duplicate_index is None:
+            config = self.near_duplicate_config
+            self.near_duplicate_index = NearDuplicateIndex(
+                config.get('db_path', 'checkpoints/near_duplicates.sqlite3'),
+                threshold=config.get('threshold', 0.9),
+                num_perm=config.get('num_perm', 128),
+                bands=config.get('bands', 16),
+                shingle_size=config.get('shingle_size', 5)
+            )
+        return self.near_duplicate_index
+    
+    def _run_unique_videos(
+        self,
+        video_data: pd.DataFrame,
+        ai_provider: str,
+        column_mapping: Dict[str, str],
+        progress_callback: Optional[Callable],
+        use_concurrent: bool,
+        window: int,
+        on_result: Optional[Callable] = None
+    ) -> List[List[str]]:
+        """
+        重複をまとめずに、逐次（バッチ単位）または並行モードで全行を処理
+        
+        Args:
+            video_data: 動画データのDataFrame
+            ai_provider: AIプロバイダー名
+            column_mapping: 列マッピング
+            progress_callback: 進捗コールバック関数
+            use_concurrent: 並行モードで処理するか
+            window: 並行モードの同時実行リクエスト数
+            on_result: 1動画完了ごとに (行番号, タグリスト) で呼ばれる関数
+            
+        Returns:
+            各動画のタグリスト（入力と同じ順序）
+        """
         processor = self.processors[ai_provider]
+        
+        if use_concurrent:
+            return self._process_videos_concurrent(
+                video_data, processor, column_mapping, progress_callback, window, on_result
+            )
+        
         total_videos = len(video_data)
         all_tags = []
         
@@ -120,7 +486,8 @@ class BatchProcessor:
                 batch_data, 
                 processor, 
                 column_mapping,
-                batch_start
+                batch_start,
+                on_result
             )
             
             all_tags.extend(batch_tags)
@@ -137,12 +504,449 @@ class BatchProcessor:
         self.logger.info(f"バッチ処理完了: {len(all_tags)}動画分のタグを生成")
         return all_tags
     
+    def _process_videos_tracked(
+        self,
+        video_data: pd.DataFrame,
+        ai_provider: str,
+        column_mapping: Dict[str, str],
+        progress_callback: Optional[Callable],
+        use_concurrent: bool,
+        window: int,
+        run_id: Optional[str],
+        resume: bool,
+        incremental_namespace: Optional[str]
+    ) -> List[List[str]]:
+        """
+        完了行をジャーナル・結果ストアに記録しながら、未処理の行だけを処理
+        
+        ジャーナル（run_id）の行は内容のダイジェストで識別するため、再開時に行の並びが
+        変わっていても完了済みの行を正しく復元できる。結果ストア（増分モード）の行は
+        ID列またはタイトルで識別し、フィンガープリントが一致する場合のみ再利用する。
+        タグが空の行（APIエラー等）は記録せず、次回に再処理する。
+        
+        Args:
+            video_data: 動画データのDataFrame
+            ai_provider: AIプロバイダー名
+            column_mapping: 列マッピング
+            progress_callback: 進捗コールバック関数
+            use_concurrent: 並行モードで処理するか
+            window: 並行モードの同時実行リクエスト数
+            run_id: 実行ID（None の場合はジャーナルを使わない）
+            resume: ジャーナルに記録済みの行を復元するか（全行完了済みの実行は復元しない）
+            incremental_namespace: 結果ストアの名前空間（None の場合は増分モードを使わない）
+            
+        Returns:
+            各動画のタグリスト（入力と同じ順序）
+        """
+        total_videos = len(video_data)
+        video_infos = [video_info for _, video_info in self._iter_video_infos(video_data, column_mapping)]
+        all_tags: List[List[str]] = [[] for _ in range(total_videos)]
+        done = [False] * total_videos
+        
+        # 増分モード: フィンガープリントが一致する行は結果ストアから再利用
+        store_keys, fingerprints = [], []
+        reused = 0
+        if incremental_namespace is not None:
+            model = self._processor_model(ai_provider)
+            store_keys = stable_row_keys(video_infos, 'id' if 'id' in column_mapping else None)
+            fingerprints = [row_fingerprint(video_info, ai_provider, model) for video_info in video_infos]
+            stored = self._get_result_store().get_many(incremental_namespace, store_keys)
+            
+            for index, key in enumerate(store_keys):
+                if key in stored and stored[key][0] == fingerprints[index] and stored[key][1]:
+                    all_tags[index] = stored[key][1]
+                    done[index] = True
+                    reused += 1
+        
+        # ジャーナル: 前回中断した実行の完了行を復元
+        journal = None
+        journal_keys = []
+        resumed = 0
+        if run_id is not None:
+            journal = RunJournal(
+                run_id, self.checkpoint_dir, self.checkpoint_fsync_interval, self.checkpoint_fsync_every
+            )
+            journal_keys = row_keys(video_infos)
+            
+            # 全行完了した実行は再開に使わず、最初から処理し直す
+            if resume and not journal.is_complete():
+                completed = journal.load()
+            else:
+                journal.reset()
+                completed = {}
+            
+            for index, key in enumerate(journal_keys):
+                if not done[index] and key in completed:
+                    all_tags[index] = completed[key]
+                    done[index] = True
+                    resumed += 1
+        
+        pending = [index for index in range(total_videos) if not done[index]]
+        self.last_run_stats = {
+            'total_videos': total_videos,
+            'reused': reused,
+            'resumed': resumed,
+            'processed': len(pending),
+            'calls_saved': 0
+        }
+        
+        if reused or resumed:
+            self.logger.info(
+                f"処理済みの行を再利用: 結果ストア {reused}件, チェックポイント {resumed}件, "
+                f"処理対象 {len(pending)}/{total_videos}件"
+            )
+        
+        skipped = total_videos - len(pending)
+        # 復元した行は実測スループットに含めない
+        self._live_run['baseline'] = skipped
+        
+        def on_result(position: int, tags: List[str]):
+            index = pending[position]
+            all_tags[index] = tags
+            if not tags:
+                return
+            if journal is not None:
+                journal.append(journal_keys[index], index, tags)
+            if incremental_namespace is not None:
+                self._get_result_store().put(incremental_namespace, store_keys[index], fingerprints[index], tags)
+        
+        def report_progress(progress: float, current: int, total: int):
+            finished = skipped + current
+            progress_callback((finished / total_videos) * 100, finished, total_videos)
+        
+        if journal is not None:
+            journal.open({'ai_provider': ai_provider, 'total_videos': total_videos, 'resumed': resumed})
+        try:
+            if pending:
+                self._run_videos(
+                    video_data.iloc[pending], ai_provider, column_mapping,
+                    report_progress if progress_callback else None,
+                    use_concurrent, window, on_result
+                )
+            elif progress_callback:
+                progress_callback(100.0, total_videos, total_videos)
+            
+            # タグが空の行（APIエラー等）が残っている場合は、次回その行だけを再処理できるよう完了にしない
+            if journal is not None and all(all_tags):
+                journal.complete()
+        finally:
+            if journal is not None:
+                journal.close()
+        
+        return all_tags
+    
+    def run_id_for(self, dataset_id: str, ai_provider: str, column_mapping: Dict[str, str]) -> str:
+        """
+        データセット・プロバイダーの実行ID（ジャーナルのファイル名）を算出
+        
+        モデル・プロンプト・プロバイダー設定・列マッピング・重複処理の設定のいずれかが変わると
+        別の実行IDになるため、以前の設定で記録した行が再開時に復元されることはない
+        
+        Args:
+            dataset_id: データセットID
+            ai_provider: AIプロバイダー名
+            column_mapping: 列マッピング
+            
+        Returns:
+            実行ID（例: 'openai-1a2b3c4d5e6f'）
+        """
+        processor = self.processors.get(ai_provider)
+        settings = {
+            'dataset_id': dataset_id or '',
+            'model': self._processor_model(ai_provider),
+            'prompt': processor.create_prompt({}) if processor is not None else '',
+            'config': processor.config if processor is not None else {},
+            'column_mapping': column_mapping,
+            'dedup': [self.dedup, list(self.dedup_fields), list(self.dedup_required_fields)],
+            'near_duplicate': self.near_duplicate_config
+        }
+        encoded = json.dumps(settings, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8')
+        return f"{ai_provider}-{hashlib.sha1(encoded).hexdigest()[:12]}"
+    
+    def _get_result_store(self) -> ResultStore:
+        """結果ストアを取得（初回使用時に開く）"""
+        if self.result_store is None:
+            self.result_store = ResultStore(self.result_store_path)
+        return self.result_store
+    
+    def process_videos_stream(
+        self,
+        rows: Iterable[Any],
+        ai_provider: str,
+        column_mapping: Dict[str, str],
+        namespace: str,
+        progress_callback: Optional[Callable] = None,
+        concurrent: Optional[bool] = None,
+        max_concurrency: Optional[int] = None,
+        total_rows: Optional[int] = None,
+        incremental: bool = False,
+        buffer_rows: Optional[int] = None
+    ) -> Iterator[Tuple[str, List[str]]]:
+        """
+        行イテレーターから動画データを読みながら、メモリ使用量を抑えてタグを生成
+        
+        入力を buffer_rows 行ずつ読み込んで処理し、完了した結果を結果ストアの名前空間に
+        書き出してからチャンク単位で返す。メモリに保持するのは処理中のチャンクだけなので、
+        全体を DataFrame として読み込めない大きなカタログも処理できる。
+        チャンクごとにプロセスの常駐メモリ（RSS）を計測し、max_memory_mb を超えた場合はチャンクを縮小し、
+        最小のチャンク（1バッチ、並行モードは同時実行数）でも超える場合は MemoryError を送出する。
+        RSS はチャンクの処理後にだけ読むため計測のオーバーヘッドは無く、RSS を取得できない環境では上限を確認しない。
+        
+        Args:
+            rows: 行のイテラブル。要素は列名 → 値の辞書（csv.DictReader など）、
+                または DataFrame のチャンク（pd.read_csv(chunksize=...) など）
+            ai_provider: 使用するAIプロバイダー
+            column_mapping: 列マッピング辞書
+            namespace: 結果を書き出す結果ストアの名前空間
+            progress_callback: 進捗コールバック関数
+            concurrent: 並行モードで処理するか（省略時は設定値 processing.concurrent）
+            max_concurrency: 並行モードの同時実行リクエスト数の上限（省略時は設定値）
+            total_rows: 総行数（分かっている場合のみ。進捗率・残り時間の算出に使う）
+            incremental: True の場合、結果ストアに内容・エンジン・モデルが一致する結果がある行は再利用する
+            buffer_rows: 一度にメモリに保持する行数（省略時は設定値 processing.stream_buffer_rows）
+            
+        Yields:
+            (行キー, タグリスト)。入力と同じ順序で、行キーは結果ストアのキー
+            
+        Raises:
+            ValueError: サポートされていないAIプロバイダーの場合
+            MemoryError: 最小のチャンクでも処理後のRSSが max_memory_mb を超える場合
+        """
+        if ai_provider not in self.processors:
+            raise ValueError(f"サポートされていないAIプロバイダー: {ai_provider}")
+        
+        use_concurrent = self.concurrent if concurrent is None else concurrent
+        window = max(1, max_concurrency or self.max_concurrency)
+        chunk_rows = max(1, buffer_rows or self.stream_buffer_rows)
+        min_chunk_rows = min(chunk_rows, window if use_concurrent else self.batch_size)
+        limit_bytes = self.max_memory_mb * 1024 * 1024
+        
+        id_field = 'id' if 'id' in column_mapping else None
+        fields = ROW_FIELDS + (['id'] if id_field else [])
+        # チャンクは正規化済みのフィールド名で DataFrame にするため列マッピングは恒等写像になる
+        chunk_mapping = {field: field for field in fields}
+        model = self._processor_model(ai_provider)
+        store = self._get_result_store()
+        occurrences = {}
+        
+        stats = {
+            'total_videos': 0,
+            'reused': 0,
+            'processed': 0,
+            'failed': 0,
+            'calls_saved': 0,
+            'chunk_rows': chunk_rows,
+            'peak_memory_mb': 0.0
+        }
+        self.last_run_stats = stats
+        self._start_live_run(ai_provider, use_concurrent, window, total_rows or 0)
+        
+        def report_progress(finished: int):
+            self._live_run['completed'] = finished
+            if progress_callback:
+                total = total_rows or finished
+                progress_callback((finished / total) * 100 if total else 0.0, finished, total)
+        
+        try:
+            video_infos = self._iter_stream_video_infos(rows, column_mapping, fields)
+            
+            while True:
+                chunk = list(itertools.islice(video_infos, chunk_rows))
+                if not chunk:
+                    break
+                
+                offset = stats['total_videos']
+                keys = stable_row_keys(chunk, id_field, occurrences)
+                fingerprints = [row_fingerprint(video_info, ai_provider, model) for video_info in chunk]
+                chunk_tags: List[List[str]] = [[] for _ in chunk]
+                pending = list(range(len(chunk)))
+                
+                if incremental:
+                    stored = store.get_many(namespace, keys)
+                    pending = []
+                    for index, key in enumerate(keys):
+                        if key in stored and stored[key][0] == fingerprints[index] and stored[key][1]:
+                            chunk_tags[index] = stored[key][1]
+                        else:
+                            pending.append(index)
+                    skipped = len(chunk) - len(pending)
+                    stats['reused'] += skipped
+                    self._live_run['baseline'] += skipped
+                
+                if pending:
+                    skipped = len(chunk) - len(pending)
+                    results = self._run_videos(
+                        pd.DataFrame([chunk[index] for index in pending], columns=fields),
+                        ai_provider, chunk_mapping,
+                        lambda progress, current, total: report_progress(offset + skipped + current),
+                        use_concurrent, window
+                    )
+                    for index, tags in zip(pending, results):
+                        chunk_tags[index] = tags
+                    
+                    # 完了した結果は結果ストアに書き出す（タグが空の行は次回に再処理する）
+                    store.put_many(namespace, [
+                        (keys[index], fingerprints[index], chunk_tags[index])
+                        for index in pending if chunk_tags[index]
+                    ])
+                    stats['processed'] += len(pending)
+                    stats['failed'] += sum(1 for index in pending if not chunk_tags[index])
+                
+                stats['total_videos'] += len(chunk)
+                report_progress(stats['total_videos'])
+                
+                rss_bytes = _current_rss_bytes()
+                if rss_bytes is not None:
+                    stats['peak_memory_mb'] = max(stats['peak_memory_mb'], rss_bytes / (1024 * 1024))
+                self._record_memory_usage(pd.DataFrame(chunk, columns=fields), chunk_tags)
+                
+                for key, tags in zip(keys, chunk_tags):
+                    yield key, tags
+                del chunk, keys, fingerprints, chunk_tags
+                
+                if rss_bytes is not None and rss_bytes > limit_bytes:
+                    if chunk_rows <= min_chunk_rows:
+                        raise MemoryError(
+                            f"メモリ使用量が上限を超えました: {rss_bytes / (1024 * 1024):.1f}MB > {self.max_memory_mb}MB"
+                        )
+                    chunk_rows = max(min_chunk_rows, chunk_rows // 2)
+                    stats['chunk_rows'] = chunk_rows
+                    self.logger.warning(
+                        f"メモリ使用量が上限を超えたためチャンクを縮小: {rss_bytes / (1024 * 1024):.1f}MB, "
+                        f"{chunk_rows}行/チャンク"
+                    )
+            
+            self.logger.info(
+                f"ストリーム処理完了: {stats['total_videos']}動画 (再利用 {stats['reused']}件, "
+                f"ピークメモリ {stats['peak_memory_mb']:.1f}MB)"
+            )
+        finally:
+            self.latency_stats.save()
+    
+    def _iter_stream_video_infos(self, rows: Iterable[Any], column_mapping: Dict[str, str], fields: List[str]):
+        """
+        行のイテラブルから動画データ辞書を順に生成
+        
+        Args:
+            rows: 列名 → 値の辞書、または DataFrame のチャンクのイテラブル
+            column_mapping: 列マッピング
+            fields: 取り出すフィールド
+            
+        Yields:
+            動画データ辞書
+        """
+        for item in rows:
+            if isinstance(item, pd.DataFrame):
+                for _, video_info in self._iter_video_infos(item, column_mapping):
+                    yield video_info
+            else:
+                yield {field: str(item.get(column_mapping.get(field, ''), '')) for field in fields}
+    
+    def _process_videos_concurrent(
+        self,
+        video_data: pd.DataFrame,
+        processor,
+        column_mapping: Dict[str, str],
+        progress_callback: Optional[Callable],
+        window: int,
+        on_result: Optional[Callable] = None
+    ) -> List[List[str]]:
+        """
+        スライディングウィンドウで並行処理
+        
+        常に最大 window 件のリクエストを実行中に保ち、1件完了するごとに次の動画を投入する。
+        リクエスト間隔はプロセッサーのレート制限で制御し、固定の待機は行わない。
+        
+        Args:
+            video_data: 動画データのDataFrame
+            processor: AI processor
+            column_mapping: 列マッピング
+            progress_callback: 進捗コールバック関数
+            window: 同時実行リクエスト数
+            on_result: 1動画完了ごとに (行番号, タグリスト) で呼ばれる関数
+            
+        Returns:
+            各動画のタグリスト（入力と同じ順序）
+        """
+        total_videos = len(video_data)
+        all_tags: List[List[str]] = [[] for _ in range(total_videos)]
+        video_infos = self._iter_video_infos(video_data, column_mapping)
+        in_flight = {}
+        completed = 0
+        
+        self.logger.info(f"並行バッチ処理開始: {total_videos}動画, 同時実行数: {window}")
+        
+        def submit_next(executor) -> bool:
+            video = next(video_infos, None)
+            if video is None:
+                return False
+            index, video_info = video
+            # 使用量ラベル（contextvars）をワーカースレッドに引き継ぐ
+            future = executor.submit(contextvars.copy_context().run, processor.generate_tags, video_info)
+            in_flight[future] = index
+            return True
+        
+        with ThreadPoolExecutor(max_workers=window) as executor:
+            while len(in_flight) < window and submit_next(executor):
+                pass
+            
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    index = in_flight.pop(future)
+                    try:
+                        all_tags[index] = future.result()
+                        self.logger.debug(f"動画 {index + 1}: {len(all_tags[index])}個のタグを生成")
+                    except Exception as e:
+                        self.logger.error(f"動画 {index + 1} 処理エラー: {str(e)}")
+                    
+                    if on_result:
+                        on_result(index, all_tags[index])
+                    
+                    completed += 1
+                    if progress_callback:
+                        progress = (completed / total_videos) * 100
+                        progress_callback(progress, completed, total_videos)
+                    
+                    submit_next(executor)
+        
+        self.logger.info(f"並行バッチ処理完了: {len(all_tags)}動画分のタグを生成")
+        return all_tags
+    
+    def _iter_video_infos(self, video_data: pd.DataFrame, column_mapping: Dict[str, str]):
+        """
+        列単位で値を取り出して動画データ辞書を順に生成（iterrows を使わない）
+        
+        Args:
+            video_data: 動画データのDataFrame
+            column_mapping: 列マッピング
+            
+        Yields:
+            (行番号, 動画データ辞書)
+        """
+        fields = ['title', 'skill', 'description', 'summary', 'transcript']
+        if 'id' in column_mapping:
+            # 増分モードの行キーに使う任意のID列
+            fields.append('id')
+        columns = {}
+        for field in fields:
+            column = column_mapping.get(field, '')
+            if column in video_data.columns:
+                columns[field] = video_data[column].tolist()
+            else:
+                columns[field] = [''] * len(video_data)
+        
+        for index in range(len(video_data)):
+            yield index, {field: str(columns[field][index]) for field in fields}
+    
     def _process_single_batch(
         self,
         batch_data: pd.DataFrame,
         processor,
         column_mapping: Dict[str, str],
-        batch_start: int
+        batch_start: int,
+        on_result: Optional[Callable] = None
     ) -> List[List[str]]:
         """
         単一バッチの処理
@@ -152,6 +956,7 @@ class BatchProcessor:
             processor: AI processor
             column_mapping: 列マッピング
             batch_start: バッチ開始インデックス
+            on_result: 1動画完了ごとに (行番号, タグリスト) で呼ばれる関数
             
         Returns:
             バッチ内各動画のタグリスト
@@ -161,13 +966,7 @@ class BatchProcessor:
         for idx, row in batch_data.iterrows():
             try:
                 # 動画データを構築
-                video_info = {
-                    'title': str(row.get(column_mapping.get('title', ''), '')),
-                    'skill': str(row.get(column_mapping.get('skill', ''), '')),
-                    'description': str(row.get(column_mapping.get('description', ''), '')),
-                    'summary': str(row.get(column_mapping.get('summary', ''), '')),
-                    'transcript': str(row.get(column_mapping.get('transcript', ''), ''))
-                }
+                video_info = self._build_video_info(row, column_mapping)
                 
                 # タグを生成
                 tags = processor.generate_tags(video_info)
@@ -178,72 +977,393 @@ class BatchProcessor:
             except Exception as e:
                 self.logger.error(f"動画 {batch_start + len(batch_tags)} 処理エラー: {str(e)}")
                 batch_tags.append([])  # 空のタグリストを追加
+            
+            if on_result:
+                on_result(batch_start + len(batch_tags) - 1, batch_tags[-1])
                 
         return batch_tags
     
+    def _build_video_info(self, row: pd.Series, column_mapping: Dict[str, str]) -> Dict[str, str]:
+        """
+        行データからAI processorに渡す動画データを構築
+        
+        Args:
+            row: 動画1件分の行データ
+            column_mapping: 列マッピング
+            
+        Returns:
+            動画データ辞書
+        """
+        return {
+            'title': str(row.get(column_mapping.get('title', ''), '')),
+            'skill': str(row.get(column_mapping.get('skill', ''), '')),
+            'description': str(row.get(column_mapping.get('description', ''), '')),
+            'summary': str(row.get(column_mapping.get('summary', ''), '')),
+            'transcript': str(row.get(column_mapping.get('transcript', ''), ''))
+        }
+    
+    async def process_videos_batch_async(
+        self,
+        video_data: pd.DataFrame,
+        ai_provider: str,
+        column_mapping: Dict[str, str],
+        progress_callback: Optional[Callable] = None,
+        max_concurrency: Optional[int] = None,
+        cancel_event: Optional[asyncio.Event] = None
+    ) -> List[List[str]]:
+        """
+        動画データを非同期に並行処理してタグを生成
+        
+        セマフォで同時実行数を制限しながら、各プロバイダーの非同期クライアントで
+        複数のリクエストを同時に実行中にする。スレッドはリクエストごとに消費しない。
+        
+        Args:
+            video_data: 動画データのDataFrame
+            ai_provider: 使用するAIプロバイダー ('openai', 'claude', 'gemini')
+            column_mapping: 列マッピング辞書
+            progress_callback: 進捗コールバック関数
+            max_concurrency: 同時実行リクエスト数の上限（省略時は設定値）
+            cancel_event: セットされると処理を中断するイベント
+            
+        Returns:
+            各動画のタグリスト（入力と同じ順序）
+            
+        Raises:
+            asyncio.CancelledError: cancel_event がセットされた場合、
+                または呼び出し元のタスクがキャンセルされた場合
+        """
+        if ai_provider not in self.processors:
+            raise ValueError(f"サポートされていないAIプロバイダー: {ai_provider}")
+        
+        processor = self.processors[ai_provider]
+        total_videos = len(video_data)
+        window = max(1, max_concurrency or self.max_concurrency)
+        semaphore = asyncio.Semaphore(window)
+        
+        # 内容が同一の動画は代表の1件だけ処理する
+        video_infos = [video_info for _, video_info in self._iter_video_infos(video_data, column_mapping)]
+        if self.dedup:
+            representative_of = find_representatives(video_infos, self.dedup_fields, self.dedup_required_fields)
+        else:
+            representative_of = list(range(total_videos))
+        group_sizes = Counter(representative_of)
+        self.last_run_stats = {
+            'total_videos': total_videos,
+            'processed': len(group_sizes),
+            'calls_saved': total_videos - len(group_sizes)
+        }
+        all_tags: List[List[str]] = [[] for _ in range(total_videos)]
+        in_flight = set()
+        completed = 0
+        
+        self.logger.info(
+            f"非同期バッチ処理開始: {total_videos}動画, プロバイダー: {ai_provider}, 同時実行数: {window}"
+        )
+        
+        async def process_one(index: int, video_info: Dict[str, str]):
+            nonlocal completed
+            try:
+                all_tags[index] = await processor.generate_tags_async(video_info)
+                self.logger.debug(f"動画 {index + 1}: {len(all_tags[index])}個のタグを生成")
+            except Exception as e:
+                self.logger.error(f"動画 {index + 1} 処理エラー: {str(e)}")
+            finally:
+                semaphore.release()
+            
+            completed += group_sizes[index]
+            if progress_callback:
+                progress = (completed / total_videos) * 100
+                progress_callback(progress, completed, total_videos)
+        
+        # キャンセルイベントを監視し、セットされたらこのタスク自体をキャンセルする
+        watcher = None
+        if cancel_event is not None:
+            watcher = asyncio.create_task(
+                self._cancel_on_event(cancel_event, asyncio.current_task())
+            )
+        
+        try:
+            for index, video_info in enumerate(video_infos):
+                if representative_of[index] != index:
+                    continue
+                # 空きスロットができるまで待機
+                await semaphore.acquire()
+                task = asyncio.create_task(process_one(index, video_info))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            
+            if in_flight:
+                await asyncio.gather(*in_flight)
+                
+        except asyncio.CancelledError:
+            self.logger.warning(f"非同期バッチ処理がキャンセルされました: {completed}/{total_videos}動画完了")
+            raise
+        finally:
+            # 実行中のリクエストを確実に停止
+            pending = [task for task in in_flight if not task.done()]
+            for task in pending:
+                task.cancel()
+            if watcher is not None:
+                watcher.cancel()
+                pending.append(watcher)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        
+        # 代表行の結果を重複行に適用
+        for index, representative in enumerate(representative_of):
+            if representative != index:
+                all_tags[index] = list(all_tags[representative])
+        
+        self.logger.info(f"非同期バッチ処理完了: {len(all_tags)}動画分のタグを生成")
+        return all_tags
+    
+    @staticmethod
+    async def _cancel_on_event(cancel_event: asyncio.Event, task: asyncio.Task):
+        """イベントがセットされたら対象タスクをキャンセル"""
+        await cancel_event.wait()
+        task.cancel()
+    
     def estimate_processing_time(
         self, 
         total_videos: int, 
-        ai_provider: str
-    ) -> Dict[str, float]:
+        ai_provider: str,
+        concurrent: Optional[bool] = None,
+        max_concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
         処理時間を推定
         
+        実測レイテンシ（エンジン/モデル・プロンプトサイズ別のローリングパーセンタイル）が
+        あればそれを使い、無ければプロバイダー別の既定値を使う。
+        逐次モードはバッチ間の待機、並行モードは同時実行数とレート制限で律速する。
+        
         Args:
             total_videos: 総動画数
             ai_provider: AIプロバイダー
+            concurrent: 並行モードで処理するか（省略時は設定値 processing.concurrent）
+            max_concurrency: 並行モードの同時実行リクエスト数（省略時は設定値）
             
         Returns:
             推定時間情報
         """
-        # AIプロバイダー別の処理時間（秒/動画）
-        time_per_video = {
+        use_concurrent = self.concurrent if concurrent is None else concurrent
+        window = max(1, max_concurrency or self.max_concurrency)
+        
+        # 実測が無い場合のAIプロバイダー別の処理時間（秒/動画）
+        default_time_per_video = {
             'openai': 3.0,
             'claude': 4.0,
-            'gemini': 2.5
+            'gemini': 2.5,
+            'mock': self.config.get('ai_models', {}).get('mock', {}).get('latency_mean', 0.8)
         }
         
-        base_time = time_per_video.get(ai_provider, 3.0)
+        model = self._processor_model(ai_provider)
+        prompt_tokens = self.estimate_processing_cost(total_videos, ai_provider)['prompt_tokens_per_video']
+        latency_p50 = self.latency_stats.latency_percentile(ai_provider, model, 50, prompt_tokens)
+        latency_p90 = self.latency_stats.latency_percentile(ai_provider, model, 90, prompt_tokens)
+        
+        if latency_p50 is None:
+            source = 'default'
+            latency_p50 = latency_p90 = default_time_per_video.get(ai_provider, 3.0)
+        else:
+            source = 'measured'
         
         # レート制限を考慮
         rate_limit = self.config.get('ai_models', {}).get(ai_provider, {}).get('rate_limit_per_minute', 60)
         min_time_per_video = 60.0 / rate_limit
+        total_batches = (total_videos + self.batch_size - 1) // self.batch_size
         
-        actual_time_per_video = max(base_time, min_time_per_video)
+        def wall_time(latency: float) -> float:
+            if use_concurrent:
+                # 同時実行数ぶんのリクエストが重なるが、送信間隔はレート制限を下回れない
+                return total_videos * max(latency / window, min_time_per_video)
+            # 逐次モードは1件ずつ処理し、バッチ間で1秒待機する
+            return total_videos * max(latency, min_time_per_video) + max(0, total_batches - 1)
         
-        total_time_seconds = total_videos * actual_time_per_video
-        total_batches = (total_videos + self.batch_size - 1) // self.batch_size
+        total_time_seconds = wall_time(latency_p50)
+        actual_time_per_video = total_time_seconds / total_videos if total_videos else 0.0
         
         return {
             'total_seconds': total_time_seconds,
             'total_minutes': total_time_seconds / 60,
             'total_hours': total_time_seconds / 3600,
+            'total_seconds_p90': wall_time(latency_p90),
             'total_batches': total_batches,
             'time_per_video': actual_time_per_video,
-            'time_per_batch': actual_time_per_video * self.batch_size
+            'time_per_batch': actual_time_per_video * self.batch_size,
+            'latency_p50': latency_p50,
+            'latency_p90': latency_p90,
+            'concurrency': window if use_concurrent else 1,
+            'samples': self.latency_stats.sample_count(ai_provider, model),
+            'source': source
         }
     
-    def get_memory_usage_estimate(self, total_videos: int) -> Dict[str, float]:
+    def get_live_estimate(self) -> Dict[str, Any]:
+        """
+        実行中の処理の残り時間を、これまでの実測スループットから推定
+        
+        処理済み件数が少ないうちは開始時に算出した事前推定（estimate_processing_time）と加重平均し、
+        1バッチ（並行モードは同時実行数）ぶん処理した時点で実測のみに切り替える。
+        使用量履歴は参照しないため、1動画ごとに呼び出してもよい
+        
+        Returns:
+            残り時間情報（実行していない場合は空の辞書）
+        """
+        run = self._live_run
+        if not run:
+            return {}
+        
+        elapsed = time.time() - run['started_at']
+        processed = run['completed'] - run['baseline']
+        remaining = max(0, run['total'] - run['completed'])
+        
+        prior = remaining * run['prior_seconds_per_video']
+        
+        if processed > 0 and elapsed > 0:
+            observed = remaining * elapsed / processed
+            warmup = run['window'] if run['concurrent'] else self.batch_size
+            weight = min(1.0, processed / max(1, warmup))
+            eta_seconds = weight * observed + (1 - weight) * prior
+            throughput = processed / elapsed * 60
+        else:
+            weight = 0.0
+            eta_seconds = prior
+            throughput = 0.0
+        
+        return {
+            'completed': run['completed'],
+            'total': run['total'],
+            'elapsed_seconds': elapsed,
+            'throughput_per_minute': throughput,
+            'eta_seconds': eta_seconds,
+            'eta_minutes': eta_seconds / 60,
+            'observed_weight': weight
+        }
+    
+    def _start_live_run(self, ai_provider: str, use_concurrent: bool, window: int, total_videos: int):
+        """実行中の残り時間推定の状態を初期化（事前推定の1動画あたりの秒数はここで1回だけ算出する）"""
+        prior = self.estimate_processing_time(max(1, total_videos), ai_provider, use_concurrent, window)
+        self._live_run = {
+            'ai_provider': ai_provider,
+            'concurrent': use_concurrent,
+            'window': window,
+            'prior_seconds_per_video': prior['time_per_video'],
+            'total': total_videos,
+            'baseline': 0,
+            'completed': 0,
+            'started_at': time.time()
+        }
+    
+    def _track_live_progress(self, progress_callback: Callable) -> Callable:
+        """進捗コールバックをラップし、実行中の完了件数を記録"""
+        def tracked(progress: float, current: int, total: int):
+            self._live_run['completed'] = current
+            progress_callback(progress, current, total)
+        return tracked
+    
+    def _record_memory_usage(self, video_data: pd.DataFrame, all_tags: List[List[str]]):
+        """
+        入力データと生成タグの実メモリサイズから動画あたりのメモリ使用量を記録
+        
+        Args:
+            video_data: 動画データのDataFrame
+            all_tags: 各動画のタグリスト
+        """
+        if not len(video_data):
+            return
+        
+        data_bytes = int(video_data.memory_usage(deep=True).sum())
+        tag_bytes = sum(
+            sys.getsizeof(tags) + sum(sys.getsizeof(tag) for tag in tags) for tags in all_tags
+        )
+        self.latency_stats.record_memory((data_bytes + tag_bytes) / len(video_data) / (1024 * 1024))
+    
+    def _processor_model(self, ai_provider: str) -> str:
+        """AIプロバイダーのモデル名を取得（使用量記録と同じ名前）"""
+        processor = self.processors.get(ai_provider)
+        if processor is None:
+            return self.config.get('ai_models', {}).get(ai_provider, {}).get('model', '')
+        return str(getattr(processor, 'model_name', getattr(processor, 'model', '')))
+    
+    def estimate_processing_cost(
+        self,
+        total_videos: int,
+        ai_provider: str
+    ) -> Dict[str, Any]:
+        """
+        価格表からコストを推定
+        
+        実行済みの呼び出し記録があれば1呼び出しあたりの実測トークン数を使い、
+        無ければ設定の見込みトークン数（pricing.estimated_tokens_per_video）を使う
+        
+        Args:
+            total_videos: 総動画数
+            ai_provider: AIプロバイダー
+            
+        Returns:
+            推定コスト情報
+        """
+        model = self._processor_model(ai_provider)
+        defaults = self.config.get('pricing', {}).get('estimated_tokens_per_video', {})
+        
+        history = self.usage_tracker.summarize(model=model, success=True)
+        if history['calls'] > 0:
+            prompt_tokens = history['prompt_tokens'] / history['calls']
+            completion_tokens = history['completion_tokens'] / history['calls']
+        else:
+            prompt_tokens = defaults.get('prompt', 1200)
+            completion_tokens = defaults.get('completion', 150)
+        
+        return {
+            'model': model,
+            'total_cost': self.usage_tracker.estimate_cost(model, total_videos, prompt_tokens, completion_tokens),
+            'cost_per_video': self.usage_tracker.compute_cost(model, prompt_tokens, completion_tokens),
+            'prompt_tokens_per_video': prompt_tokens,
+            'completion_tokens_per_video': completion_tokens,
+            'based_on_history': history['calls'] > 0
+        }
+    
+    def get_memory_usage_estimate(
+        self,
+        total_videos: int,
+        concurrent: Optional[bool] = None,
+        max_concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
         メモリ使用量を推定
         
+        過去の実行で計測した動画あたりメモリ使用量の90パーセンタイルを使い、
+        計測が無い場合は既定値を使う
+        
         Args:
             total_videos: 総動画数
+            concurrent: 並行モードで処理するか（省略時は設定値 processing.concurrent）
+            max_concurrency: 並行モードの同時実行リクエスト数（省略時は設定値）
             
         Returns:
             メモリ使用量推定
         """
-        # 1動画あたりの推定メモリ使用量（MB）
-        memory_per_video = 0.5  # テキストデータのため比較的小さい
+        use_concurrent = self.concurrent if concurrent is None else concurrent
+        
+        # 1動画あたりのメモリ使用量（MB）
+        memory_per_video = self.latency_stats.memory_percentile(90)
+        source = 'measured'
+        if memory_per_video is None:
+            memory_per_video = 0.5  # テキストデータのため比較的小さい
+            source = 'default'
         
-        batch_memory = self.batch_size * memory_per_video
+        # 並行モードでは同時実行数ぶんの動画が処理中になる
+        in_flight = max(1, max_concurrency or self.max_concurrency) if use_concurrent else self.batch_size
+        batch_memory = in_flight * memory_per_video
         total_memory = total_videos * memory_per_video
         
         return {
             'total_mb': total_memory,
             'batch_mb': batch_memory,
+            'memory_per_video_mb': memory_per_video,
             'max_memory_mb': self.max_memory_mb,
-            'memory_safe': batch_memory < self.max_memory_mb
+            'memory_safe': batch_memory < self.max_memory_mb,
+            'source': source
         }
     
     def format_tags_for_sheets(self, tags_lists: List[List[str]]) -> List[List[str]]:
@@ -0,0 +1,156 @@
+"""
+カタログスナップショットモジュール
+動画カタログやタグ付け結果を Parquet 形式のローカルスナップショットとして保存・読み込みする。
+スキルなどの値の種類が少ない列は辞書エンコードし、文字起こしなどの長いテキスト列は zstd で圧縮する。
+読み込みはメモリマップで行い、必要な列だけ・一定行数ずつ読み出せる
+
+pyarrow はオプションの依存関係（未インストールの場合は PYARROW_AVAILABLE が False）
+"""
+
+import os
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+# 辞書エンコードする列（値の種類が少ない列）
+DICTIONARY_COLUMNS = ('skill', 'source_tab')
+# 高圧縮の zstd で保存する長いテキスト列（それ以外の列は展開の速い snappy）
+TEXT_COLUMNS = ('transcript', 'description', 'summary')
+ZSTD_LEVEL = 9
+# 1行グループの行数（列の絞り込み・分割読み込みの単位）
+ROW_GROUP_ROWS = 10000
+
+
+def _require_pyarrow():
+    """pyarrow が無い場合は分かりやすいエラーにする"""
+    if not PYARROW_AVAILABLE:
+        raise ImportError("カタログスナップショットには pyarrow が必要です: pip install pyarrow")
+
+
+def write_catalog_snapshot(
+    data: Any,
+    path: str,
+    dictionary_columns: Iterable[str] = DICTIONARY_COLUMNS,
+    text_columns: Iterable[str] = TEXT_COLUMNS,
+    row_group_rows: int = ROW_GROUP_ROWS
+) -> int:
+    """
+    カタログを Parquet ファイルに保存
+    
+    Args:
+        data: DataFrame または 列名 → 値 の辞書のリスト
+        path: 保存先のパス
+        dictionary_columns: 辞書エンコードする列
+        text_columns: zstd で圧縮する列
+        row_group_rows: 1行グループの行数
+    
+    Returns:
+        保存した行数
+    """
+    _require_pyarrow()
+    
+    df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(list(data))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    
+    # 辞書エンコードは文字列の列だけ（カテゴリ列はそのまま辞書型になる）
+    dictionary = [
+        name for name in table.column_names
+        if name in set(dictionary_columns) and (
+            pa.types.is_string(table.schema.field(name).type)
+            or pa.types.is_dictionary(table.schema.field(name).type)
+        )
+    ]
+    text = set(text_columns)
+    compression = {name: ('zstd' if name in text else 'snappy') for name in table.column_names}
+    compression_level = {name: ZSTD_LEVEL for name in table.column_names if name in text}
+    
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    # 書き込み途中で落ちても既存のスナップショットを壊さないよう一時ファイルから置き換える
+    temp_path = f"{path}.tmp"
+    pq.write_table(
+        table,
+        temp_path,
+        row_group_size=row_group_rows,
+        use_dictionary=dictionary or False,
+        compression=compression,
+        compression_level=compression_level or None
+    )
+    os.replace(temp_path, path)
+    return table.num_rows
+
+
+def read_catalog_snapshot(path: str, columns: List[str] = None, as_category: bool = True) -> pd.DataFrame:
+    """
+    Parquet ファイルのカタログをメモリマップで読み込み
+    
+    Args:
+        path: スナップショットのパス
+        columns: 読み込む列（省略時は全列）
+        as_category: 辞書エンコードした列をカテゴリ型のまま読むか（False の場合は文字列）
+    
+    Returns:
+        データフレーム
+    """
+    _require_pyarrow()
+    
+    read_dictionary = _dictionary_columns(path) if as_category else None
+    table = pq.read_table(path, columns=columns, memory_map=True, read_dictionary=read_dictionary)
+    return table.to_pandas()
+
+
+def iter_catalog_batches(path: str, columns: List[str] = None, batch_rows: int = ROW_GROUP_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Parquet ファイルのカタログを一定行数ずつ読み込み（BatchProcessor.process_videos_stream の入力にできる）
+    
+    Args:
+        path: スナップショットのパス
+        columns: 読み込む列（省略時は全列）
+        batch_rows: 1回に読み込む行数
+    
+    Yields:
+        データフレームのチャンク
+    """
+    _require_pyarrow()
+    
+    parquet_file = pq.ParquetFile(path, memory_map=True, read_dictionary=_dictionary_columns(path))
+    for batch in parquet_file.iter_batches(batch_size=batch_rows, columns=columns):
+        yield batch.to_pandas()
+
+
+def catalog_snapshot_info(path: str) -> Dict[str, Any]:
+    """
+    ファイルのメタデータだけから行数・列・サイズを取得
+    
+    Args:
+        path: スナップショットのパス
+    
+    Returns:
+        {'rows', 'columns', 'row_groups', 'bytes'}
+    """
+    _require_pyarrow()
+    
+    metadata = pq.read_metadata(path)
+    return {
+        'rows': metadata.num_rows,
+        'columns': [metadata.schema.column(index).name for index in range(metadata.num_columns)],
+        'row_groups': metadata.num_row_groups,
+        'bytes': os.path.getsize(path)
+    }
+
+
+def _dictionary_columns(path: str) -> Optional[List[str]]:
+    """ファイル中の辞書エンコード対象の列（読み込み時も辞書型のまま展開せずに読む）"""
+    schema = pq.read_schema(path, memory_map=True)
+    columns = [name for name in schema.names if name in DICTIONARY_COLUMNS]
+    return columns or None
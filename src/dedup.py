@@ -0,0 +1,90 @@
+"""
+重複動画検出モジュール
+再アップロードやコースごとのコピーなど、内容が同一の動画をまとめて
+代表の1件だけをAIで処理できるようにする
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import List, Dict, Optional
+
+
+# 重複判定に使う動画データのフィールド（コースごとに変わるタイトル・スキルは含めない）
+DEDUP_FIELDS = ['description', 'summary', 'transcript']
+# 空の場合は重複とみなさないフィールド（定型の説明文だけが同じ別々の動画をまとめないため）
+DEDUP_REQUIRED_FIELDS = ['transcript']
+
+
+def normalize_text(text: str) -> str:
+    """
+    重複判定用にテキストを正規化
+    
+    全角・半角の違い（NFKC）、大文字・小文字、空白の違いを無視する
+    
+    Args:
+        text: テキスト
+    
+    Returns:
+        正規化したテキスト
+    """
+    normalized = unicodedata.normalize('NFKC', str(text or '')).casefold()
+    return re.sub(r'\s+', ' ', normalized).strip()
+
+
+def content_hash(
+    video_info: Dict[str, str],
+    fields: List[str] = None,
+    required_fields: List[str] = None
+) -> Optional[str]:
+    """
+    動画データの正規化した内容のハッシュを算出
+    
+    Args:
+        video_info: 動画データ辞書
+        fields: ハッシュに含めるフィールド（省略時は DEDUP_FIELDS）
+        required_fields: 空の場合は重複とみなさないフィールド（省略時は DEDUP_REQUIRED_FIELDS）
+    
+    Returns:
+        SHA-256 の16進文字列。対象フィールドがすべて空の場合や必須フィールドが空の場合は
+        None（重複とみなさない）
+    """
+    required = DEDUP_REQUIRED_FIELDS if required_fields is None else required_fields
+    if any(not normalize_text(video_info.get(field, '')) for field in required):
+        return None
+    
+    values = [normalize_text(video_info.get(field, '')) for field in (fields or DEDUP_FIELDS)]
+    if not any(values):
+        return None
+    return hashlib.sha256('\x1f'.join(values).encode('utf-8')).hexdigest()
+
+
+def find_representatives(
+    video_infos: List[Dict[str, str]],
+    fields: List[str] = None,
+    required_fields: List[str] = None
+) -> List[int]:
+    """
+    各行の代表行を算出
+    
+    内容ハッシュが同じ行のうち最初に出現した行を代表とする
+    
+    Args:
+        video_infos: 動画データ辞書のリスト
+        fields: 重複判定に使うフィールド
+        required_fields: 空の場合は重複とみなさないフィールド
+    
+    Returns:
+        入力と同じ順序の代表行の番号のリスト（代表行自身は自分の番号）
+    """
+    first_seen = {}
+    representatives = []
+    
+    for index, video_info in enumerate(video_infos):
+        digest = content_hash(video_info, fields, required_fields)
+        if digest is None:
+            representatives.append(index)
+            continue
+        representatives.append(first_seen.setdefault(digest, index))
+    
+    return representatives
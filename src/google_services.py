@@ -0,0 +1,194 @@
+"""
+Google API サービスレジストリモジュール
+認証情報ごとに Sheets / Drive のサービスオブジェクトをプロセス内で使い回す。ディスカバリー文書は
+プロセス内で1回だけ読み込み、スレッドセーフでない HTTP 接続（keep-alive）はスレッドごとに持つ。
+トークンの更新は認証情報ごとに1か所で行う
+"""
+
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+import google_auth_httplib2
+import httplib2
+from google.auth.transport.requests import Request
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build, build_from_document
+
+
+# HTTP リクエストのタイムアウト秒数
+HTTP_TIMEOUT = 60
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+# (API名, バージョン) → ディスカバリー文書（同梱されていない API は None）
+_documents: Dict[Tuple[str, str], Optional[str]] = {}
+# 認証情報のキー → 共有する認証情報（トークン更新を1か所にまとめる）
+_credentials: Dict[Tuple[str, ...], Any] = {}
+_refresh_locks: Dict[Tuple[str, ...], threading.Lock] = {}
+# (認証情報のキー, API名, バージョン) → サービスオブジェクト（全スレッドで共有する）
+_services: Dict[Tuple[Any, str, str], Any] = {}
+# clear() のたびに増やす世代番号（各スレッドの HTTP 接続は世代が変わったら作り直す）
+_generation = 0
+# HTTP 接続はスレッドセーフでないため、スレッドごとに保持する
+_local = threading.local()
+
+
+def credentials_key(credentials: Any) -> Tuple[str, ...]:
+    """
+    認証情報を識別するキー
+    
+    Args:
+        credentials: google.auth の認証情報
+    
+    Returns:
+        サービスアカウントはメールアドレスとスコープ、ユーザー認証はクライアントIDと
+        リフレッシュトークンのハッシュから作るキー
+    """
+    scopes = ','.join(sorted(getattr(credentials, 'scopes', None) or []))
+    email = getattr(credentials, 'service_account_email', None)
+    if email:
+        return ('service_account', email, scopes)
+    
+    refresh_token = getattr(credentials, 'refresh_token', None)
+    if refresh_token:
+        digest = hashlib.sha256(refresh_token.encode('utf-8')).hexdigest()[:16]
+        return ('user', getattr(credentials, 'client_id', '') or '', digest, scopes)
+    
+    return ('object', str(id(credentials)))
+
+
+def get_service(api: str, version: str, credentials: Any) -> Any:
+    """
+    認証情報に対応するサービスオブジェクトを取得（初回だけ作成し、以降は使い回す）
+    
+    Args:
+        api: API名（'sheets', 'drive' など）
+        version: APIバージョン
+        credentials: google.auth の認証情報
+    
+    Returns:
+        サービスオブジェクト（どのスレッドから使ってもよい）
+    """
+    key = credentials_key(credentials)
+    with _lock:
+        shared = _credentials.setdefault(key, credentials)
+        _refresh_locks.setdefault(key, threading.Lock())
+        generation = _generation
+        service = _services.get((key, api, version))
+    
+    ensure_fresh(shared)
+    
+    if service is None:
+        http = _ThreadLocalHttp(key, shared, generation)
+        document = _discovery_document(api, version)
+        if document is not None:
+            service = build_from_document(document, http=http)
+        else:
+            # 同梱されていない API はディスカバリーサービスから取得する
+            service = build(api, version, http=http, static_discovery=False)
+        
+        with _lock:
+            # 作成中に clear() された場合は登録しない
+            if generation == _generation:
+                service = _services.setdefault((key, api, version), service)
+    return service
+
+
+def sheets_service(credentials: Any) -> Any:
+    """Sheets API v4 のサービスオブジェクトを取得"""
+    return get_service('sheets', 'v4', credentials)
+
+
+def drive_service(credentials: Any) -> Any:
+    """Drive API v3 のサービスオブジェクトを取得"""
+    return get_service('drive', 'v3', credentials)
+
+
+def ensure_fresh(credentials: Any):
+    """
+    期限切れのアクセストークンを更新（同じ認証情報の同時更新は1回にまとめる）
+    
+    Args:
+        credentials: google.auth の認証情報
+    """
+    if credentials.valid:
+        return
+    
+    key = credentials_key(credentials)
+    with _lock:
+        refresh_lock = _refresh_locks.setdefault(key, threading.Lock())
+    
+    with refresh_lock:
+        # 待っている間に他のスレッドが更新済みなら何もしない
+        if not credentials.valid:
+            credentials.refresh(Request())
+            logger.info("Google API のアクセストークンを更新しました")
+
+
+def clear():
+    """
+    登録済みの認証情報とサービスオブジェクトを破棄（再認証時に使用）
+    
+    各スレッドの HTTP 接続は、そのスレッドが次に新しい世代で通信するときに作り直す
+    """
+    global _generation
+    with _lock:
+        _credentials.clear()
+        _refresh_locks.clear()
+        _services.clear()
+        _generation += 1
+
+
+def _discovery_document(api: str, version: str) -> Optional[str]:
+    """ライブラリ同梱のディスカバリー文書（プロセス内で1回だけ読み込む）"""
+    with _lock:
+        if (api, version) in _documents:
+            return _documents[(api, version)]
+    
+    document = discovery_cache.get_static_doc(api, version)
+    with _lock:
+        return _documents.setdefault((api, version), document)
+
+
+def _authorized_http(key: Tuple[str, ...], credentials: Any, generation: int) -> Any:
+    """呼び出したスレッドで認証情報・世代ごとに共有する HTTP 接続"""
+    if not hasattr(_local, 'http'):
+        _local.http = {}
+    http = _local.http.get((generation, key))
+    if http is None:
+        # clear() より前の世代の接続は破棄する
+        for stale in [pool_key for pool_key in _local.http if pool_key[0] < _generation]:
+            _local.http.pop(stale).close()
+        http = google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+        _local.http[(generation, key)] = http
+    return http
+
+
+class _ThreadLocalHttp:
+    """リクエストを呼び出したスレッドの HTTP 接続に振り分ける HTTP オブジェクト"""
+    
+    def __init__(self, key: Tuple[str, ...], credentials: Any, generation: int):
+        """
+        初期化
+        
+        Args:
+            key: 認証情報のキー
+            credentials: 共有する認証情報
+            generation: 作成時の世代番号
+        """
+        self.key = key
+        self.credentials = credentials
+        self.generation = generation
+    
+    def request(self, *args, **kwargs):
+        """呼び出したスレッドの HTTP 接続でリクエストを送信"""
+        return _authorized_http(self.key, self.credentials, self.generation).request(*args, **kwargs)
+    
+    def close(self):
+        """呼び出したスレッドの HTTP 接続を閉じる"""
+        http = getattr(_local, 'http', {}).pop((self.generation, self.key), None)
+        if http is not None:
+            http.close()
@@ -0,0 +1,311 @@
+"""
+インクリメンタルタグ最適化モジュール
+タグ頻度・文書頻度・TF-IDF の累積値・類似タグのクラスタをファイルに保存し、
+新しい動画のタグだけを取り込んで最終タグセットを更新する
+"""
+
+import json
+import math
+import os
+from collections import Counter
+from typing import List, Dict, Any, Set
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .tag_clustering import UnionFind
+from .tag_cosine import normalize_tag
+from .tag_matcher import TagMatcher
+from .tag_optimizer import TagOptimizer
+
+
+# 状態ファイルの形式バージョン
+STATE_VERSION = 1
+
+
+class IncrementalTagOptimizer(TagOptimizer):
+    """状態を保存するインクリメンタルタグ最適化クラス"""
+    
+    def __init__(self, config_path: str = None, state_path: str = None, reset_state: bool = False):
+        """
+        初期化
+        
+        Args:
+            config_path: 設定ファイルのパス
+            state_path: 状態ファイルのパス（省略時は設定の tag_optimization.state_path）
+            reset_state: 保存済みの状態を読み込まず空の状態から始めるか（次の保存で上書きする）
+        
+        Raises:
+            ValueError: 保存済みの状態が現在の設定と互換性がない場合（reset_state=False のとき）
+        """
+        super().__init__(config_path)
+        self.state_path = state_path or self.optimization_config.get(
+            'state_path', 'checkpoints/tag_optimizer_state.json'
+        )
+        self.reset()
+        
+        if not reset_state and os.path.exists(self.state_path):
+            self._load()
+    
+    def reset(self):
+        """保存済みの状態を使わず空の状態から始める"""
+        self._documents = 0
+        self._tag_frequencies = Counter()
+        self._tags: List[str] = []
+        self._tag_index: Dict[str, int] = {}
+        self._union_find = UnionFind(0)
+        self._document_frequencies: Dict[str, int] = {}
+        self._tfidf_sums: Dict[str, float] = {}
+        self._ingested_rows: Set[str] = set()
+    
+    def update(
+        self,
+        all_tags: List[List[str]],
+        video_data: pd.DataFrame,
+        column_mapping: Dict[str, str],
+        row_ids: List[str] = None
+    ) -> List[str]:
+        """
+        新しい動画のタグを取り込み、最終タグセットを更新して状態を保存
+        
+        Args:
+            all_tags: 新しい動画ごとのタグリスト（row_ids を省略する場合は取り込み済みの動画を含めない）
+            video_data: 新しい動画のデータ
+            column_mapping: 列マッピング
+            row_ids: 各行の識別キー（指定すると取り込み済みのキーの行を読み飛ばす）
+        
+        Returns:
+            最適化されたタグリスト
+        """
+        if row_ids is not None:
+            positions = [
+                position for position, row_id in enumerate(row_ids)
+                if row_id not in self._ingested_rows
+            ]
+            self.logger.info(f"インクリメンタルタグ最適化: 新規 {len(positions)}/{len(row_ids)}件を取り込み")
+            
+            all_tags = [all_tags[position] for position in positions]
+            video_data = video_data.iloc[positions].reset_index(drop=True)
+            self._ingested_rows.update(row_ids)
+        
+        cleaned_tags = self._collect_and_clean_tags(all_tags)
+        new_frequencies = self._analyze_tag_frequencies(cleaned_tags)
+        self._tag_frequencies.update(new_frequencies)
+        
+        self._update_scores(cleaned_tags, video_data, column_mapping)
+        self._update_clusters([tag for tag in new_frequencies if tag not in self._tag_index])
+        self.save()
+        
+        return self.final_tags()
+    
+    def final_tags(self) -> List[str]:
+        """
+        現在の状態から最終タグセットを算出
+        
+        Returns:
+            最適化されたタグリスト
+        """
+        clusters: Dict[int, List[str]] = {}
+        for index, tag in enumerate(self._tags):
+            clusters.setdefault(self._union_find.find(index), []).append(tag)
+        
+        merged_tags = self._score_clusters(
+            [clusters[root] for root in sorted(clusters)], self._tag_frequencies, self.tag_scores()
+        )
+        return self._select_final_tags(merged_tags)
+    
+    def tag_scores(self) -> Dict[str, float]:
+        """
+        累積値から現在のタグ重要度スコア（TF-IDF の平均）を算出
+        
+        Returns:
+            タグ重要度スコア辞書
+        """
+        if not self._documents:
+            return {}
+        
+        return {
+            tag: self._idf(self._document_frequencies[tag]) * total / self._documents
+            for tag, total in self._tfidf_sums.items()
+        }
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        状態の件数を取得
+        
+        Returns:
+            件数情報
+        """
+        return {
+            'documents': self._documents,
+            'unique_tags': len(self._tags),
+            'clusters': len({self._union_find.find(index) for index in range(len(self._tags))}),
+            'scored_tags': len(self._tfidf_sums),
+            'ingested_rows': len(self._ingested_rows)
+        }
+    
+    def _update_scores(self, tags: List[str], video_data: pd.DataFrame, column_mapping: Dict[str, str]):
+        """
+        新しい動画の TF-IDF を累積値に加える
+        
+        各動画の行の正規化には取り込み時点の IDF を使い、タグごとに正規化後の出現回数の合計を保持する
+        （スコアは現在の IDF を掛けて算出する）。取り込み済みの動画のテキストは保持しないため、
+        新しく現れたタグはそれ以降に取り込んだ動画だけで数える
+        """
+        if len(video_data) == 0:
+            return
+        
+        matcher = TagMatcher(list(self._tfidf_sums) + sorted(set(tags) - set(self._tfidf_sums)))
+        if not matcher.tags:
+            self._documents += len(video_data)
+            return
+        
+        counts = self._weighted_tag_counts(matcher, video_data, column_mapping).tocsr()
+        batch_frequencies = np.asarray((counts > 0).sum(axis=0)).ravel()
+        
+        self._documents += len(video_data)
+        document_frequencies = np.array(
+            [self._document_frequencies.get(tag, 0) for tag in matcher.tags], dtype=np.float64
+        ) + batch_frequencies
+        idf = np.array([self._idf(value) for value in document_frequencies])
+        
+        # TfidfTransformer と同じ L2 正規化（出現の無い動画は 0 のまま）
+        norms = np.sqrt(np.asarray(counts.multiply(counts).multiply(idf ** 2).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        sums = np.asarray((sparse.diags(1.0 / norms) @ counts).sum(axis=0)).ravel()
+        
+        for tag, frequency, total in zip(matcher.tags, document_frequencies.tolist(), sums.tolist()):
+            self._document_frequencies[tag] = int(frequency)
+            self._tfidf_sums[tag] = self._tfidf_sums.get(tag, 0.0) + total
+    
+    def _update_clusters(self, new_tags: List[str]):
+        """
+        新しいタグと類似しうるタグだけでクラスタリングし、既存のクラスタに結合する
+        
+        類似度が0より大きいタグの組は必ず共通の文字 n-gram を持つため、新しいタグと
+        n-gram を共有しない既存タグ（とそのクラスタ）は比較しない
+        """
+        if not new_tags:
+            return
+        
+        base = len(self._tags)
+        for tag in new_tags:
+            self._tag_index[tag] = len(self._tags)
+            self._tags.append(tag)
+        self._union_find.parent.extend(range(base, len(self._tags)))
+        
+        gram_size = self._blocking_gram_size(new_tags)
+        new_grams: Set[str] = set()
+        for tag in new_tags:
+            new_grams.update(self._blocking_grams(tag, gram_size))
+        
+        affected = [
+            index for index in range(base)
+            if len(self._blocking_key(self._tags[index])) < gram_size
+            or not new_grams.isdisjoint(self._blocking_grams(self._tags[index], gram_size))
+        ] + list(range(base, len(self._tags)))
+        
+        subset = [self._tags[index] for index in affected]
+        for pair in self._create_clusterer().similar_pairs(subset):
+            first, second = affected[pair[0]], affected[pair[1]]
+            # 既存タグ同士の組は前回までに結合済み
+            if first >= base or second >= base:
+                self._union_find.union(first, second)
+        
+        self.logger.info(
+            f"インクリメンタルクラスタリング: 新規タグ {len(new_tags)}件, 比較対象 {len(subset)}/{len(self._tags)}件"
+        )
+    
+    def _blocking_gram_size(self, new_tags: List[str]) -> int:
+        """
+        比較対象の絞り込みに使う n-gram の長さ
+        
+        類似する組が必ず共有する n-gram の長さを返す。保証できない場合は1文字単位にする
+        """
+        if any(len(self._blocking_key(tag)) < 2 for tag in new_tags):
+            return 1
+        
+        if self.clustering_method == 'cosine':
+            return max(1, min(self.cosine_config.get('ngram_range', [2, 3])))
+        
+        # 編集距離 k 以内の長さ L の組は L - 1 - 2k 個以上のバイグラムを共有する（包含関係は必ず共有）
+        clusterer = self._create_clusterer()
+        if all(length - 1 - 2 * clusterer._max_distance(length) > 0 for length in range(2, 51)):
+            return 2
+        return 1
+    
+    def _blocking_key(self, tag: str) -> str:
+        """n-gram を取り出す前のタグ（コサイン類似度の場合は同じ正規化をかける）"""
+        return normalize_tag(tag) if self.clustering_method == 'cosine' else tag
+    
+    def _blocking_grams(self, tag: str, size: int) -> Set[str]:
+        """絞り込み用の n-gram の集合"""
+        key = self._blocking_key(tag)
+        return {key[start:start + size] for start in range(len(key) - size + 1)}
+    
+    def _idf(self, document_frequency: float) -> float:
+        """TfidfTransformer（smooth_idf）と同じ IDF"""
+        return math.log((1 + self._documents) / (1 + document_frequency)) + 1
+    
+    def _settings(self) -> Dict[str, Any]:
+        """状態の互換性に関わる設定"""
+        return {
+            'clustering_method': self.clustering_method,
+            'similarity_threshold': self.similarity_threshold,
+            'cosine': self.cosine_config,
+            'importance_weights': self.importance_weights
+        }
+    
+    def save(self):
+        """状態をJSONファイルに保存"""
+        data = {
+            'version': STATE_VERSION,
+            'settings': self._settings(),
+            'documents': self._documents,
+            'tag_frequencies': dict(self._tag_frequencies),
+            'tags': self._tags,
+            'parent': [self._union_find.find(index) for index in range(len(self._tags))],
+            'document_frequencies': self._document_frequencies,
+            'tfidf_sums': self._tfidf_sums,
+            'ingested_rows': sorted(self._ingested_rows)
+        }
+        
+        try:
+            directory = os.path.dirname(self.state_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            
+            # 書き込み途中で落ちても既存の状態を壊さないよう一時ファイルから置き換える
+            temp_path = f"{self.state_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.state_path)
+        
+        except OSError as e:
+            self.logger.error(f"タグ最適化状態の保存エラー: {str(e)}")
+    
+    def _load(self):
+        """JSONファイルから状態を読み込み"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.error(f"タグ最適化状態の読み込みエラー: {str(e)}")
+            return
+        
+        if data.get('version') != STATE_VERSION or data.get('settings') != self._settings():
+            raise ValueError(
+                f"タグ最適化状態 {self.state_path} は現在の設定と互換性がありません。"
+                "reset_state=True を指定して作り直すか状態ファイルを削除してください"
+            )
+        
+        self._documents = data['documents']
+        self._tag_frequencies = Counter(data['tag_frequencies'])
+        self._tags = data['tags']
+        self._tag_index = {tag: index for index, tag in enumerate(self._tags)}
+        self._union_find = UnionFind(0)
+        self._union_find.parent = data['parent']
+        self._document_frequencies = data['document_frequencies']
+        self._tfidf_sums = data['tfidf_sums']
+        self._ingested_rows = set(data.get('ingested_rows', []))
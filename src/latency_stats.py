@@ -0,0 +1,218 @@
+"""
+レイテンシ・メモリ統計モジュール
+LLM呼び出しの実測レイテンシと動画あたりメモリ使用量をローリングウィンドウで保持し、
+処理時間・メモリ見積もりに使うパーセンタイルを提供する
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+from collections import deque
+from typing import List, Dict, Any, Optional
+
+
+# プロンプトサイズ（入力トークン数）のバケット境界
+PROMPT_SIZE_BUCKETS = [500, 1000, 2000, 4000]
+
+
+def prompt_size_bucket(prompt_tokens: int) -> str:
+    """
+    入力トークン数からプロンプトサイズのバケット名を取得
+    
+    Args:
+        prompt_tokens: 入力トークン数
+    
+    Returns:
+        バケット名（例: '<1000', '4000+'）
+    """
+    for bound in PROMPT_SIZE_BUCKETS:
+        if prompt_tokens < bound:
+            return f"<{bound}"
+    return f"{PROMPT_SIZE_BUCKETS[-1]}+"
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """
+    最近傍ランク法でパーセンタイルを算出
+    
+    Args:
+        values: 数値のリスト
+        pct: パーセンタイル（0-100）
+    
+    Returns:
+        パーセンタイル値（値がない場合は None）
+    """
+    if not values:
+        return None
+    
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class LatencyStats:
+    """実測レイテンシ・メモリ統計クラス"""
+    
+    def __init__(self, path: str = None, window: int = 500):
+        """
+        初期化
+        
+        Args:
+            path: 統計を保存するJSONファイルのパス（None の場合は保存しない）
+            window: エンジン/モデル・バケットごとに保持する直近サンプル数
+        """
+        self.path = path
+        self.window = window
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._memory = deque(maxlen=window)
+        
+        if path and os.path.exists(path):
+            self._load()
+    
+    def observe(self, record: Dict[str, Any]):
+        """
+        UsageTracker の呼び出し記録を取り込む（UsageTracker のリスナーとして登録する）
+        
+        Args:
+            record: UsageTracker.record が返す記録
+        """
+        if record.get('success'):
+            self.record_latency(
+                record['provider'], record['model'], record['prompt_tokens'], record['latency']
+            )
+    
+    def record_latency(self, engine: str, model: str, prompt_tokens: int, latency: float):
+        """
+        1回の呼び出しのレイテンシを記録
+        
+        Args:
+            engine: AIエンジン名
+            model: モデル名
+            prompt_tokens: 入力トークン数
+            latency: レイテンシ（秒）
+        """
+        key = self._key(engine, model, prompt_size_bucket(prompt_tokens))
+        with self._lock:
+            self._latencies.setdefault(key, deque(maxlen=self.window)).append(latency)
+    
+    def record_memory(self, mb_per_video: float):
+        """
+        実行で計測した動画あたりメモリ使用量を記録
+        
+        Args:
+            mb_per_video: 動画あたりのメモリ使用量（MB）
+        """
+        with self._lock:
+            self._memory.append(mb_per_video)
+    
+    def latency_percentile(
+        self,
+        engine: str,
+        model: str,
+        pct: float,
+        prompt_tokens: Optional[int] = None
+    ) -> Optional[float]:
+        """
+        レイテンシのパーセンタイルを取得
+        
+        該当するプロンプトサイズのバケットにサンプルが無い場合は、
+        同じエンジン/モデルの全バケットのサンプルで算出する
+        
+        Args:
+            engine: AIエンジン名
+            model: モデル名
+            pct: パーセンタイル（0-100）
+            prompt_tokens: 想定する入力トークン数（省略時は全バケット）
+        
+        Returns:
+            レイテンシ（秒）。サンプルが無い場合は None
+        """
+        prefix = self._key(engine, model, '')
+        with self._lock:
+            if prompt_tokens is not None:
+                samples = list(self._latencies.get(self._key(engine, model, prompt_size_bucket(prompt_tokens)), []))
+                if samples:
+                    return percentile(samples, pct)
+            
+            samples = [
+                latency for key, values in self._latencies.items()
+                if key.startswith(prefix) for latency in values
+            ]
+        return percentile(samples, pct)
+    
+    def sample_count(self, engine: str, model: str) -> int:
+        """
+        エンジン/モデルのレイテンシサンプル数を取得
+        
+        Args:
+            engine: AIエンジン名
+            model: モデル名
+        
+        Returns:
+            サンプル数
+        """
+        prefix = self._key(engine, model, '')
+        with self._lock:
+            return sum(len(values) for key, values in self._latencies.items() if key.startswith(prefix))
+    
+    def memory_percentile(self, pct: float) -> Optional[float]:
+        """
+        動画あたりメモリ使用量のパーセンタイルを取得
+        
+        Args:
+            pct: パーセンタイル（0-100）
+        
+        Returns:
+            メモリ使用量（MB）。サンプルが無い場合は None
+        """
+        with self._lock:
+            return percentile(list(self._memory), pct)
+    
+    def save(self):
+        """統計をJSONファイルに保存"""
+        if not self.path:
+            return
+        
+        with self._lock:
+            data = {
+                'latencies': {key: list(values) for key, values in self._latencies.items()},
+                'memory_mb_per_video': list(self._memory)
+            }
+        
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            
+            # 書き込み途中で落ちても既存の統計を壊さないよう一時ファイルから置き換える
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+        
+        except OSError as e:
+            self.logger.error(f"レイテンシ統計の保存エラー: {str(e)}")
+    
+    def _load(self):
+        """JSONファイルから統計を読み込み"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.error(f"レイテンシ統計の読み込みエラー: {str(e)}")
+            return
+        
+        self._latencies = {
+            key: deque(values, maxlen=self.window)
+            for key, values in data.get('latencies', {}).items()
+        }
+        self._memory = deque(data.get('memory_mb_per_video', []), maxlen=self.window)
+    
+    @staticmethod
+    def _key(engine: str, model: str, bucket: str) -> str:
+        """統計のキーを作成"""
+        return f"{engine}/{model}|{bucket}"
@@ -0,0 +1,333 @@
+"""
+類似動画検出モジュール
+文字シングルの MinHash と LSH で、再編集版や翻訳版などほぼ同じ内容の動画を検出し、
+タグ付け済みの動画のタグを再利用できるようにする
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from .dedup import normalize_text
+
+
+# MinHash の置換に使うメルセンヌ素数（2^31 - 1）。係数との積が uint64 に収まる
+_MERSENNE_PRIME = (1 << 31) - 1
+
+# 類似度の算出に使う動画データのフィールド
+NEAR_DUPLICATE_FIELDS = ['title', 'summary', 'transcript']
+
+
+def grounded_tags(tags: List[str], video_info: Dict[str, str], fields: List[str] = None) -> List[str]:
+    """
+    動画のテキストにそのまま出現するタグを抽出
+    
+    Args:
+        tags: タグリスト
+        video_info: 動画データ辞書
+        fields: 検索するフィールド（省略時は NEAR_DUPLICATE_FIELDS）
+    
+    Returns:
+        テキストに出現するタグのリスト
+    """
+    text = _joined_text(video_info, fields)
+    return [tag for tag in tags if normalize_text(tag) and normalize_text(tag) in text]
+
+
+def adjust_tags(tags: List[str], grounded: List[str], video_info: Dict[str, str], fields: List[str] = None) -> List[str]:
+    """
+    類似動画のタグを対象の動画向けに調整
+    
+    元の動画のテキストに出現していたタグのうち、対象の動画のテキストには出現しないもの
+    （再編集で削られた固有名詞など）を除く。テキストに出現しない抽象的なタグはそのまま残す
+    
+    Args:
+        tags: 類似動画のタグリスト
+        grounded: 類似動画のテキストに出現していたタグ
+        video_info: 対象の動画データ辞書
+        fields: 検索するフィールド
+    
+    Returns:
+        調整したタグリスト
+    """
+    text = _joined_text(video_info, fields)
+    grounded_set = set(grounded)
+    return [tag for tag in tags if tag not in grounded_set or normalize_text(tag) in text]
+
+
+def _joined_text(video_info: Dict[str, str], fields: List[str] = None) -> str:
+    """対象フィールドを正規化して連結"""
+    return ' '.join(normalize_text(video_info.get(field, '')) for field in (fields or NEAR_DUPLICATE_FIELDS))
+
+
+class NearDuplicateIndex:
+    """MinHash LSH による類似動画インデックスクラス"""
+    
+    def __init__(
+        self,
+        db_path: str = "checkpoints/near_duplicates.sqlite3",
+        threshold: float = 0.9,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        fields: List[str] = None,
+        seed: int = 1
+    ):
+        """
+        初期化
+        
+        Args:
+            db_path: インデックスを保存するSQLiteデータベースのパス
+            threshold: タグを再利用する推定 Jaccard 類似度の下限
+            num_perm: MinHash の置換数（シグネチャ長）
+            bands: LSH のバンド数（num_perm を割り切れる数）
+            shingle_size: 文字シングルの長さ
+            fields: 類似度の算出に使うフィールド（省略時は NEAR_DUPLICATE_FIELDS）
+            seed: 置換の乱数シード（保存済みのシグネチャと同じ値を使う必要がある）
+        """
+        if num_perm % bands != 0:
+            raise ValueError(f"num_perm ({num_perm}) は bands ({bands}) で割り切れる必要があります")
+        
+        self.db_path = db_path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.shingle_size = shingle_size
+        self.fields = fields or NEAR_DUPLICATE_FIELDS
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        
+        generator = np.random.default_rng(seed)
+        self._a = generator.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = generator.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('''
+            CREATE TABLE IF NOT EXISTS signatures (
+                namespace TEXT NOT NULL,
+                row_key TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                tags TEXT NOT NULL,
+                grounded TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (namespace, row_key)
+            )
+        ''')
+        self._connection.execute('''
+            CREATE TABLE IF NOT EXISTS bands (
+                namespace TEXT NOT NULL,
+                band INTEGER NOT NULL,
+                bucket TEXT NOT NULL,
+                row_key TEXT NOT NULL
+            )
+        ''')
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS bands_lookup ON bands (namespace, band, bucket)'
+        )
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS bands_row ON bands (namespace, row_key)'
+        )
+        self._connection.commit()
+    
+    def signature(self, video_info: Dict[str, str]) -> Optional[np.ndarray]:
+        """
+        動画データの MinHash シグネチャを算出
+        
+        Args:
+            video_info: 動画データ辞書
+        
+        Returns:
+            長さ num_perm の uint64 配列。テキストが短すぎる場合は None
+        """
+        text = _joined_text(video_info, self.fields)
+        if len(text) < self.shingle_size:
+            return None
+        
+        shingles = {text[start:start + self.shingle_size] for start in range(len(text) - self.shingle_size + 1)}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+            dtype=np.uint64, count=len(shingles)
+        ) % _MERSENNE_PRIME
+        
+        # 置換 (a * x + b) mod p の最小値。長い文字起こしでも一時配列が大きくならないよう分割する
+        signature = np.full(self.num_perm, _MERSENNE_PRIME, dtype=np.uint64)
+        for start in range(0, len(hashes), 4096):
+            block = hashes[start:start + 4096]
+            permuted = (self._a[:, None] * block[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+        
+        return signature
+    
+    def similarity(self, first: np.ndarray, second: np.ndarray) -> float:
+        """
+        2つのシグネチャから Jaccard 類似度を推定
+        
+        Args:
+            first: シグネチャ
+            second: シグネチャ
+        
+        Returns:
+            推定類似度（0.0-1.0）
+        """
+        return float(np.mean(first == second))
+    
+    def query(self, namespace: str, signature: np.ndarray) -> Optional[Dict[str, Any]]:
+        """
+        インデックスから最も類似した動画を検索
+        
+        Args:
+            namespace: 名前空間（AIエンジン・モデル・タグ候補セットなど、タグの互換性の単位）
+            signature: 検索する動画のシグネチャ
+        
+        Returns:
+            類似度が閾値以上の動画のうち最も類似したもの
+            {'row_key', 'similarity', 'tags', 'grounded'}。無い場合は None
+        """
+        buckets = self._band_buckets(signature)
+        
+        with self._lock:
+            candidates = set()
+            for band, bucket in enumerate(buckets):
+                rows = self._connection.execute(
+                    'SELECT row_key FROM bands WHERE namespace = ? AND band = ? AND bucket = ?',
+                    (namespace, band, bucket)
+                ).fetchall()
+                candidates.update(row_key for (row_key,) in rows)
+            
+            best = None
+            for row_key in candidates:
+                row = self._connection.execute(
+                    'SELECT signature, tags, grounded FROM signatures WHERE namespace = ? AND row_key = ?',
+                    (namespace, row_key)
+                ).fetchone()
+                if row is None:
+                    continue
+                
+                similarity = self.similarity(signature, np.frombuffer(row[0], dtype=np.uint64))
+                if similarity >= self.threshold and (best is None or similarity > best['similarity']):
+                    best = {
+                        'row_key': row_key,
+                        'similarity': similarity,
+                        'tags': json.loads(row[1]),
+                        'grounded': json.loads(row[2])
+                    }
+        
+        return best
+    
+    def add(self, namespace: str, row_key: str, signature: np.ndarray, tags: List[str], grounded: List[str]):
+        """
+        タグ付け済みの動画をインデックスに追加（既存の同じキーは置き換え）
+        
+        Args:
+            namespace: 名前空間
+            row_key: 行キー（内容ダイジェストなど）
+            signature: シグネチャ
+            tags: タグリスト
+            grounded: 動画のテキストに出現するタグ（grounded_tags の結果）
+        """
+        buckets = self._band_buckets(signature)
+        
+        with self._lock:
+            self._connection.execute(
+                'DELETE FROM bands WHERE namespace = ? AND row_key = ?', (namespace, row_key)
+            )
+            self._connection.execute(
+                'INSERT OR REPLACE INTO signatures (namespace, row_key, signature, tags, grounded, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    namespace, row_key, signature.astype(np.uint64).tobytes(),
+                    json.dumps(tags, ensure_ascii=False), json.dumps(grounded, ensure_ascii=False), time.time()
+                )
+            )
+            self._connection.executemany(
+                'INSERT INTO bands (namespace, band, bucket, row_key) VALUES (?, ?, ?, ?)',
+                [(namespace, band, bucket, row_key) for band, bucket in enumerate(buckets)]
+            )
+            self._connection.commit()
+    
+    def group(self, signatures: Dict[int, np.ndarray]) -> Dict[int, int]:
+        """
+        同じ実行内の動画を類似グループにまとめる（インデックスには保存しない）
+        
+        番号順に処理し、既出の代表と類似度が閾値以上の動画はその代表に割り当てる
+        
+        Args:
+            signatures: 行番号 → シグネチャの辞書
+        
+        Returns:
+            代表以外の行番号 → 代表の行番号 の辞書
+        """
+        buckets = {}
+        assigned = {}
+        
+        for index in sorted(signatures):
+            signature = signatures[index]
+            band_buckets = self._band_buckets(signature)
+            
+            candidates = set()
+            for band, bucket in enumerate(band_buckets):
+                candidates.update(buckets.get((band, bucket), []))
+            
+            best, best_similarity = None, self.threshold
+            for candidate in sorted(candidates):
+                similarity = self.similarity(signature, signatures[candidate])
+                if similarity >= best_similarity:
+                    best, best_similarity = candidate, similarity
+            
+            if best is not None:
+                assigned[index] = best
+                continue
+            
+            for band, bucket in enumerate(band_buckets):
+                buckets.setdefault((band, bucket), []).append(index)
+        
+        return assigned
+    
+    def stats(self, namespace: str = None) -> Dict[str, Any]:
+        """
+        登録件数を取得
+        
+        Args:
+            namespace: 名前空間（省略時は全体）
+        
+        Returns:
+            件数情報
+        """
+        with self._lock:
+            if namespace is None:
+                count = self._connection.execute('SELECT COUNT(*) FROM signatures').fetchone()[0]
+            else:
+                count = self._connection.execute(
+                    'SELECT COUNT(*) FROM signatures WHERE namespace = ?', (namespace,)
+                ).fetchone()[0]
+        
+        return {'namespace': namespace, 'videos': count}
+    
+    def close(self):
+        """データベース接続を閉じる"""
+        with self._lock:
+            self._connection.close()
+    
+    def _band_buckets(self, signature: np.ndarray) -> List[str]:
+        """シグネチャをバンドに分割し、各バンドのバケットキーを算出"""
+        data = signature.astype(np.uint64)
+        return [
+            hashlib.blake2b(
+                data[band * self.rows_per_band:(band + 1) * self.rows_per_band].tobytes(), digest_size=8
+            ).hexdigest()
+            for band in range(self.bands)
+        ]
@@ -0,0 +1,165 @@
+"""
+タグ付け結果ストアモジュール
+行ごとのタグ付け結果を内容フィンガープリントと共にSQLiteへ保存し、
+変更のない行の再タグ付けを省略できるようにする
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Any, Iterable, Tuple
+
+
+class ResultStore:
+    """行単位のタグ付け結果ストアクラス"""
+    
+    # SQLite のバインド変数上限（古いビルドは999）を超えないよう分割して問い合わせる
+    QUERY_CHUNK_SIZE = 500
+    
+    def __init__(self, db_path: str = "checkpoints/results.sqlite3"):
+        """
+        初期化
+        
+        Args:
+            db_path: SQLiteデータベースのパス
+        """
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # 並行モードのワーカースレッドからも書き込むため、接続は共有してロックで直列化する
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('''
+            CREATE TABLE IF NOT EXISTS results (
+                namespace TEXT NOT NULL,
+                row_key TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                tags TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (namespace, row_key)
+            )
+        ''')
+        self._connection.commit()
+    
+    def get_many(self, namespace: str, row_keys: List[str]) -> Dict[str, Tuple[str, List[str]]]:
+        """
+        複数行の保存済み結果を取得
+        
+        Args:
+            namespace: 名前空間（データセット単位）
+            row_keys: 行キーのリスト
+        
+        Returns:
+            行キー → (フィンガープリント, タグリスト) の辞書（未保存の行は含まない）
+        """
+        stored = {}
+        unique_keys = list(dict.fromkeys(row_keys))
+        
+        with self._lock:
+            for start in range(0, len(unique_keys), self.QUERY_CHUNK_SIZE):
+                chunk = unique_keys[start:start + self.QUERY_CHUNK_SIZE]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._connection.execute(
+                    f'SELECT row_key, fingerprint, tags FROM results '
+                    f'WHERE namespace = ? AND row_key IN ({placeholders})',
+                    [namespace, *chunk]
+                ).fetchall()
+                
+                for row_key, fingerprint, tags in rows:
+                    stored[row_key] = (fingerprint, json.loads(tags))
+        
+        return stored
+    
+    def put(self, namespace: str, row_key: str, fingerprint: str, tags: List[str]):
+        """
+        1行の結果を保存（既存の結果は上書き）
+        
+        Args:
+            namespace: 名前空間
+            row_key: 行キー
+            fingerprint: 内容フィンガープリント
+            tags: タグリスト
+        """
+        self.put_many(namespace, [(row_key, fingerprint, tags)])
+    
+    def put_many(self, namespace: str, rows: Iterable[Tuple[str, str, List[str]]]):
+        """
+        複数行の結果を保存（既存の結果は上書き）
+        
+        Args:
+            namespace: 名前空間
+            rows: (行キー, フィンガープリント, タグリスト) のイテラブル
+        """
+        now = time.time()
+        records = [
+            (namespace, row_key, fingerprint, json.dumps(tags, ensure_ascii=False), now)
+            for row_key, fingerprint, tags in rows
+        ]
+        
+        with self._lock:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO results (namespace, row_key, fingerprint, tags, updated_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                records
+            )
+            self._connection.commit()
+    
+    def prune(self, namespace: str, keep_keys: List[str]) -> int:
+        """
+        指定した行キー以外の結果を削除（シートから削除された行の掃除）
+        
+        Args:
+            namespace: 名前空間
+            keep_keys: 残す行キーのリスト
+        
+        Returns:
+            削除した行数
+        """
+        keep = set(keep_keys)
+        
+        with self._lock:
+            existing = [
+                row_key for (row_key,) in self._connection.execute(
+                    'SELECT row_key FROM results WHERE namespace = ?', (namespace,)
+                )
+            ]
+            removed = [(namespace, row_key) for row_key in existing if row_key not in keep]
+            self._connection.executemany(
+                'DELETE FROM results WHERE namespace = ? AND row_key = ?', removed
+            )
+            self._connection.commit()
+        
+        return len(removed)
+    
+    def stats(self, namespace: str = None) -> Dict[str, Any]:
+        """
+        保存件数を取得
+        
+        Args:
+            namespace: 名前空間（省略時は全体）
+        
+        Returns:
+            件数情報
+        """
+        with self._lock:
+            if namespace is None:
+                count = self._connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+            else:
+                count = self._connection.execute(
+                    'SELECT COUNT(*) FROM results WHERE namespace = ?', (namespace,)
+                ).fetchone()[0]
+        
+        return {'namespace': namespace, 'rows': count}
+    
+    def close(self):
+        """データベース接続を閉じる"""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,125 @@
+"""
+行識別モジュール
+動画データの内容から行を識別するキーを算出する
+"""
+
+import hashlib
+from collections import defaultdict
+from typing import List, Dict
+
+
+# 行の内容として扱う動画データのフィールド
+ROW_FIELDS = ['title', 'skill', 'description', 'summary', 'transcript']
+
+
+def row_digest(video_info: Dict[str, str], fields: List[str] = None) -> str:
+    """
+    動画データの内容ダイジェストを算出
+    
+    行の並び替えや挿入があっても同じ内容の行は同じダイジェストになる
+    
+    Args:
+        video_info: 動画データ辞書
+        fields: ダイジェストに含めるフィールド（省略時は ROW_FIELDS）
+    
+    Returns:
+        SHA-256 の16進文字列
+    """
+    values = [str(video_info.get(field, '') or '').strip() for field in (fields or ROW_FIELDS)]
+    # フィールド境界をまたいだ衝突を防ぐため区切り文字 (US) で連結
+    return hashlib.sha256('\x1f'.join(values).encode('utf-8')).hexdigest()
+
+
+def row_keys(video_infos: List[Dict[str, str]], fields: List[str] = None) -> List[str]:
+    """
+    各行の識別キーを算出
+    
+    内容が完全に同じ行が複数ある場合も区別できるよう、ダイジェストに
+    同一内容内での出現順を付与する（例: "<digest>:0", "<digest>:1"）
+    
+    Args:
+        video_infos: 動画データ辞書のリスト
+        fields: ダイジェストに含めるフィールド
+    
+    Returns:
+        入力と同じ順序の識別キーのリスト
+    """
+    occurrences = defaultdict(int)
+    keys = []
+    
+    for video_info in video_infos:
+        digest = row_digest(video_info, fields)
+        keys.append(f"{digest}:{occurrences[digest]}")
+        occurrences[digest] += 1
+    
+    return keys
+
+
+def stable_row_keys(
+    video_infos: List[Dict[str, str]],
+    id_field: str = None,
+    occurrences: Dict[str, int] = None
+) -> List[str]:
+    """
+    内容が変わっても変化しない行キーを算出（増分処理用）
+    
+    ID列があればその値を、無ければタイトルと同一タイトル内での出現順を使う
+    
+    Args:
+        video_infos: 動画データ辞書のリスト
+        id_field: 行IDとして使うフィールド名
+        occurrences: タイトルごとの出現数（チャンク単位で算出する場合に呼び出し間で引き継ぐ）
+    
+    Returns:
+        入力と同じ順序の行キーのリスト
+    """
+    if occurrences is None:
+        occurrences = defaultdict(int)
+    keys = []
+    
+    for video_info in video_infos:
+        row_id = str(video_info.get(id_field, '') or '').strip() if id_field else ''
+        if row_id:
+            keys.append(f"id:{row_id}")
+            continue
+        
+        title = str(video_info.get('title', '') or '').strip()
+        count = occurrences.get(title, 0)
+        keys.append(f"title:{title}#{count}")
+        occurrences[title] = count + 1
+    
+    return keys
+
+
+def candidate_set_version(candidates: List[str]) -> str:
+    """
+    タグ候補セットのバージョン（順序に依存しないハッシュ）を算出
+    
+    Args:
+        candidates: タグ候補のリスト
+    
+    Returns:
+        16文字の16進文字列
+    """
+    joined = '\n'.join(sorted(set(candidates or [])))
+    return hashlib.sha256(joined.encode('utf-8')).hexdigest()[:16]
+
+
+def row_fingerprint(video_info: Dict[str, str], engine: str, model: str = '', candidate_version: str = '') -> str:
+    """
+    行のフィンガープリントを算出
+    
+    内容・タグ候補セット・AIエンジン/モデルのいずれかが変わると値が変わるため、
+    一致すれば保存済みのタグをそのまま再利用できる
+    
+    Args:
+        video_info: 動画データ辞書
+        engine: AIエンジン名
+        model: モデル名
+        candidate_version: タグ候補セットのバージョン（候補を使わない処理では空）
+    
+    Returns:
+        SHA-256 の16進文字列
+    """
+    parts = [row_digest(video_info), engine or '', model or '', candidate_version or '']
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
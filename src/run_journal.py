@@ -0,0 +1,192 @@
+"""
+実行ジャーナルモジュール
+バッチ処理の完了行を追記専用のJSONLファイルに記録し、中断後の再開を可能にする
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import List, Dict, Any
+
+
+class RunJournal:
+    """追記専用の実行ジャーナルクラス"""
+    
+    def __init__(
+        self,
+        run_id: str,
+        directory: str = "checkpoints",
+        fsync_interval: float = 5.0,
+        fsync_every: int = 50
+    ):
+        """
+        初期化
+        
+        Args:
+            run_id: 実行ID（ファイル名に使用。英数字・'-'・'_'・'.' のみ）
+            directory: ジャーナルを保存するディレクトリ
+            fsync_interval: fsync を行う最大間隔（秒）
+            fsync_every: fsync を行う最大未同期レコード数
+        """
+        if not re.fullmatch(r'[A-Za-z0-9_.\-]+', run_id or '') or run_id in ('.', '..'):
+            raise ValueError(f"不正な実行ID: {run_id}")
+        
+        self.run_id = run_id
+        self.directory = directory
+        self.path = os.path.join(directory, f"{run_id}.jsonl")
+        self.fsync_interval = fsync_interval
+        self.fsync_every = fsync_every
+        self.logger = logging.getLogger(__name__)
+        
+        self._file = None
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.time()
+    
+    def load(self) -> Dict[str, List[str]]:
+        """
+        記録済みの完了行を読み込み
+        
+        クラッシュで書きかけになった末尾の行は無視する
+        
+        Returns:
+            行識別キー → タグリストの辞書
+        """
+        completed = {}
+        
+        if not os.path.exists(self.path):
+            return completed
+        
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    self.logger.warning(f"ジャーナルの破損行をスキップ: {self.path}:{line_number}")
+                    continue
+                
+                if record.get('type') == 'row':
+                    completed[record['key']] = record['tags']
+        
+        return completed
+    
+    def is_complete(self) -> bool:
+        """
+        最後の実行が全行完了として記録されているか
+        
+        Returns:
+            完了済みの場合 True（完了済みの実行は再開に使わない）
+        """
+        if not os.path.exists(self.path):
+            return False
+        
+        complete = False
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                
+                if record.get('type') == 'run':
+                    complete = False
+                elif record.get('type') == 'complete':
+                    complete = True
+        
+        return complete
+    
+    def reset(self):
+        """既存のジャーナルを破棄"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+    
+    def open(self, metadata: Dict[str, Any] = None):
+        """
+        ジャーナルを追記モードで開き、実行情報を記録
+        
+        Args:
+            metadata: 実行情報（AIプロバイダー、総動画数など）
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        needs_newline = self._has_partial_last_line()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if needs_newline:
+            # クラッシュで書きかけになった行の後ろに続けて書かないよう改行で区切る
+            self._file.write('\n')
+        self._write({'type': 'run', 'run_id': self.run_id, 'started_at': time.time(), **(metadata or {})})
+        self.sync()
+    
+    def append(self, row_key: str, index: int, tags: List[str]):
+        """
+        完了した行を記録
+        
+        Args:
+            row_key: 行識別キー
+            index: 実行時の行番号（参考情報）
+            tags: 生成されたタグリスト
+        """
+        self._write({'type': 'row', 'key': row_key, 'index': index, 'tags': tags})
+    
+    def complete(self):
+        """全行の完了を記録してジャーナルを閉じる"""
+        self._write({'type': 'complete', 'run_id': self.run_id, 'completed_at': time.time()})
+        self.close()
+    
+    def sync(self):
+        """バッファをディスクに書き出して fsync"""
+        with self._lock:
+            self._sync_locked()
+    
+    def close(self):
+        """ジャーナルを同期して閉じる"""
+        with self._lock:
+            if self._file is None:
+                return
+            self._sync_locked()
+            self._file.close()
+            self._file = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _write(self, record: Dict[str, Any]):
+        """1レコードを追記し、必要に応じて fsync"""
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        
+        with self._lock:
+            if self._file is None:
+                raise RuntimeError("ジャーナルが開かれていません")
+            
+            # 1行ごとに flush するためプロセスが落ちても記録は残り、
+            # OS ごと落ちた場合に失うのは直近の未 fsync 分だけ
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            
+            if (self._unsynced >= self.fsync_every or
+                    time.time() - self._last_sync >= self.fsync_interval):
+                self._sync_locked()
+    
+    def _has_partial_last_line(self) -> bool:
+        """既存ファイルの末尾が改行で終わっていないか"""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return False
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b'\n'
+    
+    def _sync_locked(self):
+        """ロック取得済みの状態で fsync"""
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.time()
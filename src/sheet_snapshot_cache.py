@@ -0,0 +1,186 @@
+"""
+スプレッドシートのスナップショットキャッシュモジュール
+読み込んだシートの内容を Drive の modifiedTime / version と一緒にローカルへ保存し、
+ファイルが更新されていなければ再ダウンロードせずに保存済みの内容を返す。
+pyarrow がある場合は行データを Parquet（メモリマップで読み込み）、無い場合は JSON で保存する
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, Any, Optional, Callable
+
+import pandas as pd
+
+from .catalog_snapshot import PYARROW_AVAILABLE, read_catalog_snapshot, write_catalog_snapshot
+
+
+# スナップショットの保存先
+DEFAULT_SNAPSHOT_DIR = os.path.join('checkpoints', 'sheet_snapshots')
+
+
+def drive_file_version(drive_service: Any, spreadsheet_id: str, scheduler: Any = None) -> Dict[str, Any]:
+    """
+    Drive API でスプレッドシートの更新日時とバージョンだけを取得
+    
+    Args:
+        drive_service: Google Drive API のサービスオブジェクト
+        spreadsheet_id: スプレッドシートID
+        scheduler: クォータスケジューラー（省略時はそのまま実行）
+    
+    Returns:
+        {'modified_time', 'version'}
+    """
+    request = drive_service.files().get(
+        fileId=spreadsheet_id,
+        fields='modifiedTime,version',
+        supportsAllDrives=True
+    )
+    metadata = scheduler.execute(request) if scheduler else request.execute()
+    return {'modified_time': metadata.get('modifiedTime'), 'version': metadata.get('version')}
+
+
+class SheetSnapshotCache:
+    """スプレッドシートID・シート単位のスナップショットキャッシュクラス"""
+    
+    def __init__(self, cache_dir: str = DEFAULT_SNAPSHOT_DIR):
+        """
+        初期化
+        
+        Args:
+            cache_dir: スナップショットの保存ディレクトリ
+        """
+        self.cache_dir = cache_dir
+        self.logger = logging.getLogger(__name__)
+    
+    def get(self, spreadsheet_id: str, sheet_key: str, version: Dict[str, Any]) -> Optional[pd.DataFrame]:
+        """
+        保存時と同じバージョンのスナップショットを取得
+        
+        Args:
+            spreadsheet_id: スプレッドシートID
+            sheet_key: シート名（読み込み条件を含めたキー）
+            version: 現在の {'modified_time', 'version'}
+        
+        Returns:
+            保存済みのデータフレーム。無い場合やファイルが更新されている場合は None
+        """
+        path = self._path(spreadsheet_id, sheet_key)
+        if not os.path.exists(path):
+            return None
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.error(f"スナップショットの読み込みエラー: {str(e)}")
+            return None
+        
+        if snapshot.get('spreadsheet_id') != spreadsheet_id or snapshot.get('sheet_key') != sheet_key:
+            return None
+        if snapshot.get('version') != version:
+            return None
+        
+        if snapshot.get('format') == 'parquet':
+            if not PYARROW_AVAILABLE:
+                return None
+            try:
+                df = read_catalog_snapshot(self._rows_path(path), as_category=False)
+            except (OSError, ValueError) as e:
+                self.logger.error(f"スナップショットの読み込みエラー: {str(e)}")
+                return None
+            return df[snapshot['columns']]
+        
+        return pd.DataFrame(snapshot['rows'], columns=snapshot['columns'])
+    
+    def put(self, spreadsheet_id: str, sheet_key: str, version: Dict[str, Any], df: pd.DataFrame):
+        """
+        スナップショットを保存
+        
+        Args:
+            spreadsheet_id: スプレッドシートID
+            sheet_key: シート名（読み込み条件を含めたキー）
+            version: 読み込み時点の {'modified_time', 'version'}
+            df: 読み込んだデータフレーム
+        """
+        snapshot = {
+            'spreadsheet_id': spreadsheet_id,
+            'sheet_key': sheet_key,
+            'version': version,
+            'saved_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'columns': [str(column) for column in df.columns]
+        }
+        
+        path = self._path(spreadsheet_id, sheet_key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if self._put_rows(self._rows_path(path), df, snapshot['columns']):
+                snapshot['format'] = 'parquet'
+            else:
+                snapshot['rows'] = df.astype(object).where(df.notna(), None).values.tolist()
+            
+            # 書き込み途中で落ちても既存のスナップショットを壊さないよう一時ファイルから置き換える
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False, default=str)
+            os.replace(temp_path, path)
+        except OSError as e:
+            self.logger.error(f"スナップショットの保存エラー: {str(e)}")
+    
+    def get_or_fetch(
+        self,
+        spreadsheet_id: str,
+        sheet_key: str,
+        version: Optional[Dict[str, Any]],
+        fetch: Callable[[], Optional[pd.DataFrame]]
+    ) -> Optional[pd.DataFrame]:
+        """
+        ファイルが更新されていなければ保存済みの内容を、更新されていれば fetch() の結果を返す
+        
+        Args:
+            spreadsheet_id: スプレッドシートID
+            sheet_key: シート名（読み込み条件を含めたキー）
+            version: 現在の {'modified_time', 'version'}（取得できない場合は None で常に fetch する）
+            fetch: シートを読み込む関数
+        
+        Returns:
+            データフレーム
+        """
+        if version:
+            cached = self.get(spreadsheet_id, sheet_key, version)
+            if cached is not None:
+                self.logger.info(f"スナップショットを使用: {spreadsheet_id} / {sheet_key} ({version.get('modified_time')})")
+                return cached
+        
+        df = fetch()
+        if version and df is not None and len(df.columns):
+            self.put(spreadsheet_id, sheet_key, version, df)
+        return df
+    
+    def _put_rows(self, rows_path: str, df: pd.DataFrame, columns: list) -> bool:
+        """行データを Parquet で保存（pyarrow が無い・型が混在している場合は False で JSON に保存する）"""
+        if not PYARROW_AVAILABLE:
+            return False
+        
+        frame = df.copy()
+        frame.columns = columns
+        try:
+            write_catalog_snapshot(frame, rows_path)
+            return True
+        except (ValueError, TypeError) as e:
+            # 同じ列に数値と文字列が混在するシートなど
+            self.logger.warning(f"Parquet で保存できないため JSON で保存します: {str(e)}")
+            if os.path.exists(rows_path):
+                os.remove(rows_path)
+            return False
+    
+    def _rows_path(self, path: str) -> str:
+        """Parquet で保存する行データのパス"""
+        return f"{os.path.splitext(path)[0]}.parquet"
+    
+    def _path(self, spreadsheet_id: str, sheet_key: str) -> str:
+        """スナップショットファイルのパス"""
+        digest = hashlib.sha1(f"{spreadsheet_id}\0{sheet_key}".encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{digest}.json")
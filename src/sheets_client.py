@@ -6,17 +6,22 @@ Google Sheets API連携モジュール
 import os
 import json
 import re
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 import pandas as pd
 from dotenv import load_dotenv
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google.oauth2.service_account import Credentials as ServiceCredentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 import streamlit as st
 
+from . import google_services
+from .a1_notation import a1_range
+from .sheets_quota import QuotaScheduler
+from .sheets_reader import SheetsReader, DEFAULT_CHUNK_ROWS
+from .sheets_writer import SheetsWriter, DEFAULT_MAX_PAYLOAD_BYTES, DEFAULT_MAX_WORKERS
+
 # .envファイルを読み込み
 load_dotenv()
 
@@ -34,6 +39,17 @@ class SheetsClient:
         self.config_path = config_path or "config/settings.json"
         self.service = None
         self.drive_service = None
+        self.credentials = None
+        self.sheets_config = self._load_sheets_config()
+        self.read_chunk_rows = self.sheets_config.get('read_chunk_rows', DEFAULT_CHUNK_ROWS)
+        
+        # クォータはユーザー・プロジェクト単位なのでプロセス共有のスケジューラーを使う
+        self.scheduler = QuotaScheduler.shared()
+        self.scheduler.configure(
+            read_per_minute=self.sheets_config.get('read_requests_per_minute'),
+            write_per_minute=self.sheets_config.get('write_requests_per_minute'),
+            max_retries=self.sheets_config.get('api_max_retries')
+        )
         self.scopes = [
             'https://www.googleapis.com/auth/spreadsheets',
             'https://www.googleapis.com/auth/drive'
@@ -78,8 +94,10 @@ class SheetsClient:
                     )
             
             if creds:
-                self.service = build('sheets', 'v4', credentials=creds)
-                self.drive_service = build('drive', 'v3', credentials=creds)
+                self.credentials = creds
+                # 同じ認証情報のサービスを使い回す
+                self.service = google_services.sheets_service(creds)
+                self.drive_service = google_services.drive_service(creds)
                 return True
             else:
                 st.error("Google認証情報が設定されていません。.envファイルを確認してください。")
@@ -122,9 +140,9 @@ class SheetsClient:
             スプレッドシート情報
         """
         try:
-            spreadsheet = self.service.spreadsheets().get(
+            spreadsheet = self.scheduler.execute(self.service.spreadsheets().get(
                 spreadsheetId=spreadsheet_id
-            ).execute()
+            ))
             
             return {
                 'title': spreadsheet.get('properties', {}).get('title', 'Unknown'),
@@ -142,7 +160,7 @@ class SheetsClient:
             return None
     
     def get_sheet_data(self, spreadsheet_id: str, sheet_name: str, 
-                      range_name: str = None) -> Optional[pd.DataFrame]:
+                      range_name: str = None, columns: List[str] = None) -> Optional[pd.DataFrame]:
         """
         シートデータを取得
         
@@ -150,21 +168,27 @@ class SheetsClient:
             spreadsheet_id: スプレッドシートID
             sheet_name: シート名
             range_name: 範囲指定（例: 'A1:Z1000'）
+            columns: 読み込む列ヘッダー（指定時は該当列だけを行を区切って読み込む）
             
         Returns:
             データフレーム
         """
         try:
+            if columns:
+                return SheetsReader(
+                    self.service, spreadsheet_id, sheet_name, self.read_chunk_rows, scheduler=self.scheduler
+                ).read(columns)
+            
             if range_name:
                 range_spec = f"'{sheet_name}'!{range_name}"
             else:
                 range_spec = f"'{sheet_name}'"
             
-            result = self.service.spreadsheets().values().get(
+            result = self.scheduler.execute(self.service.spreadsheets().values().get(
                 spreadsheetId=spreadsheet_id,
                 range=range_spec,
                 valueRenderOption='UNFORMATTED_VALUE'
-            ).execute()
+            ))
             
             values = result.get('values', [])
             if not values:
@@ -182,10 +206,48 @@ class SheetsClient:
             
             return df
             
-        except HttpError as e:
+        except (HttpError, ValueError) as e:
             st.error(f"シートデータ取得エラー: {str(e)}")
             return None
     
+    def iter_sheet_chunks(self, spreadsheet_id: str, sheet_name: str, columns: List[str] = None,
+                          chunk_rows: int = None) -> Iterator[pd.DataFrame]:
+        """
+        指定した列だけを行を区切って順に読み込む
+        
+        Args:
+            spreadsheet_id: スプレッドシートID
+            sheet_name: シート名
+            columns: 読み込む列ヘッダー（省略時は全列）
+            chunk_rows: 1回に読み込む行数（省略時は設定の google_sheets.read_chunk_rows）
+            
+        Yields:
+            データフレームのチャンク
+        """
+        reader = SheetsReader(
+            self.service, spreadsheet_id, sheet_name, chunk_rows or self.read_chunk_rows, scheduler=self.scheduler
+        )
+        yield from reader.iter_chunks(columns)
+    
+    def iter_sheet_rows(self, spreadsheet_id: str, sheet_name: str, columns: List[str] = None,
+                        chunk_rows: int = None) -> Iterator[Dict[str, Any]]:
+        """
+        指定した列だけを1行ずつ辞書として読み込む
+        
+        Args:
+            spreadsheet_id: スプレッドシートID
+            sheet_name: シート名
+            columns: 読み込む列ヘッダー（省略時は全列）
+            chunk_rows: 1回に読み込む行数（省略時は設定の google_sheets.read_chunk_rows）
+            
+        Yields:
+            列ヘッダー → 値 の辞書
+        """
+        reader = SheetsReader(
+            self.service, spreadsheet_id, sheet_name, chunk_rows or self.read_chunk_rows, scheduler=self.scheduler
+        )
+        yield from reader.iter_rows(columns)
+    
     def get_column_headers(self, spreadsheet_id: str, sheet_name: str) -> List[str]:
         """
         列ヘッダーを取得
@@ -198,11 +260,9 @@ class SheetsClient:
             列ヘッダーのリスト
         """
         try:
+            # 同時に発生したヘッダーの読み込みは1回の batchGet にまとめる
             range_spec = f"'{sheet_name}'!1:1"
-            result = self.service.spreadsheets().values().get(
-                spreadsheetId=spreadsheet_id,
-                range=range_spec
-            ).execute()
+            result = self.scheduler.get_range(self.service, spreadsheet_id, range_spec)
             
             values = result.get('values', [])
             return values[0] if values else []
@@ -228,10 +288,10 @@ class SheetsClient:
                 'name': new_title
             }
             
-            copied_file = self.drive_service.files().copy(
+            copied_file = self.scheduler.execute(self.drive_service.files().copy(
                 fileId=source_id,
                 body=copy_request
-            ).execute()
+            ), 'write', idempotent=False)
             
             return copied_file.get('id')
             
@@ -258,15 +318,14 @@ class SheetsClient:
             
             if column_name not in headers:
                 # 新しい列ヘッダーを追加
-                new_column_index = len(headers)
-                range_spec = f"'{sheet_name}'!{chr(65 + new_column_index)}1"
+                range_spec = a1_range(sheet_name, len(headers), 1)
                 
-                self.service.spreadsheets().values().update(
+                self.scheduler.execute(self.service.spreadsheets().values().update(
                     spreadsheetId=spreadsheet_id,
                     range=range_spec,
                     valueInputOption='RAW',
                     body={'values': [[column_name]]}
-                ).execute()
+                ), 'write')
                 
             return True
             
@@ -276,7 +335,7 @@ class SheetsClient:
     
     def write_tags(self, spreadsheet_id: str, sheet_name: str, 
                   tags_data: List[List[str]], start_row: int = 2,
-                  column_name: str = "Generated_Tags") -> bool:
+                  column_name: str = "Generated_Tags", only_changed: bool = True) -> bool:
         """
         タグデータを書き込み
         
@@ -286,6 +345,7 @@ class SheetsClient:
             tags_data: タグデータのリスト
             start_row: 開始行（1ベース）
             column_name: タグ列名
+            only_changed: 現在の値を1回読み込み、変わった行だけを書き込むか
             
         Returns:
             成功可否
@@ -300,17 +360,27 @@ class SheetsClient:
                 st.error(f"列 '{column_name}' が見つかりません")
                 return False
             
-            # 範囲を指定してデータを書き込み
-            column_letter = chr(65 + column_index)  # A, B, C...
-            end_row = start_row + len(tags_data) - 1
-            range_spec = f"'{sheet_name}'!{column_letter}{start_row}:{column_letter}{end_row}"
-            
-            self.service.spreadsheets().values().update(
-                spreadsheetId=spreadsheet_id,
-                range=range_spec,
-                valueInputOption='RAW',
-                body={'values': tags_data}
-            ).execute()
+            writer = self._create_writer(spreadsheet_id)
+            if only_changed and tags_data:
+                # 現在の値との差分がある行だけを、連続する行をまとめて書き込み
+                width = max(len(row) for row in tags_data)
+                result = self.scheduler.execute(self.service.spreadsheets().values().get(
+                    spreadsheetId=spreadsheet_id,
+                    range=a1_range(
+                        sheet_name, column_index, start_row,
+                        column_index + max(width, 1) - 1, start_row + len(tags_data) - 1
+                    ),
+                    valueRenderOption='UNFORMATTED_VALUE'
+                ))
+                failed = writer.write_changed_values(
+                    sheet_name, result.get('values', []), tags_data, start_row, column_index
+                )
+            else:
+                # 範囲を分割して書き込み
+                failed = writer.write_values(sheet_name, tags_data, start_row, column_index)
+            if failed:
+                st.error(f"タグ書き込みエラー: {len(failed)}範囲の書き込みに失敗しました")
+                return False
             
             return True
             
@@ -368,12 +438,12 @@ class SheetsClient:
             # メインシートにタグデータを書き込み
             main_sheet_name = "Sheet1"  # デフォルト、実際のシート名を取得したい場合は改良
             
-            # まず元データを全て書き込み
-            self._write_dataframe_to_sheet(new_id, main_sheet_name, video_data_with_tags)
-            
-            # 最終タグセット用の新しいシートを作成
+            # 最終タグセット用の新しいシートを作成し、元データと合わせて並行に書き込み
             self._create_new_sheet(new_id, "Optimized_Tags")
-            self._write_dataframe_to_sheet(new_id, "Optimized_Tags", final_tags_df)
+            self._write_dataframes(new_id, {
+                main_sheet_name: video_data_with_tags,
+                "Optimized_Tags": final_tags_df
+            })
             
             # 新しいスプレッドシートのURLを返す
             new_url = self.get_spreadsheet_url(new_id)
@@ -396,29 +466,58 @@ class SheetsClient:
         Returns:
             成功可否
         """
-        try:
-            # データフレームを値のリストに変換
-            headers = df.columns.tolist()
-            data_rows = df.fillna('').values.tolist()
+        return self._write_dataframes(spreadsheet_id, {sheet_name: df})
+    
+    def _write_dataframes(self, spreadsheet_id: str, frames: Dict[str, pd.DataFrame]) -> bool:
+        """
+        複数のデータフレームをそれぞれのシートに並行して書き込み
+        
+        Args:
+            spreadsheet_id: スプレッドシートID
+            frames: シート名 → データフレーム
             
+        Returns:
+            成功可否
+        """
+        writer = self._create_writer(spreadsheet_id)
+        
+        value_ranges = []
+        for sheet_name, df in frames.items():
             # ヘッダーとデータを結合
-            all_data = [headers] + data_rows
-            
-            # 範囲を指定して書き込み
-            range_spec = f"'{sheet_name}'!A1"
-            
-            self.service.spreadsheets().values().update(
-                spreadsheetId=spreadsheet_id,
-                range=range_spec,
-                valueInputOption='RAW',
-                body={'values': all_data}
-            ).execute()
-            
-            return True
-            
-        except HttpError as e:
-            st.error(f"データフレーム書き込みエラー: {str(e)}")
+            all_data = [df.columns.tolist()] + df.fillna('').values.tolist()
+            value_ranges.extend(writer.value_ranges(sheet_name, all_data))
+        
+        failed = writer.write_ranges(value_ranges)
+        if failed:
+            st.error(f"データフレーム書き込みエラー: {len(failed)}範囲の書き込みに失敗しました")
             return False
+        
+        return True
+    
+    def _create_writer(self, spreadsheet_id: str) -> SheetsWriter:
+        """
+        分割書き込み用のライターを作成
+        
+        Args:
+            spreadsheet_id: スプレッドシートID
+            
+        Returns:
+            ライター
+        """
+        if self.credentials is None:
+            # 認証情報が無い（サービスを外から設定した）場合は1スレッドで同じサービスを使う
+            service_factory, max_workers = (lambda: self.service), 1
+        else:
+            service_factory = lambda: google_services.sheets_service(self.credentials)
+            max_workers = self.sheets_config.get('write_max_workers', DEFAULT_MAX_WORKERS)
+        
+        return SheetsWriter(
+            service_factory,
+            spreadsheet_id,
+            max_payload_bytes=self.sheets_config.get('write_max_payload_bytes', DEFAULT_MAX_PAYLOAD_BYTES),
+            max_workers=max_workers,
+            scheduler=self.scheduler
+        )
     
     def _create_new_sheet(self, spreadsheet_id: str, sheet_name: str) -> bool:
         """
@@ -442,13 +541,22 @@ class SheetsClient:
                 }]
             }
             
-            self.service.spreadsheets().batchUpdate(
+            self.scheduler.execute(self.service.spreadsheets().batchUpdate(
                 spreadsheetId=spreadsheet_id,
                 body=request_body
-            ).execute()
+            ), 'write', idempotent=False)
             
             return True
             
         except HttpError as e:
             st.error(f"シート作成エラー: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+    
+    def _load_sheets_config(self) -> Dict[str, Any]:
+        """設定ファイルから google_sheets の設定を取得"""
+        try:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            return config.get('google_sheets', {})
+        except (OSError, json.JSONDecodeError):
+            return {}
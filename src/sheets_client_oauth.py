@@ -7,15 +7,18 @@ import os
 import json
 import re
 import streamlit as st
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 import pandas as pd
-from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 import requests
 
+from . import google_services
+from .sheets_quota import QuotaScheduler
+from .sheets_reader import SheetsReader, DEFAULT_CHUNK_ROWS
+from .sheet_snapshot_cache import SheetSnapshotCache, drive_file_version
+
 
 class SheetsClientOAuth:
     """Google Sheets OAuth認証クライアント"""
@@ -24,6 +27,8 @@ class SheetsClientOAuth:
         """初期化"""
         self.service = None
         self.drive_service = None
+        self.snapshot_cache = SheetSnapshotCache()
+        self.scheduler = QuotaScheduler.shared()
         self.scopes = [
             'https://www.googleapis.com/auth/spreadsheets.readonly',
             'https://www.googleapis.com/auth/drive.readonly'
@@ -85,8 +90,8 @@ class SheetsClientOAuth:
             flow.fetch_token(code=auth_code)
             
             # サービスを初期化
-            self.service = build('sheets', 'v4', credentials=flow.credentials)
-            self.drive_service = build('drive', 'v3', credentials=flow.credentials)
+            self.service = google_services.sheets_service(flow.credentials)
+            self.drive_service = google_services.drive_service(flow.credentials)
             
             # セッションに認証情報を保存
             st.session_state.google_credentials = flow.credentials
@@ -110,14 +115,9 @@ class SheetsClientOAuth:
             
             creds = st.session_state.google_credentials
             
-            # トークンが期限切れの場合は更新
-            if creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-                st.session_state.google_credentials = creds
-            
-            # サービスを初期化
-            self.service = build('sheets', 'v4', credentials=creds)
-            self.drive_service = build('drive', 'v3', credentials=creds)
+            # 同じ認証情報のサービスを使い回す（期限切れのトークンはレジストリで更新される）
+            self.service = google_services.sheets_service(creds)
+            self.drive_service = google_services.drive_service(creds)
             
             return True
             
@@ -156,67 +156,37 @@ class SheetsClientOAuth:
         
         return None
     
-    def read_spreadsheet(self, url: str, sheet_name: str = None) -> Optional[pd.DataFrame]:
+    def read_spreadsheet(self, url: str, sheet_name: str = None, columns: List[str] = None,
+                         chunk_rows: int = DEFAULT_CHUNK_ROWS, use_cache: bool = True) -> Optional[pd.DataFrame]:
         """
         スプレッドシートを読み込み
         
         Args:
             url: スプレッドシートURL
             sheet_name: シート名（省略時は最初のシート）
+            columns: 読み込む列ヘッダー（指定時は該当列だけを chunk_rows 行ずつ読み込む）
+            chunk_rows: 列を指定した場合に1回に読み込む行数
+            use_cache: Drive の更新日時を確認し、前回から更新されていなければ保存済みの内容を使うか
             
         Returns:
             データフレーム
         """
         try:
-            # 認証チェック
-            if not self.is_authenticated():
-                if not self.authenticate_with_saved_credentials():
-                    st.error("Google認証が必要です")
-                    return None
-            
-            # スプレッドシートIDを抽出
-            spreadsheet_id = self.extract_spreadsheet_id(url)
-            if not spreadsheet_id:
-                st.error("無効なスプレッドシートURLです")
+            target = self._resolve_sheet(url, sheet_name)
+            if target is None:
                 return None
+            spreadsheet_id, sheet_name = target
             
-            # シート名が指定されていない場合は最初のシートを取得
-            if not sheet_name:
-                spreadsheet = self.service.spreadsheets().get(
-                    spreadsheetId=spreadsheet_id
-                ).execute()
-                
-                sheets = spreadsheet.get('sheets', [])
-                if not sheets:
-                    st.error("シートが見つかりません")
-                    return None
-                
-                sheet_name = sheets[0]['properties']['title']
-            
-            # データを取得
-            range_spec = f"'{sheet_name}'"
-            result = self.service.spreadsheets().values().get(
-                spreadsheetId=spreadsheet_id,
-                range=range_spec,
-                valueRenderOption='UNFORMATTED_VALUE'
-            ).execute()
-            
-            values = result.get('values', [])
-            if not values:
-                st.error("データが見つかりません")
-                return pd.DataFrame()
-            
-            # ヘッダー行を取得
-            headers = values[0] if values else []
-            data_rows = values[1:] if len(values) > 1 else []
+            if not use_cache:
+                return self._download_sheet(spreadsheet_id, sheet_name, columns, chunk_rows)
             
-            # データフレームを作成
-            df = pd.DataFrame(data_rows, columns=headers)
-            
-            # 空の列を削除
-            df = df.dropna(axis=1, how='all')
-            
-            return df
+            sheet_key = sheet_name if not columns else f"{sheet_name}|{json.dumps(columns, ensure_ascii=False)}"
+            return self.snapshot_cache.get_or_fetch(
+                spreadsheet_id,
+                sheet_key,
+                self._file_version(spreadsheet_id),
+                lambda: self._download_sheet(spreadsheet_id, sheet_name, columns, chunk_rows)
+            )
             
         except HttpError as e:
             if e.resp.status == 403:
@@ -228,6 +198,147 @@ class SheetsClientOAuth:
             st.error(f"予期しないエラー: {str(e)}")
             return None
     
+    def iter_spreadsheet_chunks(self, url: str, sheet_name: str = None, columns: List[str] = None,
+                                chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """
+        指定した列だけを行を区切って順に読み込む
+        
+        Args:
+            url: スプレッドシートURL
+            sheet_name: シート名（省略時は最初のシート）
+            columns: 読み込む列ヘッダー（省略時は全列）
+            chunk_rows: 1回に読み込む行数
+            
+        Yields:
+            データフレームのチャンク
+        """
+        target = self._resolve_sheet(url, sheet_name)
+        if target is None:
+            return
+        
+        reader = SheetsReader(self.service, target[0], target[1], chunk_rows, scheduler=self.scheduler)
+        yield from reader.iter_chunks(columns)
+    
+    def iter_spreadsheet_rows(self, url: str, sheet_name: str = None, columns: List[str] = None,
+                              chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[Dict[str, Any]]:
+        """
+        指定した列だけを1行ずつ辞書として読み込む
+        
+        Args:
+            url: スプレッドシートURL
+            sheet_name: シート名（省略時は最初のシート）
+            columns: 読み込む列ヘッダー（省略時は全列）
+            chunk_rows: 1回に読み込む行数
+            
+        Yields:
+            列ヘッダー → 値 の辞書
+        """
+        target = self._resolve_sheet(url, sheet_name)
+        if target is None:
+            return
+        
+        reader = SheetsReader(self.service, target[0], target[1], chunk_rows, scheduler=self.scheduler)
+        yield from reader.iter_rows(columns)
+    
+    def _download_sheet(self, spreadsheet_id: str, sheet_name: str, columns: List[str] = None,
+                        chunk_rows: int = DEFAULT_CHUNK_ROWS) -> pd.DataFrame:
+        """
+        シートの内容をダウンロード
+        
+        Args:
+            spreadsheet_id: スプレッドシートID
+            sheet_name: シート名
+            columns: 読み込む列ヘッダー（指定時は該当列だけを chunk_rows 行ずつ読み込む）
+            chunk_rows: 列を指定した場合に1回に読み込む行数
+            
+        Returns:
+            データフレーム
+        """
+        if columns:
+            reader = SheetsReader(self.service, spreadsheet_id, sheet_name, chunk_rows, scheduler=self.scheduler)
+            return reader.read(columns)
+        
+        # データを取得
+        range_spec = f"'{sheet_name}'"
+        result = self.scheduler.execute(self.service.spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id,
+            range=range_spec,
+            valueRenderOption='UNFORMATTED_VALUE'
+        ))
+        
+        values = result.get('values', [])
+        if not values:
+            st.error("データが見つかりません")
+            return pd.DataFrame()
+        
+        # ヘッダー行を取得
+        headers = values[0] if values else []
+        data_rows = values[1:] if len(values) > 1 else []
+        
+        # データフレームを作成
+        df = pd.DataFrame(data_rows, columns=headers)
+        
+        # 空の列を削除
+        df = df.dropna(axis=1, how='all')
+        
+        return df
+    
+    def _file_version(self, spreadsheet_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Drive の更新日時とバージョンを取得（取得できない場合はキャッシュを使わない）
+        
+        Args:
+            spreadsheet_id: スプレッドシートID
+            
+        Returns:
+            {'modified_time', 'version'}。取得できない場合は None
+        """
+        if self.drive_service is None:
+            return None
+        
+        try:
+            return drive_file_version(self.drive_service, spreadsheet_id, self.scheduler)
+        except HttpError:
+            return None
+    
+    def _resolve_sheet(self, url: str, sheet_name: str = None) -> Optional[Tuple[str, str]]:
+        """
+        認証を確認し、URLからスプレッドシートIDとシート名を決定
+        
+        Args:
+            url: スプレッドシートURL
+            sheet_name: シート名（省略時は最初のシート）
+            
+        Returns:
+            (スプレッドシートID, シート名)。失敗時は None
+        """
+        # 認証チェック
+        if not self.is_authenticated():
+            if not self.authenticate_with_saved_credentials():
+                st.error("Google認証が必要です")
+                return None
+        
+        # スプレッドシートIDを抽出
+        spreadsheet_id = self.extract_spreadsheet_id(url)
+        if not spreadsheet_id:
+            st.error("無効なスプレッドシートURLです")
+            return None
+        
+        # シート名が指定されていない場合は最初のシートを取得
+        if not sheet_name:
+            spreadsheet = self.scheduler.execute(self.service.spreadsheets().get(
+                spreadsheetId=spreadsheet_id
+            ))
+            
+            sheets = spreadsheet.get('sheets', [])
+            if not sheets:
+                st.error("シートが見つかりません")
+                return None
+            
+            sheet_name = sheets[0]['properties']['title']
+        
+        return spreadsheet_id, sheet_name
+    
     def get_available_sheets(self, url: str) -> List[str]:
         """
         スプレッドシート内の利用可能なシート一覧を取得
@@ -246,9 +357,9 @@ class SheetsClientOAuth:
             if not spreadsheet_id:
                 return []
             
-            spreadsheet = self.service.spreadsheets().get(
+            spreadsheet = self.scheduler.execute(self.service.spreadsheets().get(
                 spreadsheetId=spreadsheet_id
-            ).execute()
+            ))
             
             sheets = spreadsheet.get('sheets', [])
             return [sheet['properties']['title'] for sheet in sheets]
@@ -276,10 +387,10 @@ class SheetsClientOAuth:
                 return False
             
             # 基本情報のみ取得してテスト
-            self.service.spreadsheets().get(
+            self.scheduler.execute(self.service.spreadsheets().get(
                 spreadsheetId=spreadsheet_id,
                 fields='properties.title'
-            ).execute()
+            ))
             
             return True
             
@@ -0,0 +1,254 @@
+"""
+Google API クォータスケジューラーモジュール
+読み込み・書き込みそれぞれの1分あたりのリクエスト数をトークンバケットで制限し、
+クォータ超過などの一時的なエラーは待機時間を倍にしながら再送する。
+同時に発生した小さな範囲の読み込みは1回の values.batchGet にまとめる
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import List, Dict, Any, Optional
+
+
+# Sheets API の既定のクォータ（1ユーザー・1分あたり）
+DEFAULT_READ_PER_MINUTE = 60
+DEFAULT_WRITE_PER_MINUTE = 60
+# 一度に連続して送ってよいリクエスト数
+DEFAULT_BURST = 10
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 64.0
+# 読み込みをまとめるために待つ秒数と、1回の batchGet にまとめる範囲数の上限
+DEFAULT_COALESCE_WINDOW = 0.01
+MAX_COALESCED_RANGES = 100
+
+# 再送するHTTPステータス（クォータ超過・サーバーエラー）
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# 冪等でないリクエストで再送するHTTPステータス（処理されていないことが確実なクォータ超過だけ）
+NON_IDEMPOTENT_RETRYABLE_STATUSES = {429}
+
+
+class TokenBucket:
+    """1分あたりのリクエスト数を制限するトークンバケットクラス"""
+    
+    def __init__(self, per_minute: float, burst: int = DEFAULT_BURST):
+        """
+        初期化
+        
+        Args:
+            per_minute: 1分あたりに補充するトークン数
+            burst: バケットの容量（連続して送ってよいリクエスト数）
+        """
+        self.per_minute = per_minute
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """トークンを1つ取得（足りない場合は補充されるまで待つ）"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) * 60.0 / self.per_minute
+            time.sleep(wait)
+    
+    def drain(self):
+        """クォータ超過を受けたときにトークンを空にし、補充されるまで次のリクエストを止める"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0)
+    
+    def set_rate(self, per_minute: float):
+        """補充の速さを変更"""
+        with self._lock:
+            self._refill()
+            self.per_minute = per_minute
+    
+    def _refill(self):
+        """経過時間に応じてトークンを補充"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.per_minute / 60.0)
+        self._updated = now
+
+
+class _PendingRead:
+    """まとめて送る予定の読み込み"""
+    
+    def __init__(self):
+        self.ranges: List[str] = []
+        self.results: List[Dict[str, Any]] = []
+        self.error: Optional[Exception] = None
+        self.closed = False
+        self.done = threading.Event()
+
+
+class QuotaScheduler:
+    """読み込み・書き込みのクォータ内で Google API のリクエストを実行するクラス"""
+    
+    _shared: Optional['QuotaScheduler'] = None
+    _shared_lock = threading.Lock()
+    
+    def __init__(
+        self,
+        read_per_minute: float = DEFAULT_READ_PER_MINUTE,
+        write_per_minute: float = DEFAULT_WRITE_PER_MINUTE,
+        burst: int = DEFAULT_BURST,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        coalesce_window: float = DEFAULT_COALESCE_WINDOW
+    ):
+        """
+        初期化
+        
+        Args:
+            read_per_minute: 1分あたりの読み込みリクエスト数
+            write_per_minute: 1分あたりの書き込みリクエスト数
+            burst: 連続して送ってよいリクエスト数
+            max_retries: 一時的なエラーの再送回数
+            base_delay: 再送までの初回待機秒数（再送ごとに倍にする）
+            max_delay: 再送までの最大待機秒数
+            coalesce_window: 範囲の読み込みをまとめるために待つ秒数
+        """
+        self.buckets = {
+            'read': TokenBucket(read_per_minute, burst),
+            'write': TokenBucket(write_per_minute, burst)
+        }
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.coalesce_window = coalesce_window
+        self.logger = logging.getLogger(__name__)
+        self._pending: Dict[Any, _PendingRead] = {}
+        self._pending_lock = threading.Lock()
+    
+    @classmethod
+    def shared(cls) -> 'QuotaScheduler':
+        """
+        プロセス全体で共有するスケジューラー（クォータはユーザー・プロジェクト単位のため）
+        
+        Returns:
+            共有のスケジューラー
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+    
+    def configure(self, read_per_minute: float = None, write_per_minute: float = None, max_retries: int = None):
+        """
+        クォータと再送回数を変更
+        
+        Args:
+            read_per_minute: 1分あたりの読み込みリクエスト数
+            write_per_minute: 1分あたりの書き込みリクエスト数
+            max_retries: 一時的なエラーの再送回数
+        """
+        if read_per_minute:
+            self.buckets['read'].set_rate(read_per_minute)
+        if write_per_minute:
+            self.buckets['write'].set_rate(write_per_minute)
+        if max_retries is not None:
+            self.max_retries = max_retries
+    
+    def execute(self, request: Any, kind: str = 'read', idempotent: bool = True) -> Any:
+        """
+        クォータ内でリクエストを実行し、一時的なエラーは待機してから再送
+        
+        Args:
+            request: execute() を持つリクエスト
+            kind: 'read' または 'write'
+            idempotent: False の場合（ファイルのコピーやシートの追加など）は、サーバー側で処理済みの
+                可能性があるサーバーエラー・接続エラーでは再送せず、クォータ超過（429）だけ再送する
+        
+        Returns:
+            レスポンス
+        """
+        bucket = self.buckets[kind]
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire()
+            try:
+                return request.execute()
+            
+            except Exception as e:
+                status = getattr(getattr(e, 'resp', None), 'status', None)
+                if idempotent:
+                    retryable = status in RETRYABLE_STATUSES or isinstance(e, (ConnectionError, TimeoutError))
+                else:
+                    retryable = status in NON_IDEMPOTENT_RETRYABLE_STATUSES
+                if not retryable or attempt == self.max_retries:
+                    raise
+                
+                if status == 429:
+                    bucket.drain()
+                delay = self._retry_delay(e, attempt)
+                self.logger.warning(
+                    f"Google API の{kind}リクエストを再送します（{attempt + 1}/{self.max_retries}, {delay:.1f}秒後）: {str(e)}"
+                )
+                time.sleep(delay)
+    
+    def get_range(self, service: Any, spreadsheet_id: str, range_name: str, **params) -> Dict[str, Any]:
+        """
+        範囲を読み込み（同時に発生した同じスプレッドシートの読み込みは1回の batchGet にまとめる）
+        
+        Args:
+            service: Google Sheets API のサービスオブジェクト
+            spreadsheet_id: スプレッドシートID
+            range_name: 範囲
+            **params: batchGet の追加パラメータ（valueRenderOption など）
+        
+        Returns:
+            values.get と同じ形式の {'range', 'values'}
+        """
+        key = (spreadsheet_id, tuple(sorted(params.items())))
+        with self._pending_lock:
+            batch = self._pending.get(key)
+            leader = batch is None or batch.closed or len(batch.ranges) >= MAX_COALESCED_RANGES
+            if leader:
+                batch = _PendingRead()
+                self._pending[key] = batch
+            position = len(batch.ranges)
+            batch.ranges.append(range_name)
+        
+        if leader:
+            # 他のスレッドの読み込みが加わるのを少し待ってからまとめて送る
+            time.sleep(self.coalesce_window)
+            with self._pending_lock:
+                batch.closed = True
+                if self._pending.get(key) is batch:
+                    del self._pending[key]
+            
+            try:
+                result = self.execute(service.spreadsheets().values().batchGet(
+                    spreadsheetId=spreadsheet_id, ranges=batch.ranges, **params
+                ), 'read')
+                batch.results = result.get('valueRanges', [])
+            except Exception as e:
+                batch.error = e
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+        
+        if batch.error is not None:
+            raise batch.error
+        return batch.results[position] if position < len(batch.results) else {'range': range_name}
+    
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """再送までの待機秒数（Retry-After があれば従い、無ければジッター付きの指数バックオフ）"""
+        response = getattr(error, 'resp', None)
+        retry_after = response.get('retry-after') if hasattr(response, 'get') else None
+        if retry_after:
+            try:
+                return min(self.max_delay, float(retry_after))
+            except ValueError:
+                pass
+        
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
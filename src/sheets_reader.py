@@ -0,0 +1,201 @@
+"""
+スプレッドシート分割読み込みモジュール
+必要な列だけを values.batchGet（列方向）で取得し、行を一定数ずつ区切って
+DataFrame のチャンクまたは行の辞書として順に返す
+"""
+
+import logging
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+import pandas as pd
+
+from .a1_notation import a1_range, quote_sheet_name
+from .sheets_quota import QuotaScheduler
+
+
+# 1回の batchGet で読み込む既定の行数
+DEFAULT_CHUNK_ROWS = 1000
+
+
+class SheetsReader:
+    """列を絞り込んで行を分割して読み込むスプレッドシートリーダークラス"""
+    
+    def __init__(
+        self,
+        service: Any,
+        spreadsheet_id: str,
+        sheet_name: str,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        value_render_option: str = 'UNFORMATTED_VALUE',
+        scheduler: QuotaScheduler = None
+    ):
+        """
+        初期化
+        
+        Args:
+            service: Google Sheets API のサービスオブジェクト
+            spreadsheet_id: スプレッドシートID
+            sheet_name: シート名
+            chunk_rows: 1回に読み込む行数
+            value_render_option: 値の取得形式
+            scheduler: クォータスケジューラー（省略時はプロセス共有のもの）
+        """
+        if chunk_rows < 1:
+            raise ValueError(f"chunk_rows は1以上である必要があります: {chunk_rows}")
+        
+        self.service = service
+        self.spreadsheet_id = spreadsheet_id
+        self.sheet_name = sheet_name
+        self.chunk_rows = chunk_rows
+        self.value_render_option = value_render_option
+        self.scheduler = scheduler or QuotaScheduler.shared()
+        self.logger = logging.getLogger(__name__)
+        self._headers: Optional[List[str]] = None
+    
+    def headers(self) -> List[str]:
+        """
+        ヘッダー行（1行目）を取得
+        
+        Returns:
+            列ヘッダーのリスト
+        """
+        if self._headers is None:
+            result = self.scheduler.get_range(
+                self.service,
+                self.spreadsheet_id,
+                f"{quote_sheet_name(self.sheet_name)}!1:1",
+                valueRenderOption=self.value_render_option
+            )
+            values = result.get('values', [])
+            self._headers = [str(header) for header in values[0]] if values else []
+        return self._headers
+    
+    def row_count(self) -> Optional[int]:
+        """
+        シートの行数（グリッドサイズ）を取得
+        
+        Returns:
+            行数。取得できない場合は None
+        """
+        spreadsheet = self.scheduler.execute(self.service.spreadsheets().get(
+            spreadsheetId=self.spreadsheet_id,
+            fields='sheets.properties(title,gridProperties.rowCount)'
+        ))
+        
+        for sheet in spreadsheet.get('sheets', []):
+            properties = sheet.get('properties', {})
+            if properties.get('title') == self.sheet_name:
+                return properties.get('gridProperties', {}).get('rowCount')
+        return None
+    
+    def iter_chunks(self, columns: List[str] = None) -> Iterator[pd.DataFrame]:
+        """
+        指定した列だけを行を区切って読み込む
+        
+        空のセルは空文字列にする。途中の空行は空の行として残し、シート末尾の空行は除く。インデックスは
+        データ行の通し番号（シートの行番号 - 2）なので、連結すると一括読み込みと同じになる
+        
+        Args:
+            columns: 読み込む列ヘッダー（省略時は全列）
+        
+        Yields:
+            列が columns の順の DataFrame
+        """
+        headers = self.headers()
+        if not headers:
+            return
+        
+        columns = list(dict.fromkeys(columns or [header for header in headers if header != '']))
+        missing = [column for column in columns if column not in headers]
+        if missing:
+            raise ValueError(f"列が見つかりません: {', '.join(missing)}")
+        
+        column_indices = [headers.index(column) for column in columns]
+        last_row = self.row_count()
+        
+        # 後続にデータがあるか分かるまで、空のチャンクと直前のチャンク（とそのデータ行数）を保留する
+        pending: Optional[Tuple[pd.DataFrame, int]] = None
+        pending_empty = 0
+        start_row = 2
+        
+        while last_row is None or start_row <= last_row:
+            end_row = start_row + self.chunk_rows - 1
+            if last_row is not None:
+                end_row = min(end_row, last_row)
+            
+            values = self._fetch_columns(column_indices, start_row, end_row)
+            length = max((len(column_values) for column_values in values), default=0)
+            
+            if length == 0:
+                if last_row is None:
+                    break
+                pending_empty += 1
+            else:
+                if pending is not None:
+                    yield pending[0]
+                for skipped in range(pending_empty):
+                    skipped_start = start_row - (pending_empty - skipped) * self.chunk_rows
+                    yield self._frame(columns, [[] for _ in columns], skipped_start, self.chunk_rows)
+                pending_empty = 0
+                pending = (self._frame(columns, values, start_row, end_row - start_row + 1), length)
+            
+            start_row = end_row + 1
+        
+        if pending is not None:
+            # 最後のチャンクはシート末尾の空行を除く
+            frame, data_rows = pending
+            yield frame.iloc[:data_rows]
+    
+    def iter_rows(self, columns: List[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        指定した列だけを1行ずつ辞書として読み込む
+        
+        Args:
+            columns: 読み込む列ヘッダー（省略時は全列）
+        
+        Yields:
+            列ヘッダー → 値 の辞書（空のセルは空文字列）
+        """
+        for chunk in self.iter_chunks(columns):
+            for row in chunk.itertuples(index=False, name=None):
+                yield dict(zip(chunk.columns, row))
+    
+    def read(self, columns: List[str] = None) -> pd.DataFrame:
+        """
+        指定した列だけを読み込んで1つの DataFrame にする
+        
+        Args:
+            columns: 読み込む列ヘッダー（省略時は全列）
+        
+        Returns:
+            データフレーム
+        """
+        chunks = list(self.iter_chunks(columns))
+        if not chunks:
+            return pd.DataFrame(columns=columns or self.headers())
+        return pd.concat(chunks)
+    
+    def _fetch_columns(self, column_indices: List[int], start_row: int, end_row: int) -> List[List[Any]]:
+        """各列の start_row〜end_row の値を列方向の batchGet で取得"""
+        result = self.scheduler.execute(self.service.spreadsheets().values().batchGet(
+            spreadsheetId=self.spreadsheet_id,
+            ranges=[a1_range(self.sheet_name, index, start_row, index, end_row) for index in column_indices],
+            majorDimension='COLUMNS',
+            valueRenderOption=self.value_render_option
+        ))
+        
+        value_ranges = result.get('valueRanges', [])
+        values = []
+        for position in range(len(column_indices)):
+            column_values = value_ranges[position].get('values', []) if position < len(value_ranges) else []
+            values.append(column_values[0] if column_values else [])
+        return values
+    
+    @staticmethod
+    def _frame(columns: List[str], values: List[List[Any]], start_row: int, rows: int) -> pd.DataFrame:
+        """列ごとの値（末尾の空セルは省略されている）を rows 行の DataFrame にする"""
+        data = {
+            column: list(column_values[:rows]) + [''] * (rows - min(len(column_values), rows))
+            for column, column_values in zip(columns, values)
+        }
+        return pd.DataFrame(data, columns=columns, index=pd.RangeIndex(start_row - 2, start_row - 2 + rows))
@@ -0,0 +1,277 @@
+"""
+スプレッドシート分割書き込みモジュール
+書き込む値をリクエストサイズの上限以下の範囲に分割し、values.batchUpdate を
+クォータスケジューラー経由で並行して送信する。失敗したリクエストは範囲ごとに個別に再送する。
+現在の値との差分がある行だけを書き込むこともできる
+"""
+
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable
+
+from .a1_notation import a1_range
+from .sheets_quota import QuotaScheduler
+
+
+# 1リクエストあたりのペイロード上限（API推奨の2MBに余裕を持たせる）
+DEFAULT_MAX_PAYLOAD_BYTES = 1_000_000
+# 同時に送信するリクエスト数（書き込みクォータは1分あたりのリクエスト数で制限される）
+DEFAULT_MAX_WORKERS = 4
+
+
+def _row_bytes(row: List[Any]) -> int:
+    """1行分の値をJSONにしたときのバイト数"""
+    return len(json.dumps(row, ensure_ascii=False, default=str).encode('utf-8')) + 1
+
+
+class SheetsWriter:
+    """範囲を分割して並行に書き込むスプレッドシートライタークラス"""
+    
+    def __init__(
+        self,
+        service_factory: Callable[[], Any],
+        spreadsheet_id: str,
+        max_payload_bytes: int = DEFAULT_MAX_PAYLOAD_BYTES,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        scheduler: QuotaScheduler = None
+    ):
+        """
+        初期化
+        
+        Args:
+            service_factory: Google Sheets API のサービスオブジェクトを作成する関数
+                （サービスオブジェクトはスレッドセーフでないため、スレッドごとに作成する）
+            spreadsheet_id: スプレッドシートID
+            max_payload_bytes: 1リクエストあたりのペイロード上限
+            max_workers: 同時に送信するリクエスト数
+            scheduler: クォータスケジューラー（省略時はプロセス共有のもの）
+        """
+        self.service_factory = service_factory
+        self.spreadsheet_id = spreadsheet_id
+        self.max_payload_bytes = max_payload_bytes
+        self.max_workers = max(1, max_workers)
+        self.scheduler = scheduler or QuotaScheduler.shared()
+        self.logger = logging.getLogger(__name__)
+        self._local = threading.local()
+    
+    def value_ranges(
+        self,
+        sheet_name: str,
+        values: List[List[Any]],
+        start_row: int = 1,
+        start_column: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        書き込む値をペイロード上限以下の行ブロックの範囲に分割
+        
+        Args:
+            sheet_name: シート名
+            values: 行ごとの値
+            start_row: 書き込み開始行（1始まり）
+            start_column: 書き込み開始列（0始まり）
+        
+        Returns:
+            values.batchUpdate の data 要素（{'range', 'values'}）のリスト
+        """
+        value_ranges = []
+        block: List[List[Any]] = []
+        block_bytes = 0
+        block_start = start_row
+        
+        for row in values:
+            size = _row_bytes(row)
+            if block and block_bytes + size > self.max_payload_bytes:
+                value_ranges.append(self._value_range(sheet_name, block, block_start, start_column))
+                block_start += len(block)
+                block, block_bytes = [], 0
+            block.append(row)
+            block_bytes += size
+        
+        if block:
+            value_ranges.append(self._value_range(sheet_name, block, block_start, start_column))
+        return value_ranges
+    
+    def write_values(
+        self,
+        sheet_name: str,
+        values: List[List[Any]],
+        start_row: int = 1,
+        start_column: int = 0
+    ) -> List[str]:
+        """
+        行ごとの値を start_row 行・start_column 列から書き込み
+        
+        Args:
+            sheet_name: シート名
+            values: 行ごとの値
+            start_row: 書き込み開始行（1始まり）
+            start_column: 書き込み開始列（0始まり）
+        
+        Returns:
+            書き込みに失敗した範囲のリスト（成功時は空）
+        """
+        return self.write_ranges(self.value_ranges(sheet_name, values, start_row, start_column))
+    
+    def changed_value_ranges(
+        self,
+        sheet_name: str,
+        current: List[List[Any]],
+        values: List[List[Any]],
+        start_row: int = 1,
+        start_column: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        現在の値と異なる行だけを、連続する行をまとめた範囲にする
+        
+        Args:
+            sheet_name: シート名
+            current: 同じ位置の現在の行ごとの値（values.get の結果。末尾の空セル・空行は省略されていてよい）
+            values: 書き込む行ごとの値
+            start_row: 書き込み開始行（1始まり）
+            start_column: 書き込み開始列（0始まり）
+        
+        Returns:
+            values.batchUpdate の data 要素（{'range', 'values'}）のリスト
+        """
+        value_ranges = []
+        run: List[List[Any]] = []
+        run_start = start_row
+        
+        for offset, row in enumerate(values):
+            existing = current[offset] if offset < len(current) else []
+            if self._row_changed(existing, row):
+                if not run:
+                    run_start = start_row + offset
+                run.append(row)
+            elif run:
+                value_ranges.extend(self.value_ranges(sheet_name, run, run_start, start_column))
+                run = []
+        
+        if run:
+            value_ranges.extend(self.value_ranges(sheet_name, run, run_start, start_column))
+        return value_ranges
+    
+    def write_changed_values(
+        self,
+        sheet_name: str,
+        current: List[List[Any]],
+        values: List[List[Any]],
+        start_row: int = 1,
+        start_column: int = 0
+    ) -> List[str]:
+        """
+        現在の値と異なる行だけを書き込み
+        
+        Args:
+            sheet_name: シート名
+            current: 同じ位置の現在の行ごとの値
+            values: 書き込む行ごとの値
+            start_row: 書き込み開始行（1始まり）
+            start_column: 書き込み開始列（0始まり）
+        
+        Returns:
+            書き込みに失敗した範囲のリスト（成功時は空）
+        """
+        value_ranges = self.changed_value_ranges(sheet_name, current, values, start_row, start_column)
+        changed_rows = sum(len(value_range['values']) for value_range in value_ranges)
+        self.logger.info(f"差分書き込み: {len(values)}行中 {changed_rows}行が変更, {len(value_ranges)}範囲")
+        return self.write_ranges(value_ranges)
+    
+    def write_ranges(self, value_ranges: List[Dict[str, Any]]) -> List[str]:
+        """
+        範囲をペイロード上限以下のリクエストにまとめて並行に書き込み
+        
+        まとめたリクエストが失敗した場合は、含まれる範囲を1つずつ再送する
+        
+        Args:
+            value_ranges: {'range', 'values'} のリスト
+        
+        Returns:
+            書き込みに失敗した範囲のリスト（成功時は空）
+        """
+        batches = self._batches(value_ranges)
+        if not batches:
+            return []
+        
+        self.logger.info(f"スプレッドシート書き込み: {len(value_ranges)}範囲, {len(batches)}リクエスト")
+        
+        failed: List[str] = []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            results = list(executor.map(self._send, batches))
+            
+            retry_ranges = [
+                value_range
+                for batch, succeeded in zip(batches, results) if not succeeded and len(batch) > 1
+                for value_range in batch
+            ]
+            failed.extend(
+                batch[0]['range'] for batch, succeeded in zip(batches, results) if not succeeded and len(batch) == 1
+            )
+            
+            if retry_ranges:
+                self.logger.warning(f"失敗したリクエストの {len(retry_ranges)}範囲を個別に再送します")
+                retry_results = executor.map(self._send, [[value_range] for value_range in retry_ranges])
+                failed.extend(
+                    value_range['range'] for value_range, succeeded in zip(retry_ranges, retry_results)
+                    if not succeeded
+                )
+        
+        if failed:
+            self.logger.error(f"書き込みに失敗した範囲: {', '.join(failed)}")
+        return failed
+    
+    def _batches(self, value_ranges: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """範囲を合計ペイロードが上限以下になるようにまとめる"""
+        batches: List[List[Dict[str, Any]]] = []
+        batch_bytes = 0
+        
+        for value_range in value_ranges:
+            size = sum(_row_bytes(row) for row in value_range['values']) + len(value_range['range'])
+            if not batches or batch_bytes + size > self.max_payload_bytes:
+                batches.append([])
+                batch_bytes = 0
+            batches[-1].append(value_range)
+            batch_bytes += size
+        return batches
+    
+    def _send(self, batch: List[Dict[str, Any]]) -> bool:
+        """1リクエストを送信（クォータ超過などの一時的なエラーはスケジューラーが再送する）"""
+        try:
+            self.scheduler.execute(self._service().spreadsheets().values().batchUpdate(
+                spreadsheetId=self.spreadsheet_id,
+                body={'valueInputOption': 'RAW', 'data': batch}
+            ), 'write')
+            return True
+        
+        except Exception as e:
+            self.logger.error(f"書き込みエラー ({batch[0]['range']} ほか{len(batch)}範囲): {str(e)}")
+            return False
+    
+    @staticmethod
+    def _row_changed(existing: List[Any], row: List[Any]) -> bool:
+        """行の値が変わったか（空セルと空文字列は同じ、値は文字列として比較）"""
+        width = max(len(existing), len(row))
+        
+        def normalize(cells: List[Any]) -> List[str]:
+            padded = list(cells) + [''] * (width - len(cells))
+            return ['' if value is None else str(value) for value in padded]
+        
+        return normalize(existing) != normalize(row)
+    
+    def _service(self) -> Any:
+        """スレッドごとのサービスオブジェクト"""
+        if not hasattr(self._local, 'service'):
+            self._local.service = self.service_factory()
+        return self._local.service
+    
+    @staticmethod
+    def _value_range(sheet_name: str, rows: List[List[Any]], start_row: int, start_column: int) -> Dict[str, Any]:
+        """行ブロックの書き込み範囲"""
+        width = max((len(row) for row in rows), default=1)
+        end_column = start_column + max(width, 1) - 1
+        return {
+            'range': a1_range(sheet_name, start_column, start_row, end_column, start_row + len(rows) - 1),
+            'values': rows
+        }
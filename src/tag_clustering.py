@@ -0,0 +1,306 @@
+"""
+類似タグクラスタリングモジュール
+長さと文字 n-gram によるブロッキングで比較対象の組を絞り込み、上限付き編集距離で
+類似度を判定し、Union-Find で類似タグのクラスタを作成する
+"""
+
+import logging
+from collections import Counter, defaultdict
+from typing import List, Dict, Tuple, Iterator, Set
+
+
+# 包含関係にあるタグの類似度（TagOptimizer の類似度定義と同じ）
+CONTAINMENT_SIMILARITY = 0.9
+
+
+def levenshtein_distance(s1: str, s2: str) -> int:
+    """
+    編集距離を計算
+    
+    Args:
+        s1: 文字列1
+        s2: 文字列2
+    
+    Returns:
+        編集距離
+    """
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    
+    previous_row = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            current_row.append(min(
+                previous_row[j + 1] + 1,
+                current_row[j] + 1,
+                previous_row[j] + (c1 != c2)
+            ))
+        previous_row = current_row
+    
+    return previous_row[-1]
+
+
+def bounded_levenshtein(s1: str, s2: str, max_distance: int) -> int:
+    """
+    上限付きの編集距離を計算
+    
+    対角線から max_distance 以内の帯だけを計算し、上限を超えた時点で打ち切る
+    
+    Args:
+        s1: 文字列1
+        s2: 文字列2
+        max_distance: 距離の上限
+    
+    Returns:
+        編集距離。上限を超える場合は max_distance + 1
+    """
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    if len(s1) - len(s2) > max_distance:
+        return max_distance + 1
+    if not s2:
+        return len(s1)
+    
+    over = max_distance + 1
+    previous_row = [j if j <= max_distance else over for j in range(len(s2) + 1)]
+    
+    for i in range(1, len(s1) + 1):
+        c1 = s1[i - 1]
+        low = max(1, i - max_distance)
+        high = min(len(s2), i + max_distance)
+        current_row = [over] * (len(s2) + 1)
+        current_row[0] = i if i <= max_distance else over
+        
+        row_min = current_row[0]
+        for j in range(low, high + 1):
+            value = min(
+                previous_row[j] + 1,
+                current_row[j - 1] + 1,
+                previous_row[j - 1] + (c1 != s2[j - 1])
+            )
+            current_row[j] = value if value <= max_distance else over
+            row_min = min(row_min, current_row[j])
+        
+        if row_min > max_distance:
+            return over
+        previous_row = current_row
+    
+    return previous_row[-1]
+
+
+def tag_similarity(tag1: str, tag2: str) -> float:
+    """
+    タグ間の類似度を計算
+    
+    同一なら1.0、包含関係なら0.9、それ以外は 1 - 編集距離 / 長い方の長さ
+    
+    Args:
+        tag1: タグ1
+        tag2: タグ2
+    
+    Returns:
+        類似度 (0-1)
+    """
+    if tag1 == tag2:
+        return 1.0
+    
+    if tag1 in tag2 or tag2 in tag1:
+        return CONTAINMENT_SIMILARITY
+    
+    max_len = max(len(tag1), len(tag2))
+    return 1.0 - (levenshtein_distance(tag1, tag2) / max_len)
+
+
+class UnionFind:
+    """経路圧縮付き Union-Find"""
+    
+    def __init__(self, size: int):
+        """
+        初期化
+        
+        Args:
+            size: 要素数
+        """
+        self.parent = list(range(size))
+    
+    def find(self, item: int) -> int:
+        """代表要素を取得"""
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+    
+    def union(self, first: int, second: int):
+        """2つの要素の集合を結合（番号の小さい方を代表にする）"""
+        first_root, second_root = self.find(first), self.find(second)
+        if first_root != second_root:
+            self.parent[max(first_root, second_root)] = min(first_root, second_root)
+
+
+class TagClusterer:
+    """類似タグクラスタリングクラス"""
+    
+    def __init__(self, threshold: float = 0.8, qgram: int = 2):
+        """
+        初期化
+        
+        Args:
+            threshold: 同じクラスタにまとめる類似度の下限（tag_similarity の値と比較）
+            qgram: 候補生成に使う文字 n-gram の長さ
+        """
+        self.threshold = threshold
+        self.qgram = qgram
+        self.logger = logging.getLogger(__name__)
+    
+    def cluster(self, tags: List[str]) -> List[List[str]]:
+        """
+        類似度が閾値以上のタグの組を辿ってクラスタを作成
+        
+        Args:
+            tags: ユニークなタグのリスト
+        
+        Returns:
+            クラスタのリスト（クラスタ・メンバーとも入力での出現順）
+        """
+        tags = list(dict.fromkeys(tags))
+        union_find = UnionFind(len(tags))
+        pair_count = 0
+        
+        for first, second in self.similar_pairs(tags):
+            union_find.union(first, second)
+            pair_count += 1
+        
+        clusters = defaultdict(list)
+        for index, tag in enumerate(tags):
+            clusters[union_find.find(index)].append(tag)
+        
+        self.logger.debug(f"タグクラスタリング: {len(tags)}タグ, 類似ペア {pair_count}組, クラスタ {len(clusters)}個")
+        return [clusters[root] for root in sorted(clusters)]
+    
+    def similar_pairs(self, tags: List[str]) -> Iterator[Tuple[int, int]]:
+        """
+        類似度が閾値以上のタグの組を列挙
+        
+        Args:
+            tags: ユニークなタグのリスト
+        
+        Yields:
+            (タグ番号, タグ番号) の組（各組1回ずつ）
+        """
+        for first, second in sorted(self._candidate_pairs(tags)):
+            if self._is_similar(tags[first], tags[second]):
+                yield first, second
+    
+    def _candidate_pairs(self, tags: List[str]) -> Set[Tuple[int, int]]:
+        """ブロッキングで比較対象の組を生成"""
+        candidates = set()
+        
+        # 包含関係の候補: 短いタグの n-gram をすべて含むタグ
+        if self.threshold <= CONTAINMENT_SIMILARITY:
+            candidates.update(self._containment_candidates(tags))
+        
+        candidates.update(self._edit_distance_candidates(tags))
+        return candidates
+    
+    def _containment_candidates(self, tags: List[str]) -> Iterator[Tuple[int, int]]:
+        """部分文字列の関係にある可能性があるタグの組"""
+        postings = {size: defaultdict(set) for size in range(1, self.qgram + 1)}
+        for index, tag in enumerate(tags):
+            for size in postings:
+                for gram in self._grams(tag, size):
+                    postings[size][gram].add(index)
+        
+        for index, tag in enumerate(tags):
+            if not tag:
+                continue
+            size = min(len(tag), self.qgram)
+            grams = sorted(set(self._grams(tag, size)), key=lambda gram: len(postings[size][gram]))
+            
+            # 出現数の少ない n-gram から積集合を取る
+            containing = set(postings[size][grams[0]])
+            for gram in grams[1:]:
+                containing &= postings[size][gram]
+                if len(containing) <= 1:
+                    break
+            
+            for other in containing:
+                if other != index and len(tags[other]) >= len(tag) and tag in tags[other]:
+                    yield (min(index, other), max(index, other))
+    
+    def _edit_distance_candidates(self, tags: List[str]) -> Iterator[Tuple[int, int]]:
+        """
+        編集距離が上限以内になりうるタグの組
+        
+        長い方のタグ（長さ L）を基準に許容距離 k = floor((1 - threshold) * L) を求め、
+        長さが [L - k, L] のタグのうち共通 n-gram 数が L - q + 1 - k * q 以上のものを候補とする
+        （q-gram カウントフィルタ）。下限が0以下になる短いタグは長さバケット内で総当たりする
+        """
+        q = self.qgram
+        by_length = defaultdict(list)
+        # n-gram → 長さ → (タグ番号, 出現数) のリスト（長さフィルタを満たすタグだけを数える）
+        postings = defaultdict(lambda: defaultdict(list))
+        gram_counts = []
+        
+        for index, tag in enumerate(tags):
+            by_length[len(tag)].append(index)
+            counts = Counter(self._grams(tag, q))
+            gram_counts.append(counts)
+            for gram, count in counts.items():
+                postings[gram][len(tag)].append((index, count))
+        
+        for index, tag in enumerate(tags):
+            length = len(tag)
+            max_distance = self._max_distance(length)
+            if max_distance <= 0:
+                continue
+            
+            def accepts(other: int) -> bool:
+                # 各組は長い方（同じ長さなら番号の大きい方）から1回だけ調べる
+                other_length = len(tags[other])
+                return length - max_distance <= other_length < length or (other_length == length and other < index)
+            
+            required = length - q + 1 - max_distance * q
+            if required <= 0:
+                for other_length in range(max(0, length - max_distance), length + 1):
+                    for other in by_length.get(other_length, []):
+                        if accepts(other):
+                            yield (min(index, other), max(index, other))
+                continue
+            
+            shared = defaultdict(int)
+            for gram, count in gram_counts[index].items():
+                by_gram_length = postings[gram]
+                for other_length in range(length - max_distance, length + 1):
+                    for other, other_count in by_gram_length.get(other_length, ()):
+                        shared[other] += min(count, other_count)
+            
+            for other, count in shared.items():
+                if count >= required and accepts(other):
+                    yield (min(index, other), max(index, other))
+    
+    def _is_similar(self, tag1: str, tag2: str) -> bool:
+        """tag_similarity(tag1, tag2) >= threshold を上限付き編集距離で判定"""
+        if tag1 in tag2 or tag2 in tag1:
+            return CONTAINMENT_SIMILARITY >= self.threshold
+        
+        max_len = max(len(tag1), len(tag2))
+        max_distance = self._max_distance(max_len)
+        if max_distance < 0:
+            return False
+        distance = bounded_levenshtein(tag1, tag2, max_distance)
+        return distance <= max_distance and 1.0 - (distance / max_len) >= self.threshold
+    
+    def _max_distance(self, max_len: int) -> int:
+        """類似度が閾値以上になる最大の編集距離"""
+        # 浮動小数点の誤差で境界の組を落とさないよう僅かに余裕を持たせ、最終判定は _is_similar で行う
+        return int((1.0 - self.threshold) * max_len + 1e-9)
+    
+    @staticmethod
+    def _grams(text: str, size: int) -> List[str]:
+        """文字 n-gram のリスト（文字列が短い場合は文字列全体）"""
+        if len(text) <= size:
+            return [text]
+        return [text[start:start + size] for start in range(len(text) - size + 1)]
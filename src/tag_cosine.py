@@ -0,0 +1,156 @@
+"""
+文字 n-gram コサイン類似度によるタグクラスタリングモジュール
+ユニークなタグの文字 n-gram TF-IDF 疎行列を作成し、ブロック単位の疎行列積で
+閾値以上の上位 k 近傍を求めて類似タグのクラスタを作成する
+"""
+
+import logging
+import unicodedata
+from collections import Counter, defaultdict
+from typing import List, Tuple, Iterator
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from .tag_clustering import UnionFind
+
+
+def normalize_tag(tag: str) -> str:
+    """
+    n-gram 化の前にタグを正規化
+    
+    全角・半角（NFKC）と大文字・小文字の違いを無視し、長音記号・中黒・空白を除く
+    
+    Args:
+        tag: タグ
+    
+    Returns:
+        正規化したタグ
+    """
+    normalized = unicodedata.normalize('NFKC', tag).casefold()
+    return ''.join(char for char in normalized if char not in 'ー・ 　-_')
+
+
+def ngram_cosine(tag1: str, tag2: str, ngram_range: Tuple[int, int] = (2, 3)) -> float:
+    """
+    2つのタグの文字 n-gram 出現数ベクトルのコサイン類似度を計算
+    
+    IDF はタグ集合全体が必要なため、2タグ間の比較では出現数のみを使う
+    
+    Args:
+        tag1: タグ1
+        tag2: タグ2
+        ngram_range: 文字 n-gram の長さの範囲
+    
+    Returns:
+        類似度 (0-1)
+    """
+    def grams(tag: str) -> Counter:
+        text = normalize_tag(tag)
+        return Counter(
+            text[start:start + size]
+            for size in range(ngram_range[0], ngram_range[1] + 1)
+            for start in range(len(text) - size + 1)
+        )
+    
+    first, second = grams(tag1), grams(tag2)
+    if not first or not second:
+        return 1.0 if normalize_tag(tag1) == normalize_tag(tag2) else 0.0
+    
+    dot = sum(count * second[gram] for gram, count in first.items())
+    norm = (sum(c * c for c in first.values()) * sum(c * c for c in second.values())) ** 0.5
+    return dot / norm
+
+
+class CosineTagClusterer:
+    """文字 n-gram コサイン類似度による類似タグクラスタリングクラス"""
+    
+    def __init__(
+        self,
+        threshold: float = 0.75,
+        ngram_range: Tuple[int, int] = (2, 3),
+        top_k: int = 20,
+        block_size: int = 2048
+    ):
+        """
+        初期化
+        
+        Args:
+            threshold: 同じクラスタにまとめるコサイン類似度の下限
+            ngram_range: 文字 n-gram の長さの範囲
+            top_k: 1タグあたりに残す近傍の最大数
+            block_size: 1回の疎行列積で処理する行数（メモリ使用量の上限を決める）
+        """
+        self.threshold = threshold
+        self.ngram_range = tuple(ngram_range)
+        self.top_k = top_k
+        self.block_size = block_size
+        self.logger = logging.getLogger(__name__)
+    
+    def cluster(self, tags: List[str]) -> List[List[str]]:
+        """
+        コサイン類似度が閾値以上の近傍を辿ってクラスタを作成
+        
+        Args:
+            tags: ユニークなタグのリスト
+        
+        Returns:
+            クラスタのリスト（クラスタ・メンバーとも入力での出現順）
+        """
+        tags = list(dict.fromkeys(tags))
+        union_find = UnionFind(len(tags))
+        
+        for first, second, _ in self.similar_pairs(tags):
+            union_find.union(first, second)
+        
+        clusters = defaultdict(list)
+        for index, tag in enumerate(tags):
+            clusters[union_find.find(index)].append(tag)
+        
+        return [clusters[root] for root in sorted(clusters)]
+    
+    def similar_pairs(self, tags: List[str]) -> Iterator[Tuple[int, int, float]]:
+        """
+        各タグについてコサイン類似度が閾値以上の上位 k 近傍を列挙
+        
+        Args:
+            tags: ユニークなタグのリスト
+        
+        Yields:
+            (タグ番号, 近傍のタグ番号, コサイン類似度)
+        """
+        if len(tags) < 2:
+            return
+        
+        # 行は L2 正規化されるため、行列積がそのままコサイン類似度になる
+        vectorizer = TfidfVectorizer(
+            analyzer='char',
+            ngram_range=self.ngram_range,
+            preprocessor=normalize_tag,
+            sublinear_tf=True,
+            dtype=np.float32
+        )
+        matrix = vectorizer.fit_transform(tags).tocsr()
+        transposed = matrix.T.tocsc()
+        
+        for start in range(0, matrix.shape[0], self.block_size):
+            similarities = (matrix[start:start + self.block_size] @ transposed).tocsr()
+            
+            # 閾値未満を落としてから行ごとに上位 k 件を選ぶ
+            similarities.data[similarities.data < self.threshold] = 0
+            similarities.eliminate_zeros()
+            
+            for offset in range(similarities.shape[0]):
+                row = start + offset
+                begin, end = similarities.indptr[offset], similarities.indptr[offset + 1]
+                neighbors = similarities.indices[begin:end]
+                scores = similarities.data[begin:end]
+                
+                mask = neighbors != row
+                neighbors, scores = neighbors[mask], scores[mask]
+                if len(neighbors) > self.top_k:
+                    top = np.argpartition(-scores, self.top_k - 1)[:self.top_k]
+                    neighbors, scores = neighbors[top], scores[top]
+                
+                for neighbor, score in zip(neighbors.tolist(), scores.tolist()):
+                    yield row, neighbor, score
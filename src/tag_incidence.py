@@ -0,0 +1,377 @@
+"""
+動画 × タグ接続行列モジュール
+各動画にどのタグが付いているかを疎行列で保持し、カバレッジ・頻度・共起・スキル別の集計と
+遅延評価貪欲法（lazy greedy）によるカバレッジ最大のタグ選択を提供する
+実行ごとに1回作成してメモリマップ可能な .npz に保存し、APIサーバー・UIから再読み込みする
+"""
+
+import heapq
+import os
+import zipfile
+from typing import List, Dict, Any, Callable, Iterable, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+
+
+class TagIncidence:
+    """動画 × タグの接続行列クラス"""
+    
+    def __init__(
+        self,
+        matrix: sparse.csr_matrix,
+        tags: List[str],
+        weights: Optional[np.ndarray] = None,
+        group_codes: Optional[np.ndarray] = None,
+        group_names: Optional[List[str]] = None,
+        total_assignments: Optional[int] = None
+    ):
+        """
+        初期化
+        
+        Args:
+            matrix: 動画数 × タグ数 の0/1行列
+            tags: 列に対応するタグ
+            weights: 動画ごとの重み（省略時はすべて1）
+            group_codes: 動画ごとのグループ（スキルなど）の番号（-1 はグループ無し）
+            group_names: グループ番号に対応する名前
+            total_assignments: 重複を含む元のタグ付与数（省略時は行列の非ゼロ数）
+        """
+        self.matrix = matrix.tocsr()
+        self.tags = list(tags)
+        self.index: Dict[str, int] = {tag: column for column, tag in enumerate(self.tags)}
+        self.weights = np.ones(self.matrix.shape[0]) if weights is None else np.asarray(weights, dtype=np.float64)
+        self.group_codes = (
+            np.full(self.matrix.shape[0], -1, dtype=np.int32) if group_codes is None else np.asarray(group_codes)
+        )
+        self.group_names = list(group_names or [])
+        self.total_assignments = int(self.matrix.nnz if total_assignments is None else total_assignments)
+    
+    @classmethod
+    def from_tags(
+        cls,
+        all_tags: Iterable[Iterable[str]],
+        key: Callable[[str], Optional[str]] = None,
+        weights: Optional[Sequence[float]] = None,
+        groups: Optional[Sequence[str]] = None
+    ) -> 'TagIncidence':
+        """
+        動画ごとのタグリストから接続行列を作成
+        
+        Args:
+            all_tags: 各動画のタグリスト
+            key: タグを列のキーに変換する関数（空文字列・None を返したタグは除く）
+            weights: 動画ごとの重み
+            groups: 動画ごとのグループ名（スキルなど。空文字列・None はグループ無し）
+        
+        Returns:
+            TagIncidence
+        """
+        index: Dict[str, int] = {}
+        indptr = [0]
+        indices: List[int] = []
+        total_assignments = 0
+        
+        for video_tags in all_tags:
+            columns = set()
+            for tag in video_tags:
+                total_assignments += 1
+                column_key = key(tag) if key else tag
+                if column_key:
+                    columns.add(index.setdefault(column_key, len(index)))
+            indices.extend(sorted(columns))
+            indptr.append(len(indices))
+        
+        matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.uint8), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(indptr) - 1, len(index))
+        )
+        
+        group_codes, group_names = None, None
+        if groups is not None:
+            group_index: Dict[str, int] = {}
+            group_codes = np.array(
+                [group_index.setdefault(group, len(group_index)) if group else -1 for group in groups],
+                dtype=np.int32
+            )
+            group_names = list(group_index)
+        
+        return cls(matrix, list(index), weights, group_codes, group_names, total_assignments)
+    
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'TagIncidence':
+        """
+        save() で保存した .npz から読み込み
+        
+        Args:
+            path: ファイルパス
+            mmap: 配列をメモリマップで読み込むか（False の場合はメモリに読み込む）
+        
+        Returns:
+            TagIncidence
+        """
+        arrays = _load_npz_mmap(path) if mmap else dict(np.load(path, allow_pickle=False))
+        
+        matrix = sparse.csr_matrix(
+            (arrays['data'], arrays['indices'], arrays['indptr']),
+            shape=tuple(int(size) for size in arrays['shape'])
+        )
+        return cls(
+            matrix,
+            arrays['tags'].tolist(),
+            arrays['weights'],
+            arrays['group_codes'],
+            arrays['group_names'].tolist(),
+            int(arrays['total_assignments'])
+        )
+    
+    def save(self, path: str):
+        """
+        メモリマップで読み込める非圧縮の .npz に保存
+        
+        Args:
+            path: ファイルパス
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # 書き込み途中で落ちても既存のファイルを壊さないよう一時ファイルから置き換える
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            np.savez(
+                f,
+                data=self.matrix.data,
+                indices=self.matrix.indices,
+                indptr=self.matrix.indptr,
+                shape=np.array(self.matrix.shape, dtype=np.int64),
+                tags=np.array(self.tags, dtype=str),
+                weights=self.weights,
+                group_codes=self.group_codes,
+                group_names=np.array(self.group_names, dtype=str),
+                total_assignments=np.array(self.total_assignments, dtype=np.int64)
+            )
+        os.replace(temp_path, path)
+    
+    @property
+    def video_count(self) -> int:
+        """動画数"""
+        return self.matrix.shape[0]
+    
+    def columns(self, tags: Iterable[str]) -> List[int]:
+        """タグの列番号のリスト（行列に無いタグは除く）"""
+        return [self.index[tag] for tag in tags if tag in self.index]
+    
+    def covered(self, tags: Iterable[str]) -> np.ndarray:
+        """
+        いずれかのタグが付いている動画
+        
+        Args:
+            tags: タグリスト
+        
+        Returns:
+            動画ごとの bool 配列
+        """
+        selector = np.zeros(self.matrix.shape[1], dtype=np.float64)
+        selector[self.columns(tags)] = 1.0
+        return (self.matrix @ selector) > 0
+    
+    def coverage(self, tags: Iterable[str]) -> float:
+        """
+        重み付きカバレッジ率を算出
+        
+        Args:
+            tags: タグリスト
+        
+        Returns:
+            カバレッジ率（%）
+        """
+        total = self.weights.sum()
+        if not total:
+            return 0
+        return float(self.weights[self.covered(tags)].sum() / total * 100)
+    
+    def tag_frequencies(self) -> np.ndarray:
+        """
+        タグごとの付与動画数
+        
+        Returns:
+            列順の動画数の配列
+        """
+        return np.bincount(self.matrix.indices, minlength=self.matrix.shape[1])
+    
+    def cooccurrence(self, tags: List[str], top: int = 20) -> List[Dict[str, Any]]:
+        """
+        タグの組ごとの共起動画数（多い順）
+        
+        Args:
+            tags: 対象のタグリスト（行列に無いタグは除く）
+            top: 返す組の数
+        
+        Returns:
+            {'tags': [タグ1, タグ2], 'videos': 共起動画数} のリスト
+        """
+        columns = self.columns(tags)
+        if len(columns) < 2:
+            return []
+        
+        selected = self.matrix[:, columns].astype(np.int32)
+        counts = (selected.T @ selected).toarray()
+        first, second = np.triu_indices(len(columns), k=1)
+        pair_counts = counts[first, second]
+        
+        order = np.argsort(-pair_counts, kind='stable')[:top]
+        return [
+            {'tags': [self.tags[columns[first[i]]], self.tags[columns[second[i]]]], 'videos': int(pair_counts[i])}
+            for i in order if pair_counts[i] > 0
+        ]
+    
+    def group_coverage(self, tags: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        グループ（スキルなど）ごとのカバレッジ
+        
+        Args:
+            tags: タグリスト
+        
+        Returns:
+            {'group', 'videos', 'covered_videos', 'coverage_percentage'} のリスト（動画数の多い順）
+        """
+        if not self.group_names:
+            return []
+        
+        has_group = self.group_codes >= 0
+        codes = self.group_codes[has_group]
+        videos = np.bincount(codes, minlength=len(self.group_names))
+        covered = np.bincount(codes, weights=self.covered(tags)[has_group], minlength=len(self.group_names))
+        
+        return [
+            {
+                'group': self.group_names[code],
+                'videos': int(videos[code]),
+                'covered_videos': int(covered[code]),
+                'coverage_percentage': float(covered[code] / videos[code] * 100)
+            }
+            for code in np.argsort(-videos, kind='stable') if videos[code] > 0
+        ]
+    
+    def analytics(self, final_tags: List[str], top: int = 20) -> Dict[str, Any]:
+        """
+        最終タグセットの分析レポートを作成
+        
+        Args:
+            final_tags: 最終タグリスト（行列の列キーと同じ表記）
+            top: 頻度・共起の上位件数
+        
+        Returns:
+            分析レポート
+        """
+        frequencies = self.tag_frequencies()
+        unique_original_tags = int(np.count_nonzero(frequencies))
+        columns = self.columns(final_tags)
+        top_columns = sorted(columns, key=lambda column: -frequencies[column])[:top]
+        
+        return {
+            'total_final_tags': len(final_tags),
+            'total_original_tags': self.total_assignments,
+            'unique_original_tags': unique_original_tags,
+            'reduction_ratio': 1 - (len(final_tags) / unique_original_tags) if unique_original_tags > 0 else 0,
+            'coverage_percentage': self.coverage(final_tags),
+            'tag_frequencies': {self.tags[column]: int(frequencies[column]) for column in top_columns},
+            'cooccurrence': self.cooccurrence(final_tags, top),
+            'skill_coverage': self.group_coverage(final_tags)
+        }
+
+
+def _load_npz_mmap(path: str) -> Dict[str, np.ndarray]:
+    """
+    非圧縮の .npz の各配列をメモリマップで読み込む
+    
+    np.load は .npz に mmap_mode を適用しないため、zip 内の各 .npy の位置を求めて直接マップする
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path} は圧縮されているためメモリマップできません")
+            
+            # ローカルファイルヘッダー（30バイト + ファイル名 + 拡張フィールド）の後が .npy の先頭
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = np.frombuffer(f.read(4), dtype='<u2')
+            f.seek(info.header_offset + 30 + int(name_length) + int(extra_length))
+            
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            
+            if dtype.hasobject:
+                raise ValueError(f"{path} の {name} はオブジェクト配列のため読み込めません")
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.empty(shape, dtype=dtype)
+                continue
+            
+            arrays[name] = np.memmap(
+                path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                order='F' if fortran_order else 'C'
+            )
+    return arrays
+
+
+def lazy_greedy_cover(
+    incidence: TagIncidence,
+    budget: int,
+    candidates: Optional[List[str]] = None,
+    priorities: Optional[Dict[str, float]] = None
+) -> List[str]:
+    """
+    遅延評価貪欲法で重み付きカバレッジが最大になるタグを選択
+    
+    カバレッジは劣モジュラなため、タグの追加で増える被覆重み（限界利得）は選択が進むと減るだけになる。
+    優先度付きキューに利得の上限を保持し、先頭のタグだけを再評価して上限以上ならそのまま選ぶ
+    
+    Args:
+        incidence: 動画 × タグの接続行列
+        budget: 選択するタグ数
+        candidates: 候補タグ（省略時は行列の全タグ。行列に無い候補は利得0として扱う）
+        priorities: 利得が同じ場合に優先するタグのスコア（高いほど優先）
+    
+    Returns:
+        選択順のタグリスト（全動画を被覆した後の残りは優先度順）
+    """
+    candidates = list(incidence.tags if candidates is None else candidates)
+    priorities = priorities or {}
+    by_column = incidence.matrix.tocsc()
+    weights = incidence.weights
+    covered = np.zeros(incidence.video_count, dtype=bool)
+    
+    def rows_of(tag: str) -> np.ndarray:
+        column = incidence.index.get(tag)
+        if column is None:
+            return np.empty(0, dtype=np.int32)
+        return by_column.indices[by_column.indptr[column]:by_column.indptr[column + 1]]
+    
+    # (-利得の上限, -優先度, 候補番号)
+    heap = [
+        (-float(weights[rows_of(tag)].sum()), -priorities.get(tag, 0.0), order)
+        for order, tag in enumerate(candidates)
+    ]
+    heapq.heapify(heap)
+    selected = []
+    
+    while heap and len(selected) < budget:
+        _, negative_priority, order = heapq.heappop(heap)
+        rows = rows_of(candidates[order])
+        uncovered = rows[~covered[rows]]
+        entry = (-float(weights[uncovered].sum()), negative_priority, order)
+        
+        if heap and entry > heap[0]:
+            # 上限が古かったので更新して入れ直す
+            heapq.heappush(heap, entry)
+            continue
+        
+        selected.append(candidates[order])
+        covered[uncovered] = True
+    
+    return selected
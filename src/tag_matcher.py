@@ -0,0 +1,105 @@
+"""
+タグ語彙マッチングモジュール
+タグ語彙のトライ木で動画テキスト中のタグ出現を数え、動画 × タグの疎行列を作成する
+（分かち書きを必要としないため日本語のタグもそのまま数えられる）
+"""
+
+import unicodedata
+from typing import List, Dict, Iterable
+
+import numpy as np
+from scipy import sparse
+
+
+def normalize_for_matching(text: str) -> str:
+    """
+    マッチング用にテキストを正規化（全角・半角と大文字・小文字の違いを無視）
+    
+    Args:
+        text: テキスト
+    
+    Returns:
+        正規化したテキスト
+    """
+    return unicodedata.normalize('NFKC', text).casefold()
+
+
+class TagMatcher:
+    """トライ木によるタグ語彙マッチングクラス"""
+    
+    # トライ木のノードでタグ番号を保持するキー（1文字のキーと衝突しない）
+    _END = ''
+    
+    def __init__(self, tags: Iterable[str]):
+        """
+        初期化
+        
+        Args:
+            tags: タグ語彙（列番号は最初に出現した順）
+        """
+        self.tags: List[str] = []
+        self._root: Dict[str, dict] = {}
+        
+        for tag in dict.fromkeys(tags):
+            normalized = normalize_for_matching(tag)
+            if not normalized:
+                continue
+            
+            node = self._root
+            for char in normalized:
+                node = node.setdefault(char, {})
+            # 正規化後に同じになるタグは同じ出現を数える
+            node.setdefault(self._END, []).append(len(self.tags))
+            self.tags.append(tag)
+    
+    def count(self, text: str) -> Dict[int, int]:
+        """
+        テキスト中の各タグの出現回数を数える（重なり合う出現もそれぞれ数える）
+        
+        Args:
+            text: テキスト
+        
+        Returns:
+            タグ番号 → 出現回数 の辞書
+        """
+        counts: Dict[int, int] = {}
+        text = normalize_for_matching(text)
+        root = self._root
+        
+        for start in range(len(text)):
+            node = root.get(text[start])
+            position = start + 1
+            while node is not None:
+                for tag_index in node.get(self._END, ()):
+                    counts[tag_index] = counts.get(tag_index, 0) + 1
+                if position >= len(text):
+                    break
+                node = node.get(text[position])
+                position += 1
+        
+        return counts
+    
+    def count_matrix(self, texts: Iterable[str]) -> sparse.csr_matrix:
+        """
+        テキストごとのタグ出現回数の疎行列を作成
+        
+        Args:
+            texts: テキストのリスト（None・非文字列は空文字列として扱う）
+        
+        Returns:
+            テキスト数 × タグ数 の CSR 行列
+        """
+        indptr = [0]
+        indices: List[int] = []
+        data: List[int] = []
+        
+        for text in texts:
+            counts = self.count(text if isinstance(text, str) else '')
+            indices.extend(counts.keys())
+            data.extend(counts.values())
+            indptr.append(len(indices))
+        
+        return sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(indptr) - 1, len(self.tags))
+        )
@@ -9,9 +9,13 @@ import re
 from collections import Counter, defaultdict
 from typing import List, Dict, Any, Set, Tuple
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfTransformer
 import numpy as np
+from .tag_clustering import TagClusterer
+from .tag_cosine import CosineTagClusterer
+from .tag_matcher import TagMatcher
+from .tag_incidence import TagIncidence, lazy_greedy_cover
 
 
 class TagOptimizer:
@@ -25,13 +29,17 @@ class TagOptimizer:
             config_path: 設定ファイルのパス
         """
         self.config_path = config_path or "config/settings.json"
-        self.config = self._load_config()
         self.logger = logging.getLogger(__name__)
+        self.config = self._load_config()
         
         # 最適化設定
         self.optimization_config = self.config.get('tag_optimization', {})
         self.min_frequency = self.optimization_config.get('min_frequency', 2)
         self.similarity_threshold = self.optimization_config.get('similarity_threshold', 0.8)
+        self.clustering_method = self.optimization_config.get('clustering_method', 'edit_distance')
+        self.cosine_config = self.optimization_config.get('cosine', {})
+        self.selection_method = self.optimization_config.get('selection_method', 'score')
+        self.coverage_weight_column = self.optimization_config.get('coverage_weight_column')
         self.importance_weights = self.optimization_config.get('importance_weights', {
             'title': 0.3,
             'skill': 0.25,
@@ -91,7 +99,10 @@ class TagOptimizer:
         self.logger.info(f"統合後タグ数: {len(merged_tags)}")
         
         # Step 5: 最終選択
-        final_tags = self._select_final_tags(merged_tags)
+        incidence = None
+        if self.selection_method == 'coverage':
+            incidence = self._build_cluster_incidence(all_tags, video_data)
+        final_tags = self._select_final_tags(merged_tags, incidence)
         self.logger.info(f"最終タグ数: {len(final_tags)}")
         
         return final_tags
@@ -211,40 +222,20 @@ class TagOptimizer:
         """
         tag_scores = defaultdict(float)
         
-        # 各動画のコンテンツを結合
-        all_content = []
-        for _, row in video_data.iterrows():
-            content_parts = []
-            
-            for field, weight in self.importance_weights.items():
-                column_name = column_mapping.get(field, '')
-                if column_name and column_name in row:
-                    text = str(row[column_name])
-                    # 重要度に応じて重み付け
-                    weighted_text = ' '.join([text] * int(weight * 10))
-                    content_parts.append(weighted_text)
-            
-            all_content.append(' '.join(content_parts))
-        
         # TF-IDFでタグの重要度を計算
         try:
             # ユニークタグを取得
             unique_tags = list(set(tags))
             
-            if len(unique_tags) > 1 and len(all_content) > 0:
-                vectorizer = TfidfVectorizer(
-                    vocabulary=unique_tags,
-                    ngram_range=(1, 3),
-                    max_features=1000
-                )
-                
-                tfidf_matrix = vectorizer.fit_transform(all_content)
-                feature_names = vectorizer.get_feature_names_out()
+            if len(unique_tags) > 1 and len(video_data) > 0:
+                matcher = TagMatcher(unique_tags)
+                weighted_counts = self._weighted_tag_counts(matcher, video_data, column_mapping)
+                tfidf_matrix = TfidfTransformer().fit_transform(weighted_counts)
                 
                 # 各タグのTF-IDFスコアを平均
-                for i, tag in enumerate(feature_names):
-                    scores = tfidf_matrix[:, i].toarray().flatten()
-                    tag_scores[tag] = float(np.mean(scores))
+                mean_scores = np.asarray(tfidf_matrix.mean(axis=0)).ravel()
+                for tag, score in zip(matcher.tags, mean_scores.tolist()):
+                    tag_scores[tag] = score
         
         except Exception as e:
             self.logger.warning(f"TF-IDF計算エラー: {str(e)}")
@@ -256,6 +247,33 @@ class TagOptimizer:
         
         return dict(tag_scores)
     
+    def _weighted_tag_counts(
+        self,
+        matcher: TagMatcher,
+        video_data: pd.DataFrame,
+        column_mapping: Dict[str, str]
+    ) -> sparse.csr_matrix:
+        """
+        フィールドごとのタグ出現回数を重要度で重み付けして合算
+        
+        Args:
+            matcher: タグ語彙マッチャー
+            video_data: 動画データ
+            column_mapping: 列マッピング
+            
+        Returns:
+            動画数 × タグ数 の重み付き出現回数行列
+        """
+        weighted_counts = sparse.csr_matrix((len(video_data), len(matcher.tags)), dtype=np.float32)
+        
+        for field, weight in self.importance_weights.items():
+            column_name = column_mapping.get(field, '')
+            if column_name and column_name in video_data.columns:
+                texts = video_data[column_name].fillna('').astype(str)
+                weighted_counts = weighted_counts + matcher.count_matrix(texts) * weight
+        
+        return weighted_counts
+    
     def _merge_similar_tags(
         self, 
         tag_frequencies: Counter,
@@ -264,6 +282,8 @@ class TagOptimizer:
         """
         類似タグを統合
         
+        類似度が閾値以上のタグの組を辿ってできるクラスタ（Union-Find）ごとに1つのタグにまとめる
+        
         Args:
             tag_frequencies: タグ頻度
             tag_scores: タグ重要度スコア
@@ -272,102 +292,67 @@ class TagOptimizer:
             統合後タグスコア辞書
         """
         tags_list = list(tag_frequencies.keys())
-        merged_scores = {}
-        processed_tags = set()
+        return self._score_clusters(self._create_clusterer().cluster(tags_list), tag_frequencies, tag_scores)
+    
+    def _score_clusters(
+        self,
+        clusters: List[List[str]],
+        tag_frequencies: Counter,
+        tag_scores: Dict[str, float]
+    ) -> Dict[str, float]:
+        """
+        類似タグのクラスタごとに代表タグと統合スコアを算出
         
-        for tag in tags_list:
-            if tag in processed_tags:
-                continue
-            
-            # 類似タグを検索
-            similar_tags = self._find_similar_tags(tag, tags_list)
+        Args:
+            clusters: 類似タグのクラスタのリスト
+            tag_frequencies: タグ頻度
+            tag_scores: タグ重要度スコア
             
+        Returns:
+            統合後タグスコア辞書
+        """
+        merged_scores = {}
+        # 代表タグ → クラスタのタグ（カバレッジ計算で動画のタグを代表タグにまとめるために使う）
+        self._cluster_members = {}
+        
+        for similar_tags in clusters:
             if len(similar_tags) > 1:
                 # 類似タグがある場合は統合
                 best_tag = self._select_best_tag(similar_tags, tag_frequencies, tag_scores)
+                self._cluster_members[best_tag] = similar_tags
                 total_score = sum(tag_scores.get(t, 0) for t in similar_tags)
                 total_frequency = sum(tag_frequencies.get(t, 0) for t in similar_tags)
                 
                 # 統合スコア計算
                 merged_scores[best_tag] = total_score + (total_frequency * 0.1)
-                processed_tags.update(similar_tags)
             else:
                 # 類似タグがない場合はそのまま
+                tag = similar_tags[0]
                 frequency = tag_frequencies.get(tag, 0)
                 importance = tag_scores.get(tag, 0)
                 merged_scores[tag] = importance + (frequency * 0.1)
-                processed_tags.add(tag)
         
         return merged_scores
     
-    def _find_similar_tags(self, target_tag: str, all_tags: List[str]) -> List[str]:
+    def _create_clusterer(self):
         """
-        類似タグを検索
+        設定（clustering_method）に応じた類似タグのクラスタリング器を作成
         
-        Args:
-            target_tag: 対象タグ
-            all_tags: 全タグリスト
-            
         Returns:
-            類似タグリスト
+            クラスタリング器（TagClusterer または CosineTagClusterer）
         """
-        similar_tags = [target_tag]
-        
-        for tag in all_tags:
-            if tag != target_tag:
-                similarity = self._calculate_tag_similarity(target_tag, tag)
-                if similarity >= self.similarity_threshold:
-                    similar_tags.append(tag)
-        
-        return similar_tags
-    
-    def _calculate_tag_similarity(self, tag1: str, tag2: str) -> float:
-        """
-        タグ間の類似度を計算
-        
-        Args:
-            tag1: タグ1
-            tag2: タグ2
-            
-        Returns:
-            類似度 (0-1)
-        """
-        # 文字レベルの類似度
-        if tag1 == tag2:
-            return 1.0
-        
-        # 包含関係チェック
-        if tag1 in tag2 or tag2 in tag1:
-            return 0.9
-        
-        # 編集距離ベースの類似度
-        def levenshtein_distance(s1, s2):
-            if len(s1) < len(s2):
-                return levenshtein_distance(s2, s1)
-            
-            if len(s2) == 0:
-                return len(s1)
-            
-            previous_row = list(range(len(s2) + 1))
-            for i, c1 in enumerate(s1):
-                current_row = [i + 1]
-                for j, c2 in enumerate(s2):
-                    insertions = previous_row[j + 1] + 1
-                    deletions = current_row[j] + 1
-                    substitutions = previous_row[j] + (c1 != c2)
-                    current_row.append(min(insertions, deletions, substitutions))
-                previous_row = current_row
-            
-            return previous_row[-1]
-        
-        max_len = max(len(tag1), len(tag2))
-        if max_len == 0:
-            return 1.0
-        
-        distance = levenshtein_distance(tag1, tag2)
-        similarity = 1.0 - (distance / max_len)
-        
-        return similarity
+        if self.clustering_method == 'edit_distance':
+            return TagClusterer(self.similarity_threshold)
+        
+        if self.clustering_method == 'cosine':
+            return CosineTagClusterer(
+                threshold=self.cosine_config.get('threshold', 0.75),
+                ngram_range=tuple(self.cosine_config.get('ngram_range', [2, 3])),
+                top_k=self.cosine_config.get('top_k', 20),
+                block_size=self.cosine_config.get('block_size', 2048)
+            )
+        
+        raise ValueError(f"サポートされていないクラスタリング方式: {self.clustering_method}")
     
     def _select_best_tag(
         self, 
@@ -405,12 +390,17 @@ class TagOptimizer:
         
         return best_tag
     
-    def _select_final_tags(self, merged_tags: Dict[str, float]) -> List[str]:
+    def _select_final_tags(
+        self,
+        merged_tags: Dict[str, float],
+        incidence: TagIncidence = None
+    ) -> List[str]:
         """
         最終タグセットを選択
         
         Args:
             merged_tags: 統合済みタグスコア辞書
+            incidence: 動画 × 代表タグの接続行列（selection_method が coverage の場合に使用）
             
         Returns:
             最終タグリスト
@@ -422,6 +412,9 @@ class TagOptimizer:
             reverse=True
         )
         
+        if incidence is not None and len(sorted_tags) > self.max_tag_count:
+            return self._select_coverage_tags(merged_tags, incidence)
+        
         # 目標タグ数に基づいて選択
         if len(sorted_tags) <= self.min_tag_count:
             # タグ数が少なすぎる場合は全て採用
@@ -441,54 +434,101 @@ class TagOptimizer:
         
         return final_tags
     
-    def generate_tag_analytics(
-        self, 
-        final_tags: List[str],
-        all_tags: List[List[str]]
-    ) -> Dict[str, Any]:
+    def _select_coverage_tags(self, merged_tags: Dict[str, float], incidence: TagIncidence) -> List[str]:
         """
-        タグ分析レポートを生成
+        動画の重み付きカバレッジが最大になるよう目標タグ数のタグを選択
         
         Args:
-            final_tags: 最終タグリスト
-            all_tags: 元の全タグリスト
+            merged_tags: 統合済みタグスコア辞書
+            incidence: 動画 × 代表タグの接続行列
             
         Returns:
-            分析レポート
-        """
-        # 基本統計
-        total_original_tags = sum(len(tags) for tags in all_tags)
-        unique_original_tags = len(set(tag for tags in all_tags for tag in tags))
-        
-        # カバレッジ計算
-        coverage = self._calculate_coverage(final_tags, all_tags)
-        
-        return {
-            'total_final_tags': len(final_tags),
-            'total_original_tags': total_original_tags,
-            'unique_original_tags': unique_original_tags,
-            'reduction_ratio': 1 - (len(final_tags) / unique_original_tags) if unique_original_tags > 0 else 0,
-            'coverage_percentage': coverage,
-            'final_tags': final_tags
-        }
+            最終タグリスト（選択順）
+        """
+        # 最小頻度を満たすタグだけを候補にし、利得が同じ場合はスコアの高いタグを選ぶ
+        candidates = [
+            tag for tag, score in merged_tags.items()
+            if score >= self.min_frequency * 0.1
+        ]
+        final_tags = lazy_greedy_cover(incidence, self.target_tag_count, candidates, merged_tags)
+        
+        self.logger.info(f"カバレッジ最大化選択: {len(final_tags)}タグ, カバレッジ {incidence.coverage(final_tags):.1f}%")
+        return final_tags
     
-    def _calculate_coverage(self, final_tags: List[str], all_tags: List[List[str]]) -> float:
+    def _build_cluster_incidence(self, all_tags: List[List[str]], video_data: pd.DataFrame) -> TagIncidence:
         """
-        タグカバレッジを計算
+        動画 × 代表タグの接続行列を作成（直前の _merge_similar_tags のクラスタを使用）
+        
+        Args:
+            all_tags: 各動画のタグリスト
+            video_data: 動画データ（coverage_weight_column の列を動画の重みに使う）
+            
+        Returns:
+            TagIncidence
+        """
+        representative = {}
+        for best_tag, members in getattr(self, '_cluster_members', {}).items():
+            for member in members:
+                representative[member] = best_tag
+        
+        weights = None
+        if self.coverage_weight_column and self.coverage_weight_column in video_data.columns:
+            weights = pd.to_numeric(video_data[self.coverage_weight_column], errors='coerce').fillna(0).to_numpy()
+        
+        def key(tag: str) -> str:
+            normalized = self._tag_key(tag)
+            return representative.get(normalized, normalized)
+        
+        return TagIncidence.from_tags(all_tags, key=key, weights=weights)
+    
+    def _tag_key(self, tag: str) -> str:
+        """クリーニング・正規化後のタグ（_analyze_tag_frequencies のキーと同じ）"""
+        return self._normalize_characters(self._clean_single_tag(tag).lower())
+    
+    def build_incidence(
+        self,
+        all_tags: List[List[str]],
+        video_data: pd.DataFrame = None,
+        column_mapping: Dict[str, str] = None
+    ) -> TagIncidence:
+        """
+        分析用の動画 × タグ接続行列を作成（タグは小文字化して数える）
+        
+        Args:
+            all_tags: 各動画のタグリスト
+            video_data: 動画データ（スキル別の集計に使用）
+            column_mapping: 列マッピング
+            
+        Returns:
+            TagIncidence
+        """
+        groups = None
+        skill_column = (column_mapping or {}).get('skill', '')
+        if video_data is not None and skill_column and skill_column in video_data.columns:
+            groups = video_data[skill_column].fillna('').astype(str).str.strip().tolist()
+        
+        return TagIncidence.from_tags(all_tags, key=str.lower, groups=groups)
+    
+    def generate_tag_analytics(
+        self, 
+        final_tags: List[str],
+        all_tags: List[List[str]],
+        incidence: TagIncidence = None
+    ) -> Dict[str, Any]:
+        """
+        タグ分析レポートを生成
         
         Args:
             final_tags: 最終タグリスト
             all_tags: 元の全タグリスト
+            incidence: build_incidence で作成済みの接続行列（省略時は all_tags から作成）
             
         Returns:
-            カバレッジ率
+            分析レポート（カバレッジ・頻度・共起・スキル別カバレッジを含む）
         """
-        final_tags_set = set(tag.lower() for tag in final_tags)
-        covered_videos = 0
-        
-        for video_tags in all_tags:
-            video_tags_set = set(tag.lower() for tag in video_tags)
-            if final_tags_set.intersection(video_tags_set):
-                covered_videos += 1
+        if incidence is None:
+            incidence = self.build_incidence(all_tags)
         
-        return (covered_videos / len(all_tags)) * 100 if all_tags else 0
\ No newline at end of file
+        analytics = incidence.analytics([tag.lower() for tag in final_tags])
+        analytics['final_tags'] = final_tags
+        return analytics
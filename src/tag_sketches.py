@@ -0,0 +1,306 @@
+"""
+タグ集計スケッチモジュール
+大量のタグ付け結果を一定のメモリで集計するための SpaceSaving（上位K件）、
+Count-Min（頻度の上限）、HyperLogLog（ユニーク数）を提供する
+"""
+
+import hashlib
+import heapq
+import math
+from typing import List, Dict, Any, Iterable, Tuple
+
+import numpy as np
+
+
+# スケッチの既定サイズ
+DEFAULT_CAPACITY = 10000
+DEFAULT_CMS_WIDTH = 1 << 16
+DEFAULT_CMS_DEPTH = 4
+DEFAULT_HLL_PRECISION = 14
+
+# Count-Min・HyperLogLog にまとめて反映するタグ数
+FLUSH_SIZE = 8192
+
+
+def _hashes(items: List[str], words: int, salt: bytes = b'') -> np.ndarray:
+    """
+    文字列ごとに words 個の64ビットハッシュを算出
+
+    Args:
+        items: 文字列のリスト
+        words: 1文字列あたりのハッシュ数
+        salt: ハッシュの種類を分けるソルト
+
+    Returns:
+        (文字列数, words) の uint64 配列
+    """
+    digest = b''.join(
+        hashlib.blake2b(item.encode('utf-8'), digest_size=8 * words, salt=salt).digest() for item in items
+    )
+    return np.frombuffer(digest, dtype='<u8').reshape(len(items), words)
+
+
+class SpaceSaving:
+    """SpaceSaving による上位K件の頻度推定クラス"""
+    
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        """
+        初期化
+        
+        Args:
+            capacity: 保持する項目数の上限（頻度が総数 / capacity を超える項目は必ず保持される）
+        """
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []
+    
+    def add(self, item: str, count: int = 1):
+        """
+        項目を追加
+        
+        Args:
+            item: 項目
+            count: 追加する回数
+        """
+        if item in self.counts:
+            self.counts[item] += count
+            heapq.heappush(self._heap, (self.counts[item], item))
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+            heapq.heappush(self._heap, (count, item))
+        else:
+            # 最小の項目を置き換え、その頻度を新しい項目の誤差とする
+            minimum, evicted = self._pop_minimum()
+            del self.counts[evicted]
+            del self.errors[evicted]
+            self.counts[item] = minimum + count
+            self.errors[item] = minimum
+            heapq.heappush(self._heap, (self.counts[item], item))
+        
+        # 古いヒープ要素が溜まりすぎたら作り直す
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, key) for key, count in self.counts.items()]
+            heapq.heapify(self._heap)
+    
+    def top(self, k: int) -> List[Tuple[str, int, int]]:
+        """
+        頻度の多い順に上位 k 件を取得
+        
+        Args:
+            k: 件数
+        
+        Returns:
+            (項目, 推定頻度, 誤差) のリスト。真の頻度は [推定頻度 - 誤差, 推定頻度] の範囲
+        """
+        items = heapq.nlargest(k, self.counts.items(), key=lambda entry: (entry[1], -self.errors[entry[0]]))
+        return [(item, count, self.errors[item]) for item, count in items]
+    
+    def _pop_minimum(self) -> Tuple[int, str]:
+        """現在の最小頻度の項目を取り出す（更新済みの古いヒープ要素は読み飛ばす）"""
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return count, item
+
+
+class CountMinSketch:
+    """Count-Min スケッチによる頻度推定クラス"""
+    
+    def __init__(self, width: int = DEFAULT_CMS_WIDTH, depth: int = DEFAULT_CMS_DEPTH):
+        """
+        初期化
+        
+        Args:
+            width: 各行のカウンタ数（過大推定は確率 1 - e^-depth で 総数 * e / width 以下）
+            depth: 行数（独立なハッシュ関数の数）
+        """
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+    
+    def update(self, items: List[str]):
+        """
+        項目をまとめて1回ずつ追加
+        
+        Args:
+            items: 項目のリスト
+        """
+        if not items:
+            return
+        
+        columns = _hashes(items, self.depth) % self.width
+        for row in range(self.depth):
+            self.table[row] += np.bincount(columns[:, row], minlength=self.width)
+        self.total += len(items)
+    
+    def estimate(self, item: str) -> int:
+        """
+        頻度の推定値（真の頻度以上）
+        
+        Args:
+            item: 項目
+        
+        Returns:
+            推定頻度
+        """
+        columns = _hashes([item], self.depth)[0] % self.width
+        return int(self.table[np.arange(self.depth), columns].min())
+    
+    @property
+    def error_bound(self) -> float:
+        """過大推定の上限（確率 1 - e^-depth で成り立つ）"""
+        return math.e / self.width * self.total
+
+
+class HyperLogLog:
+    """HyperLogLog によるユニーク数推定クラス"""
+    
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION):
+        """
+        初期化
+        
+        Args:
+            precision: レジスタ数の指数（レジスタ数 m = 2^precision、相対標準誤差 1.04 / sqrt(m)）
+        """
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = np.zeros(self.size, dtype=np.uint8)
+    
+    def update(self, items: List[str]):
+        """
+        項目をまとめて追加
+        
+        Args:
+            items: 項目のリスト
+        """
+        if not items:
+            return
+        
+        values = _hashes(items, 1, b'hll')[:, 0]
+        suffix_bits = 64 - self.precision
+        registers = (values >> np.uint64(suffix_bits)).astype(np.int64)
+        # 残りのビットは 2^53 未満なので float64 で正確に表せ、frexp の指数がビット長になる
+        _, bit_lengths = np.frexp((values & np.uint64((1 << suffix_bits) - 1)).astype(np.float64))
+        ranks = (suffix_bits - bit_lengths + 1).astype(np.uint8)
+        np.maximum.at(self.registers, registers, ranks)
+    
+    def count(self) -> int:
+        """
+        ユニーク数の推定値
+        
+        Returns:
+            推定ユニーク数
+        """
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size ** 2 / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        
+        # 小さい範囲は空レジスタ数による線形カウントの方が正確
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * self.size and zeros:
+            estimate = self.size * math.log(self.size / zeros)
+        
+        return int(round(estimate))
+    
+    @property
+    def relative_error(self) -> float:
+        """相対標準誤差"""
+        return 1.04 / math.sqrt(self.size)
+
+
+class TagStreamSummary:
+    """タグリストのストリームを一定のメモリで集計するクラス"""
+    
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        cms_width: int = DEFAULT_CMS_WIDTH,
+        cms_depth: int = DEFAULT_CMS_DEPTH,
+        hll_precision: int = DEFAULT_HLL_PRECISION
+    ):
+        """
+        初期化
+        
+        Args:
+            capacity: SpaceSaving の保持項目数
+            cms_width: Count-Min の幅
+            cms_depth: Count-Min の深さ
+            hll_precision: HyperLogLog の精度
+        """
+        self.heavy_hitters = SpaceSaving(capacity)
+        self.count_min = CountMinSketch(cms_width, cms_depth)
+        self.distinct = HyperLogLog(hll_precision)
+        self.rows = 0
+        self.total_tags = 0
+        self._pending: List[str] = []
+    
+    def add_tags(self, tags: Iterable[str]):
+        """
+        1行（1動画）分のタグを追加
+        
+        Args:
+            tags: タグリスト
+        """
+        self.rows += 1
+        for tag in tags:
+            if not isinstance(tag, str) or not tag:
+                continue
+            self.total_tags += 1
+            self.heavy_hitters.add(tag)
+            self._pending.append(tag)
+        
+        if len(self._pending) >= FLUSH_SIZE:
+            self._flush()
+    
+    def _flush(self):
+        """保留中のタグを Count-Min・HyperLogLog にまとめて反映"""
+        self.count_min.update(self._pending)
+        self.distinct.update(self._pending)
+        self._pending = []
+    
+    def top(self, k: int) -> List[Dict[str, Any]]:
+        """
+        頻度上位 k 件のタグを誤差の範囲付きで取得
+        
+        Args:
+            k: 件数
+        
+        Returns:
+            {'tag', 'count', 'lower_bound', 'upper_bound'} のリスト。
+            lower_bound は確実な下限、upper_bound は SpaceSaving と Count-Min の小さい方の上限
+        """
+        self._flush()
+        results = []
+        for tag, count, error in self.heavy_hitters.top(k):
+            upper_bound = min(count, self.count_min.estimate(tag))
+            results.append({
+                'tag': tag,
+                'count': upper_bound,
+                'lower_bound': count - error,
+                'upper_bound': upper_bound
+            })
+        return results
+    
+    def summary(self, k: int) -> Dict[str, Any]:
+        """
+        集計結果
+        
+        Args:
+            k: 上位タグの件数
+        
+        Returns:
+            行数・タグ数・推定ユニーク数・上位タグと誤差情報
+        """
+        self._flush()
+        return {
+            'rows': self.rows,
+            'total_tags': self.total_tags,
+            'distinct_tags': self.distinct.count(),
+            'distinct_relative_error': self.distinct.relative_error,
+            'count_min_error_bound': self.count_min.error_bound,
+            # 頻度がこの値を超えるタグは必ず上位候補に残る
+            'guaranteed_frequency': self.total_tags / self.heavy_hitters.capacity,
+            'top_tags': self.top(k)
+        }
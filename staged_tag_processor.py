@@ -7,30 +7,56 @@
 """
 
 import json
+import hashlib
 import logging
-from typing import List, Dict, Any, Set
+import contextlib
+import uuid
+from typing import List, Dict, Any, Set, Tuple
 import re
 from datetime import datetime
 
+from src.row_identity import stable_row_keys, row_digest, row_fingerprint, candidate_set_version
+from src.dedup import find_representatives
+
 class StagedTagProcessor:
     """段階分離式タグ処理システム"""
     
-    def __init__(self, ai_handler=None):
+    def __init__(self, ai_handler=None, result_store=None, near_duplicate_index=None):
         self.ai_handler = ai_handler
+        self.result_store = result_store  # 増分モード用（未指定時は初回使用時に開く）
+        self.near_duplicate_index = near_duplicate_index  # 類似動画検出用（未指定時は初回使用時に開く）
         self.logger = logging.getLogger(__name__)
         self.stage1_candidates = set()
         self.approved_candidates = set()
         
-    def execute_stage1_candidate_generation(self, all_video_data: List[Dict[str, Any]], max_batch_size: int = 50) -> Dict[str, Any]:
+    def execute_stage1_candidate_generation(self, all_video_data: List[Dict[str, Any]], max_batch_size: int = 50, ai_engine: str = 'openai',
+                                            job_id: str = None, dataset_id: str = None) -> Dict[str, Any]:
         """
         第1段階: 文字起こし除外での全件分析とタグ候補生成
         
         Args:
             all_video_data: 全動画データのリスト
+            max_batch_size: 処理する最大動画数
+            ai_engine: 使用するAIエンジン
+            job_id: 使用量集計用のジョブID（省略時は自動生成）
+            dataset_id: 使用量集計用のデータセットID（省略時は動画データから算出）
             
         Returns:
-            stage1結果（タグ候補、統計情報等）
+            stage1結果（タグ候補、統計情報、トークン使用量等）
         """
+        job_id = job_id or self._new_job_id(1)
+        dataset_id = dataset_id or self._dataset_id(all_video_data)
+        
+        with self._usage_labels(stage=1, job_id=job_id, dataset_id=dataset_id, ai_engine=ai_engine):
+            result = self._execute_stage1(all_video_data, max_batch_size, ai_engine)
+        
+        result['job_id'] = job_id
+        result['dataset_id'] = dataset_id
+        result['usage'] = self._usage_summary(job_id)
+        return result
+    
+    def _execute_stage1(self, all_video_data: List[Dict[str, Any]], max_batch_size: int, ai_engine: str) -> Dict[str, Any]:
+        """第1段階の処理本体"""
         # 高負荷対策: バッチサイズ制限
         if len(all_video_data) > max_batch_size:
             print(f"⚠️ 高負荷対策: {len(all_video_data)}件 → 最初の{max_batch_size}件のみ処理")
@@ -47,7 +73,7 @@ class StagedTagProcessor:
         aggregated_data = self._aggregate_non_transcript_data(all_video_data)
         
         # タグ候補を生成
-        self.stage1_candidates = self._generate_tag_candidates(aggregated_data)
+        self.stage1_candidates = self._generate_tag_candidates(aggregated_data, ai_engine)
         
         # 厳格な汎用タグフィルタリングを適用
         filtered_candidates = self._apply_strict_generic_filter(list(self.stage1_candidates))
@@ -81,7 +107,9 @@ class StagedTagProcessor:
         
         return result
     
-    def execute_stage2_individual_tagging(self, all_video_data: List[Dict[str, Any]], approved_candidates: List[str], ai_engine: str = 'openai') -> Dict[str, Any]:
+    def execute_stage2_individual_tagging(self, all_video_data: List[Dict[str, Any]], approved_candidates: List[str], ai_engine: str = 'openai',
+                                          job_id: str = None, dataset_id: str = None, incremental: bool = False,
+                                          dedup: bool = True, near_duplicate: bool = False) -> Dict[str, Any]:
         """
         第2段階: 承認されたタグ候補を使用しての1件ずつ詳細分析
         
@@ -89,10 +117,40 @@ class StagedTagProcessor:
             all_video_data: 全動画データのリスト
             approved_candidates: ユーザーが承認したタグ候補のリスト
             ai_engine: 使用するAIエンジン
+            job_id: 使用量集計用のジョブID（省略時は自動生成）
+            dataset_id: 使用量集計用のデータセットID（省略時は動画データから算出）
+            incremental: True の場合、内容・承認候補セット・AIエンジン・モデルが前回と同じ動画は
+                結果ストアのタグを再利用し、新規・変更された動画だけをAIで分析する
+                （AI分析に失敗してフォールバックしたタグは保存しない）
+            dedup: True の場合、説明文・要約・文字起こしが同一の動画（文字起こしが空の動画を除く）は最初の1件だけをAIで分析し、
+                同じタグを適用する
+            near_duplicate: True の場合、タイトル・要約・文字起こしがほぼ同じ（MinHash 類似度が閾値以上）の
+                タグ付け済み動画があれば、AIを呼ばずにそのタグを調整して再利用する
             
         Returns:
-            stage2結果（各動画のタグ付け結果）
+            stage2結果（各動画のタグ付け結果、トークン使用量）
         """
+        job_id = job_id or self._new_job_id(2)
+        # 増分モードの名前空間は内容が変わっても変化しないよう、明示されたIDのみを使う
+        store_namespace = (dataset_id or 'default') if incremental else None
+        dataset_id = dataset_id or self._dataset_id(all_video_data)
+        
+        # 候補リストのサイズ別にもコストを比較できるようラベルに含める
+        with self._usage_labels(stage=2, job_id=job_id, dataset_id=dataset_id, ai_engine=ai_engine,
+                                candidate_count=len(approved_candidates)):
+            result = self._execute_stage2(all_video_data, approved_candidates, ai_engine, store_namespace, dedup,
+                                          near_duplicate)
+        
+        result['job_id'] = job_id
+        result['dataset_id'] = dataset_id
+        result['usage'] = self._usage_summary(job_id)
+        if result['usage'] and result['results']:
+            result['usage']['cost_per_video'] = result['usage']['cost'] / len(result['results'])
+        return result
+    
+    def _execute_stage2(self, all_video_data: List[Dict[str, Any]], approved_candidates: List[str], ai_engine: str,
+                        store_namespace: str = None, dedup: bool = True, near_duplicate: bool = False) -> Dict[str, Any]:
+        """第2段階の処理本体（store_namespace 指定時は増分モード、dedup/near_duplicate 指定時は重複・類似動画をまとめて分析）"""
         print(f"\n{'='*60}")
         print(f"第2段階開始: 個別動画タグ付け（文字起こし含む詳細分析）")
         print(f"対象動画数: {len(all_video_data)}件")
@@ -110,12 +168,70 @@ class StagedTagProcessor:
         self.approved_candidates = set(approved_candidates)
         start_time = datetime.now()
         
+        # 増分モード: 前回の結果を行キーでまとめて取得
+        stored = {}
+        if store_namespace is not None:
+            row_keys = stable_row_keys(all_video_data, 'id')
+            candidate_version = candidate_set_version(approved_candidates)
+            model = self._model_name(ai_engine)
+            fingerprints = [row_fingerprint(video, ai_engine, model, candidate_version) for video in all_video_data]
+            stored = self._get_result_store().get_many(store_namespace, row_keys)
+        
+        # 内容が同一の動画は最初の1件（代表）だけを分析する
+        representative_of = find_representatives(all_video_data) if dedup else list(range(len(all_video_data)))
+        
+        # 類似動画インデックス: タグはモデル・候補セットに依存するため名前空間にモデル名と候補セットのバージョンを含める
+        near_index = None
+        if near_duplicate:
+            from src.near_duplicate import adjust_tags, grounded_tags
+            near_index = self._get_near_duplicate_index()
+        near_namespace = f"stage2:{ai_engine}:{self._model_name(ai_engine)}:{candidate_set_version(approved_candidates)}"
+        
         # 各動画を個別に詳細分析
         results = []
+        # 各動画のタグがAIの分析結果か（フォールバックのタグは結果ストア・類似動画インデックスに保存しない）
+        ai_generated = []
+        reused_count = 0
+        duplicate_count = 0
+        near_duplicate_count = 0
         for i, video in enumerate(all_video_data):
             print(f"\n--- 動画 {i+1}/{len(all_video_data)} を分析中 ---")
             
-            selected_tags = self._analyze_individual_video(video, ai_engine)
+            previous = stored.get(row_keys[i]) if stored else None
+            reused = bool(previous and previous[0] == fingerprints[i] and previous[1])
+            duplicate_of = None
+            similar = None
+            
+            if reused:
+                print(f"  変更なし: 前回のタグを再利用")
+                selected_tags = previous[1]
+                reused_count += 1
+                from_ai = True
+            elif representative_of[i] != i:
+                print(f"  重複: 動画 {representative_of[i]+1} のタグを適用")
+                duplicate_of = representative_of[i]
+                selected_tags = list(results[duplicate_of]['selected_tags'])
+                duplicate_count += 1
+                from_ai = ai_generated[duplicate_of]
+                if store_namespace is not None and selected_tags and from_ai:
+                    self._get_result_store().put(store_namespace, row_keys[i], fingerprints[i], selected_tags)
+            else:
+                signature = near_index.signature(video) if near_index else None
+                similar = near_index.query(near_namespace, signature) if signature is not None else None
+                
+                if similar:
+                    print(f"  類似動画（類似度 {similar['similarity']:.2f}）のタグを再利用")
+                    selected_tags = adjust_tags(similar['tags'], similar['grounded'], video, near_index.fields)
+                    near_duplicate_count += 1
+                    from_ai = True
+                else:
+                    selected_tags, from_ai = self._analyze_individual_video(video, ai_engine)
+                    if signature is not None and selected_tags and from_ai:
+                        near_index.add(near_namespace, row_digest(video), signature, selected_tags,
+                                       grounded_tags(selected_tags, video, near_index.fields))
+                
+                if store_namespace is not None and selected_tags and from_ai:
+                    self._get_result_store().put(store_namespace, row_keys[i], fingerprints[i], selected_tags)
             
             # タイトルの取得とデバッグ
             title = video.get('title', '')
@@ -128,9 +244,13 @@ class StagedTagProcessor:
                 'title': title,
                 'selected_tags': selected_tags,
                 'tag_count': len(selected_tags),
-                'confidence': self._calculate_confidence(selected_tags, video)
+                'confidence': self._calculate_confidence(selected_tags, video),
+                'reused': reused,
+                'duplicate_of': duplicate_of,
+                'near_duplicate_similarity': similar['similarity'] if similar else None
             }
             results.append(result)
+            ai_generated.append(from_ai)
             
             print(f"  タイトル: {video.get('title', 'Unknown')[:50]}...")
             print(f"  選定タグ数: {len(selected_tags)}")
@@ -147,7 +267,12 @@ class StagedTagProcessor:
                 'avg_tags_per_video': sum(len(r['selected_tags']) for r in results) / len(results) if results else 0,
                 'total_tags_assigned': sum(len(r['selected_tags']) for r in results),
                 'approved_candidates_used': len(approved_candidates),
-                'processing_time': processing_time
+                'processing_time': processing_time,
+                'reused_videos': reused_count,
+                'deduplicated_videos': duplicate_count,
+                'near_duplicate_videos': near_duplicate_count,
+                'calls_saved': duplicate_count + near_duplicate_count,
+                'analyzed_videos': len(all_video_data) - reused_count - duplicate_count - near_duplicate_count
             },
             'message': '全動画のタグ付けが完了しました'
         }
@@ -158,6 +283,48 @@ class StagedTagProcessor:
         
         return final_result
     
+    def _get_result_store(self):
+        """増分モード用の結果ストアを取得（初回使用時に開く）"""
+        if self.result_store is None:
+            from src.result_store import ResultStore
+            self.result_store = ResultStore()
+        return self.result_store
+    
+    def _get_near_duplicate_index(self):
+        """類似動画インデックスを取得（初回使用時に開く。numpy が必要）"""
+        if self.near_duplicate_index is None:
+            from src.near_duplicate import NearDuplicateIndex
+            self.near_duplicate_index = NearDuplicateIndex()
+        return self.near_duplicate_index
+    
+    def _model_name(self, ai_engine: str) -> str:
+        """AIエンジンのモデル名（AIハンドラーが無い場合は空）"""
+        get_model_name = getattr(self.ai_handler, 'get_model_name', None)
+        return get_model_name(ai_engine) if get_model_name else ''
+    
+    def _new_job_id(self, stage: int) -> str:
+        """使用量集計用のジョブIDを生成"""
+        return f"stage{stage}-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    
+    def _dataset_id(self, all_video_data: List[Dict[str, Any]]) -> str:
+        """動画タイトルの一覧からデータセットIDを算出（同じデータセットは同じIDになる）"""
+        titles = '\n'.join(str(video.get('title', '')) for video in all_video_data)
+        return f"ds-{hashlib.sha1(titles.encode('utf-8')).hexdigest()[:12]}"
+    
+    def _usage_labels(self, **labels):
+        """AIハンドラーの使用量トラッカーにラベルを設定"""
+        tracker = getattr(self.ai_handler, 'usage_tracker', None)
+        if tracker is None:
+            return contextlib.nullcontext()
+        return tracker.labels(**labels)
+    
+    def _usage_summary(self, job_id: str) -> Dict[str, Any]:
+        """ジョブのトークン使用量・コストを集計"""
+        tracker = getattr(self.ai_handler, 'usage_tracker', None)
+        if tracker is None:
+            return {}
+        return tracker.summarize(job_id=job_id)
+    
     def _aggregate_non_transcript_data(self, all_video_data: List[Dict[str, Any]]) -> Dict[str, str]:
         """文字起こし以外のデータを集約"""
         print("文字起こし以外のデータを集約中...")
@@ -193,13 +360,13 @@ class StagedTagProcessor:
         
         return aggregated
     
-    def _generate_tag_candidates(self, aggregated_data: Dict[str, str]) -> Set[str]:
+    def _generate_tag_candidates(self, aggregated_data: Dict[str, str], ai_engine: str = 'openai') -> Set[str]:
         """集約データからタグ候補を生成"""
         
         # AIを使用したタグ候補生成
         if self.ai_handler:
             try:
-                ai_candidates = self._generate_candidates_with_ai(aggregated_data)
+                ai_candidates = self._generate_candidates_with_ai(aggregated_data, ai_engine)
                 if ai_candidates:
                     print(f"AI分析で{len(ai_candidates)}個の候補を生成")
                     return set(ai_candidates)
@@ -209,7 +376,7 @@ class StagedTagProcessor:
         # フォールバック: キーワード抽出
         return self._extract_candidates_fallback(aggregated_data)
     
-    def _generate_candidates_with_ai(self, aggregated_data: Dict[str, str]) -> List[str]:
+    def _generate_candidates_with_ai(self, aggregated_data: Dict[str, str], ai_engine: str = 'openai') -> List[str]:
         """AI分析でタグ候補を生成"""
         
         # 高負荷対策: テキスト長制限でプロンプトサイズを削減
@@ -252,7 +419,7 @@ class StagedTagProcessor:
 出力: 具体的で有用なタグ候補のみをカンマ区切りで出力してください。
 """
         
-        return self.ai_handler.call_openai(prompt)
+        return self.ai_handler.call_ai(prompt, ai_engine)
     
     def _extract_candidates_fallback(self, aggregated_data: Dict[str, str]) -> Set[str]:
         """フォールバック: キーワード抽出"""
@@ -507,18 +674,24 @@ class StagedTagProcessor:
         }
         return word in generic_words
     
-    def _analyze_individual_video(self, video_data: Dict[str, Any], ai_engine: str) -> List[str]:
-        """個別動画の詳細分析（文字起こし含む）"""
+    def _analyze_individual_video(self, video_data: Dict[str, Any], ai_engine: str) -> Tuple[List[str], bool]:
+        """
+        個別動画の詳細分析（文字起こし含む）
+        
+        Returns:
+            (選定タグ, AIで分析したか)。AIハンドラーが無い・AI分析でエラーになった場合は
+            キーワード一致によるフォールバックのタグと False
+        """
         title = video_data.get('title', '')[:30]
         print(f"    分析中: {title}...")
         
         if self.ai_handler:
             try:
-                return self._ai_individual_analysis(video_data, ai_engine)
+                return self._ai_individual_analysis(video_data, ai_engine), True
             except Exception as e:
                 print(f"    AI分析エラー、フォールバック: {e}")
         
-        return self._fallback_individual_analysis(video_data)
+        return self._fallback_individual_analysis(video_data), False
     
     def _ai_individual_analysis(self, video_data: Dict[str, Any], ai_engine: str) -> List[str]:
         """AI による個別動画分析"""
@@ -578,14 +751,7 @@ class StagedTagProcessor:
 出力: 選択したタグのみをカンマ区切りで出力してください。
 """
         
-        if ai_engine == 'openai':
-            ai_tags = self.ai_handler.call_openai(prompt)
-        elif ai_engine == 'claude':
-            ai_tags = self.ai_handler.call_claude(prompt)
-        elif ai_engine == 'gemini':
-            ai_tags = self.ai_handler.call_gemini(prompt)
-        else:
-            ai_tags = []
+        ai_tags = self.ai_handler.call_ai(prompt, ai_engine)
         
         # 厳格なタグ検証: Stage1候補からのみ選択
         validated_tags = self._validate_tags_against_candidates(ai_tags)
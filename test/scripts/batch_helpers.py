@@ -0,0 +1,156 @@
+"""
+BatchProcessor テスト用の共通ヘルパー
+一時ディレクトリの設定ファイルで BatchProcessor を作成し、呼び出しを記録するテスト用プロセッサーを登録する
+"""
+
+import asyncio
+import json
+import threading
+import time
+import sys
+import os
+from typing import List, Dict, Any
+
+import pandas as pd
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from src.ai_processors.base_processor import BaseAIProcessor
+from src.batch_processor import BatchProcessor
+
+
+COLUMN_MAPPING = {
+    'title': 'タイトル',
+    'skill': 'スキル',
+    'description': '説明文',
+    'summary': '要約',
+    'transcript': '文字起こし'
+}
+
+
+def video_frame(count: int, description: str = None) -> pd.DataFrame:
+    """
+    内容がすべて異なるテスト用の動画データ
+    
+    Args:
+        count: 行数
+        description: 全行に共通の説明文（省略時は行ごとに異なる説明文）
+    
+    Returns:
+        COLUMN_MAPPING の列を持つデータフレーム
+    """
+    return pd.DataFrame([
+        {
+            'タイトル': f'動画{index}',
+            'スキル': 'マーケティング',
+            '説明文': description if description is not None else f'動画{index}の説明',
+            '要約': '',
+            '文字起こし': f'動画{index}の文字起こし'
+        }
+        for index in range(count)
+    ])
+
+
+class RecordingProcessor(BaseAIProcessor):
+    """呼び出しを記録し、タイトルから決まったタグを返すテスト用プロセッサー"""
+    
+    def __init__(self, delay: float = 0.0, delays: Dict[str, float] = None, fail_titles: List[str] = ()):
+        """
+        初期化
+        
+        Args:
+            delay: 1回の呼び出しにかかる秒数
+            delays: タイトルごとの呼び出し秒数（delay より優先）
+            fail_titles: 空のタグを返す（APIエラー相当の）タイトル
+        """
+        super().__init__('test', {'rate_limit_per_minute': 10 ** 6})
+        self.model = 'recording-model'
+        self.delay = delay
+        self.delays = delays or {}
+        self.fail_titles = set(fail_titles)
+        self.calls: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def tags_for(title: str) -> List[str]:
+        """タイトルに対して返すタグ"""
+        return [f'{title}タグ', '共通タグ']
+    
+    def generate_tags(self, video_data: Dict[str, str]) -> List[str]:
+        title = self._enter(video_data)
+        try:
+            time.sleep(self.delays.get(title, self.delay))
+            return self._result(title)
+        finally:
+            self._exit()
+    
+    async def generate_tags_async(self, video_data: Dict[str, str]) -> List[str]:
+        title = self._enter(video_data)
+        try:
+            await asyncio.sleep(self.delays.get(title, self.delay))
+            return self._result(title)
+        finally:
+            self._exit()
+    
+    def _enter(self, video_data: Dict[str, str]) -> str:
+        title = video_data.get('title', '')
+        with self._lock:
+            self.calls.append(title)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return title
+    
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+    
+    def _result(self, title: str) -> List[str]:
+        if title in self.fail_titles:
+            return []
+        self._record_usage('test', self.model, 100, 10, time.time() - 0.01)
+        return self.tags_for(title)
+
+
+def make_batch_processor(
+    directory: str,
+    processing: Dict[str, Any] = None,
+    processor: BaseAIProcessor = None,
+    ai_models: Dict[str, Any] = None
+) -> BatchProcessor:
+    """
+    一時ディレクトリに設定・チェックポイントを置いた BatchProcessor を作成し、'test' プロバイダーを登録
+    
+    Args:
+        directory: 一時ディレクトリ
+        processing: processing 設定の上書き（辞書の値は既定値にマージする）
+        processor: 'test' として登録するプロセッサー（省略時は RecordingProcessor）
+        ai_models: ai_models 設定
+    
+    Returns:
+        BatchProcessor
+    """
+    settings = {
+        'batch_size': 100,
+        'checkpoint': {'directory': os.path.join(directory, 'checkpoints')},
+        'result_store_path': os.path.join(directory, 'results.sqlite3'),
+        'latency_stats_path': os.path.join(directory, 'latency_stats.json'),
+        'near_duplicate': {'enabled': False, 'db_path': os.path.join(directory, 'near_duplicates.sqlite3')}
+    }
+    for key, value in (processing or {}).items():
+        if isinstance(value, dict) and isinstance(settings.get(key), dict):
+            settings[key] = {**settings[key], **value}
+        else:
+            settings[key] = value
+    
+    config_path = os.path.join(directory, 'settings.json')
+    with open(config_path, 'w', encoding='utf-8') as f:
+        json.dump({'processing': settings, 'ai_models': ai_models or {}}, f, ensure_ascii=False)
+    
+    batch_processor = BatchProcessor(config_path)
+    processor = processor or RecordingProcessor()
+    processor.usage_tracker = batch_processor.usage_tracker
+    batch_processor.processors['test'] = processor
+    return batch_processor
@@ -0,0 +1,73 @@
+"""
+Google API テスト用の共通フェイク
+HttpError と同じ形のエラー、execute() を持つリクエスト、values.batchGet / batchUpdate だけを再現するサービス
+"""
+
+import threading
+from typing import Any, Callable, Dict, List
+
+
+class FakeResponse(dict):
+    """HttpError.resp と同じく status とヘッダーを持つレスポンス"""
+    
+    def __init__(self, status: int, headers: Dict[str, str] = None):
+        super().__init__(headers or {})
+        self.status = status
+
+
+class FakeHttpError(Exception):
+    """HttpError と同じく resp.status を持つエラー"""
+    
+    def __init__(self, status: int, headers: Dict[str, str] = None):
+        super().__init__(f"HTTP {status}")
+        self.resp = FakeResponse(status, headers)
+
+
+class FakeRequest:
+    """execute() で関数を呼び出すリクエスト"""
+    
+    def __init__(self, run: Callable[[], Any]):
+        self.run = run
+    
+    def execute(self):
+        return self.run()
+
+
+class FakeSheetsService:
+    """values.batchGet / values.batchUpdate だけを再現するサービス（書き込みはリクエストごとに失敗させられる）"""
+    
+    def __init__(self, fail: Callable[[List[Dict[str, Any]]], int] = None):
+        """
+        初期化
+        
+        Args:
+            fail: 書き込む範囲のリストを受け取り、失敗させる場合はHTTPステータスを返す関数
+        """
+        self.fail = fail or (lambda data: None)
+        self.calls: List[List[str]] = []
+        self.requests: List[List[str]] = []
+        self.written: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+    
+    def spreadsheets(self):
+        return self
+    
+    def values(self):
+        return self
+    
+    def batchGet(self, spreadsheetId, ranges, **params):
+        self.calls.append(list(ranges))
+        return FakeRequest(lambda: {'valueRanges': [{'range': name, 'values': [[name]]} for name in ranges]})
+    
+    def batchUpdate(self, spreadsheetId, body):
+        return FakeRequest(lambda: self._write(body['data']))
+    
+    def _write(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        with self.lock:
+            self.requests.append([value_range['range'] for value_range in data])
+            status = self.fail(data)
+            if status:
+                raise FakeHttpError(status)
+            for value_range in data:
+                self.written[value_range['range']] = value_range['values']
+        return {}
@@ -0,0 +1,172 @@
+"""
+APIサーバーテスト
+ハンドラーを HTTP サーバーなしで呼び出し、複数タブの読み込み（gid の解釈・source_tab の付与）と
+タグ最適化の頻度・接続行列の保存を確認
+"""
+
+import io
+import json
+import tempfile
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+import api_server_v2
+
+
+def make_handler(path='/'):
+    """レスポンスを記録するハンドラー（ソケットは開かない）"""
+    handler = api_server_v2.TagGeneratorAPIHandler.__new__(api_server_v2.TagGeneratorAPIHandler)
+    handler.path = path
+    handler.responses = []
+    handler.send_json_response = lambda data, status=200: handler.responses.append((status, data))
+    return handler
+
+
+TABS = [{'gid': '0', 'title': 'コースA'}, {'gid': '5', 'title': 'コースB'}]
+CSV_BY_GID = {
+    '0': 'タイトル,スキル,説明\n動画A,営業,説明A\n動画B,,\n',
+    '5': 'title,skill\n動画C,AI\n'
+}
+
+
+class TestSheetsData(unittest.TestCase):
+    """/api/sheets/data の複数タブ読み込みのテスト（通信はしない）"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.handler = make_handler()
+        self.handler._list_public_tabs = lambda sheet_id: [dict(tab) for tab in TABS]
+        self.handler._public_sheet_version = lambda sheet_id: None
+        self.handler._fetch_tab_csv = lambda sheet_id, gid: (
+            (CSV_BY_GID[gid], None) if gid in CSV_BY_GID else (None, 'スプレッドシートが空か、データが不十分です')
+        )
+    
+    def test_requested_tabs(self):
+        """URL の gid・gids・all_tabs から読み込むタブを決め、不正な gid と重複は除く"""
+        url = 'https://docs.google.com/spreadsheets/d/abc/edit#gid=5'
+        
+        self.assertEqual(self.handler._requested_tabs('abc', url, {}), [{'gid': '5', 'title': 'gid=5'}])
+        self.assertEqual(
+            self.handler._requested_tabs('abc', 'https://docs.google.com/spreadsheets/d/abc/edit', {}),
+            [{'gid': '0', 'title': 'gid=0'}]
+        )
+        self.assertEqual(
+            self.handler._requested_tabs('abc', url, {'gids': [5, '9', 'x', '5']}),
+            [{'gid': '5', 'title': 'コースB'}, {'gid': '9', 'title': 'gid=9'}]
+        )
+        self.assertEqual(self.handler._requested_tabs('abc', url, {'all_tabs': True}), TABS)
+    
+    def test_multiple_tabs_merged_with_source_tab(self):
+        """複数タブの行は順番に結合して source_tab にタブ名を入れ、失敗したタブは tab_errors で返す"""
+        self.handler.handle_sheets_data({
+            'url': 'https://docs.google.com/spreadsheets/d/abc/edit', 'gids': [0, 5, 9]
+        })
+        
+        status, data = self.handler.responses[-1]
+        self.assertTrue(data['success'])
+        self.assertEqual(
+            [(row['title'], row['skill'], row['source_tab']) for row in data['data']],
+            [('動画A', '営業', 'コースA'), ('動画B', 'ビジネススキル', 'コースA'), ('動画C', 'AI', 'コースB')]
+        )
+        self.assertEqual([tab.get('rows') for tab in data['tabs']], [2, 1, None])
+        self.assertEqual([error['gid'] for error in data['tab_errors']], ['9'])
+    
+    def test_single_tab_has_no_source_tab(self):
+        """1タブだけの読み込みでは source_tab を付けない"""
+        self.handler.handle_sheets_data({'url': 'https://docs.google.com/spreadsheets/d/abc/edit#gid=5'})
+        
+        status, data = self.handler.responses[-1]
+        self.assertTrue(data['success'])
+        self.assertEqual(data['data'][0]['title'], '動画C')
+        self.assertNotIn('source_tab', data['data'][0])
+
+
+class TestTagOptimize(unittest.TestCase):
+    """/api/tags/optimize・/api/tags/analytics のテスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        patcher = patch.object(api_server_v2, 'INCIDENCE_DIR', self.temp_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tags = [['営業', '営業', 'KPI'], ['KPI', 'SQL'], ['KPI']]
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_frequencies_count_occurrences(self):
+        """頻度は出現回数で数え、保存を要求しない場合は接続行列を保存しない"""
+        handler = make_handler()
+        handler.handle_tag_optimize({'tags': self.tags, 'max_tags': 2})
+        
+        status, data = handler.responses[-1]
+        self.assertEqual(status, 200)
+        self.assertEqual(data['optimized_tags'], ['KPI', '営業'])
+        self.assertEqual(data['tag_frequencies'], {'KPI': 3, '営業': 2})
+        self.assertEqual(data['original_count'], 3)
+        self.assertNotIn('incidence_id', data)
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+    
+    def test_save_incidence_for_analytics(self):
+        """保存を要求した場合だけ incidence_id を返し、同じタグ一覧では同じファイルを使う"""
+        handler = make_handler()
+        handler.handle_tag_optimize({'tags': self.tags, 'save_incidence': True})
+        handler.handle_tag_optimize({'tags': self.tags, 'save_incidence': True})
+        
+        incidence_id = handler.responses[-1][1]['incidence_id']
+        self.assertEqual(handler.responses[0][1]['incidence_id'], incidence_id)
+        self.assertEqual(os.listdir(self.temp_dir.name), [f'{incidence_id}.npz'])
+        
+        handler = make_handler(f'/api/tags/analytics?incidence_id={incidence_id}&tags=KPI')
+        handler.handle_tag_analytics()
+        status, data = handler.responses[-1]
+        self.assertEqual(status, 200)
+        self.assertAlmostEqual(data['analytics']['coverage_percentage'], 100.0)
+        
+        handler = make_handler(f'/api/tags/analytics?incidence_id={incidence_id}&max_tags=1')
+        handler.handle_tag_analytics()
+        self.assertEqual(handler.responses[-1][1]['analytics']['final_tags'], ['KPI'])
+    
+    def test_analytics_rejects_invalid_max_tags(self):
+        """max_tags が整数でない・1未満の場合は 400 を返す"""
+        for value in ['abc', '-1', '0', '1.5']:
+            handler = make_handler(f'/api/tags/analytics?incidence_id=0123456789abcdef&max_tags={value}')
+            handler.handle_tag_analytics()
+            status, data = handler.responses[-1]
+            self.assertEqual(status, 400)
+            self.assertFalse(data['success'])
+            self.assertIn('max_tags', data['error'])
+    
+    def test_stream_counts_ndjson_lines(self):
+        """NDJSON の各行のタグを集計し、不正な行は数えて読み飛ばす"""
+        body = '\n'.join(json.dumps(tags, ensure_ascii=False) for tags in self.tags).encode('utf-8') + b'\nnot json\n'
+        handler = make_handler('/api/tags/optimize?max_tags=2&capacity=10')
+        handler.rfile = io.BytesIO(body)
+        handler.handle_tag_optimize_stream(len(body))
+        
+        status, data = handler.responses[-1]
+        self.assertEqual(status, 200)
+        self.assertEqual(data['optimized_tags'], ['KPI', '営業'])
+        self.assertEqual(data['invalid_lines'], 1)
+    
+    def test_stream_rejects_invalid_parameters(self):
+        """max_tags・capacity が整数でない・1未満の場合は本文を読まずに 400 を返す"""
+        for query in ['max_tags=abc', 'max_tags=-5', 'capacity=x', 'capacity=-1', 'capacity=0']:
+            handler = make_handler(f'/api/tags/optimize?{query}')
+            handler.rfile = io.BytesIO(b'["KPI"]\n')
+            handler.handle_tag_optimize_stream(8)
+            
+            status, data = handler.responses[-1]
+            self.assertEqual(status, 400, query)
+            self.assertIn(query.split('=')[0], data['error'])
+            self.assertEqual(handler.rfile.tell(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
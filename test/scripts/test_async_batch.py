@@ -0,0 +1,77 @@
+"""
+非同期バッチ処理テスト
+同時実行数の上限・入力順の維持・キャンセル、イベントループごとのオブジェクト生成を確認
+"""
+
+import asyncio
+import tempfile
+import time
+import unittest
+
+from batch_helpers import COLUMN_MAPPING, RecordingProcessor, make_batch_processor, video_frame
+
+
+class TestAsyncBatch(unittest.TestCase):
+    """process_videos_batch_async のテスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_order_and_concurrency(self):
+        """完了順に関係なく入力順で返し、同時実行数は上限を超えない"""
+        # 先頭の動画ほど遅く完了する
+        processor = RecordingProcessor(delays={f'動画{index}': 0.02 * (8 - index) for index in range(8)})
+        batch_processor = make_batch_processor(self.temp_dir.name, processor=processor)
+        progress = []
+        
+        tags = asyncio.run(batch_processor.process_videos_batch_async(
+            video_frame(8), 'test', COLUMN_MAPPING,
+            progress_callback=lambda *args: progress.append(args), max_concurrency=3
+        ))
+        
+        self.assertEqual(tags, [RecordingProcessor.tags_for(f'動画{index}') for index in range(8)])
+        self.assertEqual(processor.max_in_flight, 3)
+        self.assertEqual(progress[-1], (100.0, 8, 8))
+    
+    def test_cancel_event(self):
+        """キャンセルイベントで実行中のリクエストも停止する"""
+        processor = RecordingProcessor(delay=10)
+        batch_processor = make_batch_processor(self.temp_dir.name, processor=processor)
+        
+        async def run():
+            cancel_event = asyncio.Event()
+            asyncio.get_running_loop().call_later(0.05, cancel_event.set)
+            await batch_processor.process_videos_batch_async(
+                video_frame(4), 'test', COLUMN_MAPPING, max_concurrency=2, cancel_event=cancel_event
+            )
+        
+        started = time.monotonic()
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(run())
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(processor.in_flight, 0)
+        self.assertEqual(len(processor.calls), 2)
+    
+    def test_loop_bound_objects(self):
+        """ループに紐づくオブジェクトは同じループでは使い回し、asyncio.run のたびに作り直す"""
+        processor = RecordingProcessor()
+        
+        async def get_locks():
+            await processor._enforce_rate_limit_async()
+            return (
+                processor._get_loop_bound('rate_limit_lock', asyncio.Lock),
+                processor._get_loop_bound('rate_limit_lock', asyncio.Lock)
+            )
+        
+        first, again = asyncio.run(get_locks())
+        second, _ = asyncio.run(get_locks())
+        self.assertIs(first, again)
+        self.assertIsNot(first, second)
+
+
+if __name__ == '__main__':
+    unittest.main()
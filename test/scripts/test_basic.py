@@ -9,10 +9,11 @@ import os
 import json
 from unittest.mock import Mock, patch
 
-# パスを追加
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
 
-from tag_optimizer import TagOptimizer
+from src.tag_clustering import tag_similarity
+from src.tag_optimizer import TagOptimizer
 import pandas as pd
 
 
@@ -107,14 +108,14 @@ class TestTagOptimizer(unittest.TestCase):
     def test_calculate_tag_similarity(self):
         """タグ類似度計算のテスト"""
         # 完全一致
-        self.assertEqual(self.optimizer._calculate_tag_similarity("test", "test"), 1.0)
+        self.assertEqual(tag_similarity("test", "test"), 1.0)
         
         # 包含関係
-        similarity = self.optimizer._calculate_tag_similarity("マーケティング", "マーケティング戦略")
+        similarity = tag_similarity("マーケティング", "マーケティング戦略")
         self.assertGreater(similarity, 0.8)
         
         # 全く異なる
-        similarity = self.optimizer._calculate_tag_similarity("マーケティング", "プログラミング")
+        similarity = tag_similarity("マーケティング", "プログラミング")
         self.assertLess(similarity, 0.5)
     
     def test_generate_tag_analytics(self):
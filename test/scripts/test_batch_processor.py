@@ -0,0 +1,151 @@
+"""
+BatchProcessor テスト
+AIプロバイダーの初期化、並行モードのスライディングウィンドウ、増分モード、重複除去、実測値による見積もりを確認
+"""
+
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from batch_helpers import COLUMN_MAPPING, RecordingProcessor, make_batch_processor, video_frame
+
+
+class TestBatchProcessor(unittest.TestCase):
+    """BatchProcessor の基本テスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_mock_registered_without_api_keys(self):
+        """APIキーが無くても、有効化したモックプロバイダーは使える"""
+        environ = {'OPENAI_API_KEY': '', 'CLAUDE_API_KEY': '', 'GEMINI_API_KEY': ''}
+        with patch.dict('os.environ', environ):
+            batch_processor = make_batch_processor(
+                self.temp_dir.name,
+                ai_models={'mock': {'enabled': True, 'latency_distribution': 'none'}}
+            )
+        
+        self.assertNotIn('openai', batch_processor.processors)
+        self.assertIn('mock', batch_processor.processors)
+        
+        tags = batch_processor.process_videos_batch(video_frame(2), 'mock', COLUMN_MAPPING)
+        self.assertEqual(len(tags), 2)
+        self.assertTrue(all(tags))
+    
+    
+    def test_concurrent_window_order_and_labels(self):
+        """並行モードは同時実行数を保ったまま入力順で返し、使用量ラベルをワーカースレッドに引き継ぐ"""
+        # 先頭の動画ほど遅く完了する
+        processor = RecordingProcessor(delays={f'動画{index}': 0.02 * (10 - index) for index in range(10)})
+        batch_processor = make_batch_processor(self.temp_dir.name, processor=processor)
+        progress = []
+        
+        with batch_processor.usage_tracker.labels(job_id='job-1'):
+            tags = batch_processor.process_videos_batch(
+                video_frame(10), 'test', COLUMN_MAPPING,
+                progress_callback=lambda *args: progress.append(args),
+                concurrent=True, max_concurrency=4
+            )
+        
+        self.assertEqual(tags, [RecordingProcessor.tags_for(f'動画{index}') for index in range(10)])
+        self.assertEqual(processor.max_in_flight, 4)
+        self.assertEqual([current for _, current, _ in progress], list(range(1, 11)))
+        self.assertEqual(batch_processor.usage_tracker.summarize(job_id='job-1')['calls'], 10)
+    
+    
+    def test_incremental_reuses_unchanged_rows(self):
+        """増分モードでは内容・モデルが同じ行を結果ストアから再利用し、変更された行だけを処理する"""
+        processor = RecordingProcessor()
+        batch_processor = make_batch_processor(self.temp_dir.name, processor=processor)
+        df = video_frame(3)
+        
+        batch_processor.process_videos_batch(df, 'test', COLUMN_MAPPING, incremental_namespace='dataset')
+        self.assertEqual(len(processor.calls), 3)
+        
+        df.loc[1, '文字起こし'] = '内容を更新'
+        tags = batch_processor.process_videos_batch(df, 'test', COLUMN_MAPPING, incremental_namespace='dataset')
+        self.assertEqual(processor.calls[3:], ['動画1'])
+        self.assertEqual(batch_processor.last_run_stats['reused'], 2)
+        self.assertEqual(tags, [RecordingProcessor.tags_for(f'動画{index}') for index in range(3)])
+        
+        processor.model = 'other-model'
+        batch_processor.process_videos_batch(df, 'test', COLUMN_MAPPING, incremental_namespace='dataset')
+        self.assertEqual(len(processor.calls), 7)
+    
+    
+    def test_dedup_collapses_only_same_transcript(self):
+        """文字起こしまで同じ動画は1回だけ分析し、定型の説明文だけが同じ動画は別々に分析する"""
+        processor = RecordingProcessor()
+        batch_processor = make_batch_processor(self.temp_dir.name, processor=processor)
+        df = video_frame(4, description='本コースでは実務で使えるスキルを学びます')
+        df.loc[1, '文字起こし'] = df.loc[0, '文字起こし']
+        df.loc[2:, '文字起こし'] = ''
+        
+        tags = batch_processor.process_videos_batch(df, 'test', COLUMN_MAPPING)
+        self.assertEqual(sorted(processor.calls), ['動画0', '動画2', '動画3'])
+        self.assertEqual(tags[1], tags[0])
+        self.assertEqual(tags[2:], [RecordingProcessor.tags_for('動画2'), RecordingProcessor.tags_for('動画3')])
+    
+    
+    def test_estimates_from_measured_stats(self):
+        """実測レイテンシ・メモリがあれば見積もりに使い、並行モードはレート制限で律速する"""
+        batch_processor = make_batch_processor(self.temp_dir.name)
+        default = batch_processor.estimate_processing_time(10, 'test', concurrent=False)
+        self.assertEqual(default['source'], 'default')
+        
+        for latency in [2.0, 2.0, 2.0, 6.0]:
+            batch_processor.latency_stats.record_latency('test', 'recording-model', 1200, latency)
+        batch_processor.latency_stats.record_memory(2.0)
+        
+        sequential = batch_processor.estimate_processing_time(10, 'test', concurrent=False)
+        self.assertEqual(sequential['source'], 'measured')
+        self.assertEqual(sequential['latency_p50'], 2.0)
+        self.assertEqual(sequential['total_seconds'], 20.0)
+        self.assertEqual(sequential['total_seconds_p90'], 60.0)
+        
+        # 既定のレート制限（60回/分）では同時実行数を増やしても1件1秒を下回らない
+        concurrent = batch_processor.estimate_processing_time(10, 'test', concurrent=True, max_concurrency=4)
+        self.assertEqual(concurrent['total_seconds'], 10.0)
+        
+        memory = batch_processor.get_memory_usage_estimate(10, concurrent=True, max_concurrency=4)
+        self.assertEqual((memory['source'], memory['batch_mb'], memory['total_mb']), ('measured', 8.0, 20.0))
+    
+    
+    def test_live_estimate_does_not_rescan_history(self):
+        """残り時間は開始時の事前推定と実測スループットから求め、1動画ごとに見積もりをやり直さない"""
+        batch_processor = make_batch_processor(self.temp_dir.name)
+        estimates = []
+        
+        with patch.object(
+            batch_processor, 'estimate_processing_time', wraps=batch_processor.estimate_processing_time
+        ) as estimate:
+            batch_processor.process_videos_batch(
+                video_frame(5), 'test', COLUMN_MAPPING,
+                progress_callback=lambda *args: estimates.append(batch_processor.get_live_estimate()),
+                concurrent=True, max_concurrency=2
+            )
+        
+        self.assertEqual(estimate.call_count, 1)
+        self.assertEqual([live['completed'] for live in estimates], [1, 2, 3, 4, 5])
+        self.assertEqual(estimates[-1]['eta_seconds'], 0.0)
+        self.assertGreater(estimates[0]['eta_seconds'], 0.0)
+    
+    def test_cost_uses_recorded_model_name(self):
+        """コストの見積もりは使用量記録と同じモデル名で実測トークン数を集計する"""
+        batch_processor = make_batch_processor(
+            self.temp_dir.name, ai_models={'test': {'model': 'configured-model'}}
+        )
+        batch_processor.process_videos_batch(video_frame(2), 'test', COLUMN_MAPPING)
+        
+        cost = batch_processor.estimate_processing_cost(10, 'test')
+        self.assertEqual(cost['model'], 'recording-model')
+        self.assertTrue(cost['based_on_history'])
+        self.assertEqual(cost['prompt_tokens_per_video'], 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+カタログスナップショットテスト
+Parquet への保存・列を絞った読み込み・分割読み込みと、スナップショットキャッシュでの利用を確認
+"""
+
+import tempfile
+import unittest
+import sys
+import os
+
+import pandas as pd
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from src.catalog_snapshot import (
+    PYARROW_AVAILABLE, write_catalog_snapshot, read_catalog_snapshot, iter_catalog_batches, catalog_snapshot_info
+)
+from src.sheet_snapshot_cache import SheetSnapshotCache
+
+
+@unittest.skipUnless(PYARROW_AVAILABLE, 'pyarrow がインストールされていません')
+class TestCatalogSnapshot(unittest.TestCase):
+    """カタログスナップショットのテスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'catalog.parquet')
+        self.catalog = [
+            {
+                'title': f'動画{index}',
+                'skill': ['マーケティング', '営業', 'データ分析'][index % 3],
+                'transcript': '文字起こし' * 50,
+                'views': index
+            }
+            for index in range(25)
+        ]
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_round_trip_and_column_projection(self):
+        """保存した内容を読み込め、列を絞った場合は指定した列だけを返す"""
+        self.assertEqual(write_catalog_snapshot(self.catalog, self.path), 25)
+        
+        df = read_catalog_snapshot(self.path)
+        self.assertEqual(df.to_dict('records'), self.catalog)
+        self.assertEqual(str(df['skill'].dtype), 'category')
+        
+        projected = read_catalog_snapshot(self.path, columns=['title', 'skill'], as_category=False)
+        self.assertEqual(list(projected.columns), ['title', 'skill'])
+        self.assertNotEqual(str(projected['skill'].dtype), 'category')
+        
+        info = catalog_snapshot_info(self.path)
+        self.assertEqual(info['rows'], 25)
+        self.assertEqual(info['columns'], ['title', 'skill', 'transcript', 'views'])
+    
+    def test_batches(self):
+        """指定した行数ずつ順番に読み込む"""
+        write_catalog_snapshot(self.catalog, self.path)
+        
+        batches = list(iter_catalog_batches(self.path, columns=['title'], batch_rows=10))
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+        self.assertEqual(pd.concat(batches)['title'].tolist(), [row['title'] for row in self.catalog])
+    
+    def test_sheet_snapshot_cache_uses_parquet(self):
+        """スナップショットキャッシュは Parquet で保存し、型が混在する列は JSON で保存する"""
+        cache = SheetSnapshotCache(self.temp_dir.name)
+        version = {'modified_time': '2024-01-01T00:00:00.000Z', 'version': '10'}
+        
+        df = pd.DataFrame(self.catalog)
+        cache.put('sheet', 'シート1', version, df)
+        self.assertTrue(os.path.exists(cache._rows_path(cache._path('sheet', 'シート1'))))
+        self.assertEqual(cache.get('sheet', 'シート1', version).to_dict('records'), self.catalog)
+        
+        mixed = pd.DataFrame({'title': ['動画A', 1]})
+        cache.put('sheet', 'シート2', version, mixed)
+        self.assertEqual(cache.get('sheet', 'シート2', version)['title'].tolist(), ['動画A', 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
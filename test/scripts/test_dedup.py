@@ -0,0 +1,51 @@
+"""
+重複除去テスト
+正規化した内容ハッシュによる代表行の算出と、文字起こしが空の行を重複とみなさないことを確認
+"""
+
+import unittest
+import sys
+import os
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from src.dedup import content_hash, find_representatives
+
+
+class TestDedup(unittest.TestCase):
+    """find_representatives のテスト"""
+    
+    def test_collapses_exact_duplicates(self):
+        """タイトルだけが違い、内容が正規化後に同じ動画は最初の行を代表にする"""
+        video_infos = [
+            {'title': 'コースA: 動画1', 'description': '説明', 'transcript': 'ＫＰＩ の  設計'},
+            {'title': 'コースA: 動画2', 'description': '別の説明', 'transcript': '別の文字起こし'},
+            {'title': 'コースB: 動画1', 'description': '説明', 'transcript': 'kpi の 設計'}
+        ]
+        
+        self.assertEqual(find_representatives(video_infos), [0, 1, 0])
+    
+    def test_shared_description_without_transcript_is_not_duplicate(self):
+        """文字起こしが無い動画は、定型の説明文が同じでも別々に分析する"""
+        video_infos = [
+            {'title': f'動画{index}', 'description': '本コースでは実務で使えるスキルを学びます', 'transcript': ''}
+            for index in range(3)
+        ]
+        
+        self.assertEqual(find_representatives(video_infos), [0, 1, 2])
+        self.assertIsNone(content_hash(video_infos[0]))
+    
+    def test_required_fields_can_be_configured(self):
+        """必須フィールドを空にすると、説明文だけでも重複とみなす"""
+        video_infos = [
+            {'title': '動画1', 'description': '同じ説明'},
+            {'title': '動画2', 'description': '同じ説明'}
+        ]
+        
+        self.assertEqual(find_representatives(video_infos, ['description'], []), [0, 0])
+        self.assertEqual(find_representatives(video_infos, ['description']), [0, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Google API サービスレジストリテスト
+サービスオブジェクトのスレッド間共有、スレッドごとの HTTP 接続、clear() による作り直し、
+トークン更新の集約を確認
+"""
+
+import threading
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+try:
+    import httplib2
+    from src import google_services
+    GOOGLE_AVAILABLE = True
+except ImportError:
+    GOOGLE_AVAILABLE = False
+
+
+class FakeCredentials:
+    """サービスアカウント相当の認証情報（refresh の回数を記録）"""
+    
+    def __init__(self, email='bot@example.iam.gserviceaccount.com', valid=True):
+        self.service_account_email = email
+        self.scopes = ['https://www.googleapis.com/auth/spreadsheets']
+        self.valid = valid
+        self.refresh_count = 0
+    
+    def refresh(self, request):
+        self.refresh_count += 1
+        self.valid = True
+    
+    def before_request(self, request, method, url, headers):
+        headers['authorization'] = 'Bearer token'
+
+
+def run_in_thread(function):
+    """別スレッドで実行して結果を返す"""
+    results = []
+    thread = threading.Thread(target=lambda: results.append(function()))
+    thread.start()
+    thread.join()
+    return results[0]
+
+
+@unittest.skipUnless(GOOGLE_AVAILABLE, 'Google API クライアントがインストールされていません')
+class TestGoogleServices(unittest.TestCase):
+    """google_services のテスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        google_services.clear()
+        self.addCleanup(google_services.clear)
+        
+        # 送信した HTTP 接続を記録し、通信はしない
+        self.connections = []
+        
+        def fake_request(http, uri, method='GET', body=None, headers=None, **kwargs):
+            self.connections.append(http)
+            return httplib2.Response({'status': '200'}), b'{}'
+        
+        patcher = patch.object(httplib2.Http, 'request', fake_request)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def fetch(self, service):
+        """リクエストを1回送信し、使われた HTTP 接続を返す"""
+        service.spreadsheets().get(spreadsheetId='sheet').execute()
+        return self.connections[-1]
+    
+    def test_service_shared_across_threads(self):
+        """サービスオブジェクトは全スレッドで共有し、HTTP 接続はスレッドごとに分ける"""
+        credentials = FakeCredentials()
+        service = google_services.sheets_service(credentials)
+        
+        self.assertIs(run_in_thread(lambda: google_services.sheets_service(FakeCredentials())), service)
+        self.assertIsNot(google_services.drive_service(credentials), service)
+        
+        main_http = self.fetch(service)
+        self.assertIs(self.fetch(service), main_http)
+        self.assertIsNot(run_in_thread(lambda: self.fetch(service)), main_http)
+    
+    def test_clear_rebuilds_for_every_thread(self):
+        """clear() 後は新しいサービスオブジェクトを作り、どのスレッドでも HTTP 接続を作り直す"""
+        service = google_services.sheets_service(FakeCredentials())
+        main_http = self.fetch(service)
+        
+        google_services.clear()
+        
+        rebuilt = run_in_thread(lambda: google_services.sheets_service(FakeCredentials()))
+        self.assertIsNot(rebuilt, service)
+        self.assertIs(google_services.sheets_service(FakeCredentials()), rebuilt)
+        self.assertIsNot(self.fetch(rebuilt), main_http)
+    
+    def test_refresh_once_across_threads(self):
+        """期限切れのトークンは同時に取得しても1回だけ更新する"""
+        credentials = FakeCredentials(valid=False)
+        threads = [
+            threading.Thread(target=google_services.sheets_service, args=(credentials,)) for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(credentials.refresh_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
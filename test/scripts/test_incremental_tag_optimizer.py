@@ -0,0 +1,123 @@
+"""
+インクリメンタルタグ最適化テスト
+状態を保存しながら取り込んだ結果が一括処理と一致することの確認
+"""
+
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from src.tag_optimizer import TagOptimizer
+from src.incremental_tag_optimizer import IncrementalTagOptimizer
+
+
+class TestIncrementalTagOptimizer(unittest.TestCase):
+    """IncrementalTagOptimizer の基本テスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.state_path = os.path.join(self.temp_dir, 'state.json')
+        self.random = random.Random(2)
+        self.chars = 'アイウエオカキクケコ分析設計管理ab'
+        self.vocabulary = sorted({self.random_text(self.random.randint(2, 7)) for _ in range(300)})
+        self.column_mapping = {'title': 'title', 'transcript': 'transcript'}
+    
+    def tearDown(self):
+        """テスト後処理"""
+        shutil.rmtree(self.temp_dir)
+    
+    def random_text(self, length):
+        """ランダムなテキストを生成"""
+        return ''.join(self.random.choice(self.chars) for _ in range(length))
+    
+    def batch(self, count):
+        """動画ごとのタグと動画データを生成"""
+        all_tags = [self.random.sample(self.vocabulary, 5) for _ in range(count)]
+        video_data = pd.DataFrame({
+            'title': [self.random_text(20) for _ in range(count)],
+            'transcript': [self.random_text(300) for _ in range(count)]
+        })
+        return all_tags, video_data
+    
+    def test_first_update_matches_full_optimization(self):
+        """空の状態からの取り込みは一括処理と同じ結果になる"""
+        all_tags, video_data = self.batch(60)
+        
+        expected = TagOptimizer().optimize_tags(all_tags, video_data, self.column_mapping)
+        actual = IncrementalTagOptimizer(state_path=self.state_path).update(all_tags, video_data, self.column_mapping)
+        
+        self.assertEqual(actual, expected)
+    
+    def test_clusters_match_full_clustering_after_reload(self):
+        """保存した状態に追加で取り込んだクラスタが一括のクラスタリングと一致する"""
+        first, second = self.batch(60), self.batch(30)
+        IncrementalTagOptimizer(state_path=self.state_path).update(*first, self.column_mapping)
+        optimizer = IncrementalTagOptimizer(state_path=self.state_path)
+        optimizer.update(*second, self.column_mapping)
+        
+        full = TagOptimizer()
+        frequencies = full._analyze_tag_frequencies(full._collect_and_clean_tags(first[0] + second[0]))
+        expected = full._create_clusterer().cluster(list(frequencies))
+        
+        clusters = {}
+        for index, tag in enumerate(optimizer._tags):
+            clusters.setdefault(optimizer._union_find.find(index), []).append(tag)
+        
+        self.assertEqual(sorted(map(sorted, clusters.values())), sorted(map(sorted, expected)))
+        self.assertEqual(optimizer.get_stats()['documents'], 90)
+    
+    def test_incompatible_state_requires_reset(self):
+        """設定が変わった状態ファイルは読み込まず、reset_state=True で作り直せる"""
+        IncrementalTagOptimizer(state_path=self.state_path).update(*self.batch(10), self.column_mapping)
+        
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data['settings']['similarity_threshold'] = 0.5
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        
+        with self.assertRaises(ValueError):
+            IncrementalTagOptimizer(state_path=self.state_path)
+        
+        optimizer = IncrementalTagOptimizer(state_path=self.state_path, reset_state=True)
+        self.assertEqual(optimizer.get_stats()['documents'], 0)
+        
+        optimizer.update(*self.batch(5), self.column_mapping)
+        self.assertEqual(IncrementalTagOptimizer(state_path=self.state_path).get_stats()['documents'], 5)
+    
+    def test_ingested_rows_are_skipped(self):
+        """取り込み済みの行キーを持つ行は再実行しても二重に数えない"""
+        first_tags, first_data = self.batch(20)
+        second_tags, second_data = self.batch(10)
+        IncrementalTagOptimizer(state_path=self.state_path).update(
+            first_tags, first_data, self.column_mapping, row_ids=[f"a{index}" for index in range(20)]
+        )
+        
+        optimizer = IncrementalTagOptimizer(state_path=self.state_path)
+        actual = optimizer.update(
+            first_tags + second_tags,
+            pd.concat([first_data, second_data], ignore_index=True),
+            self.column_mapping,
+            row_ids=[f"a{index}" for index in range(20)] + [f"b{index}" for index in range(10)]
+        )
+        
+        expected = IncrementalTagOptimizer(state_path=os.path.join(self.temp_dir, 'other.json'))
+        expected.update(first_tags, first_data, self.column_mapping)
+        
+        self.assertEqual(optimizer.get_stats()['documents'], 30)
+        self.assertEqual(optimizer.get_stats()['ingested_rows'], 30)
+        self.assertEqual(actual, expected.update(second_tags, second_data, self.column_mapping))
+
+
+if __name__ == '__main__':
+    unittest.main()
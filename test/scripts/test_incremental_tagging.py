@@ -0,0 +1,95 @@
+"""
+増分タグ付けテスト
+第2段階の増分モードで、変更の無い動画だけを結果ストアから再利用することを確認
+"""
+
+import tempfile
+import unittest
+import sys
+import os
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from src.result_store import ResultStore
+from staged_tag_processor import StagedTagProcessor
+
+
+CANDIDATES = ['Power BI', 'KPI設計', 'Tableau', 'SQL クエリ']
+
+
+class FakeAIHandler:
+    """承認済み候補からタグを返すAIハンドラー"""
+    
+    def __init__(self, model='model-a'):
+        self.model = model
+        self.fail = False
+        self.calls = 0
+    
+    def get_model_name(self, ai_engine):
+        return self.model
+    
+    def call_ai(self, prompt, ai_engine):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError('API unavailable')
+        return ['Power BI', 'KPI設計']
+
+
+class TestIncrementalTagging(unittest.TestCase):
+    """第2段階の増分モードのテスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = ResultStore(os.path.join(self.temp_dir.name, 'results.sqlite3'))
+        self.handler = FakeAIHandler()
+        self.processor = StagedTagProcessor(self.handler, result_store=self.store)
+        self.videos = [
+            {'id': str(index), 'title': f'動画{index}', 'transcript': f'Power BIの使い方 その{index}'}
+            for index in range(3)
+        ]
+    
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+    
+    def run_stage2(self, videos):
+        return self.processor.execute_stage2_individual_tagging(
+            videos, CANDIDATES, ai_engine='mock', dataset_id='dataset', incremental=True
+        )
+    
+    def test_reuses_unchanged_rows(self):
+        """変更の無い動画は再利用し、内容やモデルが変わった動画だけを分析する"""
+        self.run_stage2(self.videos)
+        self.assertEqual(self.handler.calls, 3)
+        
+        result = self.run_stage2(self.videos)
+        self.assertEqual(self.handler.calls, 3)
+        self.assertTrue(all(row['reused'] for row in result['results']))
+        
+        edited = [dict(video) for video in self.videos]
+        edited[1]['transcript'] = 'Tableauの使い方'
+        result = self.run_stage2(edited)
+        self.assertEqual(self.handler.calls, 4)
+        self.assertEqual([row['reused'] for row in result['results']], [True, False, True])
+        
+        self.handler.model = 'model-b'
+        self.run_stage2(edited)
+        self.assertEqual(self.handler.calls, 7)
+    
+    def test_fallback_tags_not_stored(self):
+        """AI分析に失敗したフォールバックのタグは保存せず、次回AIで分析し直す"""
+        self.handler.fail = True
+        result = self.run_stage2(self.videos)
+        self.assertTrue(all(row['selected_tags'] for row in result['results']))
+        self.assertEqual(self.store.stats('dataset')['rows'], 0)
+        
+        self.handler.fail = False
+        result = self.run_stage2(self.videos)
+        self.assertEqual(self.handler.calls, 6)
+        self.assertFalse(any(row['reused'] for row in result['results']))
+
+
+if __name__ == '__main__':
+    unittest.main()
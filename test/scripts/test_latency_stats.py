@@ -0,0 +1,58 @@
+"""
+レイテンシ・メモリ統計テスト
+パーセンタイル、プロンプトサイズのバケット、ローリングウィンドウ、保存と読み込みを確認
+"""
+
+import os
+import tempfile
+import unittest
+import sys
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from src.latency_stats import LatencyStats, percentile, prompt_size_bucket
+
+
+class TestLatencyStats(unittest.TestCase):
+    """LatencyStats のテスト"""
+    
+    def test_percentile_and_buckets(self):
+        """最近傍ランク法のパーセンタイルとプロンプトサイズのバケット"""
+        values = [float(value) for value in range(1, 11)]
+        self.assertEqual(percentile(values, 50), 5.0)
+        self.assertEqual(percentile(values, 90), 9.0)
+        self.assertEqual(percentile(values, 100), 10.0)
+        self.assertIsNone(percentile([], 50))
+        self.assertEqual(prompt_size_bucket(999), '<1000')
+        self.assertEqual(prompt_size_bucket(5000), '4000+')
+    
+    def test_bucket_fallback_and_window(self):
+        """バケットにサンプルが無ければ全バケットで算出し、古いサンプルは捨てる"""
+        stats = LatencyStats(window=3)
+        for latency in [1.0, 2.0, 3.0, 4.0]:
+            stats.record_latency('openai', 'gpt', 800, latency)
+        stats.record_latency('openai', 'gpt', 3000, 10.0)
+        stats.observe({'success': False, 'provider': 'openai', 'model': 'gpt', 'prompt_tokens': 800, 'latency': 99.0})
+        
+        self.assertEqual(stats.latency_percentile('openai', 'gpt', 50, prompt_tokens=800), 3.0)
+        self.assertEqual(stats.latency_percentile('openai', 'gpt', 100, prompt_tokens=1500), 10.0)
+        self.assertEqual(stats.sample_count('openai', 'gpt'), 4)
+        self.assertIsNone(stats.latency_percentile('claude', 'haiku', 50))
+    
+    def test_save_and_load(self):
+        """保存した統計を次の実行で読み込む"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'stats', 'latency_stats.json')
+            stats = LatencyStats(path)
+            stats.record_latency('mock', 'mock-llm', 100, 0.5)
+            stats.record_memory(0.25)
+            stats.save()
+            
+            loaded = LatencyStats(path)
+            self.assertEqual(loaded.latency_percentile('mock', 'mock-llm', 50), 0.5)
+            self.assertEqual(loaded.memory_percentile(90), 0.25)
+
+
+if __name__ == '__main__':
+    unittest.main()
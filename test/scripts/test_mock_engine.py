@@ -0,0 +1,106 @@
+"""
+モックLLMエンジンテスト
+オフライン検証用エンジンの決定性・エラー注入・タグ候補選択の確認
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from src.ai_processors.mock_engine import MockLLMEngine, MockLLMError, estimate_tokens
+from src.ai_processors.mock_processor import MockProcessor
+from ai_api_handler import AIAPIHandler
+
+
+class TestMockLLMEngine(unittest.TestCase):
+    """MockLLMEngine の基本テスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.prompt = (
+            "【動画情報】:\n"
+            "タイトル: Power BIで作るKPI設計ダッシュボード\n"
+            "\n"
+            "【承認済みタグ候補】:\n"
+            "KPI設計, Power BI, Salesforce CRM, Tableau, ROI計算, SWOT分析, "
+            "OKR設定, LTV分析, A/Bテスト, Slack, Notion, Jira, HubSpot\n"
+            "\n"
+            "【良いタグの具体例】:\n"
+            "✅ 「Salesforce CRM」「Tableau」\n"
+        )
+    
+    def test_respond_is_deterministic(self):
+        """同じプロンプトには同じ応答を返す"""
+        engine = MockLLMEngine({'latency_distribution': 'none'})
+        other = MockLLMEngine({'latency_distribution': 'none', 'seed': 99})
+        
+        self.assertEqual(engine.respond(self.prompt), other.respond(self.prompt))
+    
+    def test_mentioned_candidates_first(self):
+        """本文で言及された候補を優先し、候補以外は返さない"""
+        engine = MockLLMEngine({'latency_distribution': 'none', 'min_tags': 5, 'max_tags': 5})
+        tags = engine.respond(self.prompt)['text'].split(', ')
+        
+        self.assertEqual(len(tags), 5)
+        self.assertEqual(set(tags[:2]), {'Power BI', 'KPI設計'})
+        self.assertNotIn('【', ''.join(tags))
+    
+    def test_prompt_labels_are_not_tags(self):
+        """BatchProcessor のプロンプトでは見出しや「タイトル: 」などのラベルをタグにしない"""
+        processor = MockProcessor({'latency_distribution': 'none'})
+        tags = processor.generate_tags({
+            'title': 'Power BIで作るKPI設計ダッシュボード',
+            'skill': 'データ分析',
+            'description': '売上データを可視化してコンバージョン率を改善',
+            'summary': 'ダッシュボード構築の手順',
+            'transcript': '今日はPower BIでコホート分析を行います。'
+        })
+        
+        self.assertIn('Power BI', tags)
+        self.assertIn('ダッシュボード', tags)
+        for label in ['動画情報', 'タイトル', 'スキル', '説明文', '要約', '文字起']:
+            self.assertFalse(any(label in tag for tag in tags), label)
+    
+    def test_injected_errors(self):
+        """エラー率1.0では常に429を送出"""
+        engine = MockLLMEngine({'latency_distribution': 'none', 'rate_limit_rate': 1.0})
+        
+        with self.assertRaises(MockLLMError) as context:
+            engine.complete(self.prompt)
+        self.assertEqual(context.exception.status_code, 429)
+    
+    def test_latency_distribution(self):
+        """レイテンシは設定した範囲内でサンプリングされる"""
+        engine = MockLLMEngine({
+            'latency_distribution': 'uniform',
+            'latency_min': 0.1,
+            'latency_max': 0.2
+        })
+        
+        for _ in range(50):
+            self.assertTrue(0.1 <= engine.sample_latency() <= 0.2)
+    
+    def test_estimate_tokens(self):
+        """トークン数の概算"""
+        self.assertEqual(estimate_tokens(''), 0)
+        self.assertEqual(estimate_tokens('abcd'), 1)
+        self.assertEqual(estimate_tokens('タグ'), 2)
+    
+    
+    def test_api_handler_uses_settings(self):
+        """AIAPIHandler のモックエンジンは settings.json の ai_models.mock 設定を使う"""
+        settings = {'ai_models': {'mock': {'model': 'mock-custom', 'latency_distribution': 'none', 'seed': 3}}}
+        with patch.object(AIAPIHandler, 'load_settings', return_value=settings):
+            handler = AIAPIHandler()
+        
+        self.assertEqual(handler.get_model_name('mock'), 'mock-custom')
+        self.assertEqual(handler.get_mock_engine().latency_distribution, 'none')
+        self.assertEqual(AIAPIHandler(mock_config={}).get_model_name('mock'), 'mock-llm')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+"""
+類似動画検出テスト
+MinHash シグネチャ・LSH インデックスの検索と同じ実行内のグループ化、タグの調整、
+第2段階でフォールバックのタグをインデックスに保存しないことを確認
+"""
+
+import tempfile
+import unittest
+import sys
+import os
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from src.near_duplicate import NearDuplicateIndex, grounded_tags, adjust_tags
+from staged_tag_processor import StagedTagProcessor
+from test_incremental_tagging import CANDIDATES, FakeAIHandler
+
+
+TRANSCRIPT = (
+    'この講座ではPower BIを使って売上データを可視化する方法を学びます。'
+    'まずExcelやCSVからデータを取り込み、不要な列を削除して型を整えます。'
+    '次にリレーションシップを設定し、日付テーブルを作成して期間ごとの集計ができるようにします。'
+    'メジャーでは前年比や移動平均を計算し、KPI設計の考え方に沿って目標値と実績を比較します。'
+    'レポートでは棒グラフと折れ線グラフを組み合わせ、スライサーで地域や商品カテゴリを絞り込みます。'
+    '最後にダッシュボードを共有し、更新スケジュールを設定して毎朝最新の数字を確認できるようにします。'
+    '受講後は自社のデータで同じ手順を繰り返し、意思決定に使えるレポートを作れるようになります。'
+)
+EDITED_TRANSCRIPT = TRANSCRIPT.replace('毎朝最新の数字', '毎朝の数字')
+
+
+def video(title, transcript=TRANSCRIPT):
+    """テスト用の動画データ"""
+    return {'title': title, 'summary': '', 'transcript': transcript}
+
+
+class TestNearDuplicateIndex(unittest.TestCase):
+    """NearDuplicateIndex のテスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index = NearDuplicateIndex(os.path.join(self.temp_dir.name, 'near.sqlite3'))
+        self.original = video('Power BI入門')
+        self.edited = video('Power BI入門', EDITED_TRANSCRIPT)
+        self.other = video('Excel関数の基本', 'VLOOKUP関数とIF関数を組み合わせて集計表を作る方法を解説します。' * 10)
+    
+    def tearDown(self):
+        self.index.close()
+        self.temp_dir.cleanup()
+    
+    def test_signature(self):
+        """同じ内容は同じシグネチャになり、短すぎるテキストは None"""
+        signature = self.index.signature(self.original)
+        
+        self.assertEqual(signature.shape, (128,))
+        self.assertTrue((signature == self.index.signature(dict(self.original))).all())
+        self.assertIsNone(self.index.signature(video('', 'ab')))
+        self.assertGreaterEqual(
+            self.index.similarity(signature, self.index.signature(self.edited)), self.index.threshold
+        )
+        self.assertLess(self.index.similarity(signature, self.index.signature(self.other)), 0.2)
+    
+    def test_query_and_add(self):
+        """追加した動画は同じ名前空間の類似動画からだけ見つかり、同じキーの追加は置き換える"""
+        signature = self.index.signature(self.original)
+        self.index.add('ns', 'row-1', signature, ['Power BI', 'ダッシュボード'], ['Power BI'])
+        
+        match = self.index.query('ns', self.index.signature(self.edited))
+        self.assertEqual(match['row_key'], 'row-1')
+        self.assertEqual(match['tags'], ['Power BI', 'ダッシュボード'])
+        self.assertEqual(match['grounded'], ['Power BI'])
+        self.assertIsNone(self.index.query('ns', self.index.signature(self.other)))
+        self.assertIsNone(self.index.query('other-ns', signature))
+        
+        self.index.add('ns', 'row-1', signature, ['KPI設計'], ['KPI設計'])
+        self.assertEqual(self.index.query('ns', signature)['tags'], ['KPI設計'])
+        self.assertEqual(self.index.stats('ns')['videos'], 1)
+        
+        # 保存したインデックスは開き直しても使える
+        reopened = NearDuplicateIndex(self.index.db_path)
+        self.assertEqual(reopened.query('ns', signature)['row_key'], 'row-1')
+        reopened.close()
+    
+    def test_group(self):
+        """同じ実行内の類似動画は先に出現した代表にまとめる"""
+        signatures = {
+            0: self.index.signature(self.original),
+            1: self.index.signature(self.other),
+            2: self.index.signature(self.edited)
+        }
+        
+        self.assertEqual(self.index.group(signatures), {2: 0})
+        self.assertEqual(self.index.stats()['videos'], 0)
+    
+    def test_adjust_tags(self):
+        """元の動画にだけ出現する固有名詞のタグは除き、抽象的なタグは残す"""
+        source = video('入門', 'Power BIとTableauでKPIを可視化します。')
+        target = video('入門', 'Power BIでKPIを可視化します。')
+        tags = ['Power BI', 'Tableau', 'データ可視化']
+        
+        grounded = grounded_tags(tags, source)
+        self.assertEqual(grounded, ['Power BI', 'Tableau'])
+        self.assertEqual(adjust_tags(tags, grounded, target), ['Power BI', 'データ可視化'])
+
+
+class TestStagedNearDuplicate(unittest.TestCase):
+    """第2段階での類似動画インデックスの利用のテスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index = NearDuplicateIndex(os.path.join(self.temp_dir.name, 'near.sqlite3'))
+        self.handler = FakeAIHandler()
+        self.processor = StagedTagProcessor(self.handler, near_duplicate_index=self.index)
+    
+    def tearDown(self):
+        self.index.close()
+        self.temp_dir.cleanup()
+    
+    def run_stage2(self, videos):
+        return self.processor.execute_stage2_individual_tagging(
+            videos, CANDIDATES, ai_engine='mock', near_duplicate=True
+        )
+    
+    def test_fallback_tags_not_indexed(self):
+        """AI分析に失敗したフォールバックのタグはインデックスに保存せず、類似動画にも適用しない"""
+        self.handler.fail = True
+        self.run_stage2([video('Power BI入門')])
+        self.assertEqual(self.index.stats()['videos'], 0)
+        
+        self.handler.fail = False
+        result = self.run_stage2([video('Power BI入門')])
+        self.assertEqual(self.handler.calls, 2)
+        self.assertIsNone(result['results'][0]['near_duplicate_similarity'])
+        self.assertEqual(self.index.stats()['videos'], 1)
+        analyzed_tags = result['results'][0]['selected_tags']
+        
+        result = self.run_stage2([video('Power BI入門', EDITED_TRANSCRIPT)])
+        self.assertEqual(self.handler.calls, 2)
+        self.assertIsNotNone(result['results'][0]['near_duplicate_similarity'])
+        self.assertEqual(result['results'][0]['selected_tags'], analyzed_tags)
+    
+    def test_namespace_includes_model(self):
+        """モデルが変わると以前のモデルのタグを再利用しない"""
+        self.run_stage2([video('Power BI入門')])
+        self.handler.model = 'model-b'
+        self.run_stage2([video('Power BI入門')])
+        self.assertEqual(self.handler.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
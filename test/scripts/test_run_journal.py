@@ -0,0 +1,92 @@
+"""
+実行ジャーナルテスト
+完了行の記録と再開、書きかけの行からの復旧、完了済みの実行を再開に使わないことを確認
+"""
+
+import os
+import tempfile
+import unittest
+
+from batch_helpers import COLUMN_MAPPING, RecordingProcessor, make_batch_processor, video_frame
+from src.run_journal import RunJournal
+
+
+class TestRunJournal(unittest.TestCase):
+    """RunJournal のテスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_resume_after_torn_line(self):
+        """書きかけの末尾行は無視し、次の追記はその行に続けない"""
+        journal = RunJournal('run-1', self.temp_dir.name)
+        journal.open({'total_videos': 3})
+        journal.append('a:0', 0, ['タグA'])
+        journal.append('b:0', 1, ['タグB'])
+        journal.close()
+        with open(journal.path, 'a', encoding='utf-8') as f:
+            f.write('{"type": "row", "key": "c:0", "ta')
+        
+        self.assertEqual(journal.load(), {'a:0': ['タグA'], 'b:0': ['タグB']})
+        
+        journal.open()
+        journal.append('c:0', 2, ['タグC'])
+        journal.sync()
+        self.assertEqual(journal.load()['c:0'], ['タグC'])
+        self.assertFalse(journal.is_complete())
+        
+        journal.complete()
+        self.assertTrue(journal.is_complete())
+        journal.open()
+        self.assertFalse(journal.is_complete())
+        journal.close()
+    
+    def test_invalid_run_id(self):
+        """ファイル名に使えない実行IDは拒否する"""
+        with self.assertRaises(ValueError):
+            RunJournal('../escape', self.temp_dir.name)
+    
+    def test_batch_resume_and_completed_run(self):
+        """失敗した行だけを再開時に処理し、全行完了した実行は再開に使わない"""
+        processor = RecordingProcessor(fail_titles=['動画2'])
+        batch_processor = make_batch_processor(self.temp_dir.name, processor=processor)
+        df = video_frame(4)
+        run_id = batch_processor.run_id_for('dataset', 'test', COLUMN_MAPPING)
+        
+        first = batch_processor.process_videos_batch(df, 'test', COLUMN_MAPPING, run_id=run_id, resume=True)
+        self.assertEqual(first[2], [])
+        
+        processor.fail_titles.clear()
+        processor.calls.clear()
+        second = batch_processor.process_videos_batch(df, 'test', COLUMN_MAPPING, run_id=run_id, resume=True)
+        self.assertEqual(processor.calls, ['動画2'])
+        self.assertEqual(second, [RecordingProcessor.tags_for(f'動画{index}') for index in range(4)])
+        self.assertTrue(RunJournal(run_id, batch_processor.checkpoint_dir).is_complete())
+        
+        # 完了済みの実行は再開せず、全行をもう一度処理する
+        processor.calls.clear()
+        batch_processor.process_videos_batch(df, 'test', COLUMN_MAPPING, run_id=run_id, resume=True)
+        self.assertEqual(len(processor.calls), 4)
+    
+    def test_run_id_changes_with_model_and_prompt(self):
+        """モデルやプロンプトが変わると別の実行IDになる"""
+        batch_processor = make_batch_processor(self.temp_dir.name)
+        processor = batch_processor.processors['test']
+        run_id = batch_processor.run_id_for('dataset', 'test', COLUMN_MAPPING)
+        self.assertEqual(run_id, batch_processor.run_id_for('dataset', 'test', COLUMN_MAPPING))
+        self.assertTrue(os.path.basename(RunJournal(run_id, self.temp_dir.name).path).startswith('test-'))
+        
+        processor.model = 'other-model'
+        other_model = batch_processor.run_id_for('dataset', 'test', COLUMN_MAPPING)
+        self.assertNotEqual(other_model, run_id)
+        
+        processor.create_prompt = lambda video_data: '別のプロンプト'
+        self.assertNotEqual(batch_processor.run_id_for('dataset', 'test', COLUMN_MAPPING), other_model)
+
+
+if __name__ == '__main__':
+    unittest.main()
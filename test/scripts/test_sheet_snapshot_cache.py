@@ -0,0 +1,64 @@
+"""
+スプレッドシートのスナップショットキャッシュテスト
+更新日時が同じなら再ダウンロードせず、更新されていれば読み込み直すことの確認
+"""
+
+import tempfile
+import unittest
+import sys
+import os
+
+import pandas as pd
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from src.sheet_snapshot_cache import SheetSnapshotCache
+
+
+class TestSheetSnapshotCache(unittest.TestCase):
+    """スナップショットキャッシュのテスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = SheetSnapshotCache(self.temp_dir.name)
+        self.fetches = []
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def fetch(self, title):
+        def run():
+            self.fetches.append(title)
+            return pd.DataFrame({'title': [title, None], 'views': [10, 20]})
+        return run
+    
+    def test_reuses_snapshot_until_modified(self):
+        """更新日時が変わるまでは fetch せずに保存済みの内容を返す"""
+        version = {'modified_time': '2024-01-01T00:00:00.000Z', 'version': '10'}
+        
+        first = self.cache.get_or_fetch('sheet', 'シート1', version, self.fetch('動画A'))
+        second = self.cache.get_or_fetch('sheet', 'シート1', version, self.fetch('動画B'))
+        self.assertEqual(self.fetches, ['動画A'])
+        self.assertEqual(second.values.tolist(), first.values.tolist())
+        self.assertEqual(list(second.columns), ['title', 'views'])
+        
+        updated = {'modified_time': '2024-01-02T00:00:00.000Z', 'version': '11'}
+        third = self.cache.get_or_fetch('sheet', 'シート1', updated, self.fetch('動画C'))
+        self.assertEqual(self.fetches, ['動画A', '動画C'])
+        self.assertEqual(third['title'][0], '動画C')
+    
+    def test_keys_and_missing_version(self):
+        """シートごとに別々に保存し、更新日時が取れない場合は毎回 fetch する"""
+        version = {'modified_time': '2024-01-01T00:00:00.000Z', 'version': '10'}
+        self.cache.get_or_fetch('sheet', 'シート1', version, self.fetch('動画A'))
+        self.cache.get_or_fetch('sheet', 'シート2', version, self.fetch('動画B'))
+        self.cache.get_or_fetch('sheet', 'シート2', None, self.fetch('動画C'))
+        
+        self.assertEqual(self.fetches, ['動画A', '動画B', '動画C'])
+        self.assertEqual(self.cache.get('sheet', 'シート2', version)['title'][0], '動画B')
+
+
+if __name__ == '__main__':
+    unittest.main()
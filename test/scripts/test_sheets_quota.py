@@ -0,0 +1,99 @@
+"""
+Google API クォータスケジューラーテスト
+トークンバケットによる速度制限、クォータ超過時の再送（冪等でない書き込みを含む）、範囲の読み込みのまとめを確認
+"""
+
+import threading
+import time
+import unittest
+import sys
+import os
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from src.sheets_quota import QuotaScheduler, TokenBucket
+from google_api_fakes import FakeHttpError, FakeRequest, FakeSheetsService
+
+
+class TestQuotaScheduler(unittest.TestCase):
+    """クォータスケジューラーのテスト"""
+    
+    def test_token_bucket_limits_rate(self):
+        """バースト分を使い切ると補充の速さでしか取得できない"""
+        bucket = TokenBucket(per_minute=1200, burst=2)
+        started = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        # 2件はすぐ、残り4件は 1200件/分（0.05秒ごと）
+        self.assertGreaterEqual(time.monotonic() - started, 0.18)
+    
+    def test_retries_quota_errors(self):
+        """429 は Retry-After に従って再送し、再送できないエラーはそのまま送出する"""
+        scheduler = QuotaScheduler(read_per_minute=10 ** 6, max_retries=3, base_delay=0)
+        attempts = []
+        
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise FakeHttpError(429, {'retry-after': '0'})
+            return {'ok': True}
+        
+        self.assertEqual(scheduler.execute(FakeRequest(flaky)), {'ok': True})
+        self.assertEqual(len(attempts), 3)
+        
+        def forbidden():
+            raise FakeHttpError(403)
+        
+        with self.assertRaises(FakeHttpError):
+            scheduler.execute(FakeRequest(forbidden), 'write')
+    
+    def test_non_idempotent_writes_retry_only_quota_errors(self):
+        """冪等でない書き込みはサーバーエラーでは再送せず、クォータ超過だけ再送する"""
+        scheduler = QuotaScheduler(write_per_minute=10 ** 6, max_retries=3, base_delay=0)
+        attempts = []
+        
+        def unavailable():
+            attempts.append(1)
+            raise FakeHttpError(503)
+        
+        with self.assertRaises(FakeHttpError):
+            scheduler.execute(FakeRequest(unavailable), 'write', idempotent=False)
+        self.assertEqual(len(attempts), 1)
+        
+        with self.assertRaises(FakeHttpError):
+            scheduler.execute(FakeRequest(unavailable), 'write')
+        self.assertEqual(len(attempts), 5)
+        
+        def quota_then_ok():
+            attempts.append(1)
+            if len(attempts) < 7:
+                raise FakeHttpError(429, {'retry-after': '0'})
+            return {'ok': True}
+        
+        self.assertEqual(scheduler.execute(FakeRequest(quota_then_ok), 'write', idempotent=False), {'ok': True})
+        self.assertEqual(len(attempts), 7)
+    
+    def test_concurrent_reads_coalesced(self):
+        """同時に発生した範囲の読み込みは1回の batchGet にまとめ、各呼び出しに自分の範囲を返す"""
+        scheduler = QuotaScheduler(read_per_minute=10 ** 6, coalesce_window=0.2)
+        service = FakeSheetsService()
+        results = {}
+        
+        def read(name):
+            results[name] = scheduler.get_range(service, 'id', name)
+        
+        threads = [threading.Thread(target=read, args=(f"'シート{index}'!1:1",)) for index in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(service.calls), 1)
+        self.assertEqual(sorted(service.calls[0]), sorted(results))
+        for name, result in results.items():
+            self.assertEqual(result['values'], [[name]])
+
+
+if __name__ == '__main__':
+    unittest.main()
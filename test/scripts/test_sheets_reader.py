@@ -0,0 +1,133 @@
+"""
+スプレッドシート分割読み込みテスト
+A1表記の変換と、列を絞り込んだ分割読み込みが一括読み込みと同じ結果になることの確認
+"""
+
+import re
+import unittest
+import sys
+import os
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from src.a1_notation import column_letter, column_index, a1_range
+from src.sheets_quota import QuotaScheduler
+from src.sheets_reader import SheetsReader
+from google_api_fakes import FakeRequest
+
+
+class FakeSheetsService:
+    """values.get / values.batchGet / spreadsheets.get だけを再現するサービス"""
+    
+    def __init__(self, grid, row_count):
+        self.grid = grid
+        self.row_count = row_count
+        self.ranges = []
+    
+    def spreadsheets(self):
+        return self
+    
+    def values(self):
+        return self
+    
+    def get(self, spreadsheetId, range=None, valueRenderOption=None, fields=None):
+        if fields:
+            return FakeRequest(lambda: {'sheets': [{'properties': {
+                'title': 'シート1', 'gridProperties': {'rowCount': self.row_count}
+            }}]})
+        return FakeRequest(lambda: {'values': self.grid[:1]})
+    
+    def batchGet(self, spreadsheetId, ranges, valueRenderOption, majorDimension='ROWS'):
+        value_ranges = []
+        for range_spec in ranges:
+            if range_spec.endswith('!1:1'):
+                value_ranges.append({'range': range_spec, 'values': self.grid[:1]})
+                continue
+            self.ranges.append(range_spec)
+            letter, start, end = re.search(r"!([A-Z]+)(\d+)(?::[A-Z]+(\d+))?$", range_spec).groups()
+            column = column_index(letter)
+            values = [
+                self.grid[row][column] if row < len(self.grid) and column < len(self.grid[row]) else ''
+                for row in range(int(start) - 1, int(end or start))
+            ]
+            # API と同様に末尾の空セルは返さない
+            while values and values[-1] == '':
+                values.pop()
+            value_ranges.append({'range': range_spec, 'values': [values]} if values else {'range': range_spec})
+        return FakeRequest(lambda: {'valueRanges': value_ranges})
+
+
+class TestA1Notation(unittest.TestCase):
+    """A1表記の変換テスト"""
+    
+    def test_column_letter_round_trip(self):
+        """列番号と列名が相互に変換できる"""
+        self.assertEqual(column_letter(0), 'A')
+        self.assertEqual(column_letter(25), 'Z')
+        self.assertEqual(column_letter(26), 'AA')
+        self.assertEqual(column_letter(702), 'AAA')
+        for index in range(1000):
+            self.assertEqual(column_index(column_letter(index)), index)
+    
+    def test_range_quotes_sheet_name(self):
+        """シート名の ' はエスケープされる"""
+        self.assertEqual(a1_range("A'B", 2, 2, 2, 1001), "'A''B'!C2:C1001")
+
+
+class TestSheetsReader(unittest.TestCase):
+    """分割読み込みのテスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.scheduler = QuotaScheduler(read_per_minute=10 ** 6, coalesce_window=0)
+        self.grid = [['title', 'skill', 'description', 'summary']]
+        for row in range(23):
+            if 5 <= row < 13:
+                # 途中のチャンクまるごと空行
+                self.grid.append([])
+            else:
+                self.grid.append([f"title{row}", f"skill{row}", '' if row % 3 else f"desc{row}", 'x'])
+        # 読み込む列が空の行（末尾）
+        self.grid.append(['', 'skill', '', 'x'])
+    
+    def test_chunks_match_full_read(self):
+        """チャンクを連結すると一括読み込みの該当列と同じになり、末尾の空行は除かれる"""
+        service = FakeSheetsService(self.grid, row_count=40)
+        reader = SheetsReader(service, 'id', 'シート1', chunk_rows=4, scheduler=self.scheduler)
+        chunks = list(reader.iter_chunks(['description', 'title']))
+        
+        self.assertTrue(all(len(chunk) <= 4 for chunk in chunks))
+        frame = reader.read(['description', 'title'])
+        self.assertEqual(list(frame.columns), ['description', 'title'])
+        self.assertEqual(list(frame.index), list(range(23)))
+        
+        for row in range(23):
+            source = self.grid[row + 1]
+            expected = [source[2], source[0]] if source else ['', '']
+            self.assertEqual(frame.iloc[row].tolist(), expected)
+        
+        # 読み込むのは指定した列（C列・A列）だけ
+        self.assertTrue(all(re.search(r"!(A|C)\d", range_spec) for range_spec in service.ranges))
+    
+    def test_iter_rows(self):
+        """行の辞書は空のセルが空文字列になる"""
+        reader = SheetsReader(
+            FakeSheetsService(self.grid, row_count=30), 'id', 'シート1', chunk_rows=7, scheduler=self.scheduler
+        )
+        rows = list(reader.iter_rows(['title', 'description']))
+        
+        self.assertEqual(len(rows), 23)
+        self.assertEqual(rows[0], {'title': 'title0', 'description': 'desc0'})
+        self.assertEqual(rows[1], {'title': 'title1', 'description': ''})
+        self.assertEqual(rows[6], {'title': '', 'description': ''})
+    
+    def test_missing_column(self):
+        """存在しない列を指定するとエラー"""
+        reader = SheetsReader(FakeSheetsService(self.grid, row_count=30), 'id', 'シート1', scheduler=self.scheduler)
+        with self.assertRaises(ValueError):
+            reader.read(['title', 'unknown'])
+
+
+if __name__ == '__main__':
+    unittest.main()
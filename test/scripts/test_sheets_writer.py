@@ -0,0 +1,104 @@
+"""
+スプレッドシート分割書き込みテスト
+ペイロード上限での分割、Z列より右の範囲指定、失敗したリクエストの個別再送の確認
+"""
+
+import unittest
+import sys
+import os
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from src.sheets_quota import QuotaScheduler
+from src.sheets_writer import SheetsWriter
+from google_api_fakes import FakeSheetsService
+
+
+class TestSheetsWriter(unittest.TestCase):
+    """分割書き込みのテスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.scheduler = QuotaScheduler(write_per_minute=10 ** 6, base_delay=0)
+    
+    def test_chunks_under_payload_limit(self):
+        """行ブロックはペイロード上限以下に分かれ、行の抜けや重複が無い"""
+        service = FakeSheetsService()
+        writer = SheetsWriter(lambda: service, 'id', max_payload_bytes=200, max_workers=3, scheduler=self.scheduler)
+        values = [[f"行{row}", 'タグ1, タグ2'] for row in range(50)]
+        
+        value_ranges = writer.value_ranges('シート1', values, start_row=2)
+        self.assertGreater(len(value_ranges), 1)
+        self.assertEqual(value_ranges[0]['range'].split(':')[0], "'シート1'!A2")
+        self.assertEqual(sum((value_range['values'] for value_range in value_ranges), []), values)
+        
+        self.assertEqual(writer.write_ranges(value_ranges), [])
+        self.assertEqual(len(service.written), len(value_ranges))
+    
+    def test_columns_beyond_z(self):
+        """27列目以降も正しい列名で書き込む"""
+        service = FakeSheetsService()
+        writer = SheetsWriter(lambda: service, 'id', scheduler=self.scheduler)
+        
+        self.assertEqual(writer.write_values('シート1', [['a'], ['b']], start_row=2, start_column=27), [])
+        self.assertEqual(list(service.written), ["'シート1'!AB2:AB3"])
+        
+        ranges = writer.value_ranges('シート1', [list(range(30))])
+        self.assertEqual(ranges[0]['range'], "'シート1'!A1:AD1")
+    
+    def test_failed_batch_retried_per_range(self):
+        """まとめたリクエストが失敗すると範囲ごとに再送し、失敗した範囲だけを返す"""
+        def fail(data):
+            if len(data) > 1:
+                return 400
+            if data[0]['values'][0][0] == '行3':
+                return 400
+            return None
+        
+        service = FakeSheetsService(fail)
+        writer = SheetsWriter(lambda: service, 'id', max_payload_bytes=10 ** 6, scheduler=self.scheduler)
+        value_ranges = [
+            {'range': f"'シート1'!A{row}", 'values': [[f"行{row}"]]} for row in range(1, 6)
+        ]
+        
+        failed = writer.write_ranges(value_ranges)
+        self.assertEqual(failed, ["'シート1'!A3"])
+        self.assertEqual(len(service.written), 4)
+    
+    def test_transient_errors_retried(self):
+        """クォータ超過などの一時的なエラーは再送する"""
+        attempts = []
+        
+        def fail(data):
+            attempts.append(1)
+            return 429 if len(attempts) < 3 else None
+        
+        service = FakeSheetsService(fail)
+        writer = SheetsWriter(lambda: service, 'id', scheduler=self.scheduler)
+        
+        self.assertEqual(writer.write_values('シート1', [['a']]), [])
+        self.assertEqual(len(attempts), 3)
+    
+    
+    def test_only_changed_rows_written(self):
+        """変わった行だけを、連続する行をまとめて書き込む"""
+        service = FakeSheetsService()
+        writer = SheetsWriter(lambda: service, 'id', scheduler=self.scheduler)
+        current = [['a'], ['b'], [], ['d'], ['e'], ['f']]
+        values = [['a'], ['B'], ['C'], ['d'], [''], ['F'], ['g']]
+        
+        self.assertEqual(writer.write_changed_values('シート1', current, values, start_row=2), [])
+        self.assertEqual(service.written, {
+            "'シート1'!A3:A4": [['B'], ['C']],
+            "'シート1'!A6:A8": [[''], ['F'], ['g']]
+        })
+        
+        # 変更が無ければリクエストを送らない
+        service.requests.clear()
+        self.assertEqual(writer.write_changed_values('シート1', [['1'], [None]], [[1], ['']]), [])
+        self.assertEqual(service.requests, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
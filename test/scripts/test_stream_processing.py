@@ -0,0 +1,84 @@
+"""
+ストリーム処理テスト
+行イテレーターからの分割処理、結果ストアへの書き出しと再利用、メモリ上限の扱いを確認
+"""
+
+import tempfile
+import tracemalloc
+import unittest
+
+import pandas as pd
+
+from batch_helpers import COLUMN_MAPPING, RecordingProcessor, make_batch_processor, video_frame
+
+
+class TestStreamProcessing(unittest.TestCase):
+    """process_videos_stream のテスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.processor = RecordingProcessor()
+        self.batch_processor = make_batch_processor(self.temp_dir.name, processor=self.processor)
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_rows_and_chunks_in_order(self):
+        """辞書の行と DataFrame のチャンクを入力順に処理し、再実行時は結果ストアから再利用する"""
+        df = video_frame(7)
+        rows = df.iloc[:3].to_dict('records')
+        chunks = [df.iloc[3:5], df.iloc[5:]]
+        
+        results = list(self.batch_processor.process_videos_stream(
+            rows + chunks, 'test', COLUMN_MAPPING, 'dataset', buffer_rows=2
+        ))
+        self.assertEqual([tags for _, tags in results], [RecordingProcessor.tags_for(f'動画{index}') for index in range(7)])
+        self.assertEqual([key for key, _ in results], [f'title:動画{index}#0' for index in range(7)])
+        self.assertEqual(self.batch_processor.last_run_stats['processed'], 7)
+        
+        again = list(self.batch_processor.process_videos_stream(
+            pd.read_csv(self._write_csv(df), chunksize=3, keep_default_na=False), 'test', COLUMN_MAPPING, 'dataset', incremental=True
+        ))
+        self.assertEqual(again, results)
+        self.assertEqual(len(self.processor.calls), 7)
+        self.assertEqual(self.batch_processor.last_run_stats['reused'], 7)
+    
+    def test_memory_limit(self):
+        """メモリ上限を超えるとチャンクを縮小し、最小のチャンクでも超える場合は MemoryError を送出する"""
+        self.batch_processor.max_memory_mb = 0
+        results = []
+        
+        # 並行モードの最小チャンクは同時実行数（1行）
+        with self.assertRaises(MemoryError):
+            for item in self.batch_processor.process_videos_stream(
+                video_frame(10).to_dict('records'), 'test', COLUMN_MAPPING, 'dataset',
+                concurrent=True, max_concurrency=1, buffer_rows=4
+            ):
+                results.append(item)
+        
+        # 4行 → 2行 → 1行と縮小し、1行のチャンクの処理後に中断する
+        self.assertEqual(len(results), 7)
+        self.assertEqual(self.batch_processor.last_run_stats['chunk_rows'], 1)
+    
+    def test_memory_sampled_without_tracing(self):
+        """メモリはチャンクごとの RSS で計測し、処理中に tracemalloc を有効にしない"""
+        tracing = []
+        
+        for _ in self.batch_processor.process_videos_stream(
+            video_frame(4).to_dict('records'), 'test', COLUMN_MAPPING, 'dataset', buffer_rows=2
+        ):
+            tracing.append(tracemalloc.is_tracing())
+        
+        self.assertEqual(tracing, [False] * 4)
+        self.assertGreater(self.batch_processor.last_run_stats['peak_memory_mb'], 0)
+        self.assertIsNotNone(self.batch_processor.latency_stats.memory_percentile(90))
+    
+    def _write_csv(self, df):
+        path = f"{self.temp_dir.name}/videos.csv"
+        df.to_csv(path, index=False)
+        return path
+
+
+if __name__ == '__main__':
+    unittest.main()
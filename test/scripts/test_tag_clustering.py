@@ -0,0 +1,114 @@
+"""
+類似タグクラスタリングテスト
+ブロッキング・上限付き編集距離による結果が総当たりの比較と一致することの確認
+"""
+
+import random
+import unittest
+import sys
+import os
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from src.tag_clustering import (
+    TagClusterer, UnionFind, tag_similarity, levenshtein_distance, bounded_levenshtein
+)
+from src.tag_cosine import CosineTagClusterer, ngram_cosine
+
+
+def brute_force_clusters(tags, threshold):
+    """全ペアを tag_similarity で比較したクラスタ"""
+    union_find = UnionFind(len(tags))
+    for i in range(len(tags)):
+        for j in range(i + 1, len(tags)):
+            if tag_similarity(tags[i], tags[j]) >= threshold:
+                union_find.union(i, j)
+    
+    clusters = {}
+    for index, tag in enumerate(tags):
+        clusters.setdefault(union_find.find(index), []).append(tag)
+    return [clusters[root] for root in sorted(clusters)]
+
+
+class TestTagClustering(unittest.TestCase):
+    """TagClusterer の基本テスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.random = random.Random(3)
+        self.alphabet = 'アイウエオカキクケコサシ分析設計abc'
+        self.tags = [
+            'マーケティング', 'デジタルマーケティング', 'KPI設計', 'KPI設定',
+            'Google Analytics', 'Google Analytic', 'ROI計算', 'ROI', 'SNS運用', '営業', 'a'
+        ]
+    
+    def random_tags(self, count):
+        """ランダムなタグを生成"""
+        generated = [
+            ''.join(self.random.choice(self.alphabet) for _ in range(self.random.randint(1, 10)))
+            for _ in range(count)
+        ]
+        tags = list(dict.fromkeys(self.tags + generated))
+        self.random.shuffle(tags)
+        return tags
+    
+    def test_bounded_levenshtein_matches_full_distance(self):
+        """上限以内では正確な距離、超える場合は上限+1を返す"""
+        for _ in range(300):
+            s1 = ''.join(self.random.choice(self.alphabet) for _ in range(self.random.randint(0, 9)))
+            s2 = ''.join(self.random.choice(self.alphabet) for _ in range(self.random.randint(0, 9)))
+            distance = levenshtein_distance(s1, s2)
+            
+            for max_distance in range(6):
+                expected = distance if distance <= max_distance else max_distance + 1
+                self.assertEqual(bounded_levenshtein(s1, s2, max_distance), expected)
+    
+    def test_clusters_match_brute_force(self):
+        """閾値ごとに総当たりの比較と同じクラスタになる"""
+        for threshold in (0.5, 0.7, 0.8, 0.9, 0.95):
+            for _ in range(10):
+                tags = self.random_tags(60)
+                self.assertEqual(TagClusterer(threshold).cluster(tags), brute_force_clusters(tags, threshold))
+    
+    def test_similar_tags_are_merged(self):
+        """包含関係・表記揺れのタグが同じクラスタになる"""
+        clusters = TagClusterer(0.8).cluster(self.tags)
+        
+        self.assertIn(['マーケティング', 'デジタルマーケティング'], clusters)
+        self.assertIn(['KPI設計', 'KPI設定'], clusters)
+        self.assertIn(['営業'], clusters)
+
+
+
+class TestCosineTagClustering(unittest.TestCase):
+    """CosineTagClusterer の基本テスト"""
+    
+    def test_notation_variants_are_merged(self):
+        """全角・半角や長音記号の表記揺れが同じクラスタになる"""
+        tags = ['KPI設計', 'ＫＰＩ設計', 'ユーザー', 'ユーザ', 'Google Analytics', 'google analytics 4', '営業']
+        clusters = CosineTagClusterer(0.75).cluster(tags)
+        
+        self.assertIn(['KPI設計', 'ＫＰＩ設計'], clusters)
+        self.assertIn(['ユーザー', 'ユーザ'], clusters)
+        self.assertIn(['Google Analytics', 'google analytics 4'], clusters)
+        self.assertIn(['営業'], clusters)
+    
+    def test_blocks_do_not_change_neighbors(self):
+        """ブロックサイズによらず同じ近傍の組になる"""
+        rng = random.Random(5)
+        tags = list(dict.fromkeys(
+            ''.join(rng.choice('アイウエオ分析設計ab') for _ in range(rng.randint(2, 8))) for _ in range(300)
+        ))
+        expected = sorted((a, b) for a, b, _ in CosineTagClusterer(0.6, block_size=1000).similar_pairs(tags))
+        actual = sorted((a, b) for a, b, _ in CosineTagClusterer(0.6, block_size=7).similar_pairs(tags))
+        self.assertEqual(actual, expected)
+    
+    def test_ngram_cosine(self):
+        """2タグ間のコサイン類似度"""
+        self.assertAlmostEqual(ngram_cosine('KPI設計', 'ＫＰＩ設計'), 1.0)
+        self.assertEqual(ngram_cosine('営業', '分析'), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
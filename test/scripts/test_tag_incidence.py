@@ -0,0 +1,83 @@
+"""
+動画 × タグ接続行列テスト
+カバレッジ・保存と再読み込み・遅延評価貪欲法によるタグ選択の確認
+"""
+
+import random
+import shutil
+import tempfile
+import unittest
+import sys
+import os
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from src.tag_incidence import TagIncidence, lazy_greedy_cover
+
+
+def naive_greedy(all_tags, weights, tags, budget, priorities):
+    """毎回すべての候補の利得を計算する貪欲法"""
+    covered = set()
+    selected = []
+    for _ in range(budget):
+        def gain(tag):
+            return sum(weights[row] for row, video_tags in enumerate(all_tags) if tag in video_tags and row not in covered)
+        best = max((tag for tag in tags if tag not in selected), key=lambda tag: (round(gain(tag), 9), priorities[tag]))
+        selected.append(best)
+        covered.update(row for row, video_tags in enumerate(all_tags) if best in video_tags)
+    return selected
+
+
+class TestTagIncidence(unittest.TestCase):
+    """TagIncidence と lazy_greedy_cover の基本テスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.random = random.Random(1)
+    
+    def test_coverage(self):
+        """キー関数で正規化したタグの重み付きカバレッジ"""
+        incidence = TagIncidence.from_tags([['AI', 'SNS'], ['ai'], ['営業'], []], key=str.lower, weights=[1, 1, 2, 0])
+        
+        self.assertEqual(incidence.matrix.shape, (4, 3))
+        self.assertAlmostEqual(incidence.coverage(['ai']), 50.0)
+        self.assertAlmostEqual(incidence.coverage(['ai', '営業', '未使用']), 100.0)
+    
+    def test_save_and_memory_mapped_load(self):
+        """保存した .npz をメモリマップで読み込んで同じ分析結果になる"""
+        incidence = TagIncidence.from_tags(
+            [['AI', 'SNS'], ['AI'], ['営業', 'SNS'], []], groups=['営業', '営業', 'マーケ', None]
+        )
+        temp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(temp_dir, 'incidence.npz')
+            incidence.save(path)
+            loaded = TagIncidence.load(path)
+            
+            # 読み取り専用のメモリマップ上の配列をそのまま使う
+            self.assertFalse(loaded.matrix.indices.flags.writeable)
+            self.assertEqual(loaded.analytics(['AI', 'SNS']), incidence.analytics(['AI', 'SNS']))
+            self.assertEqual(loaded.group_coverage(['SNS'])[0], {
+                'group': '営業', 'videos': 2, 'covered_videos': 1, 'coverage_percentage': 50.0
+            })
+        finally:
+            shutil.rmtree(temp_dir)
+    
+    def test_lazy_greedy_matches_naive_greedy(self):
+        """遅延評価しても毎回全候補を評価する貪欲法と同じ順に選ぶ"""
+        tags = [f"タグ{index}" for index in range(30)]
+        for _ in range(10):
+            all_tags = [self.random.sample(tags, self.random.randint(0, 4)) for _ in range(150)]
+            weights = [self.random.random() for _ in all_tags]
+            priorities = {tag: self.random.random() for tag in tags}
+            
+            incidence = TagIncidence.from_tags(all_tags, weights=weights)
+            self.assertEqual(
+                lazy_greedy_cover(incidence, 12, tags, priorities),
+                naive_greedy(all_tags, weights, tags, 12, priorities)
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
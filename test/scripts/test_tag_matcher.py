@@ -0,0 +1,64 @@
+"""
+タグ語彙マッチングテスト
+トライ木によるタグ出現回数の集計と、フィールド重み付きの重要度スコアの確認
+"""
+
+import unittest
+import sys
+import os
+
+import pandas as pd
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from src.tag_matcher import TagMatcher
+from src.tag_optimizer import TagOptimizer
+
+
+class TestTagMatcher(unittest.TestCase):
+    """TagMatcher の基本テスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.matcher = TagMatcher(['マーケティング', 'デジタルマーケティング', 'KPI', 'KPI設計'])
+    
+    def test_counts_overlapping_japanese_tags(self):
+        """分かち書きなしで重なり合うタグもそれぞれ数える"""
+        counts = self.matcher.count('デジタルマーケティングとマーケティング')
+        
+        self.assertEqual(counts, {0: 2, 1: 1})
+    
+    def test_count_matrix_ignores_width_and_case(self):
+        """全角・半角と大文字・小文字の違いを無視して行列を作る"""
+        matrix = self.matcher.count_matrix(['ｋｐｉ設計とKPI', None, ''])
+        
+        self.assertEqual(matrix.shape, (3, 4))
+        self.assertEqual(matrix.toarray()[0].tolist(), [0, 0, 2, 1])
+        self.assertEqual(matrix[1:].nnz, 0)
+
+
+class TestImportanceScores(unittest.TestCase):
+    """TagOptimizer の重要度スコアのテスト"""
+    
+    def test_weighted_fields_rank_tags(self):
+        """重みの大きいフィールドに出現するタグほどスコアが高い"""
+        optimizer = TagOptimizer()
+        video_data = pd.DataFrame({
+            'title': ['マーケティング入門', '営業の基礎'],
+            'transcript': ['データ分析の話', 'データ分析の話']
+        })
+        
+        scores = optimizer._calculate_importance_scores(
+            ['マーケティング', 'データ分析', '営業', 'SNS運用'],
+            video_data,
+            {'title': 'title', 'transcript': 'transcript'}
+        )
+        
+        self.assertGreater(scores['マーケティング'], scores['データ分析'])
+        self.assertGreater(scores['データ分析'], 0.0)
+        self.assertEqual(scores['SNS運用'], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+タグ集計スケッチテスト
+上位タグの頻度が誤差の範囲に収まること、ユニーク数の推定精度の確認
+"""
+
+import random
+import unittest
+import sys
+import os
+from collections import Counter
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from src.tag_sketches import TagStreamSummary, HyperLogLog, SpaceSaving
+
+
+class TestTagSketches(unittest.TestCase):
+    """スケッチの基本テスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.random = random.Random(4)
+    
+    def test_top_tags_within_error_bounds(self):
+        """上位タグの真の頻度が下限〜上限に収まり、頻出タグは必ず残る"""
+        weights = [1.0 / (rank + 1) for rank in range(2000)]
+        rows = [
+            [f"タグ{rank}" for rank in self.random.choices(range(2000), weights=weights, k=5)]
+            for _ in range(4000)
+        ]
+        counts = Counter(tag for row in rows for tag in row)
+        
+        summary = TagStreamSummary(capacity=300, cms_width=1024, hll_precision=10)
+        for row in rows:
+            summary.add_tags(row)
+        result = summary.summary(20)
+        
+        for entry in result['top_tags']:
+            self.assertLessEqual(entry['lower_bound'], counts[entry['tag']])
+            self.assertGreaterEqual(entry['upper_bound'], counts[entry['tag']])
+        
+        reported = {entry['tag'] for entry in result['top_tags']}
+        for tag, count in counts.most_common(20):
+            if count > result['guaranteed_frequency'] * 2:
+                self.assertIn(tag, reported)
+        
+        self.assertEqual(result['rows'], 4000)
+        self.assertEqual(result['total_tags'], 20000)
+    
+    def test_space_saving_is_exact_within_capacity(self):
+        """保持数以内の項目は誤差なしで数える"""
+        sketch = SpaceSaving(capacity=10)
+        for item in ['a', 'b', 'a', 'c', 'a', 'b']:
+            sketch.add(item)
+        
+        self.assertEqual(sketch.top(2), [('a', 3, 0), ('b', 2, 0)])
+    
+    def test_hyperloglog_estimate(self):
+        """ユニーク数の推定が標準誤差の数倍以内に収まる"""
+        for size in (0, 50, 20000):
+            sketch = HyperLogLog(precision=12)
+            sketch.update([f"タグ{index % max(size, 1)}" for index in range(size * 2)])
+            self.assertLessEqual(abs(sketch.count() - size), max(1, 4 * sketch.relative_error * size))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+トークン使用量トラッカーテスト
+価格表によるコスト計算、ラベルの引き継ぎ、ラベル・モデルごとの集計を確認
+"""
+
+import asyncio
+import unittest
+import sys
+import os
+
+# プロジェクトのルートディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from src.ai_processors.usage_tracker import UsageTracker
+
+
+class TestUsageTracker(unittest.TestCase):
+    """UsageTracker のテスト"""
+    
+    def setUp(self):
+        """テストセットアップ"""
+        self.tracker = UsageTracker.from_config({
+            'pricing': {'per_million_tokens': {'gpt-3.5-turbo': {'input': 0.5, 'output': 1.5}}}
+        })
+    
+    def test_cost_from_price_table(self):
+        """価格表のモデルは100万トークンあたりの価格で、価格表に無いモデルは0で計算する"""
+        record = self.tracker.record('openai', 'gpt-3.5-turbo', 2_000_000, 1_000_000, 0.5)
+        self.assertAlmostEqual(record['cost'], 2.5)
+        self.assertEqual(self.tracker.record('mock', 'mock-llm', 1000, 100, 0.1)['cost'], 0.0)
+        self.assertAlmostEqual(self.tracker.estimate_cost('gpt-3.5-turbo', 10, 1000, 100), 10 * 0.00065)
+    
+    def test_labels_and_aggregation(self):
+        """labels() のラベルは非同期タスクにも引き継がれ、ラベル・モデルごとに集計できる"""
+        async def call(latency):
+            self.tracker.record('openai', 'gpt-3.5-turbo', 1000, 100, latency)
+        
+        async def run():
+            await asyncio.gather(*(call(0.1 * (index + 1)) for index in range(4)))
+        
+        with self.tracker.labels(stage='stage2', job_id='job-1'):
+            asyncio.run(run())
+            with self.tracker.labels(stage='stage1'):
+                self.tracker.record('openai', 'gpt-3.5-turbo', 500, 0, 1.0, success=False)
+        self.tracker.record('mock', 'mock-llm', 10, 10, 0.01)
+        
+        summary = self.tracker.summarize(job_id='job-1')
+        self.assertEqual(summary['calls'], 5)
+        self.assertEqual(summary['failed_calls'], 1)
+        self.assertEqual(summary['prompt_tokens'], 4500)
+        self.assertAlmostEqual(summary['p95_latency'], 1.0)
+        
+        by_stage = self.tracker.summarize_by('stage', job_id='job-1')
+        self.assertEqual(by_stage['stage2']['calls'], 4)
+        self.assertAlmostEqual(by_stage['stage2']['avg_latency'], 0.25)
+        self.assertEqual(set(self.tracker.summarize_by('model')), {'gpt-3.5-turbo', 'mock-llm'})
+        self.assertEqual(self.tracker.summarize_by('stage')['None']['calls'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,11 +12,18 @@ import json
 from typing import Dict, List, Any, Optional
 
 # パスを追加してモジュールをインポート
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from sheets_client_oauth import SheetsClientOAuth, display_oauth_ui
-from batch_processor import BatchProcessor
-from tag_optimizer import TagOptimizer
+from src.sheets_client_oauth import SheetsClientOAuth, display_oauth_ui
+from src.batch_processor import BatchProcessor
+from src.tag_optimizer import TagOptimizer
+from src.incremental_tag_optimizer import IncrementalTagOptimizer
+from src.row_identity import ROW_FIELDS, row_keys
+from src.tag_incidence import TagIncidence
+
+
+# 処理中の進捗・残り時間の表示を更新する最短間隔（秒）
+PROGRESS_UPDATE_SECONDS = 0.5
 
 
 def init_session_state():
@@ -126,7 +133,8 @@ def display_ai_selection() -> str:
         provider_map = {
             'openai': 'OpenAI GPT',
             'claude': 'Claude',
-            'gemini': 'Google Gemini'
+            'gemini': 'Google Gemini',
+            'mock': 'Mock LLM (オフライン)'
         }
         
         provider_options = [provider_map[p] for p in available_providers]
@@ -165,30 +173,69 @@ def display_processing_settings() -> Dict[str, Any]:
             help="最終的に出力するタグの目標数"
         )
     
+    concurrent = st.checkbox(
+        "並行処理モード",
+        value=False,
+        help="複数の動画を同時にAIへ送信します。送信間隔はプロバイダーのレート制限で調整されます"
+    )
+    
+    resume = st.checkbox(
+        "中断した処理を再開",
+        value=True,
+        help="同じスプレッドシート・AIプロバイダーで前回完了した動画はチェックポイントから復元し、再処理しません"
+    )
+    
+    incremental = st.checkbox(
+        "増分モード（新規・変更された動画のみAI処理）",
+        value=False,
+        help="前回の結果から内容・AIプロバイダーが変わっていない動画はタグを再利用します"
+    )
+    
+    incremental_optimization = st.checkbox(
+        "タグ最適化を前回の状態に追加",
+        value=False,
+        help="同じスプレッドシート・AIプロバイダーの保存済みタグ統計に、まだ取り込んでいない動画のタグだけを追加して最終タグを更新します"
+    )
+    
     return {
         'batch_size': batch_size,
-        'target_tag_count': target_tags
+        'target_tag_count': target_tags,
+        'concurrent': concurrent,
+        'resume': resume,
+        'incremental': incremental,
+        'incremental_optimization': incremental_optimization
     }
 
 
-def estimate_processing_info(total_videos: int, ai_provider: str, batch_size: int):
-    """処理時間・コスト推定を表示"""
+def estimate_processing_info(total_videos: int, ai_provider: str, batch_size: int, concurrent: bool = False):
+    """
+    処理時間・コスト推定を表示
+    
+    Returns:
+        総処理時間の表示枠（処理中に残り時間で更新する）。推定に失敗した場合は None
+    """
     try:
         batch_processor = BatchProcessor()
         
         # 設定を一時的に更新
         batch_processor.batch_size = batch_size
         
-        time_estimate = batch_processor.estimate_processing_time(total_videos, ai_provider)
-        memory_estimate = batch_processor.get_memory_usage_estimate(total_videos)
+        time_estimate = batch_processor.estimate_processing_time(total_videos, ai_provider, concurrent)
+        memory_estimate = batch_processor.get_memory_usage_estimate(total_videos, concurrent)
         
         st.subheader("📊 処理推定情報")
         
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            st.metric("総処理時間", f"{time_estimate['total_minutes']:.1f}分")
+            eta_placeholder = st.empty()
+            eta_placeholder.metric("総処理時間", f"{time_estimate['total_minutes']:.1f}分")
             st.metric("バッチ数", f"{time_estimate['total_batches']}")
+            if time_estimate['source'] == 'measured':
+                st.caption(
+                    f"実測レイテンシ p50 {time_estimate['latency_p50']:.1f}秒 / "
+                    f"p90 {time_estimate['latency_p90']:.1f}秒（{time_estimate['samples']}件）"
+                )
         
         with col2:
             st.metric("メモリ使用量", f"{memory_estimate['batch_mb']:.1f}MB")
@@ -196,23 +243,30 @@ def estimate_processing_info(total_videos: int, ai_provider: str, batch_size: in
             st.metric("メモリ状況", memory_safe)
         
         with col3:
-            # 概算コスト（プロバイダー別）
-            cost_per_video = {'openai': 0.01, 'claude': 0.015, 'gemini': 0.005}
-            estimated_cost = total_videos * cost_per_video.get(ai_provider, 0.01)
-            st.metric("推定コスト", f"${estimated_cost:.2f}")
+            # 概算コスト（価格表 × 見込みトークン数）
+            cost_estimate = batch_processor.estimate_processing_cost(total_videos, ai_provider)
+            st.metric("推定コスト", f"${cost_estimate['total_cost']:.2f}")
+            st.caption(
+                f"{cost_estimate['prompt_tokens_per_video']:.0f} + {cost_estimate['completion_tokens_per_video']:.0f} tokens/動画"
+            )
         
         if not memory_estimate['memory_safe']:
             st.warning("⚠️ メモリ使用量が制限を超える可能性があります。バッチサイズを小さくすることを推奨します。")
+        
+        return eta_placeholder
             
     except Exception as e:
         st.error(f"処理推定エラー: {str(e)}")
+        return None
 
 
 def process_videos(
     df: pd.DataFrame,
     ai_provider: str,
     column_mapping: Dict[str, str],
-    processing_settings: Dict[str, Any]
+    processing_settings: Dict[str, Any],
+    dataset_id: Optional[str] = None,
+    eta_placeholder=None
 ) -> Optional[Dict[str, Any]]:
     """動画処理を実行"""
     
@@ -221,9 +275,22 @@ def process_videos(
         progress_bar = st.progress(0)
         status_text = st.empty()
         
+        # 表示の更新は一定間隔ごと（最後の1件は必ず表示する）
+        last_update = {'time': 0.0}
+        
         def progress_callback(progress: float, current: int, total: int):
+            now = time.monotonic()
+            if current < total and now - last_update['time'] < PROGRESS_UPDATE_SECONDS:
+                return
+            last_update['time'] = now
             progress_bar.progress(progress / 100)
-            status_text.text(f"処理中: {current}/{total} 動画 ({progress:.1f}%)")
+            # 実測スループットから残り時間を更新
+            live = batch_processor.get_live_estimate()
+            status_text.text(
+                f"処理中: {current}/{total} 動画 ({progress:.1f}%) - 残り約{live['eta_minutes']:.1f}分"
+            )
+            if eta_placeholder is not None:
+                eta_placeholder.metric("総処理時間（残り）", f"{live['eta_minutes']:.1f}分")
         
         # バッチ処理実行
         status_text.text("バッチ処理を初期化中...")
@@ -231,21 +298,49 @@ def process_videos(
         batch_processor.batch_size = processing_settings['batch_size']
         
         status_text.text("AI処理でタグを生成中...")
-        all_tags = batch_processor.process_videos_batch(
-            df, ai_provider, column_mapping, progress_callback
-        )
+        job_id = f"batch-{time.strftime('%Y%m%d%H%M%S')}"
+        # 同じデータセット・プロバイダー・モデル・プロンプトの実行は同じ実行IDでチェックポイントを共有する
+        run_id = batch_processor.run_id_for(dataset_id, ai_provider, column_mapping)
+        with batch_processor.usage_tracker.labels(
+            stage='batch', job_id=job_id, dataset_id=dataset_id, ai_engine=ai_provider
+        ):
+            all_tags = batch_processor.process_videos_batch(
+                df, ai_provider, column_mapping, progress_callback,
+                concurrent=processing_settings.get('concurrent', False),
+                run_id=run_id,
+                resume=processing_settings.get('resume', True),
+                incremental_namespace=(dataset_id or 'default') if processing_settings.get('incremental') else None
+            )
         
         status_text.text("タグ最適化を実行中...")
         progress_bar.progress(90)
         
         # タグ最適化
-        tag_optimizer = TagOptimizer()
-        tag_optimizer.target_tag_count = processing_settings['target_tag_count']
-        
-        final_tags = tag_optimizer.optimize_tags(all_tags, df, column_mapping)
-        
-        # 分析レポート生成
-        analytics = tag_optimizer.generate_tag_analytics(final_tags, all_tags)
+        if processing_settings.get('incremental_optimization'):
+            tag_optimizer = create_incremental_optimizer(run_id)
+            tag_optimizer.target_tag_count = processing_settings['target_tag_count']
+            
+            # 前回までに取り込んだ行は読み飛ばし、新しい行のタグだけを状態に加える
+            fields = [column_mapping[field] for field in ROW_FIELDS if column_mapping.get(field) in df.columns]
+            final_tags = tag_optimizer.update(
+                all_tags, df, column_mapping, row_ids=row_keys(df.to_dict('records'), fields)
+            )
+        else:
+            tag_optimizer = TagOptimizer()
+            tag_optimizer.target_tag_count = processing_settings['target_tag_count']
+            
+            final_tags = tag_optimizer.optimize_tags(all_tags, df, column_mapping)
+        
+        # 分析レポート生成（接続行列は実行ごとに1回作成して保存し、結果表示で再読み込みする）
+        incidence = tag_optimizer.build_incidence(all_tags, df, column_mapping)
+        analytics = tag_optimizer.generate_tag_analytics(final_tags, all_tags, incidence)
+        incidence_dir = tag_optimizer.optimization_config.get('incidence_dir', 'checkpoints/incidence')
+        incidence_path = os.path.join(incidence_dir, f"{run_id}.npz")
+        try:
+            incidence.save(incidence_path)
+        except OSError as e:
+            st.warning(f"タグ接続行列の保存エラー: {str(e)}")
+            incidence_path = None
         
         progress_bar.progress(100)
         status_text.text("✅ 処理完了!")
@@ -254,7 +349,9 @@ def process_videos(
             'all_tags': all_tags,
             'final_tags': final_tags,
             'analytics': analytics,
-            'processed_data': df
+            'processed_data': df,
+            'incidence_path': incidence_path,
+            'usage': batch_processor.usage_tracker.summarize(job_id=job_id)
         }
         
     except Exception as e:
@@ -262,6 +359,35 @@ def process_videos(
         return None
 
 
+def create_incremental_optimizer(run_id: str) -> IncrementalTagOptimizer:
+    """
+    実行IDごとの状態ファイルを使うインクリメンタルタグ最適化を作成
+    
+    保存済みの状態が現在の設定と互換性がない場合は警告を表示し、空の状態から作り直す
+    
+    Args:
+        run_id: 実行ID
+    
+    Returns:
+        インクリメンタルタグ最適化インスタンス
+    """
+    default_path = TagOptimizer().optimization_config.get('state_path', 'checkpoints/tag_optimizer_state.json')
+    root, extension = os.path.splitext(default_path)
+    state_path = f"{root}_{run_id}{extension or '.json'}"
+    
+    try:
+        return IncrementalTagOptimizer(state_path=state_path)
+    except ValueError as e:
+        st.warning(f"{str(e)}。空の状態から作り直します")
+        return IncrementalTagOptimizer(state_path=state_path, reset_state=True)
+
+
+@st.cache_resource
+def load_tag_incidence(path: str, modified_time: float) -> TagIncidence:
+    """保存済みのタグ接続行列をメモリマップで読み込み（更新時刻が変わるまでキャッシュ）"""
+    return TagIncidence.load(path)
+
+
 def display_results(results: Dict[str, Any]):
     """結果を表示"""
     st.subheader("📈 処理結果")
@@ -283,6 +409,44 @@ def display_results(results: Dict[str, Any]):
     with col4:
         st.metric("カバレッジ", f"{analytics['coverage_percentage']:.1f}%")
     
+    # スキル別カバレッジ・タグ共起
+    skill_coverage = analytics.get('skill_coverage', [])
+    cooccurrence = analytics.get('cooccurrence', [])
+    incidence_path = results.get('incidence_path')
+    if incidence_path and os.path.exists(incidence_path):
+        incidence = load_tag_incidence(incidence_path, os.path.getmtime(incidence_path))
+        final_keys = [tag.lower() for tag in results['final_tags']]
+        skill_coverage = incidence.group_coverage(final_keys)
+        cooccurrence = incidence.cooccurrence(final_keys)
+    
+    if skill_coverage:
+        with st.expander("📊 スキル別カバレッジ"):
+            st.dataframe(pd.DataFrame(skill_coverage), use_container_width=True)
+    
+    if cooccurrence:
+        with st.expander("🔗 よく一緒に付くタグ"):
+            st.dataframe(pd.DataFrame([
+                {'タグ1': pair['tags'][0], 'タグ2': pair['tags'][1], '動画数': pair['videos']}
+                for pair in cooccurrence
+            ]), use_container_width=True)
+    
+    # トークン使用量・コスト
+    usage = results.get('usage')
+    if usage and usage['calls'] > 0:
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("API呼び出し", f"{usage['calls']}回")
+        
+        with col2:
+            st.metric("入力トークン", f"{usage['prompt_tokens']:,}")
+        
+        with col3:
+            st.metric("出力トークン", f"{usage['completion_tokens']:,}")
+        
+        with col4:
+            st.metric("実コスト", f"${usage['cost']:.4f}")
+    
     # 最終タグ表示
     st.subheader("🏷️ 最終タグセット")
     
@@ -425,7 +589,9 @@ def main():
                 
                 # 処理推定情報
                 total_videos = len(st.session_state.spreadsheet_data)
-                estimate_processing_info(total_videos, ai_provider, processing_settings['batch_size'])
+                eta_placeholder = estimate_processing_info(
+                    total_videos, ai_provider, processing_settings['batch_size'], processing_settings['concurrent']
+                )
                 
                 # Step 4: 処理実行
                 st.header("4️⃣ タグ生成実行")
@@ -435,7 +601,9 @@ def main():
                         st.session_state.spreadsheet_data,
                         ai_provider,
                         column_mapping,
-                        processing_settings
+                        processing_settings,
+                        dataset_id=spreadsheet_url,
+                        eta_placeholder=eta_placeholder
                     )
                     
                     if results: